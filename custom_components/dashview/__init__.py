@@ -1,9 +1,14 @@
 """Dashview - Custom Home Assistant Dashboard Integration."""
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import time
+from collections.abc import Awaitable
+from datetime import timedelta
 from pathlib import Path
+from typing import TypeVar
 
 from homeassistant.components.frontend import (
     async_register_built_in_panel,
@@ -12,24 +17,85 @@ from homeassistant.components.frontend import (
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.components import websocket_api
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.storage import Store
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 
+from .anomaly import EXPIRE_INTERVAL, AnomalyDetector
+from .artwork import ArtworkCache
 from .const import (
+    CONF_LOOP_MONITOR,
+    CONF_LOOP_MONITOR_THRESHOLD,
+    CONF_PERSIST_UNDO_HISTORY,
+    CONF_RECENT_VALUES_RESOLUTION,
+    CONF_RECENT_VALUES_WINDOW,
+    DEFAULT_LOOP_MONITOR_THRESHOLD,
+    DEFAULT_RECENT_VALUES_RESOLUTION,
+    DEFAULT_RECENT_VALUES_WINDOW,
     DOMAIN,
     PANEL_ICON,
     PANEL_NAME,
     PANEL_TITLE,
     PANEL_URL,
+    SIGNAL_SETTINGS_UPDATED,
     URL_BASE,
     VERSION,
 )
+from .discovery import DiscoveryIndex
+from .entity_stream import DisplayedEntities
+from .log_sampler import SUMMARY_INTERVAL, get_log_sampler
+from .loop_monitor import get_loop_monitor
+from .overlays import SettingsOverlays
+from .presence import PresenceCache
+from .recent_values import (
+    SNAPSHOT_INTERVAL,
+    RecentValuesCache,
+    tracked_entities,
+)
+from .rooms import RoomAggregator
+from .search import SearchIndex
+from .settings_history import SettingsHistory
+from .settings_writer import SettingsWriter
+from .static_assets import (
+    BOOTSTRAP_URL,
+    DashviewAssetView,
+    DashviewBootstrapView,
+)
+from .statistics import StatisticsCache
+from .storage import SettingsStore
+from .status import StatusEngine
+from .suggestions import SuggestionEngine
+from .weather import WeatherForecasts
 from .websocket import (
     websocket_get_settings,
     websocket_save_settings,
     websocket_save_settings_delta,
     websocket_upload_photo,
     websocket_delete_photo,
+    websocket_history_summary,
+    websocket_media_artwork,
+    websocket_presence_history,
+    websocket_redo,
+    websocket_save_user_settings,
+    websocket_search_entities,
+    websocket_statistics_summary,
+    websocket_subscribe_anomalies,
+    websocket_subscribe_discovery,
+    websocket_subscribe_entities,
+    websocket_subscribe_rooms,
+    websocket_subscribe_status,
+    websocket_subscribe_suggestions,
+    websocket_subscribe_weather,
+    websocket_suggestion_action,
+    websocket_undo,
+    DATA_LOADED,
+    async_end_subscriptions,
     deep_merge,
 )
 
@@ -45,8 +111,18 @@ from .security import (  # noqa: F401
 
 _LOGGER = logging.getLogger(__name__)
 
-STORAGE_KEY = f"{DOMAIN}.settings"
-STORAGE_VERSION = 1
+# hass.data key for the asset view; outlives the config entry because
+# HTTP routes cannot be removed once registered
+DATA_ASSET_VIEW = f"{DOMAIN}_asset_view"
+
+_T = TypeVar("_T")
+
+# Entity registry changes that affect which entities are displayed where
+_REGISTRY_CHANGES = {"labels", "area_id", "device_id"}
+
+# Seconds to collect settings writes and registry changes before the
+# engines are rebuilt once for all of them
+REBUILD_DELAY = 0.5
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -59,26 +135,315 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Dashview from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
-    # Initialize storage
-    store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+    # Recent values of displayed sensors, served to charts from memory
+    recent_values = RecentValuesCache(hass)
+    hass.data[DOMAIN]["recent_values"] = recent_values
+    entry.async_on_unload(recent_values.async_stop)
+
+    # Long-term statistics responses for week/month charts
+    hass.data[DOMAIN]["statistics_cache"] = StatisticsCache()
+
+    # Person zone transitions for the user popup
+    presence_cache = PresenceCache(hass)
+    hass.data[DOMAIN]["presence_cache"] = presence_cache
+    entry.async_on_unload(presence_cache.async_stop)
+
+    # Rate-of-change anomalies of displayed climate sensors
+    anomaly_detector = AnomalyDetector(hass)
+    hass.data[DOMAIN]["anomaly_detector"] = anomaly_detector
+    entry.async_on_unload(anomaly_detector.async_stop)
+
+    # Per-room card data, updated per state change
+    room_aggregator = RoomAggregator(hass)
+    hass.data[DOMAIN]["room_aggregator"] = room_aggregator
+    entry.async_on_unload(room_aggregator.async_stop)
+
+    # Info-text row summary, updated per state change
+    status_engine = StatusEngine(hass)
+    hass.data[DOMAIN]["status_engine"] = status_engine
+    entry.async_on_unload(status_engine.async_stop)
+
+    # Smart suggestions, evaluated per state change of their conditions
+    suggestion_engine = SuggestionEngine(hass)
+    hass.data[DOMAIN]["suggestion_engine"] = suggestion_engine
+    entry.async_on_unload(suggestion_engine.async_stop)
+
+    # Weather, person, pollen and DWD warning entities for discovery
+    discovery_index = DiscoveryIndex(hass)
+    hass.data[DOMAIN]["discovery_index"] = discovery_index
+    entry.async_on_unload(discovery_index.async_stop)
+
+    # Entity search for the entity picker
+    search_index = SearchIndex(hass)
+    hass.data[DOMAIN]["search_index"] = search_index
+    entry.async_on_unload(search_index.async_stop)
+
+    # Weather forecasts shared by all panels
+    weather_forecasts = WeatherForecasts(hass)
+    hass.data[DOMAIN]["weather_forecasts"] = weather_forecasts
+    entry.async_on_unload(weather_forecasts.async_stop)
+
+    # Media preset artwork, fetched once and served locally
+    artwork_cache = ArtworkCache(hass)
+    hass.data[DOMAIN]["artwork_cache"] = artwork_cache
+
+    # Entities forwarded by dashview/subscribe_entities
+    displayed_entities = DisplayedEntities(hass, discovery_index)
+    hass.data[DOMAIN]["displayed_entities"] = displayed_entities
+
+    # Undo and redo of settings changes for dashview/undo and dashview/redo
+    settings_history = SettingsHistory(hass)
+    hass.data[DOMAIN]["settings_history"] = settings_history
+
+    # Per-user settings overlays for dashview/save_user_settings
+    overlays = SettingsOverlays(hass)
+    hass.data[DOMAIN]["overlays"] = overlays
+
+    # Opt-in event-loop blocking detector and cache sizing (options flow)
+    _async_apply_options(hass, entry)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    monitor = get_loop_monitor()
+
+    # Per-phase startup timings in ms, reported in debug logs and diagnostics
+    timings: dict[str, float] = {}
+    hass.data[DOMAIN]["startup_timings"] = timings
+    start = time.perf_counter()
+
+    # Initialize storage (compact enabled* maps on disk, migrations and
+    # legacy file imports run in the executor on load, see storage.py)
+    store = SettingsStore(hass)
     hass.data[DOMAIN]["store"] = store
 
-    # Load existing settings
-    data = await store.async_load()
-    hass.data[DOMAIN]["settings"] = data or {
-        "enabledRooms": {},
-        "enabledLights": {},
-    }
+    # Single writer of the settings: serialized updates, group commits
+    settings_writer = SettingsWriter(hass, store)
+    hass.data[DOMAIN]["settings_writer"] = settings_writer
 
-    # Register WebSocket commands
+    # Register WebSocket commands before the panel can be registered;
+    # commands using stored data wait until it is loaded (see after_load)
+    loaded = asyncio.Event()
+    hass.data[DOMAIN][DATA_LOADED] = loaded
     async_register_websocket_commands(hass)
 
-    # Set up frontend
-    await async_setup_frontend(hass)
+    # Load existing settings and the caches and set up the frontend
+    # concurrently; none depends on the other and all file I/O runs in the
+    # executor. The caches are optional: a broken one is logged and starts
+    # empty instead of failing the integration.
+    def _load_cache(phase: str, awaitable: Awaitable[None]) -> Awaitable[None]:
+        return _async_timed(
+            timings,
+            phase,
+            _async_load_optional(phase, monitor.run(f"setup.{phase}", awaitable)),
+        )
+
+    try:
+        data, _, _, _, _, _, _, _ = await asyncio.gather(
+            _async_timed(
+                timings,
+                "store_load",
+                monitor.run("setup.store_load", store.async_load()),
+            ),
+            _load_cache("recent_values_load", recent_values.async_load()),
+            _load_cache("suggestions_load", suggestion_engine.async_load()),
+            _load_cache("weather_forecasts_load", weather_forecasts.async_load()),
+            _load_cache("artwork_load", artwork_cache.async_load()),
+            _load_cache("settings_history_load", settings_history.async_load()),
+            _load_cache("overlays_load", overlays.async_load()),
+            monitor.run("setup.frontend", async_setup_frontend(hass, timings)),
+        )
+        hass.data[DOMAIN]["settings"] = data or {
+            "enabledRooms": {},
+            "enabledLights": {},
+        }
+    finally:
+        # Wake the waiting handlers; without settings they answer with an
+        # error (see after_load)
+        loaded.set()
+
+    # Follow the displayed entities as settings, labels or rooms change
+    unsub_rebuild = None
+
+    @callback
+    def _async_rebuild(_now=None) -> None:
+        nonlocal unsub_rebuild
+        unsub_rebuild = None
+        settings = hass.data[DOMAIN]["settings"]
+        recent_values.async_set_tracked(tracked_entities(hass, settings))
+        anomaly_detector.async_update_settings(settings, recent_values)
+        room_aggregator.async_rebuild(settings)
+        status_engine.async_rebuild(settings)
+        suggestion_engine.async_rebuild(settings)
+        displayed_entities.async_rebuild(settings)
+
+    @callback
+    def _async_settings_updated() -> None:
+        # Bursts of saves and registry changes rebuild the engines once
+        nonlocal unsub_rebuild
+        overlays.invalidate()
+        if unsub_rebuild is None:
+            unsub_rebuild = async_call_later(hass, REBUILD_DELAY, _async_rebuild)
+
+    @callback
+    def _async_cancel_rebuild() -> None:
+        if unsub_rebuild is not None:
+            unsub_rebuild()
+
+    @callback
+    def _async_registry_updated(event: Event) -> None:
+        if event.data.get("action") == "update" and not (
+            _REGISTRY_CHANGES & event.data.get("changes", {}).keys()
+        ):
+            return
+        _async_settings_updated()
+
+    @callback
+    def _async_rooms_updated(event: Event) -> None:
+        room_aggregator.async_rebuild(hass.data[DOMAIN]["settings"])
+
+    @callback
+    def _async_device_updated(event: Event) -> None:
+        if event.data.get("action") == "update" and "area_id" not in event.data.get(
+            "changes", {}
+        ):
+            return
+        _async_rooms_updated(event)
+
+    @callback
+    def _async_discovery_updated(changes: dict) -> None:
+        # Pollen sensors and the fallback weather entity are displayed
+        if "pollen" in changes or "weather" in changes:
+            displayed_entities.async_rebuild(hass.data[DOMAIN]["settings"])
+
+    # Indexed before the first rebuild, which reads the discovered entities
+    discovery_index.async_start()
+    discovery_index.async_add_listener(_async_discovery_updated)
+    _async_rebuild()
+    search_index.async_start()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_SETTINGS_UPDATED, _async_settings_updated
+        )
+    )
+    entry.async_on_unload(_async_cancel_rebuild)
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, _async_registry_updated
+        )
+    )
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            dr.EVENT_DEVICE_REGISTRY_UPDATED, _async_device_updated
+        )
+    )
+    entry.async_on_unload(
+        hass.bus.async_listen(ar.EVENT_AREA_REGISTRY_UPDATED, _async_rooms_updated)
+    )
+
+    # Let anomalies age out of their window without new samples
+    @callback
+    def _async_expire_anomalies(_now) -> None:
+        anomaly_detector.async_evaluate_all()
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_expire_anomalies, timedelta(seconds=EXPIRE_INTERVAL)
+        )
+    )
+
+    # Periodically summarize suppressed security/rate-limit warnings
+    @callback
+    def _async_flush_log_sampler(_now) -> None:
+        get_log_sampler().flush()
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_flush_log_sampler, timedelta(seconds=SUMMARY_INTERVAL)
+        )
+    )
+
+    # Snapshot recent values periodically and on shutdown
+    async def _async_snapshot_recent_values(_now) -> None:
+        if recent_values.dirty:
+            await recent_values.async_save()
+
+    async def _async_final_write(_event: Event) -> None:
+        await recent_values.async_save(clean=True)
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            _async_snapshot_recent_values,
+            timedelta(seconds=SNAPSHOT_INTERVAL),
+        )
+    )
+    entry.async_on_unload(
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, _async_final_write
+        )
+    )
+
+    timings["total"] = _elapsed_ms(start)
+    _LOGGER.debug("Dashview startup timings (ms): %s", timings)
 
     return True
 
 
+def _elapsed_ms(start: float) -> float:
+    """Return milliseconds elapsed since a perf_counter() timestamp."""
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+async def _async_timed(
+    timings: dict[str, float], phase: str, awaitable: Awaitable[_T]
+) -> _T:
+    """Await and record the duration of a startup phase."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[phase] = _elapsed_ms(start)
+
+
+async def _async_load_optional(phase: str, awaitable: Awaitable[None]) -> None:
+    """Await a cache load, logging failures instead of raising them."""
+    try:
+        await awaitable
+    except Exception:  # noqa: BLE001
+        _LOGGER.warning("Startup phase %s failed, starting empty", phase, exc_info=True)
+
+
+@callback
+def _async_apply_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply config entry options to the loop monitor, caches and history."""
+    get_loop_monitor().configure(
+        entry.options.get(CONF_LOOP_MONITOR, False),
+        entry.options.get(
+            CONF_LOOP_MONITOR_THRESHOLD, DEFAULT_LOOP_MONITOR_THRESHOLD
+        ),
+    )
+    recent_values: RecentValuesCache | None = hass.data[DOMAIN].get("recent_values")
+    if recent_values is not None:
+        recent_values.configure(
+            entry.options.get(
+                CONF_RECENT_VALUES_WINDOW, DEFAULT_RECENT_VALUES_WINDOW
+            ),
+            entry.options.get(
+                CONF_RECENT_VALUES_RESOLUTION, DEFAULT_RECENT_VALUES_RESOLUTION
+            ),
+        )
+    settings_history: SettingsHistory | None = hass.data[DOMAIN].get(
+        "settings_history"
+    )
+    if settings_history is not None:
+        settings_history.configure(
+            entry.options.get(CONF_PERSIST_UNDO_HISTORY, False)
+        )
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Handle options update without reloading the entry."""
+    _async_apply_options(hass, entry)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Remove frontend panel (#77)
@@ -88,6 +453,25 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     except Exception:  # noqa: BLE001
         _LOGGER.debug("Panel %s was not registered, skipping removal", panel_url)
 
+    # Tell panels their subscriptions end with the engines
+    if DOMAIN in hass.data:
+        async_end_subscriptions(hass)
+
+    # Finish the settings saves in flight before the writer is dropped
+    settings_writer: SettingsWriter | None = hass.data.get(DOMAIN, {}).get(
+        "settings_writer"
+    )
+    if settings_writer is not None:
+        await settings_writer.async_flush()
+
+    # Persist recent values so a reload starts warm; the next setup seeds
+    # the buffers with the current states, so the snapshot is clean
+    recent_values: RecentValuesCache | None = hass.data.get(DOMAIN, {}).get(
+        "recent_values"
+    )
+    if recent_values is not None:
+        await recent_values.async_save(clean=True)
+
     # Clean up domain data
     hass.data.pop(DOMAIN, None)
 
@@ -102,11 +486,29 @@ def async_register_websocket_commands(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, websocket_save_settings_delta)
     websocket_api.async_register_command(hass, websocket_upload_photo)
     websocket_api.async_register_command(hass, websocket_delete_photo)
+    websocket_api.async_register_command(hass, websocket_history_summary)
+    websocket_api.async_register_command(hass, websocket_statistics_summary)
+    websocket_api.async_register_command(hass, websocket_presence_history)
+    websocket_api.async_register_command(hass, websocket_subscribe_anomalies)
+    websocket_api.async_register_command(hass, websocket_subscribe_entities)
+    websocket_api.async_register_command(hass, websocket_subscribe_rooms)
+    websocket_api.async_register_command(hass, websocket_subscribe_status)
+    websocket_api.async_register_command(hass, websocket_subscribe_suggestions)
+    websocket_api.async_register_command(hass, websocket_suggestion_action)
+    websocket_api.async_register_command(hass, websocket_subscribe_weather)
+    websocket_api.async_register_command(hass, websocket_subscribe_discovery)
+    websocket_api.async_register_command(hass, websocket_search_entities)
+    websocket_api.async_register_command(hass, websocket_media_artwork)
+    websocket_api.async_register_command(hass, websocket_undo)
+    websocket_api.async_register_command(hass, websocket_redo)
+    websocket_api.async_register_command(hass, websocket_save_user_settings)
 
 
 def _get_asset_manifest(frontend_path: Path) -> dict | None:
     """Read asset manifest for content-hashed filenames.
 
+    Does blocking file I/O; must be run in the executor.
+
     Returns the manifest dict if found, None otherwise (dev mode).
     """
     manifest_path = frontend_path / "dist" / "asset-manifest.json"
@@ -120,50 +522,82 @@ def _get_asset_manifest(frontend_path: Path) -> dict | None:
     return None
 
 
-async def async_setup_frontend(hass: HomeAssistant) -> None:
-    """Set up the frontend panel."""
+async def async_setup_frontend(
+    hass: HomeAssistant, timings: dict[str, float] | None = None
+) -> None:
+    """Set up the frontend panel.
+
+    Args:
+        hass: Home Assistant instance
+        timings: Optional dict that receives per-phase durations in ms
+    """
+    if timings is None:
+        timings = {}
     frontend_path = Path(__file__).parent / "frontend"
-    dist_path = frontend_path / "dist"
 
-    # Check for bundled assets (production mode)
-    manifest = _get_asset_manifest(frontend_path)
+    # Check for bundled assets (production mode) without blocking the loop
+    manifest = await _async_timed(
+        timings,
+        "manifest",
+        hass.async_add_executor_job(_get_asset_manifest, frontend_path),
+    )
 
-    static_paths = [
-        # Always register base frontend path for unbundled development
-        StaticPathConfig(
-            URL_BASE,
-            str(frontend_path),
-            cache_headers=False,
-        )
-    ]
+    # Serve dist/, vendor/ and locales/ with pre-compressed .br/.gz
+    # variants, plus the bootstrap module for code-split builds. Registered
+    # before the plain static path so they take precedence.
+    asset_view: DashviewAssetView | None = hass.data.get(DATA_ASSET_VIEW)
+    if asset_view is None:
+        asset_view = DashviewAssetView(hass, frontend_path, manifest)
+        hass.http.register_view(asset_view)
+        hass.http.register_view(DashviewBootstrapView(asset_view))
+        hass.data[DATA_ASSET_VIEW] = asset_view
+    else:
+        asset_view.set_manifest(manifest)
 
-    # If dist exists, register it for bundled assets
-    if dist_path.exists():
-        static_paths.append(
+    # Always register base frontend path for unbundled development
+    await _async_timed(
+        timings,
+        "static_paths",
+        hass.http.async_register_static_paths([
             StaticPathConfig(
-                f"{URL_BASE}/dist",
-                str(dist_path),
-                # Enable caching for hashed files (filename changes on content change)
-                cache_headers=True,
+                URL_BASE,
+                str(frontend_path),
+                cache_headers=False,
             )
-        )
-
-    await hass.http.async_register_static_paths(static_paths)
+        ]),
+    )
 
-    # Determine JS URL based on manifest availability
-    if manifest and "dashview-panel.js" in manifest:
+    # Determine panel script based on manifest availability
+    panel_custom = {
+        "name": PANEL_NAME,
+        "embed_iframe": False,
+    }
+    if manifest and isinstance(manifest.get("entry"), str):
+        # Code-split build: bootstrap module preloads the critical chunks
+        js_url = f"{BOOTSTRAP_URL}?v={manifest['entry']}"
+        panel_custom["module_url"] = js_url
+        _LOGGER.info(
+            "Using code-split frontend: %s (%d shared, %d lazy chunks)",
+            manifest["entry"],
+            len(manifest.get("shared", [])),
+            len(manifest.get("lazy", [])),
+        )
+    elif manifest and "dashview-panel.js" in manifest:
         # Production mode: use content-hashed bundle
         hashed_filename = manifest["dashview-panel.js"]
         js_url = f"{URL_BASE}/dist/{hashed_filename}"
+        panel_custom["js_url"] = js_url
         _LOGGER.info("Using bundled frontend: %s", hashed_filename)
     else:
         # Development mode: use unbundled source with version query param
         js_url = f"{URL_BASE}/dashview-panel.js?v={VERSION}"
+        panel_custom["js_url"] = js_url
         _LOGGER.info("Using unbundled frontend (dev mode)")
 
     # Always (re-)register the panel to ensure js_url stays current
     # after version bumps. async_register_built_in_panel overwrites
     # any existing registration for the same frontend_url_path.
+    start = time.perf_counter()
     panel_url = PANEL_URL.lstrip("/")
     if panel_url in hass.data.get("frontend_panels", {}):
         async_remove_panel(hass, panel_url)
@@ -174,12 +608,7 @@ async def async_setup_frontend(hass: HomeAssistant) -> None:
         sidebar_icon=PANEL_ICON,
         frontend_url_path=panel_url,
         require_admin=False,
-        config={
-            "_panel_custom": {
-                "name": PANEL_NAME,
-                "js_url": js_url,
-                "embed_iframe": False,
-            }
-        },
+        config={"_panel_custom": panel_custom},
     )
+    timings["panel_registration"] = _elapsed_ms(start)
     _LOGGER.info("Dashview frontend panel registered: %s", js_url)
@@ -0,0 +1,309 @@
+"""Dashview - Server-side rate-of-change anomaly detection.
+
+Runs the same check as frontend/services/anomaly-detector.js once on the
+server instead of in every open panel: for each enabled temperature and
+humidity sensor, the change between the oldest and the newest value within
+the configured window is compared with the configured threshold (settings
+tempRapidChange* / humidityRapidChange*).
+
+Each sensor keeps a sliding window of recent points in a deque. A state
+change appends one point and drops points that left the window from the
+front, so updates are amortized O(1) and the oldest and newest values are
+always at the ends. Samples closer than COALESCE_SECONDS replace the newest
+point to bound memory for chatty sensors.
+
+Subscribers (dashview/subscribe_anomalies) are notified when an anomaly
+appears, changes or clears.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Any, Callable
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .entities import enabled_entities
+from .recent_values import RecentValuesCache, parse_numeric
+
+_LOGGER = logging.getLogger(__name__)
+
+KIND_TEMPERATURE = "temperature"
+KIND_HUMIDITY = "humidity"
+
+# Kind -> (threshold setting, window setting, default threshold, default
+# window minutes); defaults match THRESHOLDS in the frontend constants
+KIND_SETTINGS = {
+    KIND_TEMPERATURE: (
+        "tempRapidChangeThreshold", "tempRapidChangeWindowMinutes", 5, 60,
+    ),
+    KIND_HUMIDITY: (
+        "humidityRapidChangeThreshold", "humidityRapidChangeWindowMinutes", 20, 30,
+    ),
+}
+
+# Samples closer together than this replace the newest point
+COALESCE_SECONDS = 10
+
+# Changes over less than a minute are not rated (as in the panel)
+MIN_DURATION = 60
+
+# How often windows are re-evaluated without new samples
+EXPIRE_INTERVAL = 60
+
+AnomalyListener = Callable[[dict[str, dict[str, Any] | None]], None]
+
+
+class RateWindow:
+    """Sliding time window of (timestamp, value) points.
+
+    Attributes:
+        points: Points within the window, oldest first
+        window: Window length in seconds
+    """
+
+    __slots__ = ("points", "window")
+
+    def __init__(self, window: float) -> None:
+        """Initialize an empty window.
+
+        Args:
+            window: Window length in seconds
+        """
+        self.points: deque[tuple[float, float]] = deque()
+        self.window = window
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a point and drop points that left the window."""
+        points = self.points
+        if points and timestamp < points[-1][0]:
+            return
+        if len(points) > 1 and timestamp - points[-1][0] < COALESCE_SECONDS:
+            # Never replace the oldest point, it anchors the window
+            points[-1] = (timestamp, value)
+        else:
+            points.append((timestamp, value))
+        self.expire(timestamp)
+
+    def expire(self, now: float) -> None:
+        """Drop points older than the window."""
+        points = self.points
+        cutoff = now - self.window
+        while points and points[0][0] < cutoff:
+            points.popleft()
+
+    def rate(self, now: float) -> tuple[float, float] | None:
+        """Return (change, duration in seconds) within the window.
+
+        Returns:
+            None if there are fewer than two points or less than a minute
+            between them
+        """
+        self.expire(now)
+        if len(self.points) < 2:
+            return None
+        oldest_time, oldest_value = self.points[0]
+        newest_time, newest_value = self.points[-1]
+        duration = newest_time - oldest_time
+        if duration < MIN_DURATION:
+            return None
+        return newest_value - oldest_value, duration
+
+
+def evaluate(
+    window: RateWindow, threshold: float, now: float
+) -> dict[str, Any] | None:
+    """Return the anomaly of a window, or None if within the threshold.
+
+    The result has the fields of the panel's AnomalyResult: change
+    (absolute), duration (minutes) and direction.
+    """
+    rate = window.rate(now)
+    if rate is None:
+        return None
+    change, duration = rate
+    if abs(change) < threshold:
+        return None
+    return {
+        "change": round(abs(change), 2),
+        "duration": round(duration / 60),
+        "direction": "rising" if change >= 0 else "falling",
+    }
+
+
+class AnomalyDetector:
+    """Incremental rate-of-change detection for displayed climate sensors."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the detector.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._kinds: dict[str, str] = {}
+        self._windows: dict[str, RateWindow] = {}
+        self._thresholds: dict[str, tuple[float, float]] = {
+            kind: (defaults[2], defaults[3] * 60)
+            for kind, defaults in KIND_SETTINGS.items()
+        }
+        self._anomalies: dict[str, dict[str, Any]] = {}
+        self._listeners: list[AnomalyListener] = []
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @property
+    def anomalies(self) -> dict[str, dict[str, Any]]:
+        """Currently active anomalies by entity ID."""
+        return dict(self._anomalies)
+
+    @callback
+    def async_update_settings(
+        self, settings: dict, cache: RecentValuesCache | None = None
+    ) -> None:
+        """Apply thresholds and the set of sensors from the settings.
+
+        New sensors are seeded from the recent values cache, so anomalies
+        are detected right after a restart.
+
+        Args:
+            settings: Dashview settings
+            cache: Recent values cache to seed windows from
+        """
+        for kind, (threshold_key, window_key, threshold, minutes) in KIND_SETTINGS.items():
+            self._thresholds[kind] = (
+                _positive(settings.get(threshold_key), threshold),
+                _positive(settings.get(window_key), minutes) * 60,
+            )
+
+        kinds: dict[str, str] = {}
+        for kind in KIND_SETTINGS:
+            for entity_id in enabled_entities(self._hass, settings, kind):
+                if entity_id.startswith("sensor."):
+                    kinds.setdefault(entity_id, kind)
+
+        now = time.time()
+        for entity_id in set(self._windows) - set(kinds):
+            del self._windows[entity_id]
+        for entity_id, kind in kinds.items():
+            window_length = self._thresholds[kind][1]
+            rate_window = self._windows.get(entity_id)
+            if rate_window is None:
+                rate_window = self._windows[entity_id] = RateWindow(window_length)
+                if cache is not None:
+                    times, values = cache.series(entity_id, now - window_length, now)
+                    for timestamp, value in zip(times, values):
+                        rate_window.add(timestamp, value)
+            else:
+                rate_window.window = window_length
+        self._kinds = kinds
+
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if kinds:
+            self._unsub = async_track_state_change_event(
+                self._hass, list(kinds), self._async_state_changed
+            )
+        self.async_evaluate_all()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for state changes."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._listeners.clear()
+
+    @callback
+    def async_add_listener(self, listener: AnomalyListener) -> CALLBACK_TYPE:
+        """Register a callback receiving {entity_id: anomaly or None} changes.
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def async_record(self, entity_id: str, raw: Any, timestamp: float) -> None:
+        """Add a sample for a tracked sensor and re-evaluate it."""
+        rate_window = self._windows.get(entity_id)
+        if rate_window is None:
+            return
+        value = parse_numeric(raw)
+        if value is None:
+            return
+        rate_window.add(timestamp, value)
+        changes = self._evaluate(entity_id, timestamp)
+        if changes:
+            self._notify(changes)
+
+    @callback
+    def async_evaluate_all(self, now: float | None = None) -> None:
+        """Re-evaluate every window, e.g. when anomalies age out."""
+        now = time.time() if now is None else now
+        changes: dict[str, dict[str, Any] | None] = {}
+        for entity_id in self._windows:
+            changes.update(self._evaluate(entity_id, now))
+        for entity_id in set(self._anomalies) - set(self._windows):
+            del self._anomalies[entity_id]
+            changes[entity_id] = None
+        if changes:
+            self._notify(changes)
+
+    def get_report(self) -> dict[str, Any]:
+        """Return detector statistics for diagnostics."""
+        return {
+            "sensors": len(self._windows),
+            "points": sum(len(w.points) for w in self._windows.values()),
+            "active_anomalies": len(self._anomalies),
+            "subscribers": len(self._listeners),
+        }
+
+    def _evaluate(
+        self, entity_id: str, now: float
+    ) -> dict[str, dict[str, Any] | None]:
+        """Evaluate one sensor and return its change, if any."""
+        kind = self._kinds[entity_id]
+        anomaly = evaluate(self._windows[entity_id], self._thresholds[kind][0], now)
+        if anomaly is not None:
+            anomaly["kind"] = kind
+        previous = self._anomalies.get(entity_id)
+        if anomaly == previous:
+            return {}
+        if anomaly is None:
+            del self._anomalies[entity_id]
+        else:
+            self._anomalies[entity_id] = anomaly
+        return {entity_id: anomaly}
+
+    def _notify(self, changes: dict[str, dict[str, Any] | None]) -> None:
+        """Send changes to all subscribers."""
+        for listener in list(self._listeners):
+            listener(changes)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Record a state_changed event."""
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        self.async_record(
+            event.data["entity_id"],
+            new_state.state,
+            new_state.last_updated.timestamp(),
+        )
+
+
+def _positive(value: Any, default: float) -> float:
+    """Return value as a positive number, or default."""
+    number = parse_numeric(value)
+    return number if number is not None and number > 0 else default
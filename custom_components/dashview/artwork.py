@@ -0,0 +1,305 @@
+"""Dashview - Cached artwork for media presets.
+
+Backs the dashview/media_artwork command. The media popup asked Spotify's
+oEmbed endpoint for every preset's artwork from every browser on every
+page load. ArtworkCache resolves many media IDs in one call:
+
+- one oEmbed request per uncached media ID, sharing Home Assistant's
+  aiohttp session with a bounded number of requests in flight;
+- the thumbnail is downloaded once into www/dashview/artwork and served
+  by the integration as /dashview_artwork/<file> (Home Assistant only
+  serves /local if www/ existed at startup);
+- results are kept in a Dashview store for ARTWORK_TTL, failures
+  (unknown media, network errors) for NEGATIVE_TTL so they are retried
+  later but not on every page load. Failures have their own budget of
+  MAX_NEGATIVE_ENTRIES, so made-up media IDs cannot evict real artwork.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+
+from homeassistant.components.http import StaticPathConfig
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import aiohttp_client
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.media_artwork"
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+OEMBED_URL = "https://open.spotify.com/oembed"
+# Media IDs with artwork from OEMBED_URL
+SUPPORTED_PREFIXES = ("spotify:",)
+
+ARTWORK_DIR = "www/dashview/artwork"
+ARTWORK_URL_PREFIX = "/dashview_artwork"
+# hass.data key marking the static path as registered (once per run)
+DATA_ARTWORK_PATH = f"{DOMAIN}_artwork_path"
+
+ARTWORK_TTL = 7 * 86400
+NEGATIVE_TTL = 3600
+MAX_ENTRIES = 500
+MAX_NEGATIVE_ENTRIES = 200
+MAX_CONCURRENT_FETCHES = 4
+MAX_THUMBNAIL_SIZE = 2 * 1024 * 1024
+FETCH_TIMEOUT = 10
+
+# Request limits
+MAX_MEDIA_IDS = 50
+
+# Thumbnail content type -> file extension
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+
+
+class ArtworkError(Exception):
+    """Artwork could not be resolved."""
+
+
+def artwork_filename(media_id: str, content_type: str) -> str:
+    """Return the local thumbnail file name for a media ID."""
+    digest = hashlib.sha256(media_id.encode()).hexdigest()[:32]
+    return f"{digest}{IMAGE_EXTENSIONS[content_type]}"
+
+
+def artwork_url(filename: str) -> str:
+    """Return the URL the integration serves a thumbnail at."""
+    return f"{ARTWORK_URL_PREFIX}/{filename}"
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Write a thumbnail. Runs in the executor."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f"{path.suffix}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _remove_files(paths: list[Path]) -> None:
+    """Remove thumbnails. Runs in the executor."""
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+class ArtworkCache:
+    """Resolves and caches media preset artwork."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        oembed_url: str = OEMBED_URL,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            hass: Home Assistant instance
+            oembed_url: oEmbed endpoint
+            session: HTTP session; Home Assistant's shared one by default
+        """
+        self._hass = hass
+        self._oembed_url = oembed_url
+        self._session = session
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._directory = Path(hass.config.path(ARTWORK_DIR))
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        # media_id -> {"url": local URL or None, "file", "fetched"}
+        self._entries: dict[str, dict[str, Any]] = {}
+        # Fetches in flight, shared by concurrent requests for a media ID
+        self._pending: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.fetches = 0
+        self.failures = 0
+
+    async def async_load(self) -> None:
+        """Load the entries cached before the last shutdown and serve them."""
+        data = await self._store.async_load() or {}
+        entries = data.get("entries", {})
+        # Entries of older versions point to /local; URLs follow the file
+        for entry in entries.values():
+            entry["url"] = artwork_url(entry["file"]) if entry.get("file") else None
+        self._entries = entries
+        await self._async_register_static_path()
+
+    async def async_resolve(self, media_ids: list[str]) -> dict[str, str | None]:
+        """Return the artwork URL of several media IDs.
+
+        Uncached or expired media IDs are fetched concurrently, at most
+        MAX_CONCURRENT_FETCHES at a time.
+
+        Args:
+            media_ids: Media content IDs (e.g. spotify:playlist:...)
+
+        Returns:
+            Dict of media_id -> local artwork URL, or None if the media ID
+            is unsupported or has no artwork
+        """
+        now = time.time()
+        result: dict[str, str | None] = {}
+        missing: list[str] = []
+        for media_id in dict.fromkeys(media_ids):
+            if not media_id.startswith(SUPPORTED_PREFIXES):
+                result[media_id] = None
+                continue
+            entry = self._entries.get(media_id)
+            ttl = ARTWORK_TTL if entry and entry["url"] else NEGATIVE_TTL
+            if entry is not None and now - entry["fetched"] < ttl:
+                self.hits += 1
+                result[media_id] = entry["url"]
+            else:
+                missing.append(media_id)
+
+        if missing:
+            urls = await asyncio.gather(
+                *(self._async_fetch_shared(media_id) for media_id in missing)
+            )
+            result.update(zip(missing, urls))
+            await self._async_evict()
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return {media_id: result[media_id] for media_id in dict.fromkeys(media_ids)}
+
+    def get_report(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "entries": len(self._entries),
+            "negative": sum(1 for entry in self._entries.values() if not entry["url"]),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "failures": self.failures,
+        }
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"entries": self._entries}
+
+    async def _async_fetch_shared(self, media_id: str) -> str | None:
+        """Fetch a media ID once, even if several requests ask for it."""
+        pending = self._pending.get(media_id)
+        if pending is None:
+            pending = self._pending[media_id] = asyncio.ensure_future(
+                self._async_fetch(media_id)
+            )
+            pending.add_done_callback(lambda _: self._pending.pop(media_id, None))
+        return await asyncio.shield(pending)
+
+    async def _async_fetch(self, media_id: str) -> str | None:
+        """Resolve, download and cache one media ID's artwork."""
+        async with self._semaphore:
+            self.fetches += 1
+            try:
+                filename = await self._async_download(media_id)
+            except (
+                ArtworkError,
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+                OSError,
+                ValueError,  # Body is no JSON
+            ) as err:
+                self.failures += 1
+                _LOGGER.debug("No artwork for %s: %s", media_id, err)
+                filename = None
+
+        old = self._entries.get(media_id)
+        fetched = time.time()
+        url = artwork_url(filename) if filename else None
+        if url is None and old is not None and old["url"]:
+            # Keep serving stale artwork while the source is unreachable,
+            # retrying as often as a negative entry
+            url, filename = old["url"], old["file"]
+            fetched -= ARTWORK_TTL - NEGATIVE_TTL
+        self._entries[media_id] = {"url": url, "file": filename, "fetched": fetched}
+        return url
+
+    async def _async_download(self, media_id: str) -> str:
+        """Look up the thumbnail URL and store the thumbnail locally.
+
+        Returns:
+            Local file name
+
+        Raises:
+            ArtworkError: If the media ID has no usable thumbnail
+        """
+        session = self._session or aiohttp_client.async_get_clientsession(self._hass)
+        timeout = aiohttp.ClientTimeout(total=FETCH_TIMEOUT)
+        async with session.get(
+            self._oembed_url, params={"url": media_id}, timeout=timeout
+        ) as response:
+            if response.status != 200:
+                raise ArtworkError(f"oEmbed returned HTTP {response.status}")
+            data = await response.json(content_type=None)
+        thumbnail_url = data.get("thumbnail_url") if isinstance(data, dict) else None
+        if not isinstance(thumbnail_url, str) or not thumbnail_url.startswith(
+            ("http://", "https://")
+        ):
+            raise ArtworkError("oEmbed response has no thumbnail_url")
+
+        async with session.get(thumbnail_url, timeout=timeout) as response:
+            if response.status != 200:
+                raise ArtworkError(f"Thumbnail returned HTTP {response.status}")
+            content_type = response.content_type
+            if content_type not in IMAGE_EXTENSIONS:
+                raise ArtworkError(f"Unsupported thumbnail type {content_type}")
+            if (response.content_length or 0) > MAX_THUMBNAIL_SIZE:
+                raise ArtworkError("Thumbnail too large")
+            image = bytearray()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                image += chunk
+                if len(image) > MAX_THUMBNAIL_SIZE:
+                    raise ArtworkError("Thumbnail too large")
+
+        filename = artwork_filename(media_id, content_type)
+        await self._hass.async_add_executor_job(
+            _write_file, self._directory / filename, bytes(image)
+        )
+        return filename
+
+    async def _async_register_static_path(self) -> None:
+        """Serve the artwork directory, creating it first."""
+        if self._hass.data.get(DATA_ARTWORK_PATH):
+            return
+        await self._hass.async_add_executor_job(
+            functools.partial(self._directory.mkdir, parents=True, exist_ok=True)
+        )
+        await self._hass.http.async_register_static_paths([
+            StaticPathConfig(
+                ARTWORK_URL_PREFIX, str(self._directory), cache_headers=False
+            )
+        ])
+        self._hass.data[DATA_ARTWORK_PATH] = True
+
+    async def _async_evict(self) -> None:
+        """Drop the oldest entries and their thumbnails beyond the budgets.
+
+        Entries with artwork are limited to MAX_ENTRIES, failures to
+        MAX_NEGATIVE_ENTRIES.
+        """
+        files = []
+        for with_url, limit in ((True, MAX_ENTRIES), (False, MAX_NEGATIVE_ENTRIES)):
+            keys = [
+                key for key, entry in self._entries.items()
+                if bool(entry["url"]) is with_url
+            ]
+            excess = len(keys) - limit
+            if excess <= 0:
+                continue
+            keys.sort(key=lambda key: self._entries[key]["fetched"])
+            for media_id in keys[:excess]:
+                entry = self._entries.pop(media_id)
+                if entry["file"]:
+                    files.append(self._directory / entry["file"])
+        if files:
+            await self._hass.async_add_executor_job(_remove_files, files)
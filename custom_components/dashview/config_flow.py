@@ -3,9 +3,28 @@ from __future__ import annotations
 
 from typing import Any
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+import voluptuous as vol
 
-from .const import DOMAIN, NAME
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import callback
+
+from .const import (
+    CONF_LOOP_MONITOR,
+    CONF_LOOP_MONITOR_THRESHOLD,
+    CONF_PERSIST_UNDO_HISTORY,
+    CONF_RECENT_VALUES_RESOLUTION,
+    CONF_RECENT_VALUES_WINDOW,
+    DEFAULT_LOOP_MONITOR_THRESHOLD,
+    DEFAULT_RECENT_VALUES_RESOLUTION,
+    DEFAULT_RECENT_VALUES_WINDOW,
+    DOMAIN,
+    NAME,
+)
 
 
 class DashviewConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -13,6 +32,12 @@ class DashviewConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return DashviewOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -25,3 +50,48 @@ class DashviewConfigFlow(ConfigFlow, domain=DOMAIN):
             return self.async_create_entry(title=NAME, data={})
 
         return self.async_show_form(step_id="user")
+
+
+class DashviewOptionsFlow(OptionsFlow):
+    """Handle Dashview options (instrumentation and caching)."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_LOOP_MONITOR,
+                    default=options.get(CONF_LOOP_MONITOR, False),
+                ): bool,
+                vol.Optional(
+                    CONF_LOOP_MONITOR_THRESHOLD,
+                    default=options.get(
+                        CONF_LOOP_MONITOR_THRESHOLD, DEFAULT_LOOP_MONITOR_THRESHOLD
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+                vol.Optional(
+                    CONF_RECENT_VALUES_WINDOW,
+                    default=options.get(
+                        CONF_RECENT_VALUES_WINDOW, DEFAULT_RECENT_VALUES_WINDOW
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=168)),
+                vol.Optional(
+                    CONF_RECENT_VALUES_RESOLUTION,
+                    default=options.get(
+                        CONF_RECENT_VALUES_RESOLUTION,
+                        DEFAULT_RECENT_VALUES_RESOLUTION,
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Optional(
+                    CONF_PERSIST_UNDO_HISTORY,
+                    default=options.get(CONF_PERSIST_UNDO_HISTORY, False),
+                ): bool,
+            }),
+        )
@@ -10,3 +10,16 @@ PANEL_URL = "/dashview"
 PANEL_TITLE = "Dashview"
 PANEL_ICON = "mdi:view-dashboard"
 PANEL_NAME = "dashview-panel"
+
+# Options
+CONF_LOOP_MONITOR = "loop_monitor"
+CONF_LOOP_MONITOR_THRESHOLD = "loop_monitor_threshold_ms"
+DEFAULT_LOOP_MONITOR_THRESHOLD = 50
+CONF_RECENT_VALUES_WINDOW = "recent_values_window_hours"
+CONF_RECENT_VALUES_RESOLUTION = "recent_values_resolution_s"
+DEFAULT_RECENT_VALUES_WINDOW = 24
+DEFAULT_RECENT_VALUES_RESOLUTION = 60
+CONF_PERSIST_UNDO_HISTORY = "persist_undo_history"
+
+# Dispatcher signal sent after the settings changed
+SIGNAL_SETTINGS_UPDATED = f"{DOMAIN}_settings_updated"
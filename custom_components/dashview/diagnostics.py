@@ -0,0 +1,75 @@
+"""Diagnostics support for Dashview."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, VERSION
+from .log_sampler import get_log_sampler
+from .loop_monitor import get_loop_monitor
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data.get(DOMAIN, {})
+    recent_values = data.get("recent_values")
+    statistics_cache = data.get("statistics_cache")
+    presence_cache = data.get("presence_cache")
+    anomaly_detector = data.get("anomaly_detector")
+    room_aggregator = data.get("room_aggregator")
+    status_engine = data.get("status_engine")
+    suggestion_engine = data.get("suggestion_engine")
+    displayed_entities = data.get("displayed_entities")
+    discovery_index = data.get("discovery_index")
+    search_index = data.get("search_index")
+    artwork_cache = data.get("artwork_cache")
+    weather_forecasts = data.get("weather_forecasts")
+    store = data.get("store")
+    settings_writer = data.get("settings_writer")
+    settings_history = data.get("settings_history")
+    overlays = data.get("overlays")
+    return {
+        "version": VERSION,
+        "options": dict(entry.options),
+        "startup_timings": data.get("startup_timings"),
+        "settings_store": store.get_report() if store else None,
+        "settings_writer": (
+            settings_writer.get_report() if settings_writer else None
+        ),
+        "settings_history": (
+            settings_history.get_report() if settings_history else None
+        ),
+        "overlays": overlays.get_report() if overlays else None,
+        "log_sampler": get_log_sampler().get_metrics(),
+        "loop_monitor": get_loop_monitor().get_report(),
+        "recent_values": recent_values.get_report() if recent_values else None,
+        "statistics_cache": (
+            statistics_cache.get_report() if statistics_cache else None
+        ),
+        "presence_cache": presence_cache.get_report() if presence_cache else None,
+        "anomaly_detector": (
+            anomaly_detector.get_report() if anomaly_detector else None
+        ),
+        "room_aggregator": (
+            room_aggregator.get_report() if room_aggregator else None
+        ),
+        "status_engine": status_engine.get_report() if status_engine else None,
+        "suggestion_engine": (
+            suggestion_engine.get_report() if suggestion_engine else None
+        ),
+        "displayed_entities": (
+            displayed_entities.get_report() if displayed_entities else None
+        ),
+        "discovery_index": (
+            discovery_index.get_report() if discovery_index else None
+        ),
+        "search_index": search_index.get_report() if search_index else None,
+        "weather_forecasts": (
+            weather_forecasts.get_report() if weather_forecasts else None
+        ),
+        "artwork_cache": artwork_cache.get_report() if artwork_cache else None,
+    }
@@ -0,0 +1,311 @@
+"""Dashview - Maintained entity indexes for discovery.
+
+Backs the dashview/subscribe_discovery command. The panel discovered DWD
+pollen sensors, weather entities, persons and DWD warning sensors by
+scanning every entity in hass.states and checking attributes, in every
+browser and on every render. DiscoveryIndex keeps these sets, seeded once
+and updated from events:
+
+- entities are added and removed by state_changed events without an old
+  or new state;
+- attribute-based kinds (pollen, DWD warnings) re-check only the changed
+  sensor, so a sensor joins or leaves when its attributes do;
+- DWD warning sensors are also recognized by their registry platform,
+  followed through entity registry events.
+
+Payload (entity IDs sorted):
+
+    {"weather": [...], "person": [...],
+     "pollen": {entity_id: {"type": "birke", "region": "124"}},
+     "dwd_warning": {entity_id: {"region": "Berlin"}}}
+"""
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .recent_values import parse_numeric
+
+_LOGGER = logging.getLogger(__name__)
+
+# DWD Pollenflug sensor entity IDs: sensor.pollenflug_[type]_[region]
+DWD_POLLEN_PATTERN = re.compile(r"^sensor\.pollenflug_(\w+)_(\d+)$")
+_REGION_PATTERN = re.compile(r"_(\d+)$")
+
+# Pollen type -> (English, German) names; mirrors POLLEN_TYPES in
+# frontend/services/pollen-service.js
+POLLEN_TYPES = {
+    "erle": ("alder", "erle"),
+    "ambrosia": ("ragweed", "ambrosia"),
+    "esche": ("ash", "esche"),
+    "birke": ("birch", "birke"),
+    "hasel": ("hazel", "hasel"),
+    "graeser": ("grass", "gräser"),
+    "beifuss": ("mugwort", "beifuß"),
+    "roggen": ("rye", "roggen"),
+}
+
+DWD_WARNING_PLATFORM = "dwd_weather_warnings"
+
+DiscoveryListener = Callable[[dict[str, Any]], None]
+Describe = Callable[[str, Any, bool], dict[str, Any] | None]
+
+
+def pollen_info(
+    entity_id: str, state: Any, _platform_match: bool
+) -> dict[str, Any] | None:
+    """Describe a DWD Pollenflug sensor, detected by its attributes.
+
+    Mirrors isDwdPollenSensor, extractPollenType and extractRegion in
+    pollen-service.js.
+
+    Returns:
+        {"type", "region"}, or None if the state is no pollen sensor
+    """
+    attributes = state.attributes
+    if "state_tomorrow" not in attributes or "state_in_2_days" not in attributes:
+        return None
+    value = parse_numeric(state.state)
+    if value is None or not 0 <= value <= 3.5:
+        return None
+
+    match = DWD_POLLEN_PATTERN.match(entity_id)
+    if match:
+        return {"type": match.group(1), "region": match.group(2)}
+
+    pollen_type = None
+    friendly_name = str(attributes.get("friendly_name") or "").lower()
+    for text in (friendly_name, entity_id.lower()):
+        pollen_type = next(
+            (
+                key
+                for key, names in POLLEN_TYPES.items()
+                if key in text or any(name in text for name in names)
+            ),
+            None,
+        )
+        if pollen_type is not None:
+            break
+    if pollen_type is None:
+        return None
+    region = _REGION_PATTERN.search(entity_id)
+    return {"type": pollen_type, "region": region.group(1) if region else "unknown"}
+
+
+def dwd_warning_info(
+    entity_id: str, state: Any, platform_match: bool
+) -> dict[str, Any] | None:
+    """Describe a DWD weather warning sensor.
+
+    Recognized by its registry platform or, for entities without a
+    registry entry, by the warning_count and region_name attributes.
+
+    Returns:
+        {"region"}, or None if the state is no DWD warning sensor
+    """
+    attributes = state.attributes
+    if not platform_match and not (
+        "warning_count" in attributes and "region_name" in attributes
+    ):
+        return None
+    return {"region": attributes.get("region_name")}
+
+
+@dataclass(frozen=True)
+class DiscoveryKind:
+    """An indexed kind of entity.
+
+    Attributes:
+        domain: Domain of the entities
+        describe: Returns the entity's info or None if it does not match;
+            None indexes every entity of the domain as a plain list
+    """
+
+    domain: str
+    describe: Describe | None = None
+
+
+KINDS = {
+    "weather": DiscoveryKind("weather"),
+    "person": DiscoveryKind("person"),
+    "pollen": DiscoveryKind("sensor", pollen_info),
+    "dwd_warning": DiscoveryKind("sensor", dwd_warning_info),
+}
+
+
+class DiscoveryIndex:
+    """Entities of each discovery kind, maintained from events."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty index.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._entries: dict[str, dict[str, dict[str, Any]]] = {
+            kind: {} for kind in KINDS
+        }
+        self._kinds_by_domain: dict[str, list[str]] = {}
+        for name, kind in KINDS.items():
+            self._kinds_by_domain.setdefault(kind.domain, []).append(name)
+        # Entities registered by the DWD warnings integration
+        self._dwd_platform: set[str] = set()
+        self._listeners: list[DiscoveryListener] = []
+        self._unsub: CALLBACK_TYPE | None = None
+        self._unsub_registry: CALLBACK_TYPE | None = None
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        """Every kind in the compact payload format."""
+        return {kind: self._payload(kind) for kind in KINDS}
+
+    @callback
+    def async_start(self) -> None:
+        """Seed the index once and follow state and registry changes."""
+        hass = self._hass
+        self._dwd_platform = {
+            entry.entity_id
+            for entry in er.async_get(hass).entities.values()
+            if entry.platform == DWD_WARNING_PLATFORM
+        }
+        for domain in self._kinds_by_domain:
+            for entity_id in hass.states.async_entity_ids(domain):
+                self._apply_state(entity_id, hass.states.get(entity_id))
+        if self._unsub is None:
+            self._unsub = hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed
+            )
+            self._unsub_registry = hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_registry_updated
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following changes."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._unsub_registry is not None:
+            self._unsub_registry()
+            self._unsub_registry = None
+        self._listeners.clear()
+
+    @callback
+    def async_add_listener(self, listener: DiscoveryListener) -> CALLBACK_TYPE:
+        """Register a callback receiving {kind: payload} of changed kinds.
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def async_update_entity(self, entity_id: str, state: Any) -> None:
+        """Re-check one entity and notify about changed kinds."""
+        changed = self._apply_state(entity_id, state)
+        if changed:
+            changes = {kind: self._payload(kind) for kind in changed}
+            for listener in list(self._listeners):
+                listener(changes)
+
+    def entity_ids(self, kind: str) -> list[str]:
+        """Return the entity IDs of a kind, sorted."""
+        return sorted(self._entries[kind])
+
+    def first(self, kind: str) -> str | None:
+        """Return the first entity ID of a kind, if any."""
+        entries = self._entries[kind]
+        return min(entries) if entries else None
+
+    def contains(self, kind: str, entity_id: str) -> bool:
+        """Return whether an entity is indexed as a kind."""
+        return entity_id in self._entries[kind]
+
+    def get_report(self) -> dict[str, Any]:
+        """Return index sizes for diagnostics."""
+        return {
+            **{kind: len(entries) for kind, entries in self._entries.items()},
+            "subscribers": len(self._listeners),
+        }
+
+    def _payload(self, kind: str) -> Any:
+        entries = self._entries[kind]
+        if KINDS[kind].describe is None:
+            return sorted(entries)
+        return {entity_id: entries[entity_id] for entity_id in sorted(entries)}
+
+    def _apply_state(self, entity_id: str, state: Any) -> set[str]:
+        """Update the kinds an entity belongs to.
+
+        Returns:
+            Kinds whose entries changed
+        """
+        changed: set[str] = set()
+        for kind in self._kinds_by_domain.get(entity_id.split(".", 1)[0], ()):
+            describe = KINDS[kind].describe
+            info: dict[str, Any] | None
+            if state is None:
+                info = None
+            elif describe is None:
+                info = {}
+            else:
+                info = describe(entity_id, state, entity_id in self._dwd_platform)
+            entries = self._entries[kind]
+            if info is None:
+                if entries.pop(entity_id, None) is not None:
+                    changed.add(kind)
+            elif entries.get(entity_id) != info:
+                entries[entity_id] = info
+                changed.add(kind)
+        return changed
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Re-check an entity of an indexed domain.
+
+        Plain domain kinds only change when entities are added or removed;
+        attribute-based kinds re-check every update of their domain.
+        """
+        data = event.data
+        entity_id = data["entity_id"]
+        kinds = self._kinds_by_domain.get(entity_id.split(".", 1)[0])
+        if not kinds:
+            return
+        if (
+            data.get("old_state") is not None
+            and data.get("new_state") is not None
+            and all(KINDS[kind].describe is None for kind in kinds)
+        ):
+            return
+        self.async_update_entity(entity_id, data.get("new_state"))
+
+    @callback
+    def _async_registry_updated(self, event: Event) -> None:
+        """Follow entities of the DWD warnings platform."""
+        data = event.data
+        entity_id = data["entity_id"]
+        if data.get("action") == "remove":
+            self._dwd_platform.discard(entity_id)
+        else:
+            if data.get("old_entity_id"):
+                self._dwd_platform.discard(data["old_entity_id"])
+            entry = er.async_get(self._hass).async_get(entity_id)
+            if entry is not None and entry.platform == DWD_WARNING_PLATFORM:
+                self._dwd_platform.add(entity_id)
+            else:
+                self._dwd_platform.discard(entity_id)
+        self.async_update_entity(entity_id, self._hass.states.get(entity_id))
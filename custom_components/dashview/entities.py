@@ -0,0 +1,108 @@
+"""Dashview - Resolve the entities the panel displays.
+
+Mirrors the panel's rule (_getEnabledEntitiesForRoom in dashview-panel.js):
+an entity belongs to a category if it carries the label configured in
+settings["categoryLabels"] for that category and is not switched off in
+the category's enabled* map. Entities are enabled by default.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+# Category -> enabled* settings map
+CATEGORY_ENABLED_MAPS = {
+    "light": "enabledLights",
+    "cover": "enabledCovers",
+    "fan": "enabledFans",
+    "roofWindow": "enabledRoofWindows",
+    "window": "enabledWindows",
+    "door": "enabledDoors",
+    "garage": "enabledGarages",
+    "motion": "enabledMotionSensors",
+    "smoke": "enabledSmokeSensors",
+    "vibration": "enabledVibrationSensors",
+    "temperature": "enabledTemperatureSensors",
+    "humidity": "enabledHumiditySensors",
+    "climate": "enabledClimates",
+    "mediaPlayer": "enabledMediaPlayers",
+    "tv": "enabledTVs",
+    "lock": "enabledLocks",
+    "waterLeak": "enabledWaterLeakSensors",
+}
+
+# Non-device domains the panel never shows
+EXCLUDED_DOMAINS = ("automation", "script", "scene")
+
+
+def enabled_entries(
+    hass: HomeAssistant, settings: dict, categories: Iterable[str]
+) -> dict[str, list[er.RegistryEntry]]:
+    """Return the registry entries the panel shows, by category.
+
+    Walks the entity registry once for all requested categories.
+
+    Args:
+        hass: Home Assistant instance
+        settings: Dashview settings
+        categories: Keys of settings["categoryLabels"]
+
+    Returns:
+        Entries per category, sorted by entity ID; categories without a
+        configured label have no entries
+    """
+    labels = settings.get("categoryLabels") or {}
+    wanted = {
+        category: (labels[category], settings.get(CATEGORY_ENABLED_MAPS[category]) or {})
+        for category in categories
+        if labels.get(category)
+    }
+    result: dict[str, list[er.RegistryEntry]] = {category: [] for category in categories}
+    if not wanted:
+        return result
+    for entry in er.async_get(hass).entities.values():
+        if entry.entity_id.split(".", 1)[0] in EXCLUDED_DOMAINS:
+            continue
+        for category, (label_id, enabled_map) in wanted.items():
+            if (
+                label_id in entry.labels
+                and enabled_map.get(entry.entity_id) is not False
+            ):
+                result[category].append(entry)
+    for entries in result.values():
+        entries.sort(key=lambda entry: entry.entity_id)
+    return result
+
+
+def enabled_entities(
+    hass: HomeAssistant, settings: dict, category: str
+) -> list[str]:
+    """Return the entity IDs the panel shows for a category.
+
+    Args:
+        hass: Home Assistant instance
+        settings: Dashview settings
+        category: Key of settings["categoryLabels"] (e.g. "temperature")
+
+    Returns:
+        Sorted entity IDs; empty if no label is configured
+    """
+    return [
+        entry.entity_id
+        for entry in enabled_entries(hass, settings, (category,))[category]
+    ]
+
+
+def entry_area_id(
+    entry: er.RegistryEntry, device_registry: dr.DeviceRegistry
+) -> str | None:
+    """Return an entity's area, falling back to its device's area."""
+    if entry.area_id:
+        return entry.area_id
+    if entry.device_id:
+        device = device_registry.async_get(entry.device_id)
+        if device is not None:
+            return device.area_id
+    return None
@@ -0,0 +1,374 @@
+"""Dashview - Filtered, throttled entity state stream.
+
+Backs the dashview/subscribe_entities command. Panels get every state
+change through hass.states, including chatty power and energy sensors
+Dashview never shows. This stream only forwards the entities Dashview
+displays (DisplayedEntities) and coalesces numeric sensors to at most
+`numeric_rate` updates per second each, the latest value winning.
+
+Home Assistant's frontend already receives every state through its own
+subscription, so events only say which displayed entities changed and
+when; the panel uses them to decide when to re-render:
+
+    {"u": {entity_id: last_updated, ...}}
+    {"r": [entity_id, ...]}
+
+"u" reports updated entities (all displayed ones in the first event, and
+those that become displayed), "r" entities that were removed or are no
+longer displayed.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Callable
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .discovery import DiscoveryIndex
+from .entities import CATEGORY_ENABLED_MAPS, enabled_entries
+from .recent_values import parse_numeric
+
+_LOGGER = logging.getLogger(__name__)
+
+# Updates per second for numeric sensors (per entity)
+DEFAULT_NUMERIC_RATE = 1.0
+MIN_NUMERIC_RATE = 0.1
+MAX_NUMERIC_RATE = 10.0
+
+# Domains always displayed (header person badges)
+ALWAYS_DISPLAYED_DOMAINS = ("person",)
+
+# Entity references inside infoTextConfig groups and enabledAppliances
+_NESTED_ENTITY_KEYS = ("entity", "finishTimeEntity", "stateEntity", "timerEntity")
+
+EntitiesListener = Callable[[set[str], set[str]], None]
+
+
+def settings_entity_refs(settings: dict) -> set[str]:
+    """Collect entities referenced directly in the settings.
+
+    Covers the *Entity settings (weather, alarm, ...), appliances in
+    infoTextConfig and enabledAppliances, garbage sensors, enabled custom
+    entities with their child entities and floor card slots.
+    """
+    refs: set[str] = set()
+    for key, value in settings.items():
+        if key.endswith("Entity") and isinstance(value, str) and "." in value:
+            refs.add(value)
+    for group in ("infoTextConfig", "enabledAppliances"):
+        for config in (settings.get(group) or {}).values():
+            if not isinstance(config, dict):
+                continue
+            for key in _NESTED_ENTITY_KEYS:
+                value = config.get(key)
+                if isinstance(value, str) and "." in value:
+                    refs.add(value)
+    for sensor in settings.get("garbageSensors") or []:
+        if isinstance(sensor, str):
+            refs.add(sensor)
+    for entity_id, config in (settings.get("enabledCustomEntities") or {}).items():
+        if config is True:
+            refs.add(entity_id)
+        elif isinstance(config, dict) and config.get("enabled"):
+            refs.add(entity_id)
+            # Shown as state chips on the parent's card
+            for child in config.get("childEntities") or []:
+                if isinstance(child, str):
+                    refs.add(child)
+    for slots in (settings.get("floorCardConfig") or {}).values():
+        if not isinstance(slots, dict):
+            continue
+        for slot in slots.values():
+            value = slot.get("entity_id") if isinstance(slot, dict) else None
+            # Virtual slots (virtual:security-summary) are no entities
+            if isinstance(value, str) and "." in value:
+                refs.add(value)
+    return refs
+
+
+def custom_label_entities(hass: HomeAssistant, settings: dict) -> set[str]:
+    """Collect entities carrying a custom label enabled in the settings.
+
+    Room popups list every entity of an enabled custom label, switched on
+    in enabledCustomEntities or not.
+    """
+    labels = {
+        label_id
+        for label_id, config in (settings.get("customLabels") or {}).items()
+        if isinstance(config, dict) and config.get("enabled")
+    }
+    if not labels:
+        return set()
+    return {
+        entry.entity_id
+        for entry in er.async_get(hass).entities.values()
+        if not labels.isdisjoint(entry.labels)
+    }
+
+
+def discovered_entity_refs(settings: dict, discovery: DiscoveryIndex) -> set[str]:
+    """Collect displayed entities the panel finds through discovery.
+
+    Pollen sensors are shown unless switched off in pollenConfig; without a
+    configured weather entity the panel falls back to the first one.
+    """
+    refs: set[str] = set()
+    pollen = settings.get("pollenConfig") or {}
+    if pollen.get("enabled", True):
+        disabled = pollen.get("enabledSensors") or {}
+        refs.update(
+            entity_id
+            for entity_id in discovery.entity_ids("pollen")
+            if disabled.get(entity_id) is not False
+        )
+    if not settings.get("weatherEntity"):
+        weather = discovery.first("weather")
+        if weather is not None:
+            refs.add(weather)
+    return refs
+
+
+class DisplayedEntities:
+    """The set of entities Dashview displays, following the settings."""
+
+    def __init__(self, hass: HomeAssistant, discovery: DiscoveryIndex) -> None:
+        """Initialize an empty set.
+
+        Args:
+            hass: Home Assistant instance
+            discovery: Index of pollen and weather entities
+        """
+        self._hass = hass
+        self._discovery = discovery
+        self.entity_ids: frozenset[str] = frozenset()
+        self._listeners: list[EntitiesListener] = []
+
+    @callback
+    def async_rebuild(self, settings: dict) -> None:
+        """Resolve the displayed entities and notify about differences.
+
+        Args:
+            settings: Dashview settings
+        """
+        entity_ids = {
+            entry.entity_id
+            for entries in enabled_entries(
+                self._hass, settings, CATEGORY_ENABLED_MAPS
+            ).values()
+            for entry in entries
+        }
+        entity_ids |= settings_entity_refs(settings)
+        entity_ids |= custom_label_entities(self._hass, settings)
+        entity_ids |= discovered_entity_refs(settings, self._discovery)
+        for domain in ALWAYS_DISPLAYED_DOMAINS:
+            entity_ids.update(self._hass.states.async_entity_ids(domain))
+
+        added = entity_ids - self.entity_ids
+        removed = self.entity_ids - entity_ids
+        self.entity_ids = frozenset(entity_ids)
+        if added or removed:
+            for listener in list(self._listeners):
+                listener(added, removed)
+
+    @callback
+    def async_add_listener(self, listener: EntitiesListener) -> CALLBACK_TYPE:
+        """Register a callback receiving (added, removed) entity IDs.
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    def get_report(self) -> dict[str, Any]:
+        """Return statistics for diagnostics."""
+        return {
+            "entities": len(self.entity_ids),
+            "streams": len(self._listeners),
+        }
+
+
+def is_numeric_sensor(state: Any) -> bool:
+    """Return whether a state belongs to a numeric sensor."""
+    return (
+        state.entity_id.startswith("sensor.")
+        and parse_numeric(state.state) is not None
+    )
+
+
+class EntityStream:
+    """One subscription's filtered, coalescing view of displayed entities."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        displayed: DisplayedEntities,
+        send: Callable[[dict[str, Any]], None],
+        numeric_rate: float = DEFAULT_NUMERIC_RATE,
+    ) -> None:
+        """Initialize the stream.
+
+        Args:
+            hass: Home Assistant instance
+            displayed: Displayed entities to follow
+            send: Callback sending an event payload to the client
+            numeric_rate: Maximum updates per second per numeric sensor
+        """
+        self._hass = hass
+        self._displayed = displayed
+        self._send = send
+        self._interval = 1 / numeric_rate
+        # entity_id -> last_updated timestamp the client was told about
+        self._sent: dict[str, float] = {}
+        self._sent_at: dict[str, float] = {}
+        self._pending: dict[str, Any] = {}
+        self._timer: Any = None
+        self._unsub: CALLBACK_TYPE | None = None
+        self._unsub_displayed: CALLBACK_TYPE | None = None
+        self.sent_messages = 0
+        self.coalesced = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Send the displayed entities and start following them."""
+        self._unsub_displayed = self._displayed.async_add_listener(
+            self._async_displayed_changed
+        )
+        self._track(self._displayed.entity_ids)
+        # Always answer with a "u" event so the client knows the stream is live
+        self._send_message({"u": self._collect_added(self._displayed.entity_ids)})
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following state changes and drop pending updates."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._unsub_displayed is not None:
+            self._unsub_displayed()
+            self._unsub_displayed = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending.clear()
+
+    @callback
+    def async_update_entity(self, entity_id: str, state: Any) -> None:
+        """Forward a state change, coalescing numeric sensors."""
+        if state is not None and is_numeric_sensor(state):
+            due = self._sent_at.get(entity_id, 0.0) + self._interval
+            now = time.monotonic()
+            if now < due:
+                if entity_id in self._pending:
+                    self.coalesced += 1
+                self._pending[entity_id] = state
+                if self._timer is None:
+                    self._timer = self._hass.loop.call_later(
+                        due - now, self._async_flush
+                    )
+                return
+        self._pending.pop(entity_id, None)
+        self._emit({entity_id: state})
+
+    def _track(self, entity_ids: frozenset[str] | set[str]) -> None:
+        """(Re)subscribe to state changes of the displayed entities."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if entity_ids:
+            self._unsub = async_track_state_change_event(
+                self._hass, list(entity_ids), self._async_state_changed
+            )
+
+    def _collect_added(
+        self, entity_ids: frozenset[str] | set[str]
+    ) -> dict[str, float]:
+        """Return the last_updated timestamp of newly displayed entities."""
+        added: dict[str, float] = {}
+        now = time.monotonic()
+        for entity_id in entity_ids:
+            state = self._hass.states.get(entity_id)
+            if state is None:
+                continue
+            added[entity_id] = self._sent[entity_id] = state.last_updated.timestamp()
+            self._sent_at[entity_id] = now
+        return added
+
+    def _emit(self, states: dict[str, Any]) -> None:
+        """Report entities whose state the client has not been told about."""
+        now = time.monotonic()
+        updated: dict[str, float] = {}
+        removed: list[str] = []
+        for entity_id, state in states.items():
+            previous = self._sent.get(entity_id)
+            if state is None:
+                if previous is not None:
+                    del self._sent[entity_id]
+                    removed.append(entity_id)
+                continue
+            last_updated = state.last_updated.timestamp()
+            self._sent_at[entity_id] = now
+            if last_updated != previous:
+                self._sent[entity_id] = updated[entity_id] = last_updated
+        message: dict[str, Any] = {}
+        if updated:
+            message["u"] = updated
+        if removed:
+            message["r"] = removed
+        if message:
+            self._send_message(message)
+
+    def _send_message(self, message: dict[str, Any]) -> None:
+        self.sent_messages += 1
+        self._send(message)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Send coalesced numeric updates that are due."""
+        self._timer = None
+        now = time.monotonic()
+        due: dict[str, Any] = {}
+        next_due: float | None = None
+        for entity_id in list(self._pending):
+            at = self._sent_at.get(entity_id, 0.0) + self._interval
+            if at <= now:
+                due[entity_id] = self._pending.pop(entity_id)
+            elif next_due is None or at < next_due:
+                next_due = at
+        if due:
+            self._emit(due)
+        if next_due is not None:
+            self._timer = self._hass.loop.call_later(
+                next_due - now, self._async_flush
+            )
+
+    @callback
+    def _async_displayed_changed(self, added: set[str], removed: set[str]) -> None:
+        """Follow changes of the displayed entity set."""
+        self._track(self._displayed.entity_ids)
+        for entity_id in removed:
+            self._pending.pop(entity_id, None)
+            self._sent_at.pop(entity_id, None)
+        gone = [
+            entity_id for entity_id in removed
+            if self._sent.pop(entity_id, None) is not None
+        ]
+        if gone:
+            self._send_message({"r": sorted(gone)})
+        updated = self._collect_added(added)
+        if updated:
+            self._send_message({"u": updated})
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Forward a state_changed event of a displayed entity."""
+        self.async_update_entity(event.data["entity_id"], event.data.get("new_state"))
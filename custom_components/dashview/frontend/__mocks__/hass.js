@@ -386,6 +386,7 @@ export function createMockHass(overrides = {}) {
    * Supported message types:
    * - dashview/get_settings: Returns settings fixture
    * - dashview/save_settings: Returns success confirmation
+   * - dashview/save_user_settings: Returns success confirmation
    * - config/area_registry/list: Returns areas fixture
    * - config/floor_registry/list: Returns floors fixture (derived from areas)
    * - config/entity_registry/list: Returns entities fixture
@@ -402,6 +403,8 @@ export function createMockHass(overrides = {}) {
         return settingsFixture;
       case 'dashview/save_settings':
         return { success: true };
+      case 'dashview/save_user_settings':
+        return { success: true, paths: Object.keys(msg.changes || {}).length };
 
       // Home Assistant registry messages
       case 'config/area_registry/list':
@@ -42,7 +42,9 @@ export function renderEntityPicker(html, {
   const suggestions = getEntitySuggestions(hass, searchQuery, {
     domainFilter,
     entityFilter,
-    maxSuggestions
+    maxSuggestions,
+    // Re-render through the host once server results arrive
+    onResults: () => onSearch(searchQuery)
   });
 
   const displayValue = searchQuery !== undefined && searchQuery !== null
@@ -118,11 +120,60 @@ export function renderEntityPicker(html, {
   `;
 }
 
+/**
+ * Server search results by request key, most recent last
+ * (dashview/search_entities); null marks a pending request
+ */
+const serverResults = new Map();
+const SERVER_CACHE_SIZE = 50;
+let serverSearchUnsupported = false;
+// Latest resolved server results, shown while the next query is pending
+let lastServerResults = [];
+
+/**
+ * Search entities with the integration's search index
+ * @param {Object} hass - Home Assistant instance
+ * @param {string} query - Search query
+ * @param {Object} options - Filter options
+ * @param {string|string[]} [options.domainFilter] - Domain(s) to include
+ * @param {number} [options.maxSuggestions=10] - Maximum number of results
+ * @returns {Promise<Array|null>} Ranked entity objects, or null if the
+ *   backend does not support the command
+ */
+export async function searchEntities(hass, query, options = {}) {
+  const { domainFilter = null, maxSuggestions = 10 } = options;
+  const message = {
+    type: 'dashview/search_entities',
+    query,
+    limit: maxSuggestions,
+  };
+  if (domainFilter) {
+    message.domains = Array.isArray(domainFilter) ? domainFilter : [domainFilter];
+  }
+  try {
+    const response = await hass.connection.sendMessagePromise(message);
+    return response.results;
+  } catch (e) {
+    if (e?.code === 'unknown_command') {
+      serverSearchUnsupported = true;
+      return null;
+    }
+    throw e;
+  }
+}
+
 /**
  * Get entity suggestions based on search query
+ *
+ * Uses dashview/search_entities when the backend supports it: results are
+ * cached per query and a pending query shows the previous results;
+ * onResults is called once a request resolves so the host can re-render.
+ * Falls back to scanning hass.states for custom entity filters and older
+ * backends.
  * @param {Object} hass - Home Assistant instance
  * @param {string} query - Search query
  * @param {Object} options - Filter options
+ * @param {Function} [options.onResults] - Called when server results arrive
  * @returns {Array} Array of matching entity objects
  */
 export function getEntitySuggestions(hass, query, options = {}) {
@@ -131,9 +182,51 @@ export function getEntitySuggestions(hass, query, options = {}) {
   const {
     domainFilter = null,
     entityFilter = null,
-    maxSuggestions = 10
+    maxSuggestions = 10,
+    onResults = null
   } = options;
 
+  if (!entityFilter && !serverSearchUnsupported && hass.connection) {
+    const key = JSON.stringify([query, domainFilter, maxSuggestions]);
+    if (serverResults.has(key)) {
+      const cached = serverResults.get(key);
+      if (cached) {
+        return cached.filter(entity => hass.states[entity.entity_id]);
+      }
+      return lastServerResults;
+    }
+    serverResults.set(key, null);
+    searchEntities(hass, query, { domainFilter, maxSuggestions })
+      .then(results => {
+        if (results === null) {
+          serverResults.clear();
+        } else {
+          serverResults.delete(key);
+          serverResults.set(key, results);
+          lastServerResults = results;
+          while (serverResults.size > SERVER_CACHE_SIZE) {
+            serverResults.delete(serverResults.keys().next().value);
+          }
+        }
+        onResults?.();
+      })
+      .catch(() => {
+        serverResults.delete(key);
+      });
+    return lastServerResults;
+  }
+
+  return scanEntities(hass, query, { domainFilter, entityFilter, maxSuggestions });
+}
+
+/**
+ * Linear scan of hass.states, used without server search
+ * @param {Object} hass - Home Assistant instance
+ * @param {string} query - Search query
+ * @param {Object} options - Filter options
+ * @returns {Array} Array of matching entity objects
+ */
+function scanEntities(hass, query, { domainFilter, entityFilter, maxSuggestions }) {
   const queryLower = query.toLowerCase();
 
   return Object.keys(hass.states)
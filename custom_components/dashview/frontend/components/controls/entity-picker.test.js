@@ -0,0 +1,81 @@
+import { describe, it, expect, vi } from 'vitest';
+
+// i18n is not needed for suggestion lookup
+vi.mock('../../utils/i18n.js', () => ({ t: (key) => key }));
+
+import { getEntitySuggestions, searchEntities } from './entity-picker.js';
+
+/**
+ * Unit tests for Entity Picker suggestions
+ * - Server search via dashview/search_entities with a per-query cache
+ * - Linear scan fallback for custom filters and older backends
+ */
+
+const flush = () => new Promise(resolve => setTimeout(resolve, 0));
+
+function createHass(sendMessagePromise) {
+  return {
+    states: {
+      'sensor.kitchen_power': { attributes: { friendly_name: 'Kitchen Power' } },
+      'sensor.desk_power': { attributes: { friendly_name: 'Desk Power' } },
+      'light.kitchen': { attributes: { friendly_name: 'Kitchen' } },
+    },
+    connection: { sendMessagePromise },
+  };
+}
+
+describe('Entity Picker suggestions', () => {
+  it('should send the query, limit and domains to the server', async () => {
+    const send = vi.fn().mockResolvedValue({ results: [{ entity_id: 'sensor.desk_power' }] });
+    const results = await searchEntities(createHass(send), 'desk', {
+      domainFilter: 'sensor',
+      maxSuggestions: 15,
+    });
+
+    expect(send).toHaveBeenCalledWith({
+      type: 'dashview/search_entities',
+      query: 'desk',
+      limit: 15,
+      domains: ['sensor'],
+    });
+    expect(results).toEqual([{ entity_id: 'sensor.desk_power' }]);
+  });
+
+  it('should serve cached server results after they arrive', async () => {
+    const send = vi.fn().mockResolvedValue({
+      results: [{ entity_id: 'sensor.kitchen_power' }, { entity_id: 'sensor.removed' }],
+    });
+    const hass = createHass(send);
+    const onResults = vi.fn();
+
+    getEntitySuggestions(hass, 'kitch', { onResults });
+    await flush();
+    expect(onResults).toHaveBeenCalledTimes(1);
+
+    const suggestions = getEntitySuggestions(hass, 'kitch', { onResults });
+    expect(suggestions).toEqual([{ entity_id: 'sensor.kitchen_power' }]);
+    expect(send).toHaveBeenCalledTimes(1);
+  });
+
+  it('should scan hass.states for custom entity filters', () => {
+    const send = vi.fn();
+    const suggestions = getEntitySuggestions(createHass(send), 'power', {
+      entityFilter: (entityId) => entityId.startsWith('sensor.desk'),
+    });
+
+    expect(send).not.toHaveBeenCalled();
+    expect(suggestions).toEqual([{ entity_id: 'sensor.desk_power' }]);
+  });
+
+  it('should fall back to scanning when the backend lacks the command', async () => {
+    const send = vi.fn().mockRejectedValue({ code: 'unknown_command' });
+    const hass = createHass(send);
+
+    getEntitySuggestions(hass, 'desk', { domainFilter: 'sensor' });
+    await flush();
+
+    expect(getEntitySuggestions(hass, 'desk', { domainFilter: 'sensor' }))
+      .toEqual([{ entity_id: 'sensor.desk_power' }]);
+    expect(send).toHaveBeenCalledTimes(1);
+  });
+});
@@ -11,6 +11,7 @@ export { createLightSliderHandlers, renderLightSliderItem } from './light-slider
 export {
   renderEntityPicker,
   getEntitySuggestions,
+  searchEntities,
   createEntityPickerState
 } from './entity-picker.js';
 export { renderEntityPreviewTooltip } from './entity-preview-tooltip.js';
@@ -20,6 +20,7 @@ export {
   renderLightSliderItem,
   renderEntityPicker,
   getEntitySuggestions,
+  searchEntities,
   createEntityPickerState,
   SortableList
 } from './controls/index.js';
@@ -62,6 +62,10 @@ if (typeof structuredClone === 'undefined') {
   // These should never appear as room entities even if they carry a matching label
   const EXCLUDED_DOMAINS = ['automation', 'script', 'scene'];
 
+  // Entities per history_summary/statistics_summary request; mirrors
+  // MAX_ENTITIES in history.py, larger batches are rejected
+  const HISTORY_SUMMARY_MAX_ENTITIES = 20;
+
   // Debug mode - set to true for development logging
   const DEBUG = false;
   const debugLog = (...args) => DEBUG && console.log('[Dashview]', ...args);
@@ -89,6 +93,7 @@ if (typeof structuredClone === 'undefined') {
   let settingsStore = null;
   let uiStateStore = null;
   let registryStore = null;
+  let onboardingStore = null;
 
   // Load modules - modular structure only (legacy removed)
   try {
@@ -114,13 +119,6 @@ if (typeof structuredClone === 'undefined') {
     console.warn("Dashview: Failed to load constants module", e);
   }
 
-  try {
-    dashviewAdmin = await import(`./features/admin/index.js?v=${DASHVIEW_VERSION}`);
-    debugLog("Loaded admin module");
-  } catch (e) {
-    console.warn("Dashview: Failed to load admin module", e);
-  }
-
   try {
     dashviewPopups = await import(`./features/security/popups.js?v=${DASHVIEW_VERSION}`);
     debugLog("Loaded popups module");
@@ -143,18 +141,49 @@ if (typeof structuredClone === 'undefined') {
   let dashviewChangelogPopup = null;
   let dashviewUserPopup = null;
   let changelogUtils = null;
-  try {
-    const popupsModule = await import(`./features/popups/index.js?v=${DASHVIEW_VERSION}`);
-    dashviewRoomPopup = popupsModule.renderRoomPopup;
-    dashviewWeatherPopup = popupsModule.renderWeatherPopup;
-    dashviewMediaPopup = popupsModule.renderMediaPopup;
-    dashviewWaterPopup = popupsModule.renderWaterPopup;
-    dashviewChangelogPopup = popupsModule.renderChangelogPopup;
-    dashviewUserPopup = popupsModule.renderUserPopup;
-    debugLog("Loaded popups module");
-  } catch (e) {
-    console.warn("Dashview: Failed to load popups module", e);
-  }
+
+  // Lazily loaded modules (not needed for the first render).
+  // Admin code is only fetched when the admin popup or the setup wizard
+  // opens, so kiosk tablets never download it. Popups are fetched right
+  // after the first render, or immediately if one is opened earlier.
+  // The production build emits both as separate lazy chunks.
+  const lazyModuleLoads = {};
+  const lazyModuleFailed = {};
+  const loadLazyModule = (name, importer, onLoaded) => {
+    if (!lazyModuleLoads[name]) {
+      lazyModuleLoads[name] = importer()
+        .then((module) => {
+          onLoaded(module);
+          lazyModuleFailed[name] = false;
+          debugLog(`Loaded ${name} module`);
+          return module;
+        })
+        .catch((e) => {
+          console.warn(`Dashview: Failed to load ${name} module`, e);
+          lazyModuleFailed[name] = true;
+          delete lazyModuleLoads[name];
+          return null;
+        });
+    }
+    return lazyModuleLoads[name];
+  };
+  const loadAdminModule = () => loadLazyModule(
+    'admin',
+    () => import(`./features/admin/index.js?v=${DASHVIEW_VERSION}`),
+    (module) => { dashviewAdmin = module; }
+  );
+  const loadPopupsModule = () => loadLazyModule(
+    'popups',
+    () => import(`./features/popups/index.js?v=${DASHVIEW_VERSION}`),
+    (popupsModule) => {
+      dashviewRoomPopup = popupsModule.renderRoomPopup;
+      dashviewWeatherPopup = popupsModule.renderWeatherPopup;
+      dashviewMediaPopup = popupsModule.renderMediaPopup;
+      dashviewWaterPopup = popupsModule.renderWaterPopup;
+      dashviewChangelogPopup = popupsModule.renderChangelogPopup;
+      dashviewUserPopup = popupsModule.renderUserPopup;
+    }
+  );
 
   // Load changelog utilities
   try {
@@ -170,6 +199,7 @@ if (typeof structuredClone === 'undefined') {
     settingsStore = storesModule.getSettingsStore();
     uiStateStore = storesModule.getUIStateStore();
     registryStore = storesModule.getRegistryStore();
+    onboardingStore = storesModule.getOnboardingStore();
     debugLog("Loaded stores module");
   } catch (e) {
     console.warn("Dashview: Failed to load stores module", e);
@@ -212,11 +242,13 @@ if (typeof structuredClone === 'undefined') {
     anomalyDetector = {
       detectTemperatureAnomaly: servicesModule.detectTemperatureAnomaly,
       detectHumidityAnomaly: servicesModule.detectHumidityAnomaly,
+      formatDuration: servicesModule.formatDuration,
     };
     suggestionEngine = {
       evaluateSuggestions: servicesModule.evaluateSuggestions,
       dismissSuggestion: servicesModule.dismissSuggestion,
       recordSuggestionAction: servicesModule.recordSuggestionAction,
+      fromServerSuggestions: servicesModule.fromServerSuggestions,
     };
     debugLog("Loaded services module");
   } catch (e) {
@@ -731,6 +763,82 @@ if (typeof structuredClone === 'undefined') {
       document.addEventListener('dashview-error', this._errorEventHandler);
     }
 
+    firstUpdated() {
+      // Popups are not part of the first render; fetch them once the
+      // dashboard is on screen so the first open is still instant
+      const prefetch = () => loadPopupsModule();
+      if (typeof requestIdleCallback === 'function') {
+        requestIdleCallback(prefetch, { timeout: 2000 });
+      } else {
+        setTimeout(prefetch, 0);
+      }
+    }
+
+    /**
+     * Skip renders for hass updates that only touch entities Dashview does
+     * not display (power meters, energy sensors, ...). Only active while
+     * dashview/subscribe_entities is live; any other property change, or a
+     * hass change beyond states (language, user, registries), renders.
+     */
+    shouldUpdate(changedProperties) {
+      const caughtUp = this._entityStreamCaughtUp();
+      if (!this._entityStreamLive || changedProperties.size !== 1 || !changedProperties.has('hass')) {
+        return true;
+      }
+      const oldHass = changedProperties.get('hass');
+      if (!oldHass || !this.hass) return true;
+      const otherChange = Object.keys(this.hass).some(
+        key => key !== 'states' && this.hass[key] !== oldHass[key]
+      );
+      return otherChange || caughtUp;
+    }
+
+    /**
+     * Forget stream updates that hass.states already reflects
+     * @returns {boolean} True if any displayed entity caught up
+     */
+    _entityStreamCaughtUp() {
+      if (!this._entityStreamPending?.size) return false;
+      let caughtUp = false;
+      for (const [entityId, updatedAt] of this._entityStreamPending) {
+        const state = this.hass?.states[entityId];
+        const stateUpdatedAt = state ? new Date(state.last_updated).getTime() / 1000 : Infinity;
+        if (!state || stateUpdatedAt >= updatedAt - 0.001) {
+          this._entityStreamPending.delete(entityId);
+          caughtUp = true;
+        }
+      }
+      return caughtUp;
+    }
+
+    /**
+     * Subscribe to the filtered, throttled update stream of displayed
+     * entities. Events only name updated entities with their last_updated
+     * time and decide when to re-render; states are read from hass.states.
+     */
+    _subscribeEntityStream() {
+      this._entityStreamPending = new Map();
+      this._entityStreamUnsubscribe = this.hass.connection.subscribeMessage(
+        (event) => {
+          const pending = this._entityStreamPending;
+          for (const [entityId, updatedAt] of Object.entries(event.u || {})) {
+            pending.set(entityId, updatedAt);
+          }
+          for (const entityId of event.r || []) {
+            pending.set(entityId, 0);
+          }
+          this._entityStreamLive = true;
+          this.requestUpdate();
+        },
+        { type: 'dashview/subscribe_entities' }
+      );
+      this._entityStreamUnsubscribe.catch((e) => {
+        debugLog('Entity stream subscription failed, rendering on every change:', e);
+        this._entityStreamUnsubscribe = null;
+        this._entityStreamLive = false;
+      });
+    }
+
     disconnectedCallback() {
       super.disconnectedCallback();
       if (this._timeInterval) {
@@ -756,6 +864,38 @@ if (typeof structuredClone === 'undefined') {
         this._hourlyForecastUnsubscribe();
         this._hourlyForecastUnsubscribe = null;
       }
+      this._unsubscribeWeather();
+      // Unsubscribe from server-side anomalies
+      if (this._anomaliesUnsubscribe) {
+        this._anomaliesUnsubscribe.then(unsub => unsub()).catch(() => {});
+        this._anomaliesUnsubscribe = null;
+        this._serverAnomalies = null;
+      }
+      if (this._roomsUnsubscribe) {
+        this._roomsUnsubscribe.then(unsub => unsub()).catch(() => {});
+        this._roomsUnsubscribe = null;
+        this._serverRooms = null;
+      }
+      if (this._statusUnsubscribe) {
+        this._statusUnsubscribe.then(unsub => unsub()).catch(() => {});
+        this._statusUnsubscribe = null;
+        this._statusSummary = null;
+      }
+      if (this._discoveryUnsubscribe) {
+        this._discoveryUnsubscribe.then(unsub => unsub()).catch(() => {});
+        this._discoveryUnsubscribe = null;
+        this._discovery = null;
+      }
+      if (this._suggestionsUnsubscribe) {
+        this._suggestionsUnsubscribe.then(unsub => unsub()).catch(() => {});
+        this._suggestionsUnsubscribe = null;
+        this._serverSuggestions = null;
+      }
+      if (this._entityStreamUnsubscribe) {
+        this._entityStreamUnsubscribe.then(unsub => unsub()).catch(() => {});
+        this._entityStreamUnsubscribe = null;
+        this._entityStreamLive = false;
+      }
       // Unsubscribe from stores
       if (this._unsubscribeSettings) {
         this._unsubscribeSettings();
@@ -831,6 +971,8 @@ if (typeof structuredClone === 'undefined') {
         this._activeSuggestions = [];
         return;
       }
+      // Pushed by dashview/subscribe_suggestions
+      if (this._serverSuggestions) return;
       const context = {
         enabledMaps: {
           enabledLights: this._enabledLights,
@@ -868,6 +1010,10 @@ if (typeof structuredClone === 'undefined') {
       }
 
       // Record the action and refresh suggestions
+      if (this._serverSuggestions) {
+        this._sendSuggestionAction(suggestion, 'taken');
+        return;
+      }
       if (suggestionEngine) {
         suggestionEngine.recordSuggestionAction(suggestion.id);
       }
@@ -880,11 +1026,31 @@ if (typeof structuredClone === 'undefined') {
      */
     _handleSuggestionDismiss(suggestion) {
       if (!suggestion?.id || !suggestionEngine) return;
+      if (this._serverSuggestions) {
+        this._sendSuggestionAction(suggestion, 'dismiss');
+        return;
+      }
       // Default cooldown of 60 minutes
       suggestionEngine.dismissSuggestion(suggestion.id, 60 * 60 * 1000);
       this._updateSuggestions();
     }
 
+    /**
+     * Report a dismissal or action to the server, which starts the rule's
+     * cooldown for every panel and pushes the new suggestions
+     * @param {Object} suggestion - Suggestion object from the engine
+     * @param {string} action - 'dismiss' or 'taken'
+     */
+    _sendSuggestionAction(suggestion, action) {
+      this.hass.callWS({
+        type: 'dashview/suggestion_action',
+        rule: suggestion.ruleId || suggestion.id,
+        action,
+      }).catch((e) => {
+        console.warn('Dashview: Failed to record suggestion action', e);
+      });
+    }
+
     /**
      * Set a category's label mapping
      * @param {string} category - Category key (light, cover, etc.)
@@ -969,37 +1135,6 @@ if (typeof structuredClone === 'undefined') {
       });
     }
 
-    async _loadMediaPresetsFromLegacyFile() {
-      try {
-        // Use request registry for abort handling on unmount
-        const signal = this._requestRegistry?.register('load-media-presets');
-        const fetchOptions = signal ? { signal } : {};
-        const response = await fetch('/local/dashview/config/media_presets.json', fetchOptions);
-        // Mark request complete to clean up registry
-        this._requestRegistry?.complete('load-media-presets');
-        if (response.ok) {
-          const data = await response.json();
-          this._mediaPresets = data.media_presets || [];
-          // Migrate legacy presets to settings store
-          if (this._mediaPresets.length > 0) {
-            this._saveSettings();
-            debugLog("Media presets migrated from legacy file:", this._mediaPresets.length);
-          }
-          this.requestUpdate();
-        }
-      } catch (e) {
-        // Gracefully handle abort errors (component unmounted)
-        if (e.name === 'AbortError') {
-          debugLog('Media presets fetch aborted (component unmounted)');
-          return;
-        }
-        // Clean up registry on error
-        this._requestRegistry?.complete('load-media-presets');
-        console.warn('Dashview: Could not load media presets from legacy file', e);
-        this._mediaPresets = [];
-      }
-    }
-
     _addMediaPreset() {
       this._mediaPresets = [...this._mediaPresets, { name: '', media_content_id: '' }];
       this._saveSettings();
@@ -1648,9 +1783,10 @@ if (typeof structuredClone === 'undefined') {
               this._activeSecurityTab = 'alarm';
             }
             // Check if setup wizard should be shown (first run)
-            if (dashviewAdmin?.shouldShowWizard && dashviewAdmin.shouldShowWizard()) {
+            if (onboardingStore?.shouldShowWizard()) {
               this._showWizard = true;
               debugLog("First run detected, showing setup wizard");
+              loadAdminModule().then((module) => { if (module) this.requestUpdate(); });
             }
             // Check for new version and show changelog popup if needed
             this._checkForNewVersion();
@@ -1687,17 +1823,37 @@ if (typeof structuredClone === 'undefined') {
           });
         }
 
-        // Load media presets from legacy JSON file if not configured in settings
-        if (this._mediaPresets.length === 0) {
-          this._loadMediaPresetsFromLegacyFile();
-        }
         // Update available weather entities list
         this._updateAvailableWeatherEntities();
         // Fetch weather forecasts if popup is open or periodically
         if (this._weatherForecasts.length === 0) {
           this._fetchWeatherForecasts();
         }
-        // Evaluate smart suggestions based on current state
+        // Rate-of-change anomalies are detected on the server
+        if (!this._anomaliesUnsubscribe) {
+          this._subscribeAnomalies();
+        }
+        // Room card aggregates are maintained on the server
+        if (!this._roomsUnsubscribe) {
+          this._subscribeRooms();
+        }
+        // Info-text status summary is maintained on the server
+        if (!this._statusUnsubscribe) {
+          this._subscribeStatus();
+        }
+        // Re-render only for entities Dashview displays (see shouldUpdate)
+        if (!this._entityStreamUnsubscribe) {
+          this._subscribeEntityStream();
+        }
+        // Weather, person and pollen entities are indexed on the server
+        if (!this._discoveryUnsubscribe) {
+          this._subscribeDiscovery();
+        }
+        // Smart suggestions are evaluated on the server
+        if (!this._suggestionsUnsubscribe && suggestionEngine) {
+          this._subscribeSuggestions();
+        }
+        // Evaluate smart suggestions locally until the server answers
         this._updateSuggestions();
       }
     }
@@ -1705,8 +1861,8 @@ if (typeof structuredClone === 'undefined') {
     _updateAvailableWeatherEntities() {
       if (!this.hass) return;
       const weatherEntities = dashviewUtils.sortByName(
-        Object.keys(this.hass.states)
-          .filter(entityId => entityId.startsWith('weather.'))
+        this._discoveredEntityIds('weather')
+          .filter(entityId => this.hass.states[entityId])
           .map(entityId => ({
             entity_id: entityId,
             name: this.hass.states[entityId].attributes.friendly_name || entityId
@@ -1723,11 +1879,40 @@ if (typeof structuredClone === 'undefined') {
       if (!this.hass) return;
 
       const weatherEntity = this._weatherEntity || 'weather.forecast_home';
+
+      // Forecasts shared by all panels (dashview/subscribe_weather)
+      if (!this._weatherSubscriptionUnsupported) {
+        if (this._weatherSubscribedEntity === weatherEntity) return;
+        this._unsubscribeWeather();
+        this._weatherSubscribedEntity = weatherEntity;
+        this._weatherUnsubscribe = this.hass.connection.subscribeMessage(
+          (event) => this._handleWeatherEvent(event),
+          {
+            type: 'dashview/subscribe_weather',
+            entity_id: weatherEntity,
+            forecast_types: ['daily', 'hourly'],
+          }
+        );
+        try {
+          await this._weatherUnsubscribe;
+          return;
+        } catch (e) {
+          this._weatherUnsubscribe = null;
+          // Other errors (no weather entity) are not retried for this entity
+          if (e?.code !== 'unknown_command') {
+            debugLog('Weather subscription failed:', e);
+            return;
+          }
+          this._weatherSubscriptionUnsupported = true;
+          this._weatherSubscribedEntity = null;
+        }
+      }
+
       let entityToUse = weatherEntity;
 
       if (!this.hass.states[weatherEntity]) {
         // Try to find any weather entity
-        entityToUse = Object.keys(this.hass.states).find(e => e.startsWith('weather.'));
+        entityToUse = this._discoveredEntityIds('weather')[0];
         if (!entityToUse) return;
       }
 
@@ -1782,6 +1967,209 @@ if (typeof structuredClone === 'undefined') {
       }
     }
 
+    /**
+     * Handle a dashview/subscribe_weather event: the resolved entity with
+     * its forecast types first, then one forecast per event
+     * @param {Object} event - Subscription event
+     */
+    _handleWeatherEvent(event) {
+      if (event.forecast_types) {
+        // No daily forecast subscription: use attributes (older integrations)
+        const entity = this.hass.states[event.entity_id];
+        if (!event.forecast_types.includes('daily') && entity?.attributes?.forecast) {
+          this._weatherForecasts = entity.attributes.forecast;
+          this.requestUpdate();
+        }
+        return;
+      }
+      if (!event.forecast) return;
+      if (event.type === 'daily') {
+        this._weatherForecasts = event.forecast;
+      } else if (event.type === 'hourly') {
+        this._weatherHourlyForecasts = event.forecast;
+      }
+      this.requestUpdate();
+    }
+
+    _unsubscribeWeather() {
+      if (this._weatherUnsubscribe) {
+        this._weatherUnsubscribe.then(unsub => unsub()).catch(() => {});
+        this._weatherUnsubscribe = null;
+      }
+      this._weatherSubscribedEntity = null;
+    }
+
+    /**
+     * Subscribe to rate-of-change anomalies detected by the integration.
+     * The first event carries all active anomalies, later events only the
+     * sensors that changed (null = cleared). Until the subscription is
+     * established (or if it fails) rooms fall back to history-based checks.
+     */
+    _subscribeAnomalies() {
+      this._anomaliesUnsubscribe = this.hass.connection.subscribeMessage(
+        (event) => {
+          if (event.anomalies) {
+            this._serverAnomalies = { ...event.anomalies };
+          } else if (event.changed && this._serverAnomalies) {
+            for (const [entityId, anomaly] of Object.entries(event.changed)) {
+              if (anomaly) {
+                this._serverAnomalies[entityId] = anomaly;
+              } else {
+                delete this._serverAnomalies[entityId];
+              }
+            }
+          }
+          if (this._popupRoom) {
+            this._roomRateOfChangeAlert = null;
+            this._loadRoomRateOfChangeAlerts(this._popupRoom.area_id);
+          }
+        },
+        { type: 'dashview/subscribe_anomalies' }
+      );
+      this._anomaliesUnsubscribe.catch((e) => {
+        debugLog('Anomaly subscription failed, using history:', e);
+        this._anomaliesUnsubscribe = null;
+        this._serverAnomalies = null;
+      });
+    }
+
+    /**
+     * Subscribe to per-room aggregates maintained by the integration.
+     * The first event carries every room, later events only changed
+     * fields per room (null = room no longer shown). Until the subscription
+     * is established (or if it fails) room cards are computed locally.
+     */
+    _subscribeRooms() {
+      this._roomsUnsubscribe = this.hass.connection.subscribeMessage(
+        (event) => {
+          if (event.rooms) {
+            this._serverRooms = { ...event.rooms };
+          } else if (event.changed && this._serverRooms) {
+            const rooms = { ...this._serverRooms };
+            for (const [areaId, delta] of Object.entries(event.changed)) {
+              if (delta) {
+                rooms[areaId] = { ...rooms[areaId], ...delta };
+              } else {
+                delete rooms[areaId];
+              }
+            }
+            this._serverRooms = rooms;
+          }
+          this.requestUpdate();
+        },
+        { type: 'dashview/subscribe_rooms' }
+      );
+      this._roomsUnsubscribe.catch((e) => {
+        debugLog('Room subscription failed, computing rooms locally:', e);
+        this._roomsUnsubscribe = null;
+        this._serverRooms = null;
+      });
+    }
+
+    /**
+     * Subscribe to the info-text status summary maintained by the
+     * integration. The first event carries every enabled group, later
+     * events only changed groups (null = switched off). Until the
+     * subscription is established (or if it fails) the status row is
+     * derived from all enabled entities.
+     */
+    _subscribeStatus() {
+      this._statusUnsubscribe = this.hass.connection.subscribeMessage(
+        (event) => {
+          if (event.summary) {
+            this._statusSummary = { ...event.summary };
+          } else if (event.changed && this._statusSummary) {
+            const summary = { ...this._statusSummary };
+            for (const [group, value] of Object.entries(event.changed)) {
+              if (value) {
+                summary[group] = value;
+              } else {
+                delete summary[group];
+              }
+            }
+            this._statusSummary = summary;
+          }
+          this.requestUpdate();
+        },
+        { type: 'dashview/subscribe_status' }
+      );
+      this._statusUnsubscribe.catch((e) => {
+        debugLog('Status subscription failed, computing status locally:', e);
+        this._statusUnsubscribe = null;
+        this._statusSummary = null;
+      });
+    }
+
+    _subscribeDiscovery() {
+      this._discoveryUnsubscribe = this.hass.connection.subscribeMessage(
+        (event) => {
+          if (event.discovery) {
+            this._discovery = { ...event.discovery };
+          } else if (event.changed && this._discovery) {
+            this._discovery = { ...this._discovery, ...event.changed };
+          }
+          this.requestUpdate();
+        },
+        { type: 'dashview/subscribe_discovery' }
+      );
+      this._discoveryUnsubscribe.catch((e) => {
+        debugLog('Discovery subscription failed, scanning states locally:', e);
+        this._discoveryUnsubscribe = null;
+        this._discovery = null;
+      });
+    }
+
+    _subscribeSuggestions() {
+      this._suggestionsUnsubscribe = this.hass.connection.subscribeMessage(
+        (event) => {
+          this._serverSuggestions = suggestionEngine.fromServerSuggestions(event.suggestions);
+          this._activeSuggestions = this._serverSuggestions.slice(0, 2);
+          this.requestUpdate();
+        },
+        { type: 'dashview/subscribe_suggestions' }
+      );
+      this._suggestionsUnsubscribe.catch((e) => {
+        debugLog('Suggestions subscription failed, evaluating locally:', e);
+        this._suggestionsUnsubscribe = null;
+        this._serverSuggestions = null;
+      });
+    }
+
+    /**
+     * Get the server-side aggregate of a room
+     * @param {string} areaId - Area ID
+     * @returns {Object|null|undefined} Room data, null if the room has no
+     *   displayed entities, undefined if not subscribed
+     */
+    _getServerRoomData(areaId) {
+      if (!this._serverRooms) return undefined;
+      const room = this._serverRooms[areaId];
+      if (!room) return null;
+      return {
+        hasMotion: room.motion,
+        hasLightsOn: room.lightsOn > 0,
+        temperature: room.temperature != null ? room.temperature.toFixed(0) : null,
+        humidity: room.humidity != null ? room.humidity.toFixed(0) : null,
+        isActive: room.active,
+      };
+    }
+
+    /**
+     * Get the server-side anomaly of a sensor
+     * @param {string} entityId - Sensor entity ID
+     * @returns {Object|null|undefined} AnomalyResult, null if none, undefined if not subscribed
+     */
+    _getServerAnomaly(entityId) {
+      if (!this._serverAnomalies) return undefined;
+      const anomaly = this._serverAnomalies[entityId];
+      if (!anomaly) return null;
+      return {
+        ...anomaly,
+        detected: true,
+        formattedDuration: anomalyDetector.formatDuration(anomaly.duration),
+      };
+    }
+
     _updateTime() {
       const now = new Date();
       const locale = this.hass?.language || navigator.language || 'en';
@@ -2604,6 +2992,113 @@ if (typeof structuredClone === 'undefined') {
       }
     }
 
+    // =========================================================================
+    // NUMERIC HISTORY (batched, server-side downsampled)
+    // Requests issued in the same tick for the same range are merged into a
+    // single dashview/history_summary call (a new one every
+    // HISTORY_SUMMARY_MAX_ENTITIES entities), so a room popup with several
+    // climate sensors sends one small request. Ranges longer than two days
+    // use the recorder's long-term statistics (dashview/statistics_summary)
+    // so week and month charts cost the same as day charts. Falls back to
+    // the raw HA history API if the backend does not know the commands.
+    // =========================================================================
+
+    _historySummaryBatches = {};
+    _historySummaryUnsupported = false;
+    _statisticsSummaryUnsupported = false;
+
+    async _fetchNumericHistory(entityId, hours, label) {
+      const timeoutMs = coreUtils?.TIMEOUT_DEFAULTS?.HISTORY_FETCH || 20000;
+      const withTimeoutFn = coreUtils?.withTimeout || ((p) => p);
+
+      if (hours > 48 && !this._statisticsSummaryUnsupported) {
+        try {
+          const response = await withTimeoutFn(
+            this._queueHistorySummary('dashview/statistics_summary', entityId, hours),
+            timeoutMs,
+            label
+          );
+          const series = response?.series?.[entityId];
+          if (series?.t.length) {
+            return series.t.map((time, i) => ({ time: time * 1000, value: series.mean[i] }));
+          }
+          // No long-term statistics (no state_class): use state history
+        } catch (e) {
+          if (e?.code !== 'unknown_command') throw e;
+          this._statisticsSummaryUnsupported = true;
+        }
+      }
+
+      if (!this._historySummaryUnsupported) {
+        try {
+          const response = await withTimeoutFn(
+            this._queueHistorySummary('dashview/history_summary', entityId, hours),
+            timeoutMs,
+            label
+          );
+          const series = response?.series?.[entityId];
+          if (!series) return [];
+          return series.t.map((time, i) => ({ time: time * 1000, value: series.v[i] }));
+        } catch (e) {
+          if (e?.code !== 'unknown_command') throw e;
+          this._historySummaryUnsupported = true;
+        }
+      }
+
+      const endTime = new Date();
+      const startTime = new Date(endTime.getTime() - hours * 60 * 60 * 1000);
+      const response = await withTimeoutFn(
+        this.hass.callWS({
+          type: 'history/history_during_period',
+          start_time: startTime.toISOString(),
+          end_time: endTime.toISOString(),
+          entity_ids: [entityId],
+          minimal_response: true,
+          no_attributes: true,
+        }),
+        timeoutMs,
+        label
+      );
+
+      if (!response || !response[entityId]) return [];
+
+      // Process history data into simple array of {time, value}
+      return response[entityId]
+        .filter(item => item.s !== 'unavailable' && item.s !== 'unknown' && !isNaN(parseFloat(item.s)))
+        .map(item => ({
+          time: new Date(item.lu * 1000).getTime(),
+          value: parseFloat(item.s)
+        }));
+    }
+
+    _queueHistorySummary(type, entityId, hours) {
+      const key = `${type}:${hours}`;
+      let batch = this._historySummaryBatches[key];
+      if (!batch) {
+        batch = { entityIds: new Set() };
+        this._historySummaryBatches[key] = batch;
+        batch.promise = Promise.resolve().then(() => {
+          if (this._historySummaryBatches[key] === batch) {
+            delete this._historySummaryBatches[key];
+          }
+          const endTime = new Date();
+          const startTime = new Date(endTime.getTime() - hours * 60 * 60 * 1000);
+          return this.hass.callWS({
+            type,
+            entity_ids: [...batch.entityIds],
+            start_time: startTime.toISOString(),
+            end_time: endTime.toISOString(),
+          });
+        });
+      }
+      batch.entityIds.add(entityId);
+      if (batch.entityIds.size >= HISTORY_SUMMARY_MAX_ENTITIES) {
+        // Full: further requests of this tick start a new batch
+        delete this._historySummaryBatches[key];
+      }
+      return batch.promise;
+    }
+
     // Temperature history cache to avoid repeated API calls
     _temperatureHistoryCache = {};
     _temperatureHistoryCacheTime = {};
@@ -2621,35 +3116,7 @@ if (typeof structuredClone === 'undefined') {
       }
 
       try {
-        const endTime = new Date();
-        const startTime = new Date(endTime.getTime() - hours * 60 * 60 * 1000);
-
-        // Use timeout protection (20s for historical data)
-        const timeoutMs = coreUtils?.TIMEOUT_DEFAULTS?.HISTORY_FETCH || 20000;
-        const withTimeoutFn = coreUtils?.withTimeout || ((p) => p);
-
-        const response = await withTimeoutFn(
-          this.hass.callWS({
-            type: 'history/history_during_period',
-            start_time: startTime.toISOString(),
-            end_time: endTime.toISOString(),
-            entity_ids: [entityId],
-            minimal_response: true,
-            no_attributes: true,
-          }),
-          timeoutMs,
-          'Temperature history fetch'
-        );
-
-        if (!response || !response[entityId]) return [];
-
-        // Process history data into simple array of {time, value}
-        const history = response[entityId]
-          .filter(item => item.s !== 'unavailable' && item.s !== 'unknown' && !isNaN(parseFloat(item.s)))
-          .map(item => ({
-            time: new Date(item.lu * 1000).getTime(),
-            value: parseFloat(item.s)
-          }));
+        const history = await this._fetchNumericHistory(entityId, hours, 'Temperature history fetch');
 
         // Cache the result
         this._temperatureHistoryCache[cacheKey] = history;
@@ -2679,35 +3146,7 @@ if (typeof structuredClone === 'undefined') {
       }
 
       try {
-        const endTime = new Date();
-        const startTime = new Date(endTime.getTime() - hours * 60 * 60 * 1000);
-
-        // Use timeout protection (20s for historical data)
-        const timeoutMs = coreUtils?.TIMEOUT_DEFAULTS?.HISTORY_FETCH || 20000;
-        const withTimeoutFn = coreUtils?.withTimeout || ((p) => p);
-
-        const response = await withTimeoutFn(
-          this.hass.callWS({
-            type: 'history/history_during_period',
-            start_time: startTime.toISOString(),
-            end_time: endTime.toISOString(),
-            entity_ids: [entityId],
-            minimal_response: true,
-            no_attributes: true,
-          }),
-          timeoutMs,
-          'Humidity history fetch'
-        );
-
-        if (!response || !response[entityId]) return [];
-
-        // Process history data into simple array of {time, value}
-        const history = response[entityId]
-          .filter(item => item.s !== 'unavailable' && item.s !== 'unknown' && !isNaN(parseFloat(item.s)))
-          .map(item => ({
-            time: new Date(item.lu * 1000).getTime(),
-            value: parseFloat(item.s)
-          }));
+        const history = await this._fetchNumericHistory(entityId, hours, 'Humidity history fetch');
 
         // Cache the result
         this._humidityHistoryCache[cacheKey] = history;
@@ -2821,25 +3260,27 @@ if (typeof structuredClone === 'undefined') {
       if (tempSensors.length > 0) {
         const tempSensor = tempSensors[0];
         try {
-          // Fetch enough history to cover the window (add extra buffer)
-          const windowMinutes = this._tempRapidChangeWindowMinutes || 60;
-          const history = await this._fetchTemperatureHistory(tempSensor.entity_id, Math.ceil(windowMinutes / 60) + 1);
-
-          if (history.length >= 2) {
-            const anomaly = anomalyDetector.detectTemperatureAnomaly(
-              history,
-              this._tempRapidChangeThreshold || 5,
-              windowMinutes
-            );
+          let anomaly = this._getServerAnomaly(tempSensor.entity_id);
+          if (anomaly === undefined) {
+            // Fetch enough history to cover the window (add extra buffer)
+            const windowMinutes = this._tempRapidChangeWindowMinutes || 60;
+            const history = await this._fetchTemperatureHistory(tempSensor.entity_id, Math.ceil(windowMinutes / 60) + 1);
+            anomaly = history.length >= 2
+              ? anomalyDetector.detectTemperatureAnomaly(
+                history,
+                this._tempRapidChangeThreshold || 5,
+                windowMinutes
+              )
+              : null;
+          }
 
-            if (anomaly) {
-              const direction = anomaly.direction === 'falling'
-                ? t('climate.rapidChange.tempDropped', `Temperature dropped {{degrees}}° in {{time}}`)
-                : t('climate.rapidChange.tempRose', `Temperature rose {{degrees}}° in {{time}}`);
-              alerts.push(direction
-                .replace('{{degrees}}', anomaly.change.toFixed(1))
-                .replace('{{time}}', anomaly.formattedDuration));
-            }
+          if (anomaly) {
+            const direction = anomaly.direction === 'falling'
+              ? t('climate.rapidChange.tempDropped', `Temperature dropped {{degrees}}° in {{time}}`)
+              : t('climate.rapidChange.tempRose', `Temperature rose {{degrees}}° in {{time}}`);
+            alerts.push(direction
+              .replace('{{degrees}}', anomaly.change.toFixed(1))
+              .replace('{{time}}', anomaly.formattedDuration));
           }
         } catch (e) {
           console.warn('[Dashview] Error checking temperature rate-of-change:', e.message);
@@ -2850,25 +3291,27 @@ if (typeof structuredClone === 'undefined') {
       if (humiditySensors.length > 0) {
         const humiditySensor = humiditySensors[0];
         try {
-          // Fetch enough history to cover the window (add extra buffer)
-          const windowMinutes = this._humidityRapidChangeWindowMinutes || 30;
-          const history = await this._fetchHumidityHistory(humiditySensor.entity_id, Math.ceil(windowMinutes / 60) + 1);
-
-          if (history.length >= 2) {
-            const anomaly = anomalyDetector.detectHumidityAnomaly(
-              history,
-              this._humidityRapidChangeThreshold || 20,
-              windowMinutes
-            );
+          let anomaly = this._getServerAnomaly(humiditySensor.entity_id);
+          if (anomaly === undefined) {
+            // Fetch enough history to cover the window (add extra buffer)
+            const windowMinutes = this._humidityRapidChangeWindowMinutes || 30;
+            const history = await this._fetchHumidityHistory(humiditySensor.entity_id, Math.ceil(windowMinutes / 60) + 1);
+            anomaly = history.length >= 2
+              ? anomalyDetector.detectHumidityAnomaly(
+                history,
+                this._humidityRapidChangeThreshold || 20,
+                windowMinutes
+              )
+              : null;
+          }
 
-            if (anomaly) {
-              const direction = anomaly.direction === 'falling'
-                ? t('climate.rapidChange.humidityDropped', `Humidity dropped {{percent}}% in {{time}}`)
-                : t('climate.rapidChange.humidityRose', `Humidity rose {{percent}}% in {{time}}`);
-              alerts.push(direction
-                .replace('{{percent}}', anomaly.change.toFixed(0))
-                .replace('{{time}}', anomaly.formattedDuration));
-            }
+          if (anomaly) {
+            const direction = anomaly.direction === 'falling'
+              ? t('climate.rapidChange.humidityDropped', `Humidity dropped {{percent}}% in {{time}}`)
+              : t('climate.rapidChange.humidityRose', `Humidity rose {{percent}}% in {{time}}`);
+            alerts.push(direction
+              .replace('{{percent}}', anomaly.change.toFixed(0))
+              .replace('{{time}}', anomaly.formattedDuration));
           }
         } catch (e) {
           console.warn('[Dashview] Error checking humidity rate-of-change:', e.message);
@@ -2988,7 +3431,7 @@ if (typeof structuredClone === 'undefined') {
     }
 
     _getWeather() {
-      return weatherService ? weatherService.getWeather(this.hass, this._weatherEntity) : null;
+      return weatherService ? weatherService.getWeather(this.hass, this._weatherEntity, this._discovery?.weather) : null;
     }
 
     _translateWeatherCondition(state) {
@@ -3101,25 +3544,36 @@ if (typeof structuredClone === 'undefined') {
     }
 
     /**
-     * Get extended user data for the popup
+     * Entity IDs of a discovered kind (dashview/subscribe_discovery), or of
+     * the domain in hass.states until the index arrives
+     * @param {string} kind - 'weather' or 'person'
+     * @returns {Array<string>} Entity IDs
      */
-    _getUserPopupData() {
-      if (!this.hass) return null;
+    _discoveredEntityIds(kind) {
+      if (this._discovery?.[kind]) return this._discovery[kind];
+      return Object.keys(this.hass.states).filter(id => id.startsWith(`${kind}.`));
+    }
 
+    /**
+     * Find the person entity of the current HA user (via its user_id
+     * attribute), falling back to the first person entity
+     * @returns {Object|undefined} Person state
+     */
+    _findCurrentPerson() {
+      const persons = this._discoveredEntityIds('person')
+        .map(id => this.hass.states[id])
+        .filter(Boolean);
       const currentUserId = this.hass.user?.id;
-      let person = null;
+      return (currentUserId && persons.find(e => e.attributes.user_id === currentUserId)) || persons[0];
+    }
 
-      if (currentUserId) {
-        person = Object.values(this.hass.states).find(
-          (e) => e.entity_id.startsWith("person.") && e.attributes.user_id === currentUserId
-        );
-      }
+    /**
+     * Get extended user data for the popup
+     */
+    _getUserPopupData() {
+      if (!this.hass) return null;
 
-      if (!person) {
-        person = Object.values(this.hass.states).find((e) =>
-          e.entity_id.startsWith("person.")
-        );
-      }
+      const person = this._findCurrentPerson();
 
       if (person) {
         const customPhoto = this._userPhotos?.[person.entity_id];
@@ -3134,8 +3588,13 @@ if (typeof structuredClone === 'undefined') {
       return null;
     }
 
+    _presenceHistoryUnsupported = false;
+
     /**
-     * Fetch presence history from Home Assistant
+     * Fetch presence history from Home Assistant.
+     * Uses dashview/presence_history (transitions computed and cached
+     * server-side); falls back to the raw HA history API if the backend
+     * does not know the command.
      */
     async _fetchPresenceHistory() {
       if (!this.hass) return;
@@ -3144,15 +3603,41 @@ if (typeof structuredClone === 'undefined') {
       if (!person) return;
 
       try {
+        // Use timeout protection (20s for historical data)
+        const timeoutMs = coreUtils?.TIMEOUT_DEFAULTS?.HISTORY_FETCH || 20000;
+        const withTimeoutFn = coreUtils?.withTimeout || ((p) => p);
+
+        if (!this._presenceHistoryUnsupported) {
+          try {
+            const response = await withTimeoutFn(
+              this.hass.callWS({
+                type: 'dashview/presence_history',
+                entity_ids: [person.entityId],
+                days: 7,
+                limit: 10,
+              }),
+              timeoutMs,
+              'Presence history fetch'
+            );
+            const transitions = response?.persons?.[person.entityId] || [];
+            this._presenceHistory = transitions.map((entry) => ({
+              state: entry.state,
+              last_changed: new Date(entry.since * 1000).toISOString(),
+              dwell: entry.dwell,
+            }));
+            this.requestUpdate();
+            return;
+          } catch (e) {
+            if (e?.code !== 'unknown_command') throw e;
+            this._presenceHistoryUnsupported = true;
+          }
+        }
+
         // Get history for the last 7 days
         const endTime = new Date();
         const startTime = new Date();
         startTime.setDate(startTime.getDate() - 7);
 
-        // Use timeout protection (20s for historical data)
-        const timeoutMs = coreUtils?.TIMEOUT_DEFAULTS?.HISTORY_FETCH || 20000;
-        const withTimeoutFn = coreUtils?.withTimeout || ((p) => p);
-
         const history = await withTimeoutFn(
           this.hass.callWS({
             type: 'history/history_during_period',
@@ -3285,23 +3770,7 @@ if (typeof structuredClone === 'undefined') {
     _getPerson() {
       if (!this.hass) return null;
 
-      // Try to find the person entity associated with the current HA user
-      const currentUserId = this.hass.user?.id;
-      let person = null;
-
-      if (currentUserId) {
-        // Look for person entity linked to current user via user_id attribute
-        person = Object.values(this.hass.states).find(
-          (e) => e.entity_id.startsWith("person.") && e.attributes.user_id === currentUserId
-        );
-      }
-
-      // Fallback to first person entity if no user-linked person found
-      if (!person) {
-        person = Object.values(this.hass.states).find((e) =>
-          e.entity_id.startsWith("person.")
-        );
-      }
+      const person = this._findCurrentPerson();
 
       if (person) {
         // Check for custom photo in userPhotos settings
@@ -4366,7 +4835,8 @@ if (typeof structuredClone === 'undefined') {
 
       // Get all status items via status service (filtered by current labels)
       // Use memoized enabled maps to avoid 11x full registry iterations per render
-      const enabledMaps = this._getCachedEnabledMaps();
+      // (not needed once the server-side summary is available)
+      const enabledMaps = this._statusSummary ? {} : this._getCachedEnabledMaps();
       const allStatusItems = statusService
         ? statusService.getAllStatusItems({
             hass: this.hass,
@@ -4397,6 +4867,7 @@ if (typeof structuredClone === 'undefined') {
               lockUnlockedTooLongMinutes: this._lockUnlockedTooLongMinutes,
             },
             alarmEntity: this._alarmEntity,
+            statusSummary: this._statusSummary,
           })
         : [];
 
@@ -4609,14 +5080,14 @@ if (typeof structuredClone === 'undefined') {
         ${this._popupRoom && dashviewRoomPopup
           ? dashviewRoomPopup(this, html)
           : this._popupRoom
-            ? html`<div class="popup-overlay"><div class="popup-container"><p>Room popup module not loaded</p></div></div>`
+            ? this._renderLazyPopupFallback('Room popup')
             : ''}
 
         <!-- WEATHER POPUP -->
         ${this._weatherPopupOpen && dashviewWeatherPopup
           ? dashviewWeatherPopup(this, html)
           : this._weatherPopupOpen
-            ? html`<div class="popup-overlay"><div class="popup-container"><p>Weather popup module not loaded</p></div></div>`
+            ? this._renderLazyPopupFallback('Weather popup')
             : ''}
 
         <!-- SECURITY POPUP -->
@@ -4746,21 +5217,21 @@ if (typeof structuredClone === 'undefined') {
         ${this._userPopupOpen && dashviewUserPopup
           ? dashviewUserPopup(this, html)
           : this._userPopupOpen
-            ? html`<div class="popup-overlay"><div class="popup-container"><p>User popup module not loaded</p></div></div>`
+            ? this._renderLazyPopupFallback('User popup')
             : ''}
 
         <!-- MEDIA POPUP -->
         ${this._mediaPopupOpen && dashviewMediaPopup
           ? dashviewMediaPopup(this, html)
           : this._mediaPopupOpen
-            ? html`<div class="popup-overlay"><div class="popup-container"><p>Media popup module not loaded</p></div></div>`
+            ? this._renderLazyPopupFallback('Media popup')
             : ''}
 
         <!-- WATER POPUP -->
         ${this._waterPopupOpen && dashviewWaterPopup
           ? dashviewWaterPopup(this, html)
           : this._waterPopupOpen
-            ? html`<div class="popup-overlay"><div class="popup-container"><p>Water popup module not loaded</p></div></div>`
+            ? this._renderLazyPopupFallback('Water popup')
             : ''}
 
         <!-- ADMIN POPUP -->
@@ -4925,9 +5396,26 @@ if (typeof structuredClone === 'undefined') {
       if (dashviewAdmin?.renderAdminTab) {
         return dashviewAdmin.renderAdminTab(this, html);
       }
+      if (!lazyModuleFailed.admin) {
+        loadAdminModule().then((module) => { if (module) this.requestUpdate(); });
+        return html`<div class="module-loading">${t('ui.errors.loading', 'Loading...')}</div>`;
+      }
       return html`<div class="module-error">Admin module not loaded. Please refresh the page.</div>`;
     }
 
+    /**
+     * Fallback for a popup whose module has not been loaded yet.
+     * Triggers the lazy popups chunk and re-renders once it arrives.
+     * @param {string} label - Popup name for the error message
+     */
+    _renderLazyPopupFallback(label) {
+      if (!lazyModuleFailed.popups) {
+        loadPopupsModule().then((module) => { if (module) this.requestUpdate(); });
+        return html`<div class="popup-overlay"><div class="popup-container"><p>${t('ui.errors.loading', 'Loading...')}</p></div></div>`;
+      }
+      return html`<div class="popup-overlay"><div class="popup-container"><p>${label} module not loaded</p></div></div>`;
+    }
+
     _renderRoomConfig() {
       if (dashviewAdmin?.renderRoomConfig) {
         return dashviewAdmin.renderRoomConfig(this, html);
@@ -165,6 +165,16 @@ describe('Weather Tab Pollen Section', () => {
       expect(sensors).toHaveLength(3);
     });
 
+    it('should read only indexed sensors when the server index is given', () => {
+      const sensors = detectPollenSensors(mockHass, {
+        'sensor.pollenflug_erle_124': { type: 'erle', region: '124' },
+        'sensor.removed': { type: 'birke', region: '1' },
+      });
+
+      expect(sensors).toHaveLength(1);
+      expect(sensors[0]).toMatchObject({ type: 'erle', region: '124', value: 3, tomorrow: 2 });
+    });
+
     it('should return top 3 by level when displayMode is top3', () => {
       const sensors = detectPollenSensors(mockHass);
       const top3 = [...sensors].sort((a, b) => b.value - a.value).slice(0, 3);
@@ -315,7 +315,7 @@ export function renderWeatherTab(panel, html) {
  */
 function renderPollenSection(panel, html, toggleSection, isExpanded) {
   // Detect available pollen sensors
-  const pollenSensors = detectPollenSensors(panel.hass);
+  const pollenSensors = detectPollenSensors(panel.hass, panel._discovery?.pollen);
 
   // Get current pollen config from settings
   const pollenConfig = panel._pollenConfig || { enabled: true, enabledSensors: {}, displayMode: 'active' };
@@ -299,6 +299,14 @@ export function renderFloorOverviewCard(component, html, floorId) {
   const getRoomData = (room) => {
     const areaId = room.area_id;
 
+    // Prefer the aggregate pushed by the integration (dashview/subscribe_rooms)
+    const serverData = component._getServerRoomData?.(areaId);
+    if (serverData !== undefined) {
+      return serverData || {
+        hasMotion: false, hasLightsOn: false, temperature: null, humidity: null, isActive: false,
+      };
+    }
+
     // Check motion sensors
     const motionSensors = component._getAreaMotionSensors(areaId).filter(s => s.enabled);
     const hasMotion = motionSensors.some(s => s.state === 'on');
@@ -6,11 +6,16 @@
 import { renderPopupHeader } from '../../components/layout/index.js';
 import { t } from '../../utils/i18n.js';
 
-// Cache for Spotify artwork URLs (media_content_id -> image_url)
+// Cache for preset artwork URLs (media_content_id -> image_url, null while
+// pending or without artwork)
 const spotifyArtworkCache = new Map();
+// Set once the backend lacks dashview/media_artwork
+let artworkServerUnsupported = false;
+// Media IDs per dashview/media_artwork request (MAX_MEDIA_IDS in artwork.py)
+const ARTWORK_BATCH_SIZE = 50;
 
 /**
- * Get artwork URL for a preset, fetching from Spotify oEmbed if needed
+ * Get artwork URL for a preset, resolving it through the backend if needed
  * @param {Object} preset - Media preset object
  * @param {Object} component - DashviewPanel instance for triggering updates
  * @returns {string|null} Image URL or null
@@ -27,21 +32,61 @@ function getPresetArtwork(preset, component) {
     return spotifyArtworkCache.get(preset.media_content_id);
   }
 
-  // Fetch from Spotify oEmbed (async, will update cache and trigger re-render)
-  fetchSpotifyArtwork(preset.media_content_id, component);
+  // Resolve all presets missing artwork at once (async, will update cache
+  // and trigger re-render)
+  fetchPresetArtwork(component);
 
   return null; // Return null for now, will re-render when fetched
 }
 
+/**
+ * Resolve artwork of every preset not cached yet in batched
+ * dashview/media_artwork requests; the backend caches the oEmbed lookups
+ * and serves the thumbnails locally. Older backends fall back to
+ * Spotify's oEmbed endpoint per preset.
+ * @param {Object} component - DashviewPanel instance
+ */
+async function fetchPresetArtwork(component) {
+  const mediaIds = [...new Set((component._mediaPresets || [])
+    .filter(preset => !preset.image_url && preset.media_content_id?.startsWith('spotify:'))
+    .map(preset => preset.media_content_id)
+    .filter(mediaId => !spotifyArtworkCache.has(mediaId)))];
+  if (mediaIds.length === 0) return;
+
+  // Mark as fetching to prevent duplicate requests
+  mediaIds.forEach(mediaId => spotifyArtworkCache.set(mediaId, null));
+
+  if (!artworkServerUnsupported) {
+    try {
+      for (let i = 0; i < mediaIds.length; i += ARTWORK_BATCH_SIZE) {
+        const { artwork } = await component.hass.connection.sendMessagePromise({
+          type: 'dashview/media_artwork',
+          media_ids: mediaIds.slice(i, i + ARTWORK_BATCH_SIZE),
+        });
+        Object.entries(artwork).forEach(([mediaId, url]) => {
+          spotifyArtworkCache.set(mediaId, url);
+        });
+      }
+      component.requestUpdate();
+      return;
+    } catch (e) {
+      if (e?.code !== 'unknown_command') {
+        console.warn('Failed to fetch preset artwork:', e);
+        return;
+      }
+      artworkServerUnsupported = true;
+    }
+  }
+
+  await Promise.all(mediaIds.map(mediaId => fetchSpotifyArtwork(mediaId, component)));
+}
+
 /**
  * Fetch artwork from Spotify oEmbed endpoint
  * @param {string} mediaContentId - Spotify URI
  * @param {Object} component - DashviewPanel instance
  */
 async function fetchSpotifyArtwork(mediaContentId, component) {
-  // Mark as fetching to prevent duplicate requests
-  spotifyArtworkCache.set(mediaContentId, null);
-
   // Create unique request ID for this fetch
   const requestId = `spotify-artwork-${mediaContentId}`;
 
@@ -9,7 +9,7 @@ import { openMoreInfo } from '../../utils/helpers.js';
 import { t } from '../../utils/i18n.js';
 import { triggerHaptic } from '../../utils/haptic.js';
 import { createLongPressHandlers } from '../../utils/long-press-handlers.js';
-import { evaluateRoomSuggestions } from '../../services/suggestion-engine.js';
+import { evaluateRoomSuggestions, filterSuggestionsForRoom } from '../../services/suggestion-engine.js';
 
 /**
  * Check if room data is still loading
@@ -112,7 +112,10 @@ function renderRoomSuggestionsBanner(component, html, areaId) {
     getAreaIdForEntity: component._getAreaIdForEntity?.bind(component),
   };
 
-  const suggestions = evaluateRoomSuggestions(component.hass, context, areaId);
+  // Server-evaluated suggestions (dashview/subscribe_suggestions) if available
+  const suggestions = component._serverSuggestions
+    ? filterSuggestionsForRoom(component._serverSuggestions, context, areaId)
+    : evaluateRoomSuggestions(component.hass, context, areaId);
   if (!suggestions || suggestions.length === 0) return '';
 
   return html`
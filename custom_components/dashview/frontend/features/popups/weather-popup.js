@@ -282,7 +282,7 @@ function renderPollenForecast(component, html) {
   if (!pollenConfig.enabled) return '';
 
   // Detect all pollen sensors
-  const allSensors = detectPollenSensors(component.hass);
+  const allSensors = detectPollenSensors(component.hass, component._discovery?.pollen);
 
   // Filter based on enabled sensors (default to all enabled)
   let sensors = allSensors.filter(sensor => {
@@ -105,4 +105,6 @@ export {
   evaluateSuggestions,
   dismissSuggestion,
   recordSuggestionAction,
+  fromServerSuggestions,
+  filterSuggestionsForRoom,
 } from './suggestion-engine.js';
@@ -125,18 +125,51 @@ function extractRegion(entityId, state) {
   return 'unknown';
 }
 
+/**
+ * Build a pollen sensor object from its current state
+ *
+ * @param {string} entityId - Entity ID
+ * @param {Object} state - Entity state object
+ * @param {string} type - Pollen type key
+ * @param {string} region - Region ID
+ * @returns {Object} Pollen sensor object
+ */
+function toPollenSensor(entityId, state, type, region) {
+  return {
+    entityId,
+    type,
+    region,
+    value: parseFloat(state.state) || 0,
+    tomorrow: parseFloat(state.attributes?.state_tomorrow) || 0,
+    dayAfter: parseFloat(state.attributes?.state_in_2_days) || 0,
+    todayDesc: state.attributes?.state_today_desc || '',
+    friendlyName: state.attributes?.friendly_name || entityId,
+  };
+}
+
 /**
  * Detect all DWD Pollenflug sensors from Home Assistant states
  * Uses attribute-based detection (works even if entity is renamed)
  *
  * @param {Object} hass - Home Assistant instance
+ * @param {Object} [pollenIndex] - Sensors indexed by the integration
+ *   (dashview/subscribe_discovery): { entityId: { type, region } }; only
+ *   these states are read instead of scanning all of hass.states
  * @returns {Array} Array of pollen sensor objects
  */
-export function detectPollenSensors(hass) {
+export function detectPollenSensors(hass, pollenIndex) {
   if (!hass || !hass.states) {
     return [];
   }
 
+  if (pollenIndex) {
+    return Object.entries(pollenIndex)
+      .filter(([entityId]) => hass.states[entityId])
+      .map(([entityId, { type, region }]) =>
+        toPollenSensor(entityId, hass.states[entityId], type, region)
+      );
+  }
+
   const sensors = [];
 
   for (const [entityId, state] of Object.entries(hass.states)) {
@@ -150,16 +183,7 @@ export function detectPollenSensors(hass) {
     const type = extractPollenType(entityId, state);
     if (!type) continue; // Skip if we can't determine the type
 
-    sensors.push({
-      entityId,
-      type,
-      region: extractRegion(entityId, state),
-      value: parseFloat(state.state) || 0,
-      tomorrow: parseFloat(state.attributes?.state_tomorrow) || 0,
-      dayAfter: parseFloat(state.attributes?.state_in_2_days) || 0,
-      todayDesc: state.attributes?.state_today_desc || '',
-      friendlyName: state.attributes?.friendly_name || entityId,
-    });
+    sensors.push(toPollenSensor(entityId, state, type, extractRegion(entityId, state)));
   }
 
   return sensors;
@@ -107,6 +107,41 @@ function _getEarliestSensor(sensors) {
   );
 }
 
+/**
+ * Status groups of the server-side summary (dashview/subscribe_status)
+ * and the enabled map each one stands in for
+ */
+const SUMMARY_ENABLED_MAPS = {
+  water: 'enabledWaterLeakSensors',
+  smoke: 'enabledSmokeSensors',
+  doors: 'enabledDoors',
+  locks: 'enabledLocks',
+  garage: 'enabledGarages',
+  windows: 'enabledWindows',
+  roofWindows: 'enabledRoofWindows',
+  motion: 'enabledMotionSensors',
+  lights: 'enabledLights',
+  covers: 'enabledCovers',
+  tvs: 'enabledTVs',
+};
+
+/**
+ * Build enabled maps from the server-side status summary.
+ * The summary names only the entities relevant for each group (the active
+ * ones, or the most recently changed one), so the providers below check a
+ * handful of states instead of every enabled entity.
+ * @param {Object} statusSummary - Summary pushed by dashview/subscribe_status
+ * @returns {Object} Enabled maps keyed like getAllStatusItems' enabledEntities
+ */
+export function enabledMapsFromSummary(statusSummary) {
+  const maps = {};
+  Object.entries(SUMMARY_ENABLED_MAPS).forEach(([group, mapKey]) => {
+    const ids = statusSummary?.[group]?.ids || [];
+    maps[mapKey] = Object.fromEntries(ids.map(id => [id, true]));
+  });
+  return maps;
+}
+
 // ==================== Status Provider Functions ====================
 
 /**
@@ -921,9 +956,10 @@ export function getVacuumStatus(hass, infoTextConfig) {
  * Supports two tiers: critical (< criticalThreshold) and low (< threshold)
  * @param {Object} hass - Home Assistant instance
  * @param {Object} infoTextConfig - Info text configuration
+ * @param {string[]|null} batteryEntityIds - Optional candidate battery sensors (server summary)
  * @returns {Object|null} Status object or null
  */
-export function getBatteryLowStatus(hass, infoTextConfig) {
+export function getBatteryLowStatus(hass, infoTextConfig, batteryEntityIds = null) {
   if (!hass || !infoTextConfig.batteryLow?.enabled) return null;
 
   const threshold = infoTextConfig.batteryLow.threshold || 20;
@@ -933,7 +969,12 @@ export function getBatteryLowStatus(hass, infoTextConfig) {
   const lowBatteryDevices = [];
   const criticalBatteryDevices = [];
 
-  Object.entries(hass.states).forEach(([entityId, state]) => {
+  // Low batteries reported by the server, otherwise every state
+  const candidates = batteryEntityIds
+    ? batteryEntityIds.filter(id => hass.states[id]).map(id => [id, hass.states[id]])
+    : Object.entries(hass.states);
+
+  candidates.forEach(([entityId, state]) => {
     // Check if it's a battery sensor
     const isBatterySensor =
       entityId.includes('battery') ||
@@ -1164,6 +1205,8 @@ export function getAlarmStatus(hass, infoTextConfig, alarmEntity) {
  * @param {Function} getApplianceStatus - Optional function to get appliance status
  * @param {Object} openTooLongThresholds - Thresholds for open-too-long alerts
  * @param {string} alarmEntity - Optional alarm control panel entity ID
+ * @param {Object|null} statusSummary - Optional server-side summary; replaces
+ *   enabledEntities, labelIds and entityHasLabel when present
  * @returns {Array} Array of active status objects
  */
 export function getAllStatusItems({
@@ -1176,7 +1219,15 @@ export function getAllStatusItems({
   getApplianceStatus = null,
   openTooLongThresholds = {},
   alarmEntity = null,
+  statusSummary = null,
 }) {
+  if (statusSummary) {
+    // Entities were already resolved by the integration
+    enabledEntities = enabledMapsFromSummary(statusSummary);
+    labelIds = {};
+    entityHasLabel = null;
+  }
+
   const {
     enabledMotionSensors = {},
     enabledGarages = {},
@@ -1234,7 +1285,7 @@ export function getAllStatusItems({
     getCoversStatus(hass, infoTextConfig, enabledCovers, coverOpenTooLongMinutes, coverLabelId, entityHasLabel),
     getTVsStatus(hass, infoTextConfig, enabledTVs, tvLabelId, entityHasLabel),
     ...applianceStatusItems,
-    getBatteryLowStatus(hass, infoTextConfig),
+    getBatteryLowStatus(hass, infoTextConfig, statusSummary?.battery || null),
   ].filter(s => s !== null);
 }
 
@@ -1258,4 +1309,5 @@ export default {
   getAppliancesStatus,
   getAlarmStatus,
   getAllStatusItems,
+  enabledMapsFromSummary,
 };
@@ -2,7 +2,12 @@
  * Status Service Tests
  */
 import { describe, it, expect, vi, beforeEach } from 'vitest';
-import { getWaterLeakStatus, getAlarmStatus } from './status-service.js';
+import {
+  getWaterLeakStatus,
+  getAlarmStatus,
+  getAllStatusItems,
+  enabledMapsFromSummary,
+} from './status-service.js';
 
 // Mock the i18n function — supports 2-arg and 3-arg forms
 vi.mock('../utils/i18n.js', () => ({
@@ -320,3 +325,46 @@ describe('getAlarmStatus', () => {
     });
   });
 });
+
+describe('server-side status summary', () => {
+  const hass = {
+    states: {
+      'binary_sensor.kitchen_leak': {
+        state: 'on',
+        attributes: { friendly_name: 'Kitchen Leak Sensor' },
+        last_changed: '2026-02-05T12:00:00Z',
+      },
+      'binary_sensor.bath_leak': {
+        state: 'on',
+        attributes: { friendly_name: 'Bath Leak Sensor' },
+        last_changed: '2026-02-05T12:00:00Z',
+      },
+    },
+  };
+
+  it('builds enabled maps from the summary ids', () => {
+    const maps = enabledMapsFromSummary({
+      water: { ids: ['binary_sensor.kitchen_leak'], total: 2 },
+    });
+    expect(maps.enabledWaterLeakSensors).toEqual({ 'binary_sensor.kitchen_leak': true });
+    expect(maps.enabledWindows).toEqual({});
+  });
+
+  it('only checks the entities named by the summary', () => {
+    const items = getAllStatusItems({
+      hass,
+      infoTextConfig: { water: { enabled: true } },
+      // Ignored in favour of the summary
+      enabledEntities: {
+        enabledWaterLeakSensors: {
+          'binary_sensor.kitchen_leak': true,
+          'binary_sensor.bath_leak': true,
+        },
+      },
+      statusSummary: { water: { ids: ['binary_sensor.kitchen_leak'], total: 2 } },
+    });
+    expect(items).toHaveLength(1);
+    expect(items[0].badgeText).toBe('Kitchen Leak Sensor');
+    expect(items[0].alertId).toBe('water:binary_sensor.kitchen_leak');
+  });
+});
@@ -90,6 +90,101 @@ export function recordSuggestionAction(ruleId) {
   saveCooldown(ruleId, Date.now());
 }
 
+// ============================================================================
+// Suggestion Presentation
+// ============================================================================
+
+/**
+ * Texts, icons and actions per rule. Shared by the local rules below and
+ * suggestions evaluated by the server (dashview/subscribe_suggestions).
+ */
+const SUGGESTION_BUILDERS = {
+  'lights-left-on': (entityIds) => ({
+    icon: '💡',
+    title: t('smartSuggestions.lightsLeftOn.title'),
+    description: t('smartSuggestions.lightsLeftOn.desc', { count: entityIds.length }),
+    actionText: t('smartSuggestions.lightsLeftOn.action'),
+    actionType: 'service',
+    actionData: {
+      domain: 'light',
+      service: 'turn_off',
+      entityIds,
+    },
+    priority: 50,
+    level: 'info',
+  }),
+  'ac-windows-conflict': () => ({
+    icon: '⚠️',
+    title: t('smartSuggestions.acConflict.title'),
+    description: t('smartSuggestions.acConflict.desc'),
+    actionText: t('smartSuggestions.acConflict.action'),
+    actionType: 'popup',
+    actionData: {
+      popup: 'security',
+      tab: 'windows',
+    },
+    priority: 80,
+    level: 'warning',
+  }),
+  'sunset-lights': () => ({
+    icon: '🌅',
+    title: t('smartSuggestions.sunset.title'),
+    description: t('smartSuggestions.sunset.desc'),
+    actionText: t('smartSuggestions.sunset.action'),
+    actionType: 'popup',
+    actionData: {
+      popup: 'lights',
+    },
+    priority: 30,
+    level: 'info',
+  }),
+};
+
+/**
+ * Build the suggestion shown for an active rule
+ * @param {string} ruleId - Rule identifier
+ * @param {Array<string>} entityIds - Entities that triggered the rule
+ * @returns {Object|null} Suggestion, or null for unknown rules
+ */
+function buildSuggestion(ruleId, entityIds) {
+  const builder = SUGGESTION_BUILDERS[ruleId];
+  if (!builder) return null;
+  return {
+    id: ruleId,
+    ruleId,
+    ...builder(entityIds),
+    dismissable: true,
+  };
+}
+
+/**
+ * Build suggestions from the server's active rules
+ * @param {Array} items - Items of a dashview/subscribe_suggestions event
+ *   ({ rule, entity_ids, priority, level })
+ * @returns {Array} Suggestions sorted by priority (highest first)
+ */
+export function fromServerSuggestions(items) {
+  return (items || [])
+    .map(item => buildSuggestion(item.rule, item.entity_ids || []))
+    .filter(Boolean)
+    .sort((a, b) => b.priority - a.priority);
+}
+
+/**
+ * Filter server-evaluated suggestions for a room
+ * @param {Array} suggestions - Suggestions from fromServerSuggestions()
+ * @param {Object} context - Evaluation context (getAreaIdForEntity)
+ * @param {string} areaId - Area ID to filter suggestions for
+ * @returns {Array} Suggestions for this room, max 2
+ */
+export function filterSuggestionsForRoom(suggestions, context, areaId) {
+  if (!areaId) return [];
+  return (suggestions || [])
+    .map(suggestion => filterSuggestionForRoom(suggestion, null, context, areaId))
+    .filter(Boolean)
+    .slice(0, 2);
+}
+
 // ============================================================================
 // Built-in Rules
 // ============================================================================
@@ -128,22 +223,7 @@ function evaluateLightsLeftOn(hass, context) {
 
   if (lightsOn.length < 2) return null;
 
-  return {
-    id: 'lights-left-on',
-    icon: '💡',
-    title: t('smartSuggestions.lightsLeftOn.title'),
-    description: t('smartSuggestions.lightsLeftOn.desc', { count: lightsOn.length }),
-    actionText: t('smartSuggestions.lightsLeftOn.action'),
-    actionType: 'service',
-    actionData: {
-      domain: 'light',
-      service: 'turn_off',
-      entityIds: lightsOn,
-    },
-    dismissable: true,
-    priority: 50,
-    level: 'info',
-  };
+  return buildSuggestion('lights-left-on', lightsOn);
 }
 
 /**
@@ -184,21 +264,7 @@ function evaluateACWindowsConflict(hass, context) {
 
   if (openWindows.length === 0) return null;
 
-  return {
-    id: 'ac-windows-conflict',
-    icon: '⚠️',
-    title: t('smartSuggestions.acConflict.title'),
-    description: t('smartSuggestions.acConflict.desc'),
-    actionText: t('smartSuggestions.acConflict.action'),
-    actionType: 'popup',
-    actionData: {
-      popup: 'security',
-      tab: 'windows',
-    },
-    dismissable: true,
-    priority: 80,
-    level: 'warning',
-  };
+  return buildSuggestion('ac-windows-conflict', openWindows);
 }
 
 /**
@@ -236,20 +302,7 @@ function evaluateSunsetLights(hass, context) {
   // If some lights are already on, no suggestion needed
   if (lightsOn.length > 0) return null;
 
-  return {
-    id: 'sunset-lights',
-    icon: '🌅',
-    title: t('smartSuggestions.sunset.title'),
-    description: t('smartSuggestions.sunset.desc'),
-    actionText: t('smartSuggestions.sunset.action'),
-    actionType: 'popup',
-    actionData: {
-      popup: 'lights',
-    },
-    dismissable: true,
-    priority: 30,
-    level: 'info',
-  };
+  return buildSuggestion('sunset-lights', []);
 }
 
 // ============================================================================
@@ -28,6 +28,7 @@ beforeEach(() => {
 
 describe('suggestion-engine', () => {
   let evaluateSuggestions, dismissSuggestion, recordSuggestionAction;
+  let fromServerSuggestions, filterSuggestionsForRoom;
 
   beforeEach(async () => {
     vi.resetModules();
@@ -35,6 +36,8 @@ describe('suggestion-engine', () => {
     evaluateSuggestions = mod.evaluateSuggestions;
     dismissSuggestion = mod.dismissSuggestion;
     recordSuggestionAction = mod.recordSuggestionAction;
+    fromServerSuggestions = mod.fromServerSuggestions;
+    filterSuggestionsForRoom = mod.filterSuggestionsForRoom;
   });
 
   // ── Helper: build a mock hass object ──
@@ -220,4 +223,39 @@ describe('suggestion-engine', () => {
       expect(typeof stored['test_rule']).toBe('number');
     });
   });
+
+  describe('fromServerSuggestions()', () => {
+    it('builds suggestions from server rules, highest priority first', () => {
+      const result = fromServerSuggestions([
+        { rule: 'lights-left-on', entity_ids: ['light.a', 'light.b'], priority: 50, level: 'info' },
+        { rule: 'ac-windows-conflict', entity_ids: ['binary_sensor.w'], priority: 80, level: 'warning' },
+      ]);
+
+      expect(result.map(s => s.id)).toEqual(['ac-windows-conflict', 'lights-left-on']);
+      expect(result[1].actionData.entityIds).toEqual(['light.a', 'light.b']);
+      expect(result[1].description).toContain('"count":2');
+      expect(result[0].ruleId).toBe('ac-windows-conflict');
+    });
+
+    it('ignores unknown rules', () => {
+      expect(fromServerSuggestions([{ rule: 'unknown', entity_ids: [] }])).toEqual([]);
+      expect(fromServerSuggestions(undefined)).toEqual([]);
+    });
+  });
+
+  describe('filterSuggestionsForRoom()', () => {
+    it('keeps only the room\'s entities and the rule id', () => {
+      const suggestions = fromServerSuggestions([
+        { rule: 'lights-left-on', entity_ids: ['light.a', 'light.b'] },
+      ]);
+      const context = { getAreaIdForEntity: (id) => (id === 'light.a' ? 'kitchen' : 'bath') };
+
+      const result = filterSuggestionsForRoom(suggestions, context, 'kitchen');
+
+      expect(result).toHaveLength(1);
+      expect(result[0].id).toBe('lights-left-on-kitchen');
+      expect(result[0].ruleId).toBe('lights-left-on');
+      expect(result[0].actionData.entityIds).toEqual(['light.a']);
+    });
+  });
 });
@@ -39,9 +39,11 @@ export const DWD_WARNING_ICONS = {
  * Get weather entity data
  * @param {Object} hass - Home Assistant instance
  * @param {string} weatherEntity - Configured weather entity ID
+ * @param {Array<string>} [weatherIds] - Weather entity IDs indexed by the
+ *   integration (dashview/subscribe_discovery); avoids scanning hass.states
  * @returns {Object|null} Weather data object or null
  */
-export function getWeather(hass, weatherEntity) {
+export function getWeather(hass, weatherEntity, weatherIds) {
   if (!hass) return null;
 
   // First try the configured entity
@@ -80,9 +82,9 @@ export function getWeather(hass, weatherEntity) {
   }
 
   // Try any weather entity
-  const anyWeather = Object.values(hass.states).find((e) =>
-    e.entity_id.startsWith("weather.")
-  );
+  const anyWeather = weatherIds
+    ? weatherIds.map((id) => hass.states[id]).find(Boolean)
+    : Object.values(hass.states).find((e) => e.entity_id.startsWith("weather."));
   if (anyWeather) {
     return {
       entityId: anyWeather.entity_id,
@@ -308,14 +310,16 @@ export function getDwdWarnings(hass, dwdWarningEntity) {
 /**
  * Get person data (first person entity found)
  * @param {Object} hass - Home Assistant instance
+ * @param {Array<string>} [personIds] - Person entity IDs indexed by the
+ *   integration (dashview/subscribe_discovery); avoids scanning hass.states
  * @returns {Object|null} Person data or null
  */
-export function getPerson(hass) {
+export function getPerson(hass, personIds) {
   if (!hass) return null;
 
-  const person = Object.values(hass.states).find((e) =>
-    e.entity_id.startsWith("person.")
-  );
+  const person = personIds
+    ? personIds.map((id) => hass.states[id]).find(Boolean)
+    : Object.values(hass.states).find((e) => e.entity_id.startsWith("person."));
 
   if (person) {
     return {
@@ -8,7 +8,8 @@
 
 import { THRESHOLDS, debugLog } from '../constants/index.js';
 import { validateSettings, validateSettingsUpdate } from '../utils/schema-validator.js';
-import { calculateDelta } from '../utils/settings-diff.js';
+import { applyDelta, calculateDelta } from '../utils/settings-diff.js';
+import { ENTITY_TABLE_KEY, decodeSettings, encodeSettings } from '../utils/settings-codec.js';
 import { hapticWarning } from '../utils/haptic.js';
 
 /**
@@ -296,6 +297,8 @@ export class SettingsStore {
     // Delta save support (Story 10.1)
     /** @type {Object|null} */
     this._previousSettings = null;  // Snapshot for delta calculation
+    /** @type {boolean} */
+    this._compact = false;  // Backend accepts compact enabled* maps
     /** @type {number} */
     this._settingsVersion = 0;  // Server version timestamp for conflict detection
   }
@@ -448,7 +451,7 @@ export class SettingsStore {
    */
   async _doLoad() {
     try {
-      const result = await this._hass.callWS({ type: 'dashview/get_settings' });
+      const result = await this._fetchSettings();
 
       // Validate loaded settings against schema
       const { settings: validatedSettings, warnings } = validateSettings(result);
@@ -494,6 +497,24 @@ export class SettingsStore {
     }
   }
 
+  /**
+   * Fetch settings, in compact form if the backend supports it
+   * @private
+   * @returns {Promise<Object>} Settings with plain enabled* maps
+   */
+  async _fetchSettings() {
+    let result;
+    try {
+      result = await this._hass.callWS({ type: 'dashview/get_settings', compact: true });
+    } catch (e) {
+      // Older backends reject the compact flag
+      if (e?.code !== 'invalid_format') throw e;
+      result = await this._hass.callWS({ type: 'dashview/get_settings' });
+    }
+    this._compact = Array.isArray(result?.[ENTITY_TABLE_KEY]);
+    return decodeSettings(result);
+  }
+
   /**
    * Check if a save operation is in progress
    * @returns {boolean}
@@ -541,16 +562,17 @@ export class SettingsStore {
     try {
       // Try delta save if we have previous settings snapshot (Story 10.1 AC4)
       if (this._previousSettings !== null) {
-        const delta = calculateDelta(this._previousSettings, settingsToSave);
+        const ops = [];
+        const delta = calculateDelta(this._previousSettings, settingsToSave, ops);
 
         // If delta is null (shouldn't happen if _previousSettings exists) or empty, nothing to save
         if (delta === null) {
           debugLog('settings', 'Delta calculation failed, using full save');
           await this._doFullSave(settingsToSave);
-        } else if (Object.keys(delta).length === 0) {
+        } else if (Object.keys(delta).length === 0 && ops.length === 0) {
           debugLog('settings', 'No changes detected, skipping save');
         } else {
-          await this._doSaveDelta(delta, settingsToSave);
+          await this._doSaveDelta(delta, settingsToSave, ops);
         }
       } else {
         // No previous settings - use full save (first save, Story 10.1 AC4)
@@ -579,13 +601,14 @@ export class SettingsStore {
    * @private
    * @param {Object} delta - Delta changes object
    * @param {Object} settingsToSave - Settings snapshot to update _previousSettings with on success
+   * @param {Array} [ops] - Array operations (see calculateArrayOps)
    * @returns {Promise<void>}
    */
-  async _doSaveDelta(delta, settingsToSave) {
+  async _doSaveDelta(delta, settingsToSave, ops = []) {
     // Log payload size in dev mode (Story 10.1 AC3)
     if (import.meta.env?.DEV) {
       const fullSize = JSON.stringify(settingsToSave).length;
-      const deltaSize = JSON.stringify(delta).length;
+      const deltaSize = JSON.stringify(delta).length + JSON.stringify(ops).length;
       const reduction = ((1 - deltaSize / fullSize) * 100).toFixed(1);
       debugLog('settings', `Delta save: ${deltaSize} bytes (${reduction}% reduction from ${fullSize} bytes)`);
     }
@@ -593,19 +616,22 @@ export class SettingsStore {
     try {
       const result = await this._hass.callWS({
         type: 'dashview/save_settings_delta',
-        changes: delta,
+        changes: this._compact ? encodeSettings(delta) : delta,
+        ...(ops.length > 0 ? { ops } : {}),
         version: this._settingsVersion,
       });
 
-      // Update version from server response
-      if (result.version) {
+      // Update version from server response. A rebased delta was applied on
+      // top of other sessions' changes this store has not seen, so keep the
+      // old version: the next non-commuting delta then reports the conflict.
+      if (result.version && !result.rebased) {
         this._settingsVersion = result.version;
       }
 
       // Update snapshot for next delta calculation (use the snapshot we saved, not current _settings)
       this._previousSettings = settingsToSave;
 
-      debugLog('settings', `Delta saved: ${Object.keys(delta).length} changes`);
+      debugLog('settings', `Delta saved: ${Object.keys(delta).length} changes, ${ops.length} array ops`);
     } catch (e) {
       // Handle version conflict (Story 10.1 AC5)
       if (e.code === 'version_conflict') {
@@ -627,11 +653,16 @@ export class SettingsStore {
    */
   async _doFullSave(settingsToSave) {
     const settings = settingsToSave || this._settings;
-    await this._hass.callWS({
+    const result = await this._hass.callWS({
       type: 'dashview/save_settings',
-      settings: settings,
+      settings: this._compact ? encodeSettings(settings) : settings,
     });
 
+    // Backends with the settings writer return the new version
+    if (result?.version) {
+      this._settingsVersion = result.version;
+    }
+
     // Update snapshot for future delta saves (use the snapshot we saved, not current _settings)
     this._previousSettings = structuredClone(settings);
     debugLog('settings', 'Full settings saved to HA');
@@ -680,16 +711,17 @@ export class SettingsStore {
     try {
       // Use delta save logic (same as _doSave but returns result)
       if (this._previousSettings !== null) {
-        const delta = calculateDelta(this._previousSettings, settingsToSave);
+        const ops = [];
+        const delta = calculateDelta(this._previousSettings, settingsToSave, ops);
 
-        if (delta === null || Object.keys(delta).length === 0) {
+        if (delta === null || (Object.keys(delta).length === 0 && ops.length === 0)) {
           // No changes or delta failed - skip or use full save
           if (delta === null) {
             await this._doFullSave(settingsToSave);
           }
           // If empty delta, nothing to save
         } else {
-          await this._doSaveDelta(delta, settingsToSave);
+          await this._doSaveDelta(delta, settingsToSave, ops);
         }
       } else {
         // No previous settings - use full save
@@ -716,6 +748,115 @@ export class SettingsStore {
     }
   }
 
+  /**
+   * Undo the newest settings change on the server (dashview/undo)
+   * Pending local changes are saved first, so they can be undone too
+   * @returns {Promise<LoadResult>}
+   */
+  undo() {
+    return this._applyHistory('dashview/undo');
+  }
+
+  /**
+   * Redo the newest undone settings change on the server (dashview/redo)
+   * @returns {Promise<LoadResult>}
+   */
+  redo() {
+    return this._applyHistory('dashview/redo');
+  }
+
+  /**
+   * Apply the changes returned by dashview/undo or dashview/redo locally
+   * @private
+   * @param {string} type - WebSocket command type
+   * @returns {Promise<LoadResult>}
+   */
+  async _applyHistory(type) {
+    if (!this._hass) {
+      return { success: false, error: 'No Home Assistant instance' };
+    }
+    const saved = await this.saveNow();
+    if (!saved.success) return saved;
+
+    try {
+      const result = await this._hass.callWS({ type });
+      const settings = applyDelta(this._settings, result.changes);
+      // Maps keyed by entity ID (enabled*) change per entity
+      const entries = result.entries || {};
+      for (const [path, values] of Object.entries(entries)) {
+        let map = settings;
+        for (const part of path.split('.')) {
+          if (typeof map[part] !== 'object' || map[part] === null) map[part] = {};
+          map = map[part];
+        }
+        for (const [entityId, value] of Object.entries(values)) {
+          if (value === null) {
+            delete map[entityId];
+          } else {
+            map[entityId] = value;
+          }
+        }
+      }
+      const keys = new Set(
+        [...Object.keys(result.changes), ...Object.keys(entries)].map(path => path.split('.')[0])
+      );
+      for (const key of keys) {
+        // Keys removed by the server fall back to their defaults
+        if (!(key in settings) && key in DEFAULT_SETTINGS) {
+          settings[key] = structuredClone(DEFAULT_SETTINGS[key]);
+        }
+      }
+      this._settings = settings;
+      this._previousSettings = structuredClone(settings);
+      this._settingsVersion = result.version || this._settingsVersion;
+      keys.forEach(key => this._notifyListeners(key, this._settings[key]));
+      this._notifyListeners('_history', { canUndo: result.can_undo, canRedo: result.can_redo });
+      return { success: true };
+    } catch (e) {
+      // not_found: nothing to undo or redo
+      return { success: false, error: e.message || `Failed to run ${type}` };
+    }
+  }
+
+  /**
+   * Save preferences for the current user only (dashview/save_user_settings)
+   * Changes use the delta format and are applied on top of the shared
+   * settings for this user; reset paths fall back to the shared settings
+   * @param {Object} changes - Dot-notation paths to values (null removes)
+   * @param {string[]} [reset] - Overlay paths to drop
+   * @returns {Promise<LoadResult>}
+   */
+  async saveUserSettings(changes, reset = []) {
+    if (!this._hass) {
+      return { success: false, error: 'No Home Assistant instance' };
+    }
+    const saved = await this.saveNow();
+    if (!saved.success) return saved;
+
+    try {
+      await this._hass.callWS({
+        type: 'dashview/save_user_settings',
+        changes: this._compact ? encodeSettings(changes) : changes,
+        ...(reset.length > 0 ? { reset } : {}),
+      });
+    } catch (e) {
+      return { success: false, error: e.message || 'Failed to save user settings' };
+    }
+
+    if (reset.length > 0) {
+      // The shared values of reset paths are only known to the server
+      this._loaded = false;
+      return this.load();
+    }
+    // Apply to the delta snapshot too, so the next delta save does not send
+    // them (the backend keeps overlay paths out of the shared settings)
+    this._settings = applyDelta(this._settings, changes);
+    this._previousSettings = applyDelta(this._previousSettings, changes);
+    const keys = new Set(Object.keys(changes).map(path => path.split('.')[0]));
+    keys.forEach(key => this._notifyListeners(key, this._settings[key]));
+    return { success: true };
+  }
+
   /**
    * Subscribe to setting changes
    * @param {Function} listener - Callback function (key, value) => void
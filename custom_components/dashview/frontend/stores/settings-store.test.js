@@ -226,7 +226,7 @@ describe('SettingsStore', () => {
     it('should call WebSocket with correct type', async () => {
       store.setHass(mockHass);
       await store.load();
-      expect(mockHass.callWS).toHaveBeenCalledWith({ type: 'dashview/get_settings' });
+      expect(mockHass.callWS).toHaveBeenCalledWith({ type: 'dashview/get_settings', compact: true });
     });
 
     it('should set loaded = true after successful load', async () => {
@@ -337,6 +337,38 @@ describe('SettingsStore', () => {
       expect(labels.light).toBe('custom_label_id'); // From loaded data
       expect(labels.cover).toBe(null); // From defaults
     });
+    it('should decode compact enabled maps and save compactly', async () => {
+      const hassCompact = createMockHass({
+        callWS: vi.fn().mockResolvedValue({
+          _entityTable: ['light.desk', 'light.kitchen'],
+          enabledLights: { on: [1], off: [0] },
+        })
+      });
+      store.setHass(hassCompact);
+      await store.load();
+
+      expect(store.get('enabledLights')).toEqual({ 'light.desk': false, 'light.kitchen': true });
+
+      await store._doFullSave(store.all);
+      const saved = hassCompact.callWS.mock.calls[1][0].settings;
+      expect(saved._entityTable).toEqual(['light.desk', 'light.kitchen']);
+      expect(saved.enabledLights).toEqual({ on: [1], off: [0] });
+    });
+
+    it('should retry without the compact flag on older backends', async () => {
+      const hassOld = createMockHass({
+        callWS: vi.fn()
+          .mockRejectedValueOnce({ code: 'invalid_format', message: 'extra keys not allowed' })
+          .mockResolvedValueOnce({ enabledLights: { 'light.desk': true } })
+      });
+      store.setHass(hassOld);
+      const result = await store.load();
+
+      expect(result.success).toBe(true);
+      expect(hassOld.callWS).toHaveBeenLastCalledWith({ type: 'dashview/get_settings' });
+      expect(store.get('enabledLights')).toEqual({ 'light.desk': true });
+      expect(store._compact).toBe(false);
+    });
   });
 
   describe('save()', () => {
@@ -1532,6 +1564,28 @@ describe('SettingsStore', () => {
       expect(store._settingsVersion).toBe(2000);
     });
 
+    it('should keep its version after a rebased delta save', async () => {
+      const rebasedHass = createMockHass({
+        callWS: vi.fn().mockImplementation(async (request) => {
+          if (request.type === 'dashview/get_settings') {
+            return { _version: 1000 };
+          }
+          if (request.type === 'dashview/save_settings_delta') {
+            return { success: true, version: 2000, rebased: true };
+          }
+          return {};
+        })
+      });
+      store.setHass(rebasedHass);
+
+      await store.load();
+      store.set('weatherEntity', 'weather.test');
+      vi.advanceTimersByTime(500);
+      await vi.runAllTimersAsync();
+
+      expect(store._settingsVersion).toBe(1000);
+    });
+
     it('should snapshot settings after load for delta calculation', async () => {
       await store.load();
 
@@ -1755,4 +1809,152 @@ describe('SettingsStore', () => {
       expect(store.lastError).toBe('Full save also failed');
     });
   });
+
+  describe('undo() / redo()', () => {
+    it('should apply the changes returned by the server', async () => {
+      const historyHass = createMockHass({
+        callWS: vi.fn().mockImplementation(async (request) => {
+          if (request.type === 'dashview/get_settings') {
+            return { weatherEntity: 'weather.new', _version: 1 };
+          }
+          if (request.type === 'dashview/undo') {
+            return {
+              changes: { weatherEntity: 'weather.old' },
+              version: 2,
+              can_undo: false,
+              can_redo: true,
+            };
+          }
+          return { success: true };
+        })
+      });
+      store.setHass(historyHass);
+      await store.load();
+      const listener = vi.fn();
+      store.subscribe(listener);
+
+      const result = await store.undo();
+
+      expect(result.success).toBe(true);
+      expect(store.get('weatherEntity')).toBe('weather.old');
+      expect(store._settingsVersion).toBe(2);
+      expect(listener).toHaveBeenCalledWith('weatherEntity', 'weather.old');
+      expect(listener).toHaveBeenCalledWith('_history', { canUndo: false, canRedo: true });
+    });
+
+    it('should restore defaults for keys removed by the server', async () => {
+      const historyHass = createMockHass({
+        callWS: vi.fn().mockImplementation(async (request) => {
+          if (request.type === 'dashview/redo') {
+            return { changes: { floorOrder: null }, version: 3 };
+          }
+          return {};
+        })
+      });
+      store.setHass(historyHass);
+      await store.load();
+      store.set('floorOrder', ['ground'], false);
+      store._previousSettings = structuredClone(store.all);
+
+      await store.redo();
+
+      expect(store.get('floorOrder')).toEqual(DEFAULT_SETTINGS.floorOrder);
+    });
+
+    it('should apply per-entity entries of entity ID maps', async () => {
+      const historyHass = createMockHass({
+        callWS: vi.fn().mockImplementation(async (request) => {
+          if (request.type === 'dashview/get_settings') {
+            return {
+              enabledLights: { 'light.a': false, 'light.b': true, 'light.c': false },
+              _version: 1,
+            };
+          }
+          if (request.type === 'dashview/undo') {
+            return {
+              changes: {},
+              entries: { enabledLights: { 'light.a': true, 'light.c': null } },
+              version: 2,
+            };
+          }
+          return {};
+        })
+      });
+      store.setHass(historyHass);
+      await store.load();
+      const listener = vi.fn();
+      store.subscribe(listener);
+
+      await store.undo();
+
+      expect(store.get('enabledLights')).toEqual({ 'light.a': true, 'light.b': true });
+      expect(listener).toHaveBeenCalledWith('enabledLights', { 'light.a': true, 'light.b': true });
+    });
+
+    it('should report when there is nothing to undo', async () => {
+      const historyHass = createMockHass({
+        callWS: vi.fn().mockImplementation(async (request) => {
+          if (request.type === 'dashview/undo') {
+            throw { code: 'not_found', message: 'Nothing to undo' };
+          }
+          return {};
+        })
+      });
+      store.setHass(historyHass);
+      await store.load();
+
+      expect(await store.undo()).toEqual({ success: false, error: 'Nothing to undo' });
+    });
+  });
+
+  describe('saveUserSettings()', () => {
+    it('should send the overlay changes and apply them locally', async () => {
+      store.setHass(mockHass);
+      await store.load();
+
+      const result = await store.saveUserSettings({ weatherEntity: 'weather.mine' });
+
+      expect(result.success).toBe(true);
+      expect(mockHass.callWS).toHaveBeenCalledWith({
+        type: 'dashview/save_user_settings',
+        changes: { weatherEntity: 'weather.mine' },
+      });
+      expect(store.get('weatherEntity')).toBe('weather.mine');
+      // Not sent to the shared settings by the next delta save
+      expect(store._previousSettings.weatherEntity).toBe('weather.mine');
+    });
+
+    it('should reload the settings after resetting paths', async () => {
+      store.setHass(mockHass);
+      await store.load();
+
+      await store.saveUserSettings({}, ['weatherEntity']);
+
+      expect(mockHass.callWS).toHaveBeenCalledWith({
+        type: 'dashview/save_user_settings',
+        changes: {},
+        reset: ['weatherEntity'],
+      });
+      expect(mockHass.callWS).toHaveBeenLastCalledWith({ type: 'dashview/get_settings', compact: true });
+    });
+  });
+
+  describe('full save versions', () => {
+    it('should take the version returned by the backend', async () => {
+      const versionHass = createMockHass({
+        callWS: vi.fn().mockImplementation(async (request) => {
+          if (request.type === 'dashview/save_settings') {
+            return { success: true, version: 42 };
+          }
+          return { _version: 41 };
+        })
+      });
+      store.setHass(versionHass);
+      await store.load();
+
+      await store._doFullSave(store.all);
+
+      expect(store._settingsVersion).toBe(42);
+    });
+  });
 });
@@ -127,3 +127,9 @@ export {
   applyDelta
 } from './settings-diff.js';
 
+// Settings codec (compact enabled* maps)
+export {
+  encodeSettings,
+  decodeSettings
+} from './settings-codec.js';
+
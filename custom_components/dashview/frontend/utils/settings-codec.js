@@ -0,0 +1,99 @@
+/**
+ * Settings Codec
+ * Compact wire form of the enabled* settings maps (mirrors storage.py)
+ *
+ * The entity IDs of all enabled* maps are interned once in a sorted table
+ * and each map lists the indexes of its enabled and disabled entities:
+ *
+ *   { _entityTable: ['light.a', 'light.b'], enabledLights: { on: [0], off: [1] } }
+ */
+
+export const ENTITY_TABLE_KEY = '_entityTable';
+
+const ENABLED_PREFIX = 'enabled';
+
+function isPlainObject(value) {
+  return typeof value === 'object' && value !== null && !Array.isArray(value);
+}
+
+/**
+ * Check whether a settings entry is a plain { entityId: boolean } enabled* map
+ * @param {string} key - Settings key
+ * @param {*} value - Settings value
+ * @returns {boolean}
+ */
+export function isEnabledMap(key, value) {
+  return key.startsWith(ENABLED_PREFIX)
+    && isPlainObject(value)
+    && Object.values(value).every(enabled => typeof enabled === 'boolean');
+}
+
+function isEncodedMap(key, value) {
+  if (!key.startsWith(ENABLED_PREFIX) || !isPlainObject(value)) return false;
+  const keys = Object.keys(value);
+  return keys.length === 2
+    && Array.isArray(value.on)
+    && Array.isArray(value.off);
+}
+
+/**
+ * Return settings with the enabled* maps in compact form.
+ * Other entries are kept as they are; the entity table is always added.
+ * @param {Object} settings - Settings or settings delta
+ * @returns {Object} Encoded settings
+ */
+export function encodeSettings(settings) {
+  const maps = Object.keys(settings).filter(key => isEnabledMap(key, settings[key]));
+  const ids = new Set();
+  for (const key of maps) {
+    for (const entityId of Object.keys(settings[key])) ids.add(entityId);
+  }
+  // Sort by code point like Python's sorted() so both sides build the same table
+  const table = [...ids].sort((a, b) => (a < b ? -1 : a > b ? 1 : 0));
+  const index = new Map(table.map((entityId, i) => [entityId, i]));
+
+  const result = { ...settings };
+  for (const key of maps) {
+    const on = [];
+    const off = [];
+    for (const [entityId, enabled] of Object.entries(settings[key])) {
+      (enabled ? on : off).push(index.get(entityId));
+    }
+    result[key] = { on: on.sort((a, b) => a - b), off: off.sort((a, b) => a - b) };
+  }
+  result[ENTITY_TABLE_KEY] = table;
+  return result;
+}
+
+/**
+ * Return settings with compact enabled* maps expanded.
+ * Settings without an entity table are returned unchanged.
+ * @param {Object} data - Settings as received from the backend
+ * @returns {Object} Settings with plain enabled* maps
+ * @throws {Error} If a map references an index outside the table
+ */
+export function decodeSettings(data) {
+  const table = data?.[ENTITY_TABLE_KEY];
+  if (table === undefined) return data;
+  if (!Array.isArray(table)) throw new Error(`Invalid ${ENTITY_TABLE_KEY}`);
+
+  const result = {};
+  for (const [key, value] of Object.entries(data)) {
+    if (key === ENTITY_TABLE_KEY) continue;
+    if (!isEncodedMap(key, value)) {
+      result[key] = value;
+      continue;
+    }
+    const expanded = {};
+    for (const [state, enabled] of [['on', true], ['off', false]]) {
+      for (const i of value[state]) {
+        if (!Number.isInteger(i) || i < 0 || i >= table.length) {
+          throw new Error(`Invalid entity index in ${key}: ${i}`);
+        }
+        expanded[table[i]] = enabled;
+      }
+    }
+    result[key] = expanded;
+  }
+  return result;
+}
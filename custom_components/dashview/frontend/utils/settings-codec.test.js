@@ -0,0 +1,53 @@
+/**
+ * Settings Codec Tests
+ * Tests for the compact enabled* map encoding
+ */
+
+import { encodeSettings, decodeSettings } from './settings-codec.js';
+
+describe('encodeSettings', () => {
+  it('interns entity IDs shared by several maps', () => {
+    const encoded = encodeSettings({
+      enabledLights: { 'light.kitchen': true, 'light.desk': false },
+      enabledMotionSensors: { 'light.kitchen': true },
+      weatherEntity: 'weather.home',
+    });
+
+    expect(encoded).toEqual({
+      _entityTable: ['light.desk', 'light.kitchen'],
+      enabledLights: { on: [1], off: [0] },
+      enabledMotionSensors: { on: [1], off: [] },
+      weatherEntity: 'weather.home',
+    });
+  });
+
+  it('keeps enabled maps with non-boolean values', () => {
+    const appliances = { 'sensor.washer': { enabled: true } };
+    const encoded = encodeSettings({ enabledAppliances: appliances });
+    expect(encoded.enabledAppliances).toBe(appliances);
+    expect(encoded._entityTable).toEqual([]);
+  });
+});
+
+describe('decodeSettings', () => {
+  it('round-trips encoded settings', () => {
+    const settings = {
+      enabledLights: { 'light.kitchen': true, 'light.desk': false },
+      enabledRooms: {},
+      floorOrder: ['ground', 'first'],
+    };
+    expect(decodeSettings(encodeSettings(settings))).toEqual(settings);
+  });
+
+  it('returns plain settings unchanged', () => {
+    const settings = { enabledLights: { 'light.desk': true } };
+    expect(decodeSettings(settings)).toBe(settings);
+  });
+
+  it('rejects indexes outside the table', () => {
+    expect(() => decodeSettings({
+      _entityTable: ['light.desk'],
+      enabledLights: { on: [1], off: [] },
+    })).toThrow('Invalid entity index');
+  });
+});
@@ -7,11 +7,16 @@
  * Calculate the delta between old and new settings
  * Returns an object with changed paths using dot notation for nested values
  *
+ * When an `ops` array is passed, changed arrays whose items have stable IDs
+ * are expressed as array operations pushed onto it (see calculateArrayOps)
+ * instead of being replaced, if that is smaller.
+ *
  * @param {Object|null|undefined} oldSettings - Previous settings state
  * @param {Object} newSettings - New settings state
+ * @param {Array} [ops] - Receives array operations for save_settings_delta
  * @returns {Object|null} Delta object with changed paths, or null if full save needed
  */
-export function calculateDelta(oldSettings, newSettings) {
+export function calculateDelta(oldSettings, newSettings, ops = null) {
   // If no previous settings, full save is needed
   if (oldSettings == null) {
     return null;
@@ -48,10 +53,18 @@ export function calculateDelta(oldSettings, newSettings) {
         continue;
       }
 
-      // Handle arrays - compare by JSON string, replace entirely if different
+      // Handle arrays - compare by JSON string; send array operations if
+      // requested and smaller, else replace entirely if different
       if (Array.isArray(newVal)) {
         if (!Array.isArray(oldVal) || JSON.stringify(oldVal) !== JSON.stringify(newVal)) {
-          changes[fullPath] = newVal;
+          const arrayOps = ops && Array.isArray(oldVal)
+            ? calculateArrayOps(oldVal, newVal, fullPath)
+            : null;
+          if (arrayOps && JSON.stringify(arrayOps).length < JSON.stringify(newVal).length) {
+            ops.push(...arrayOps);
+          } else {
+            changes[fullPath] = newVal;
+          }
         }
         continue;
       }
@@ -144,3 +157,70 @@ export function applyDelta(base, delta) {
 
   return result;
 }
+
+/**
+ * Stable ID of an array item: the item itself, or an object's `id`
+ * (mirrors _item_id in websocket.py)
+ * @param {*} item - Array item
+ * @returns {*} ID, or undefined if the item has none
+ */
+function itemId(item) {
+  if (item !== null && typeof item === 'object') {
+    return Array.isArray(item) ? undefined : item.id;
+  }
+  return item;
+}
+
+/**
+ * Express the change from one array to another as ID-addressed operations
+ * for save_settings_delta: remove, insert/move before an item ID (or at the
+ * end), and replace for changed objects. Such operations merge cleanly
+ * with concurrent edits on the server.
+ *
+ * @param {Array} oldArr - Previous array
+ * @param {Array} newArr - New array
+ * @param {string} path - Dot-notation path of the array
+ * @returns {Array|null} Operations, or null if items lack unique stable IDs
+ */
+export function calculateArrayOps(oldArr, newArr, path) {
+  const oldIds = oldArr.map(itemId);
+  const newIds = newArr.map(itemId);
+  const unique = (ids) => ids.every(id => id !== undefined && id !== null)
+    && new Set(ids).size === ids.length;
+  if (!unique(oldIds) || !unique(newIds)) return null;
+
+  const ops = [];
+  const newIdSet = new Set(newIds);
+  const work = [];
+  oldArr.forEach((item, i) => {
+    if (newIdSet.has(oldIds[i])) {
+      work.push(item);
+    } else {
+      ops.push({ op: 'remove', path, id: oldIds[i] });
+    }
+  });
+
+  newArr.forEach((item, i) => {
+    const id = newIds[i];
+    const current = work.findIndex(existing => itemId(existing) === id);
+    if (current !== i) {
+      // Position relative to the item now at i (or the end)
+      const before = i < work.length ? itemId(work[i]) : undefined;
+      const target = before === undefined ? {} : { before };
+      if (current === -1) {
+        ops.push({ op: 'insert', path, value: item, ...target });
+        work.splice(i, 0, item);
+        return;
+      }
+      ops.push({ op: 'move', path, id, ...target });
+      const [moved] = work.splice(current, 1);
+      work.splice(i, 0, moved);
+    }
+    if (JSON.stringify(work[i]) !== JSON.stringify(item)) {
+      ops.push({ op: 'replace', path, id, value: item });
+      work[i] = item;
+    }
+  });
+
+  return ops;
+}
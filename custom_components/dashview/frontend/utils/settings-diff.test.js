@@ -3,7 +3,7 @@
  * Tests for delta calculation utility
  */
 
-import { calculateDelta, applyDelta } from './settings-diff.js';
+import { calculateDelta, applyDelta, calculateArrayOps } from './settings-diff.js';
 
 describe('calculateDelta', () => {
   describe('primitive value changes', () => {
@@ -296,3 +296,49 @@ describe('applyDelta', () => {
     });
   });
 });
+
+describe('calculateArrayOps', () => {
+  it('expresses a reorder as one move before an item ID', () => {
+    expect(calculateArrayOps(['a', 'b', 'c'], ['c', 'a', 'b'], 'floorOrder')).toEqual([
+      { op: 'move', path: 'floorOrder', id: 'c', before: 'a' },
+    ]);
+  });
+
+  it('removes, inserts at the end and replaces changed objects by id', () => {
+    const oldArr = [{ id: 'x', name: 'X' }, { id: 'y', name: 'Y' }];
+    const newArr = [{ id: 'y', name: 'Y2' }, { id: 'z', name: 'Z' }];
+    expect(calculateArrayOps(oldArr, newArr, 'items')).toEqual([
+      { op: 'remove', path: 'items', id: 'x' },
+      { op: 'replace', path: 'items', id: 'y', value: { id: 'y', name: 'Y2' } },
+      { op: 'insert', path: 'items', value: { id: 'z', name: 'Z' } },
+    ]);
+  });
+
+  it('returns null without unique stable IDs', () => {
+    expect(calculateArrayOps(['a', 'a'], ['a'], 'list')).toBeNull();
+    expect(calculateArrayOps([{ name: 'x' }], [], 'presets')).toBeNull();
+  });
+});
+
+describe('calculateDelta with array operations', () => {
+  const rooms = Array.from({ length: 20 }, (_, i) => `area_number_${i}`);
+
+  it('sends a reorder of a long array as operations', () => {
+    const reordered = [rooms[19], ...rooms.slice(0, 19)];
+    const ops = [];
+    const delta = calculateDelta({ roomOrder: { ground: rooms } }, { roomOrder: { ground: reordered } }, ops);
+
+    expect(delta).toEqual({});
+    expect(ops).toEqual([
+      { op: 'move', path: 'roomOrder.ground', id: 'area_number_19', before: 'area_number_0' },
+    ]);
+  });
+
+  it('replaces arrays when operations would be larger', () => {
+    const ops = [];
+    const delta = calculateDelta({ floorOrder: ['a', 'b'] }, { floorOrder: ['b', 'a', 'c'] }, ops);
+
+    expect(delta).toEqual({ floorOrder: ['b', 'a', 'c'] });
+    expect(ops).toEqual([]);
+  });
+});
@@ -0,0 +1,334 @@
+"""Dashview - Batched, downsampled numeric history.
+
+Backs the dashview/history_summary command. One recorder query fetches the
+state history of several entities; every numeric series is then reduced to
+at most N points server-side so the browser only receives what a chart can
+draw. Results use a compact columnar layout:
+
+    {"sensor.x": {"t": [epoch seconds, ...], "v": [values, ...]}}
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Iterable
+
+from homeassistant.core import HomeAssistant
+
+from .recent_values import RecentValuesCache, parse_numeric
+
+_LOGGER = logging.getLogger(__name__)
+
+# Downsampling methods
+METHOD_LTTB = "lttb"
+METHOD_MINMAX = "minmax"
+METHODS = (METHOD_LTTB, METHOD_MINMAX)
+
+# Request limits
+DEFAULT_POINTS = 200
+MAX_POINTS = 1000
+MAX_ENTITIES = 20
+MAX_RANGE_HOURS = 24 * 7
+
+# States that carry no numeric value
+_NON_NUMERIC_STATES = {"unavailable", "unknown", "", None}
+
+
+def row_state(row: Any) -> tuple[Any, float] | None:
+    """Return (state, last_updated epoch seconds) of a recorder history row.
+
+    Accepts State objects as well as the compressed ("s"/"lu") and minimal
+    ("state"/"last_changed") dict formats the recorder returns.
+
+    Returns:
+        None if the row carries no timestamp
+    """
+    if not isinstance(row, dict):
+        return row.state, row.last_updated.timestamp()
+    raw = row.get("s", row.get("state"))
+    timestamp = row.get("lu", row.get("lc"))
+    if timestamp is None:
+        changed = row.get("last_updated") or row.get("last_changed")
+        if changed is None:
+            return None
+        if isinstance(changed, str):
+            changed = datetime.fromisoformat(changed)
+        timestamp = changed.timestamp()
+    return raw, float(timestamp)
+
+
+def extract_numeric_series(
+    states: Iterable[Any],
+) -> tuple[list[float], list[float]]:
+    """Convert recorder history rows to parallel time/value lists.
+
+    Args:
+        states: History rows for a single entity, oldest first (see
+            row_state for the accepted formats)
+
+    Returns:
+        Tuple of (timestamps in epoch seconds, float values)
+    """
+    times: list[float] = []
+    values: list[float] = []
+    for row in states:
+        parsed = row_state(row)
+        if parsed is None:
+            continue
+        raw, timestamp = parsed
+        if raw in _NON_NUMERIC_STATES:
+            continue
+        value = parse_numeric(raw)
+        if value is None:
+            continue
+        times.append(timestamp)
+        values.append(value)
+    return times, values
+
+
+def lttb(
+    times: list[float], values: list[float], threshold: int
+) -> tuple[list[float], list[float]]:
+    """Downsample with Largest-Triangle-Three-Buckets.
+
+    Keeps the visual shape of a line chart: the first and last points are
+    kept, and from every bucket the point forming the largest triangle
+    with the previously selected point and the next bucket's average.
+
+    Args:
+        times: Timestamps, ascending
+        values: Values, same length as times
+        threshold: Maximum number of output points (>= 3 to have effect)
+
+    Returns:
+        Tuple of (times, values) with at most threshold points
+    """
+    length = len(times)
+    if threshold >= length or threshold < 3:
+        return list(times), list(values)
+
+    out_t = [times[0]]
+    out_v = [values[0]]
+    every = (length - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket (the third triangle vertex)
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, length)
+        avg_len = avg_end - avg_start
+        avg_t = sum(times[avg_start:avg_end]) / avg_len
+        avg_v = sum(values[avg_start:avg_end]) / avg_len
+
+        # Pick the point in the current bucket with the largest triangle
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        a_t = times[a]
+        a_v = values[a]
+        dt_avg = a_t - avg_t
+        dv_avg = avg_v - a_v
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs(dt_avg * (values[j] - a_v) - (a_t - times[j]) * dv_avg)
+            if area > max_area:
+                max_area = area
+                next_a = j
+
+        out_t.append(times[next_a])
+        out_v.append(values[next_a])
+        a = next_a
+
+    out_t.append(times[-1])
+    out_v.append(values[-1])
+    return out_t, out_v
+
+
+def minmax_buckets(
+    times: list[float], values: list[float], threshold: int
+) -> tuple[list[float], list[float]]:
+    """Downsample by keeping the minimum and maximum of each bucket.
+
+    Preserves every peak and trough, which matters for anomaly detection
+    and min/max readouts. Points are emitted in time order.
+
+    Args:
+        times: Timestamps, ascending
+        values: Values, same length as times
+        threshold: Maximum number of output points
+
+    Returns:
+        Tuple of (times, values) with at most threshold points
+    """
+    length = len(times)
+    if threshold >= length or threshold < 2:
+        return list(times), list(values)
+
+    buckets = threshold // 2
+    size = length / buckets
+    out_t: list[float] = []
+    out_v: list[float] = []
+    for b in range(buckets):
+        start = int(b * size)
+        end = int((b + 1) * size) if b < buckets - 1 else length
+        if start >= end:
+            continue
+        bucket = values[start:end]
+        lo = start + bucket.index(min(bucket))
+        hi = start + bucket.index(max(bucket))
+        for idx in sorted({lo, hi}):
+            out_t.append(times[idx])
+            out_v.append(values[idx])
+    return out_t, out_v
+
+
+def downsample(
+    times: list[float], values: list[float], points: int, method: str
+) -> tuple[list[float], list[float]]:
+    """Downsample a series with the given method."""
+    if method == METHOD_MINMAX:
+        return minmax_buckets(times, values, points)
+    return lttb(times, values, points)
+
+
+def summarize_series(
+    raw: dict[str, tuple[list[float], list[float]]],
+    points: int,
+    method: str,
+) -> dict[str, dict[str, list]]:
+    """Downsample parallel time/value lists into the columnar payload.
+
+    Args:
+        raw: Dict of entity_id -> (timestamps, values)
+        points: Maximum points per series
+        method: Downsampling method (lttb or minmax)
+
+    Returns:
+        Dict of entity_id -> {"t": [...], "v": [...]}
+    """
+    series: dict[str, dict[str, list]] = {}
+    for entity_id, (times, values) in raw.items():
+        times, values = downsample(times, values, points, method)
+        series[entity_id] = {"t": [int(t) for t in times], "v": values}
+    return series
+
+
+def summarize_history(
+    history: dict[str, list[Any]],
+    entity_ids: list[str],
+    points: int,
+    method: str,
+) -> dict[str, dict[str, list]]:
+    """Build the columnar, downsampled payload for several entities.
+
+    Args:
+        history: Recorder result keyed by entity_id
+        entity_ids: Requested entities (missing ones yield empty series)
+        points: Maximum points per series
+        method: Downsampling method (lttb or minmax)
+
+    Returns:
+        Dict of entity_id -> {"t": [...], "v": [...]}
+    """
+    raw = {
+        entity_id: extract_numeric_series(history.get(entity_id, []))
+        for entity_id in entity_ids
+    }
+    return summarize_series(raw, points, method)
+
+
+def _fetch_history_summary(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    points: int,
+    method: str,
+) -> tuple[
+    dict[str, tuple[list[float], list[float]]], dict[str, dict[str, list]]
+]:
+    """Query the recorder and downsample. Runs in the recorder executor.
+
+    Returns:
+        Tuple of (full-resolution series for backfilling, summary)
+    """
+    # Imported lazily: recorder is an optional (after_) dependency
+    from homeassistant.components.recorder import history
+
+    result = history.get_significant_states(
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state=True,
+        significant_changes_only=False,
+        minimal_response=True,
+        no_attributes=True,
+        compressed_state_format=True,
+    )
+    raw = {
+        entity_id: extract_numeric_series(result.get(entity_id, []))
+        for entity_id in entity_ids
+    }
+    return raw, summarize_series(raw, points, method)
+
+
+async def async_get_history_summary(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    points: int = DEFAULT_POINTS,
+    method: str = METHOD_LTTB,
+    cache: RecentValuesCache | None = None,
+) -> dict[str, dict[str, list]]:
+    """Fetch downsampled numeric history for several entities at once.
+
+    Entities whose recent values cover the range are served from the cache;
+    only the rest is queried from the recorder, and those results are
+    backfilled into the cache. The recorder must be loaded; handlers check
+    hass.config.components first.
+
+    Args:
+        hass: Home Assistant instance
+        entity_ids: Entities to fetch
+        start_time: Range start (timezone-aware)
+        end_time: Range end (timezone-aware)
+        points: Maximum points per series
+        method: Downsampling method (lttb or minmax)
+        cache: Recent values cache, if enabled
+
+    Returns:
+        Dict of entity_id -> {"t": [...], "v": [...]}
+    """
+    start_ts = start_time.timestamp()
+    end_ts = end_time.timestamp()
+    series: dict[str, dict[str, list]] = {}
+    missing = entity_ids
+
+    if cache is not None:
+        cached = {
+            entity_id: cache.series(entity_id, start_ts, end_ts)
+            for entity_id in entity_ids
+            if cache.covers(entity_id, start_ts)
+        }
+        missing = [entity_id for entity_id in entity_ids if entity_id not in cached]
+        if cached:
+            series.update(await hass.async_add_executor_job(
+                summarize_series, cached, points, method
+            ))
+
+    if missing:
+        from homeassistant.components.recorder import get_instance
+
+        raw, summary = await get_instance(hass).async_add_executor_job(
+            _fetch_history_summary,
+            hass, missing, start_time, end_time, points, method,
+        )
+        series.update(summary)
+        if cache is not None:
+            for entity_id, (times, values) in raw.items():
+                cache.backfill(entity_id, times, values, start_ts)
+
+    # Keep the requested order
+    return {entity_id: series[entity_id] for entity_id in entity_ids}
@@ -0,0 +1,262 @@
+"""Sampled logging for Dashview security and rate-limit warnings.
+
+A misbehaving client loop or a probing attack can trigger thousands of
+identical rejections per minute. Logging each one formats a message and
+writes to home-assistant.log every time, which can dominate CPU and flood
+the log. The LogSampler logs the first occurrence per (handler, reason,
+connection) in full, counts the rest without formatting them and emits one
+summary line per window. Per-key counters and the most recent event detail
+stay available through get_metrics() for diagnostics.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Length of one aggregation window in seconds
+SUMMARY_INTERVAL = 60
+
+# Upper bound on tracked keys; oldest keys are evicted beyond this
+MAX_KEYS = 1000
+
+
+class _SampleState:
+    """Counters for a single (handler, reason, connection) key."""
+
+    __slots__ = (
+        "logger",
+        "level",
+        "first_seen",
+        "last_seen",
+        "window_start",
+        "total",
+        "suppressed",
+        "suppressed_total",
+        "last_msg",
+        "last_args",
+    )
+
+    def __init__(self, logger: logging.Logger, level: int, now: float) -> None:
+        self.logger = logger
+        self.level = level
+        self.first_seen = now
+        self.last_seen = now
+        self.window_start = now
+        self.total = 0
+        self.suppressed = 0
+        self.suppressed_total = 0
+        self.last_msg = ""
+        self.last_args: tuple = ()
+
+
+class LogSampler:
+    """Log the first event per key, then aggregate repeats into summaries.
+
+    Keys are (handler, reason, connection_id) tuples. Within one window only
+    the first event is written to the log; repeats only update counters and
+    keep a reference to their arguments, so no string formatting happens on
+    the hot path. When the window has elapsed, the next event (or flush())
+    writes a "suppressed N similar events" summary and opens a new window.
+
+    Attributes:
+        interval: Window length in seconds
+        max_keys: Maximum number of tracked keys
+    """
+
+    # Keys idle for this long are dropped on flush (10 minutes)
+    STALE_TIMEOUT = 600
+
+    def __init__(
+        self, interval: float = SUMMARY_INTERVAL, max_keys: int = MAX_KEYS
+    ) -> None:
+        """Initialize the sampler.
+
+        Args:
+            interval: Window length in seconds
+            max_keys: Maximum number of tracked keys
+        """
+        self.interval = interval
+        self.max_keys = max_keys
+        self._states: dict[tuple[str, str, int], _SampleState] = {}
+
+    def log(
+        self,
+        logger: logging.Logger,
+        level: int,
+        handler: str,
+        reason: str,
+        connection_id: int,
+        msg: str,
+        *args: Any,
+    ) -> bool:
+        """Record an event and log it if it is not suppressed.
+
+        Args:
+            logger: Logger the event belongs to
+            level: Logging level (e.g. logging.WARNING)
+            handler: Name of the WebSocket handler
+            reason: Short machine-readable rejection reason
+            connection_id: Identifier of the client connection
+            msg: %-style log message
+            *args: Arguments for msg, formatted only if the event is logged
+
+        Returns:
+            True if the event was written to the log, False if suppressed
+        """
+        now = time.monotonic()
+        key = (handler, reason, connection_id)
+        state = self._states.get(key)
+
+        if state is None:
+            if len(self._states) >= self.max_keys:
+                self._evict_oldest()
+            state = self._states[key] = _SampleState(logger, level, now)
+            emit = True
+        elif now - state.window_start >= self.interval:
+            self._emit_summary(key, state, now)
+            state.window_start = now
+            emit = True
+        else:
+            emit = False
+
+        state.total += 1
+        state.last_seen = now
+        state.last_msg = msg
+        state.last_args = args
+
+        if emit:
+            logger.log(level, msg, *args)
+        else:
+            state.suppressed += 1
+            state.suppressed_total += 1
+        return emit
+
+    def would_emit(self, handler: str, reason: str, connection_id: int) -> bool:
+        """Return whether the next event for a key would be written to the log.
+
+        Lets callers skip computing expensive message arguments (hashes,
+        content sniffing) for events that will be suppressed anyway.
+        """
+        state = self._states.get((handler, reason, connection_id))
+        return state is None or time.monotonic() - state.window_start >= self.interval
+
+    def warning(
+        self,
+        logger: logging.Logger,
+        handler: str,
+        reason: str,
+        connection_id: int,
+        msg: str,
+        *args: Any,
+    ) -> bool:
+        """Record a WARNING level event. See log()."""
+        return self.log(
+            logger, logging.WARNING, handler, reason, connection_id, msg, *args
+        )
+
+    def error(
+        self,
+        logger: logging.Logger,
+        handler: str,
+        reason: str,
+        connection_id: int,
+        msg: str,
+        *args: Any,
+    ) -> bool:
+        """Record an ERROR level event. See log()."""
+        return self.log(
+            logger, logging.ERROR, handler, reason, connection_id, msg, *args
+        )
+
+    def flush(self) -> None:
+        """Emit summaries for all elapsed windows and drop stale keys.
+
+        Intended to be called periodically so a burst that stops is still
+        summarized without waiting for the next matching event.
+        """
+        now = time.monotonic()
+        stale_keys = []
+        for key, state in self._states.items():
+            if now - state.window_start >= self.interval:
+                self._emit_summary(key, state, now)
+                state.window_start = now
+            if now - state.last_seen > self.STALE_TIMEOUT:
+                stale_keys.append(key)
+        for key in stale_keys:
+            del self._states[key]
+
+    def get_metrics(self) -> list[dict[str, Any]]:
+        """Return per-key counters including the last full event message.
+
+        Returns:
+            List of dicts, one per tracked (handler, reason, connection) key
+        """
+        now = time.monotonic()
+        metrics = []
+        for (handler, reason, connection_id), state in self._states.items():
+            metrics.append({
+                "handler": handler,
+                "reason": reason,
+                "connection": connection_id,
+                "total": state.total,
+                "suppressed": state.suppressed_total,
+                "pending": state.suppressed,
+                "first_seen_ago": round(now - state.first_seen, 1),
+                "last_seen_ago": round(now - state.last_seen, 1),
+                "last_message": self._format(state),
+            })
+        return metrics
+
+    def _emit_summary(
+        self, key: tuple[str, str, int], state: _SampleState, now: float
+    ) -> None:
+        """Log a summary line for suppressed events and reset the window."""
+        if not state.suppressed:
+            return
+        handler, reason, connection_id = key
+        state.logger.log(
+            state.level,
+            "Suppressed %s similar events in %ds | handler=%s | reason=%s | "
+            "connection=%d | last: %s",
+            f"{state.suppressed:,}",
+            now - state.window_start,
+            handler,
+            reason,
+            connection_id,
+            self._format(state),
+        )
+        state.suppressed = 0
+
+    def _evict_oldest(self) -> None:
+        """Drop the least recently seen key to keep memory bounded."""
+        oldest = min(self._states, key=lambda k: self._states[k].last_seen)
+        del self._states[oldest]
+
+    @staticmethod
+    def _format(state: _SampleState) -> str:
+        """Format the last recorded message for a key."""
+        try:
+            return state.last_msg % state.last_args
+        except (TypeError, ValueError):
+            return f"{state.last_msg} {state.last_args!r}"
+
+
+_LOG_SAMPLER = LogSampler()
+
+
+def get_log_sampler() -> LogSampler:
+    """Get the shared log sampler.
+
+    Returns:
+        LogSampler instance used by all Dashview handlers
+    """
+    return _LOG_SAMPLER
+
+
+def reset_log_sampler() -> None:
+    """Reset the shared log sampler. Useful for testing."""
+    global _LOG_SAMPLER
+    _LOG_SAMPLER = LogSampler()
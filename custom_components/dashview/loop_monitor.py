@@ -0,0 +1,288 @@
+"""Event-loop blocking detector for Dashview handlers and setup steps.
+
+Opt-in instrumentation (config entry option "loop_monitor"). When enabled,
+every instrumented coroutine is driven step by step so each synchronous
+slice between two awaits can be timed individually. Slices longer than the
+threshold are recorded together with a stack summary of where the slice
+resumed and where it suspended (or returned). Synchronous setup code is
+measured with the measure() context manager. The report is exposed through
+diagnostics.
+
+When disabled, the wrappers add a single attribute check per call.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Coroutine, Generator, Iterator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Slices longer than this are recorded (HA's own asyncio debug mode
+# reports callbacks slower than 100ms)
+DEFAULT_THRESHOLD_MS = 50
+
+# Number of slow slices kept in the report
+MAX_SLOW_SLICES = 50
+
+# Frames kept per stack summary
+MAX_STACK_DEPTH = 6
+
+
+def _await_chain(coro: Any) -> list[str]:
+    """Summarize the frames of a suspended coroutine and what it awaits.
+
+    Args:
+        coro: Coroutine (or generator-based awaitable) to inspect
+
+    Returns:
+        List of "file:line function" strings, outermost first
+    """
+    chain: list[str] = []
+    while coro is not None and len(chain) < MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        code = frame.f_code
+        filename = code.co_filename.rsplit("/", 2)
+        chain.append(f"{'/'.join(filename[-2:])}:{frame.f_lineno} {code.co_name}")
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return chain
+
+
+class _HandlerStats:
+    """Aggregated timings for one instrumented name."""
+
+    __slots__ = ("calls", "slices", "total_ms", "max_slice_ms", "slow_slices")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.slices = 0
+        self.total_ms = 0.0
+        self.max_slice_ms = 0.0
+        self.slow_slices = 0
+
+
+class LoopMonitor:
+    """Record synchronous slices of Dashview code that block the event loop.
+
+    Attributes:
+        enabled: Whether instrumentation is active
+        threshold_ms: Slices longer than this are recorded as slow
+    """
+
+    def __init__(
+        self, enabled: bool = False, threshold_ms: float = DEFAULT_THRESHOLD_MS
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            enabled: Whether instrumentation is active
+            threshold_ms: Slow slice threshold in milliseconds
+        """
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self._stats: dict[str, _HandlerStats] = {}
+        self._slow: deque[dict[str, Any]] = deque(maxlen=MAX_SLOW_SLICES)
+
+    def configure(self, enabled: bool, threshold_ms: float) -> None:
+        """Enable or disable instrumentation and set the threshold.
+
+        Args:
+            enabled: Whether instrumentation is active
+            threshold_ms: Slow slice threshold in milliseconds
+        """
+        if enabled and not self.enabled:
+            _LOGGER.info(
+                "Dashview loop monitor enabled (threshold %sms)", threshold_ms
+            )
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+
+    def run(self, name: str, coro: Coroutine[Any, Any, Any]) -> Awaitable[Any]:
+        """Return an awaitable that runs coro with per-slice timing.
+
+        Args:
+            name: Name the slices are reported under
+            coro: Coroutine to run
+
+        Returns:
+            coro itself when disabled, a timing wrapper otherwise
+        """
+        if not self.enabled:
+            return coro
+        return _TimedCoroutine(self, name, coro)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Time a block of synchronous code as a single slice.
+
+        Args:
+            name: Name the slice is reported under
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stats_for(name).calls += 1
+            self.record_slice(name, start, time.perf_counter(), None, None)
+
+    def record_slice(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        resumed_at: list[str] | None,
+        suspended_at: list[str] | None,
+    ) -> None:
+        """Record one synchronous slice.
+
+        Args:
+            name: Instrumented handler or setup step
+            start: perf_counter() at slice start
+            end: perf_counter() at slice end
+            resumed_at: Stack summary where the slice started
+            suspended_at: Stack summary where the slice ended
+        """
+        duration_ms = (end - start) * 1000
+        stats = self._stats_for(name)
+        stats.slices += 1
+        stats.total_ms += duration_ms
+        stats.max_slice_ms = max(stats.max_slice_ms, duration_ms)
+
+        if duration_ms < self.threshold_ms:
+            return
+
+        stats.slow_slices += 1
+        self._slow.append({
+            "name": name,
+            "duration_ms": round(duration_ms, 1),
+            "timestamp": time.time(),
+            "resumed_at": resumed_at,
+            "suspended_at": suspended_at,
+        })
+        _LOGGER.debug(
+            "Slow synchronous slice in %s: %.1fms (resumed at %s, suspended at %s)",
+            name, duration_ms, resumed_at, suspended_at,
+        )
+
+    def get_report(self) -> dict[str, Any]:
+        """Return the instrumentation report for diagnostics.
+
+        Returns:
+            Dict with configuration, per-name stats and recent slow slices
+        """
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "handlers": {
+                name: {
+                    "calls": stats.calls,
+                    "slices": stats.slices,
+                    "total_ms": round(stats.total_ms, 1),
+                    "max_slice_ms": round(stats.max_slice_ms, 1),
+                    "slow_slices": stats.slow_slices,
+                }
+                for name, stats in self._stats.items()
+            },
+            "slow_slices": list(self._slow),
+        }
+
+    def _stats_for(self, name: str) -> _HandlerStats:
+        """Get or create the stats entry for a name."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = _HandlerStats()
+        return stats
+
+
+class _TimedCoroutine:
+    """Awaitable that drives a coroutine and times each step."""
+
+    __slots__ = ("_monitor", "_name", "_coro")
+
+    def __init__(
+        self, monitor: LoopMonitor, name: str, coro: Coroutine[Any, Any, Any]
+    ) -> None:
+        self._monitor = monitor
+        self._name = name
+        self._coro = coro
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        monitor, name, coro = self._monitor, self._name, self._coro
+        monitor._stats_for(name).calls += 1
+        send_value: Any = None
+        throw_exc: BaseException | None = None
+
+        while True:
+            resumed_at = _await_chain(coro)
+            start = time.perf_counter()
+            try:
+                if throw_exc is not None:
+                    yielded = coro.throw(throw_exc)
+                else:
+                    yielded = coro.send(send_value)
+            except StopIteration as stop:
+                monitor.record_slice(
+                    name, start, time.perf_counter(), resumed_at, None
+                )
+                return stop.value
+            except BaseException:
+                monitor.record_slice(
+                    name, start, time.perf_counter(), resumed_at, None
+                )
+                raise
+            monitor.record_slice(
+                name, start, time.perf_counter(), resumed_at, _await_chain(coro)
+            )
+
+            try:
+                send_value = yield yielded
+                throw_exc = None
+            except BaseException as err:  # noqa: BLE001 - forwarded into coro
+                send_value = None
+                throw_exc = err
+
+
+_LOOP_MONITOR = LoopMonitor()
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """Get the shared loop monitor.
+
+    Returns:
+        LoopMonitor instance used by all Dashview handlers
+    """
+    return _LOOP_MONITOR
+
+
+def loop_monitored(name: str) -> Callable:
+    """Decorator to time WebSocket handlers with the loop monitor.
+
+    Args:
+        name: Name the handler is reported under
+
+    Returns:
+        Decorator function
+    """
+    def decorator(func: Callable[..., Coroutine[Any, Any, Any]]) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            monitor = get_loop_monitor()
+            if not monitor.enabled:
+                return await func(*args, **kwargs)
+            return await monitor.run(name, func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def reset_loop_monitor() -> None:
+    """Reset the shared loop monitor. Useful for testing."""
+    global _LOOP_MONITOR
+    _LOOP_MONITOR = LoopMonitor()
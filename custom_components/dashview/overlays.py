@@ -0,0 +1,219 @@
+"""Dashview - Per-user settings overlays.
+
+All users share one settings document. Each user may add a small overlay
+of their own preferences (favorite rooms, hidden cards) in the
+save_settings_delta format: dot-notation paths to values, None removing a
+key. dashview/get_settings returns the shared settings with the user's
+overlay applied.
+
+Merged views are cached per user and rebuilt only when their layer
+changes: a new shared settings document (settings are replaced, never
+changed in place) or a change of the user's overlay. A view copies only
+the dicts along the overlay's paths and shares everything else with the
+shared settings, so memory grows with the overlays, not with the number
+of users times the document size. Users without an overlay get the
+shared settings themselves.
+
+Panels load the merged view and save what they show, so writes of the
+shared settings by a user keep that user's overlay paths at their shared
+values (see SettingsOverlays.protect): overlay values never leak into the
+shared settings through a full save or a whole map or list in a delta.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.user_settings"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# Overlay limits per user
+MAX_OVERLAY_PATHS = 200
+MAX_OVERLAY_SIZE = 32 * 1024
+
+
+def apply_overlay(base: dict, overlay: dict[str, Any]) -> dict:
+    """Return base with the overlay's changes applied.
+
+    Like deep_merge, but only the dicts along the overlay's paths are
+    copied; the rest of the result is shared with base, so neither may be
+    changed in place afterwards.
+
+    Args:
+        base: Shared settings
+        overlay: Dict of dot-notation path -> value or None
+
+    Returns:
+        Merged settings
+    """
+    result = dict(base)
+    # Paths of the dicts already copied into result
+    copied: set[tuple[str, ...]] = set()
+    for path, value in overlay.items():
+        parts = path.split(".")
+        current = result
+        for depth in range(len(parts) - 1):
+            part = parts[depth]
+            key = tuple(parts[: depth + 1])
+            child = current.get(part)
+            if not isinstance(child, dict):
+                child = {}
+            elif key not in copied:
+                child = dict(child)
+            copied.add(key)
+            current[part] = child
+            current = child
+        if value is None:
+            current.pop(parts[-1], None)
+        else:
+            current[parts[-1]] = value
+    return result
+
+
+def _get_path(settings: dict, path: str) -> Any:
+    """Return the value at a dot-notation path, or None if missing."""
+    current: Any = settings
+    for part in path.split("."):
+        if not isinstance(current, dict) or part not in current:
+            return None
+        current = current[part]
+    return current
+
+
+class SettingsOverlays:
+    """Per-user settings overlays with cached merged views."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without overlays.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # user_id -> overlay (dot-notation path -> value or None)
+        self._overlays: dict[str, dict[str, Any]] = {}
+        # user_id -> (shared settings the view was built from, view)
+        self._views: dict[str, tuple[dict, dict]] = {}
+        self.hits = 0
+        self.builds = 0
+
+    async def async_load(self) -> None:
+        """Load the overlays saved before the last shutdown."""
+        data = await self._store.async_load() or {}
+        self._overlays = data.get("overlays", {})
+
+    def get_overlay(self, user_id: str) -> dict[str, Any]:
+        """Return a user's overlay."""
+        return self._overlays.get(user_id, {})
+
+    def resolve(self, user_id: str, base: dict) -> dict:
+        """Return the shared settings with a user's overlay applied.
+
+        Args:
+            user_id: Home Assistant user ID
+            base: Current shared settings
+
+        Returns:
+            Merged settings, not to be changed in place
+        """
+        overlay = self._overlays.get(user_id)
+        if not overlay:
+            return base
+        cached = self._views.get(user_id)
+        if cached is not None and cached[0] is base:
+            self.hits += 1
+            return cached[1]
+        self.builds += 1
+        view = apply_overlay(base, overlay)
+        self._views[user_id] = (base, view)
+        return view
+
+    def protect(self, user_id: str, base: dict, settings: dict) -> dict:
+        """Return new shared settings with a user's overlay paths unchanged.
+
+        Args:
+            user_id: Home Assistant user writing the shared settings
+            base: Current shared settings
+            settings: New shared settings, possibly containing values of
+                the user's merged view
+
+        Returns:
+            settings with the values at the user's overlay paths taken
+            from base
+        """
+        overlay = self._overlays.get(user_id)
+        if not overlay:
+            return settings
+        return apply_overlay(
+            settings, {path: _get_path(base, path) for path in overlay}
+        )
+
+    def invalidate(self) -> None:
+        """Drop the merged views after the shared settings changed."""
+        self._views.clear()
+
+    def update(
+        self, user_id: str, changes: dict[str, Any], reset: list[str]
+    ) -> dict[str, Any]:
+        """Change a user's overlay.
+
+        Args:
+            user_id: Home Assistant user ID
+            changes: Dot-notation paths to set (None removes the key in
+                the merged settings)
+            reset: Paths to drop from the overlay, falling back to the
+                shared settings
+
+        Returns:
+            The user's new overlay
+
+        Raises:
+            ValueError: If a path is internal or the overlay gets too large
+        """
+        for path in (*changes, *reset):
+            if path.startswith("_"):
+                raise ValueError(f"Invalid path: {path}")
+        overlay = dict(self._overlays.get(user_id, {}))
+        for path in reset:
+            overlay.pop(path, None)
+        for path, value in changes.items():
+            # Later paths win: drop the path and the paths below it so the
+            # new value is applied after anything it replaces
+            prefix = f"{path}."
+            for existing in [p for p in overlay if p == path or p.startswith(prefix)]:
+                del overlay[existing]
+            overlay[path] = value
+        if len(overlay) > MAX_OVERLAY_PATHS:
+            raise ValueError(f"Overlay exceeds {MAX_OVERLAY_PATHS} paths")
+        if len(json.dumps(overlay)) > MAX_OVERLAY_SIZE:
+            raise ValueError(f"Overlay exceeds {MAX_OVERLAY_SIZE} bytes")
+
+        if overlay:
+            self._overlays[user_id] = overlay
+        else:
+            self._overlays.pop(user_id, None)
+        self._views.pop(user_id, None)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return overlay
+
+    def get_report(self) -> dict[str, Any]:
+        """Return overlay statistics for diagnostics."""
+        return {
+            "users": len(self._overlays),
+            "paths": sum(len(overlay) for overlay in self._overlays.values()),
+            "cached_views": len(self._views),
+            "hits": self.hits,
+            "builds": self.builds,
+        }
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"overlays": self._overlays}
@@ -0,0 +1,283 @@
+"""Dashview - Cached presence history of persons.
+
+Backs the dashview/presence_history command. The user popup fetched seven
+days of raw person history from the recorder on every open and reduced it
+to the last ten zone changes in the browser. Here one recorder query per
+uncached person yields its transitions (state, since, until), collapsed
+and cleaned server-side; the panel only receives the final list:
+
+    {"persons": {"person.x": [{"state", "since", "until", "dwell"}, ...]}}
+
+Transitions stay cached until the person's state changes. Attribute-only
+updates (GPS coordinates, accuracy) keep the cache, and so do requests for
+a shorter range than the cached one. Only person and device_tracker
+entities are served; the least recently requested ones beyond
+MAX_CACHED_PERSONS are dropped and no longer followed.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .history import row_state
+
+_LOGGER = logging.getLogger(__name__)
+
+# Request limits
+DEFAULT_DAYS = 7
+MAX_DAYS = 30
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+MAX_PERSONS = 10
+
+# Entities with zone history
+PRESENCE_DOMAINS = ("person", "device_tracker")
+
+# Persons cached (and followed) at most
+MAX_CACHED_PERSONS = 50
+
+# States that are not a location
+_IGNORED_STATES = ("unavailable", "unknown")
+
+
+def is_presence_entity(entity_id: str) -> bool:
+    """Whether an entity ID belongs to a person or device tracker."""
+    return entity_id.partition(".")[0] in PRESENCE_DOMAINS
+
+
+def extract_transitions(rows: Iterable[Any]) -> list[dict[str, Any]]:
+    """Collapse recorder history rows into zone transitions.
+
+    Unavailable/unknown states are skipped and consecutive equal states
+    merged, as the panel did.
+
+    Args:
+        rows: History rows of one entity, oldest first (see row_state)
+
+    Returns:
+        Transitions oldest first as {"state", "since", "until"} with epoch
+        seconds; "until" of the current state is None
+    """
+    transitions: list[dict[str, Any]] = []
+    for row in rows:
+        parsed = row_state(row)
+        if parsed is None:
+            continue
+        state, timestamp = parsed
+        if state in _IGNORED_STATES:
+            continue
+        if transitions and transitions[-1]["state"] == state:
+            continue
+        if transitions:
+            transitions[-1]["until"] = timestamp
+        transitions.append({"state": state, "since": timestamp, "until": None})
+    return transitions
+
+
+def recent_transitions(
+    transitions: list[dict[str, Any]], start_ts: float, now: float, limit: int
+) -> list[dict[str, Any]]:
+    """Return the latest transitions within a range with their dwell times.
+
+    Args:
+        transitions: Transitions oldest first (see extract_transitions)
+        start_ts: Range start; transitions that ended before are dropped
+        now: Current time, ends the dwell of the current state
+        limit: Maximum number of transitions
+
+    Returns:
+        Up to `limit` transitions, most recent first, each with "dwell"
+        in seconds
+    """
+    result: list[dict[str, Any]] = []
+    for transition in reversed(transitions):
+        until = transition["until"]
+        if until is not None and until < start_ts:
+            break
+        if len(result) == limit:
+            break
+        end = now if until is None else until
+        result.append({**transition, "dwell": round(max(end - transition["since"], 0))})
+    return result
+
+
+def _fetch_transitions(
+    hass: HomeAssistant, entity_ids: list[str], start_time: datetime
+) -> dict[str, list[dict[str, Any]]]:
+    """Query the recorder for transitions. Runs in the recorder executor."""
+    # Imported lazily: recorder is an optional (after_) dependency
+    from homeassistant.components.recorder import history
+
+    result = history.get_significant_states(
+        hass,
+        start_time,
+        None,
+        entity_ids,
+        include_start_time_state=True,
+        significant_changes_only=True,
+        minimal_response=True,
+        no_attributes=True,
+        compressed_state_format=True,
+    )
+    return {
+        entity_id: extract_transitions(result.get(entity_id, []))
+        for entity_id in entity_ids
+    }
+
+
+class PresenceCache:
+    """Transitions per person, invalidated when the person's state changes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        # entity_id -> (fetched range start, transitions oldest first),
+        # least recently requested first
+        self._entries: OrderedDict[
+            str, tuple[float, list[dict[str, Any]]]
+        ] = OrderedDict()
+        # Bumped on invalidation so racing fetches are not stored
+        self._generations: dict[str, int] = {}
+        self._tracked: frozenset[str] = frozenset()
+        self._unsub: CALLBACK_TYPE | None = None
+        self.hits = 0
+        self.misses = 0
+
+    async def async_get_history(
+        self, entity_ids: list[str], days: int, limit: int
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Return the latest transitions of several persons.
+
+        Persons not cached for the range are fetched in one recorder query.
+        The recorder must be loaded; the handler checks
+        hass.config.components first.
+
+        Args:
+            entity_ids: Person (or device_tracker) entity IDs
+            days: Range in days, ending now
+            limit: Maximum transitions per person
+
+        Returns:
+            Dict of entity_id -> transitions, most recent first (see
+            recent_transitions)
+        """
+        now = time.time()
+        start_ts = now - days * 86400
+        missing = [
+            entity_id
+            for entity_id in entity_ids
+            if entity_id not in self._entries or self._entries[entity_id][0] > start_ts
+        ]
+        self.hits += len(entity_ids) - len(missing)
+        self.misses += len(missing)
+        for entity_id in entity_ids:
+            if entity_id in self._entries:
+                self._entries.move_to_end(entity_id)
+
+        if missing:
+            from homeassistant.components.recorder import get_instance
+
+            generations = {
+                entity_id: self._generations.get(entity_id, 0) for entity_id in missing
+            }
+            self._track(missing)
+            fetched = await get_instance(self._hass).async_add_executor_job(
+                _fetch_transitions,
+                self._hass,
+                missing,
+                datetime.fromtimestamp(start_ts, timezone.utc),
+            )
+            for entity_id, transitions in fetched.items():
+                # Not stored if invalidated or evicted (no longer followed)
+                # while the query ran
+                if (
+                    self._generations.get(entity_id, 0) == generations[entity_id]
+                    and entity_id in self._tracked
+                ):
+                    self._entries[entity_id] = (start_ts, transitions)
+                    self._entries.move_to_end(entity_id)
+            # Serve this response even if a state change raced the query
+            entries = {**self._entries, **{
+                entity_id: (start_ts, transitions)
+                for entity_id, transitions in fetched.items()
+            }}
+            self._evict()
+        else:
+            entries = self._entries
+
+        return {
+            entity_id: recent_transitions(entries[entity_id][1], start_ts, now, limit)
+            for entity_id in entity_ids
+        }
+
+    @callback
+    def async_invalidate(self, entity_id: str) -> None:
+        """Drop the cached transitions of a person."""
+        self._generations[entity_id] = self._generations.get(entity_id, 0) + 1
+        self._entries.pop(entity_id, None)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for state changes and drop the cache."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._tracked = frozenset()
+        self._entries.clear()
+
+    def get_report(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "persons": len(self._entries),
+            "transitions": sum(len(entry[1]) for entry in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _track(self, entity_ids: list[str]) -> None:
+        """Follow state changes of newly requested persons."""
+        self._set_tracked(self._tracked.union(entity_ids))
+
+    def _evict(self) -> None:
+        """Drop the least recently requested persons beyond the limit."""
+        if len(self._entries) <= MAX_CACHED_PERSONS:
+            return
+        while len(self._entries) > MAX_CACHED_PERSONS:
+            self._entries.popitem(last=False)
+        self._set_tracked(frozenset(self._entries))
+
+    def _set_tracked(self, tracked: frozenset[str]) -> None:
+        """Follow state changes of exactly the given persons."""
+        if tracked == self._tracked:
+            return
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._tracked = tracked
+        if tracked:
+            self._unsub = async_track_state_change_event(
+                self._hass, list(tracked), self._async_state_changed
+            )
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Invalidate a person whose zone (not just its position) changed."""
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if (
+            old_state is not None
+            and new_state is not None
+            and old_state.state == new_state.state
+        ):
+            return
+        self.async_invalidate(event.data["entity_id"])
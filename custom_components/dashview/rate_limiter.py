@@ -14,6 +14,8 @@ from typing import Callable, Any
 from homeassistant.components import websocket_api
 from homeassistant.core import HomeAssistant
 
+from .log_sampler import get_log_sampler
+
 _LOGGER = logging.getLogger(__name__)
 
 # Rate limit configuration (Story 7.9 AC2)
@@ -21,8 +23,18 @@ _LOGGER = logging.getLogger(__name__)
 RATE_LIMITS = {
     "get_settings": (20, 10),    # Read-only, low impact
     "save_settings": (5, 3),     # Write operation, needs protection
+    "undo": (5, 3),              # Settings write, one delta per click
+    "redo": (5, 3),              # Settings write, one delta per click
+    "save_user_settings": (2, 4),  # Any user may write, own overlay only
     "upload_photo": (2, 2),      # Heavy payload, disk I/O
     "delete_photo": (5, 3),      # Write operation, moderate impact
+    "history_summary": (5, 10),  # Recorder query, batched per popup
+    "statistics_summary": (5, 10),  # Recorder query, cached per period
+    "presence_history": (5, 10),  # Recorder query, cached per person
+    "suggestion_action": (5, 3),  # Dismiss/action clicks, persisted
+    "search_entities": (10, 20),  # Entity picker keystrokes, index lookup
+    "media_artwork": (2, 4),     # Batched per popup, may fetch remotely
+    "subscribe": (5, 10),        # Long-lived subscriptions, several per panel load
 }
 
 # Default rate limit for any unlisted handler
@@ -184,10 +196,12 @@ def rate_limited(handler_name: str) -> Callable:
             conn_id = id(connection)
 
             if not limiter.check(conn_id):
-                rate_count = limiter.get_rate_limited_count(conn_id)
-                _LOGGER.warning(
+                # Sampled: a client stuck in a loop would otherwise log
+                # one warning per rejected request
+                get_log_sampler().warning(
+                    _LOGGER, handler_name, "rate_limited", conn_id,
                     "RATE_LIMITED: handler=%s | connection=%d | count=%d",
-                    handler_name, conn_id, rate_count
+                    handler_name, conn_id, limiter.get_rate_limited_count(conn_id)
                 )
                 connection.send_error(
                     msg["id"],
@@ -0,0 +1,663 @@
+"""Dashview - In-memory cache of recent numeric sensor values.
+
+Every temperature and humidity sensor the panel charts gets a fixed-size ring
+buffer of (timestamp, value) pairs, fed by state_changed events. Values are
+kept at bounded resolution: within one resolution bucket only the latest
+sample is stored, so a buffer holds at most window / resolution points no
+matter how chatty the sensor is. Both columns are array('d') instances,
+i.e. 16 bytes per point with no per-object overhead.
+
+dashview/history_summary serves entities whose buffer covers the requested
+range straight from memory and only queries the recorder for the rest.
+Recorder results are backfilled into the buffers so the next request for
+the same range is served from memory as well.
+
+The buffers are snapshotted periodically and on shutdown to a compact
+binary file in .storage (fixed-width little-endian records, see
+encode_snapshot) that is memory-mapped on load, so charts are warm right
+after a restart. Only the shutdown snapshot is marked clean: after a crash
+the changes since the last periodic snapshot are missing, so restored
+buffers then only claim coverage from the restart on.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .entities import enabled_entities
+
+_LOGGER = logging.getLogger(__name__)
+
+# Default window and resolution (24h at one point per minute)
+DEFAULT_WINDOW_HOURS = 24
+DEFAULT_RESOLUTION = 60
+
+# Per-entity memory cap: 10080 points * 16 bytes ~= 160 KB
+MAX_POINTS_PER_ENTITY = 7 * 24 * 60
+
+# Upper bound on cached entities
+MAX_ENTITIES = 500
+
+# Only sensors carry numeric chart data
+TRACKED_DOMAIN = "sensor."
+CHART_CATEGORIES = ("temperature", "humidity")
+
+# Bytes per stored point (timestamp + value, both doubles)
+POINT_SIZE = 2 * array("d").itemsize
+
+# Snapshot file in .storage and how often it is written
+SNAPSHOT_FILE = "dashview.recent_values"
+SNAPSHOT_INTERVAL = 300
+
+# Snapshot layout: header, then per entity an entry header, the UTF-8
+# entity ID and `count` records of (timestamp, value) doubles
+SNAPSHOT_MAGIC = b"DVRV"
+SNAPSHOT_VERSION = 1
+# magic, version, flags, resolution, saved_at, entities
+_HEADER = struct.Struct("<4sHBxddI")
+_ENTRY = struct.Struct("<HdI")  # entity ID length, covered_since, count
+_RECORD_SIZE = 16
+# Header flag: written on shutdown, no changes after saved_at are missing
+FLAG_CLEAN = 0x01
+
+# (entity_id, covered_since, times, values)
+SnapshotEntry = tuple[str, float, array, array]
+
+
+def parse_numeric(raw: Any) -> float | None:
+    """Return raw as a finite float, or None if it is not numeric."""
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def tracked_entities(hass: HomeAssistant, settings: dict) -> list[str]:
+    """Collect the temperature and humidity sensors the panel charts.
+
+    Args:
+        hass: Home Assistant instance
+        settings: Dashview settings
+
+    Returns:
+        Sorted list of sensor entity IDs
+    """
+    entity_ids: set[str] = set()
+    for category in CHART_CATEGORIES:
+        entity_ids.update(
+            entity_id for entity_id in enabled_entities(hass, settings, category)
+            if entity_id.startswith(TRACKED_DOMAIN)
+        )
+    return sorted(entity_ids)
+
+
+class RingBuffer:
+    """Fixed-capacity, time-ordered buffer of (timestamp, value) points.
+
+    Attributes:
+        times: Timestamps in epoch seconds (ring storage)
+        values: Values (ring storage)
+        start: Index of the oldest point
+        count: Number of stored points
+        covered_since: Earliest time for which the buffer holds every change
+    """
+
+    __slots__ = ("times", "values", "start", "count", "covered_since")
+
+    def __init__(self, capacity: int, covered_since: float) -> None:
+        """Initialize an empty buffer.
+
+        Args:
+            capacity: Maximum number of points (>= 2)
+            covered_since: Time from which changes are recorded
+        """
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.count = 0
+        self.covered_since = covered_since
+
+    @classmethod
+    def from_columns(
+        cls, capacity: int, covered_since: float, times: array, values: array
+    ) -> RingBuffer:
+        """Create a buffer from ordered columns without re-bucketing.
+
+        Keeps the newest `capacity` points if there are more.
+        """
+        if len(times) > capacity:
+            times = times[-capacity:]
+            values = values[-capacity:]
+            covered_since = max(covered_since, times[0])
+        buffer = cls(capacity, covered_since)
+        count = len(times)
+        buffer.times[:count] = times
+        buffer.values[:count] = values
+        buffer.count = count
+        return buffer
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of points."""
+        return len(self.times)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the point storage."""
+        return self.capacity * POINT_SIZE
+
+    def append(self, timestamp: float, value: float, resolution: float) -> bool:
+        """Add a point, replacing the newest one if in the same bucket.
+
+        Args:
+            timestamp: Epoch seconds, must not precede the newest point
+            value: Numeric value
+            resolution: Bucket width in seconds
+
+        Returns:
+            False if the point was older than the newest point and dropped
+        """
+        capacity = self.capacity
+        if self.count:
+            last = (self.start + self.count - 1) % capacity
+            last_time = self.times[last]
+            if timestamp < last_time:
+                return False
+            if timestamp // resolution == last_time // resolution:
+                self.times[last] = timestamp
+                self.values[last] = value
+                return True
+
+        if self.count == capacity:
+            # Overwrite the oldest point; coverage now starts at the next one
+            self.times[self.start] = timestamp
+            self.values[self.start] = value
+            self.start = (self.start + 1) % capacity
+            self.covered_since = max(self.covered_since, self.times[self.start])
+        else:
+            index = (self.start + self.count) % capacity
+            self.times[index] = timestamp
+            self.values[index] = value
+            self.count += 1
+        return True
+
+    def columns(self) -> tuple[array, array]:
+        """Return copies of the stored timestamps and values, oldest first."""
+        end = self.start + self.count
+        if end <= self.capacity:
+            return self.times[self.start:end], self.values[self.start:end]
+        end %= self.capacity
+        return (
+            self.times[self.start:] + self.times[:end],
+            self.values[self.start:] + self.values[:end],
+        )
+
+    def points(self) -> Iterator[tuple[float, float]]:
+        """Iterate over stored points, oldest first."""
+        capacity = self.capacity
+        for offset in range(self.count):
+            index = (self.start + offset) % capacity
+            yield self.times[index], self.values[index]
+
+    def series(
+        self, start_ts: float, end_ts: float
+    ) -> tuple[list[float], list[float]]:
+        """Return the points within a range as parallel lists.
+
+        The last point before start_ts is included with its time clamped to
+        start_ts, like the recorder's start-time state.
+
+        Args:
+            start_ts: Range start in epoch seconds
+            end_ts: Range end in epoch seconds
+
+        Returns:
+            Tuple of (timestamps, values)
+        """
+        times: list[float] = []
+        values: list[float] = []
+        before: tuple[float, float] | None = None
+        for timestamp, value in self.points():
+            if timestamp < start_ts:
+                before = (timestamp, value)
+                continue
+            if timestamp > end_ts:
+                break
+            times.append(timestamp)
+            values.append(value)
+        if before is not None and (not times or times[0] > start_ts):
+            times.insert(0, start_ts)
+            values.insert(0, before[1])
+        return times, values
+
+
+def encode_snapshot(
+    resolution: float,
+    saved_at: float,
+    entries: Iterable[SnapshotEntry],
+    clean: bool = False,
+) -> bytes:
+    """Serialize buffers to the snapshot format.
+
+    Args:
+        resolution: Bucket width the points were recorded with
+        saved_at: Epoch time of the snapshot
+        entries: (entity_id, covered_since, times, values) per entity
+        clean: Whether the snapshot is written on shutdown
+
+    Returns:
+        Snapshot file content
+    """
+    entries = list(entries)
+    parts = [_HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        FLAG_CLEAN if clean else 0,
+        resolution,
+        saved_at,
+        len(entries),
+    )]
+    for entity_id, covered_since, times, values in entries:
+        name = entity_id.encode()
+        records = array("d", bytes(_RECORD_SIZE * len(times)))
+        records[0::2] = times
+        records[1::2] = values
+        if sys.byteorder == "big":
+            records.byteswap()
+        parts.append(_ENTRY.pack(len(name), covered_since, len(times)))
+        parts.append(name)
+        parts.append(records.tobytes())
+    return b"".join(parts)
+
+
+def read_snapshot(
+    path: Path,
+) -> tuple[float, float, list[SnapshotEntry], bool] | None:
+    """Memory-map and decode a snapshot file.
+
+    Does blocking file I/O; must be run in the executor.
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        Tuple of (resolution, saved_at, entries, clean), None if there is
+        no snapshot
+
+    Raises:
+        ValueError: If the file is not a valid snapshot
+    """
+    try:
+        file = path.open("rb")
+    except FileNotFoundError:
+        return None
+    with file:
+        if os.fstat(file.fileno()).st_size < _HEADER.size:
+            raise ValueError("Snapshot is truncated")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _decode_snapshot(view)
+            except struct.error as err:
+                raise ValueError(f"Snapshot is truncated: {err}") from err
+            finally:
+                view.release()
+
+
+def _decode_snapshot(
+    view: memoryview,
+) -> tuple[float, float, list[SnapshotEntry], bool]:
+    """Decode snapshot content. See encode_snapshot for the layout."""
+    magic, version, flags, resolution, saved_at, count = _HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError("Unknown snapshot format")
+
+    entries: list[SnapshotEntry] = []
+    offset = _HEADER.size
+    for _ in range(count):
+        name_len, covered_since, points = _ENTRY.unpack_from(view, offset)
+        offset += _ENTRY.size
+        entity_id = bytes(view[offset:offset + name_len]).decode()
+        offset += name_len
+        end = offset + points * _RECORD_SIZE
+        if end > len(view):
+            raise ValueError("Snapshot is truncated")
+        records = array("d")
+        records.frombytes(view[offset:end])
+        if sys.byteorder == "big":
+            records.byteswap()
+        offset = end
+        entries.append((entity_id, covered_since, records[0::2], records[1::2]))
+    return resolution, saved_at, entries, bool(flags & FLAG_CLEAN)
+
+
+def write_snapshot(path: Path, data: bytes) -> None:
+    """Atomically write snapshot content.
+
+    Does blocking file I/O; must be run in the executor.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class RecentValuesCache:
+    """Ring buffers of recent values for the sensors Dashview displays.
+
+    Attributes:
+        window: Covered time window in seconds
+        resolution: Bucket width in seconds
+        max_entities: Maximum number of cached entities
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        window_hours: float = DEFAULT_WINDOW_HOURS,
+        resolution: float = DEFAULT_RESOLUTION,
+        max_entities: int = MAX_ENTITIES,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            hass: Home Assistant instance
+            window_hours: Covered time window in hours
+            resolution: Bucket width in seconds
+            max_entities: Maximum number of cached entities
+        """
+        self._hass = hass
+        self.window = window_hours * 3600
+        self.resolution = resolution
+        self.max_entities = max_entities
+        self._buffers: dict[str, RingBuffer] = {}
+        self._restored: dict[str, tuple[float, array, array]] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+        self.dirty = False
+
+    @property
+    def capacity(self) -> int:
+        """Points per entity for the configured window and resolution."""
+        return max(
+            2, min(math.ceil(self.window / self.resolution) + 1, MAX_POINTS_PER_ENTITY)
+        )
+
+    def configure(self, window_hours: float, resolution: float) -> None:
+        """Change window and resolution, keeping already cached points.
+
+        Args:
+            window_hours: Covered time window in hours
+            resolution: Bucket width in seconds
+        """
+        window = window_hours * 3600
+        if window == self.window and resolution == self.resolution:
+            return
+        self.window = window
+        self.resolution = resolution
+        for entity_id, buffer in self._buffers.items():
+            self._buffers[entity_id] = self._rebuild(
+                buffer.covered_since, buffer.points()
+            )
+
+    @callback
+    def async_set_tracked(self, entity_ids: Iterable[str]) -> None:
+        """Track exactly the given entities.
+
+        New entities are seeded with their current state; buffers of
+        entities no longer tracked are dropped.
+
+        Args:
+            entity_ids: Sensor entity IDs to cache
+        """
+        wanted = list(dict.fromkeys(entity_ids))
+        if len(wanted) > self.max_entities:
+            _LOGGER.debug(
+                "Caching recent values for %d of %d sensors",
+                self.max_entities, len(wanted),
+            )
+            wanted = wanted[:self.max_entities]
+
+        for entity_id in set(self._buffers) - set(wanted):
+            del self._buffers[entity_id]
+        for entity_id in wanted:
+            if entity_id not in self._buffers:
+                self._async_seed(entity_id)
+        # Snapshot entries of sensors that are no longer displayed
+        self._restored.clear()
+
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if wanted:
+            self._unsub = async_track_state_change_event(
+                self._hass, wanted, self._async_state_changed
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for state changes."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def record(self, entity_id: str, raw: Any, timestamp: float) -> bool:
+        """Record a state for a tracked entity.
+
+        Args:
+            entity_id: Entity ID
+            raw: State value (non-numeric states are ignored)
+            timestamp: Epoch seconds of the state
+
+        Returns:
+            True if the value was stored
+        """
+        buffer = self._buffers.get(entity_id)
+        if buffer is None:
+            return False
+        value = parse_numeric(raw)
+        if value is None:
+            return False
+        if not buffer.append(timestamp, value, self.resolution):
+            return False
+        self.dirty = True
+        return True
+
+    def covers(self, entity_id: str, start_ts: float) -> bool:
+        """Whether the cache holds every change of an entity since start_ts."""
+        buffer = self._buffers.get(entity_id)
+        return buffer is not None and buffer.covered_since <= start_ts
+
+    def series(
+        self, entity_id: str, start_ts: float, end_ts: float
+    ) -> tuple[list[float], list[float]]:
+        """Return cached points of an entity within a range.
+
+        Args:
+            entity_id: Entity ID
+            start_ts: Range start in epoch seconds
+            end_ts: Range end in epoch seconds
+
+        Returns:
+            Tuple of (timestamps, values), empty if not cached
+        """
+        buffer = self._buffers.get(entity_id)
+        if buffer is None:
+            return [], []
+        return buffer.series(start_ts, end_ts)
+
+    def backfill(
+        self,
+        entity_id: str,
+        times: list[float],
+        values: list[float],
+        start_ts: float,
+    ) -> None:
+        """Merge recorder history older than the cached range.
+
+        Args:
+            entity_id: Entity ID
+            times: Recorder timestamps, ascending
+            values: Recorder values
+            start_ts: Start of the queried range
+        """
+        buffer = self._buffers.get(entity_id)
+        if buffer is None or start_ts >= buffer.covered_since:
+            return
+        older = [
+            (timestamp, value) for timestamp, value in zip(times, values)
+            if timestamp < buffer.covered_since
+        ]
+        self._buffers[entity_id] = self._rebuild(
+            start_ts, [*older, *buffer.points()]
+        )
+        self.dirty = True
+
+    def snapshot(self) -> list[SnapshotEntry]:
+        """Copy the current buffers for persisting and clear the dirty flag."""
+        self.dirty = False
+        return [
+            (entity_id, buffer.covered_since, *buffer.columns())
+            for entity_id, buffer in self._buffers.items()
+        ]
+
+    def restore(
+        self,
+        resolution: float,
+        saved_at: float,
+        entries: list[SnapshotEntry],
+        clean: bool = False,
+    ) -> int:
+        """Keep snapshot entries to seed buffers of tracked entities.
+
+        Snapshots older than the window are ignored. Entries are used when
+        async_set_tracked() first creates the entity's buffer.
+
+        Args:
+            resolution: Bucket width the snapshot was recorded with
+            saved_at: Epoch time of the snapshot
+            entries: Snapshot entries
+            clean: Whether the snapshot was written on shutdown; otherwise
+                changes after saved_at may be missing and coverage starts
+                now, so the recorder fills the gap
+
+        Returns:
+            Number of entries kept
+        """
+        now = time.time()
+        if saved_at < now - self.window:
+            return 0
+        for entity_id, covered_since, times, values in entries:
+            if resolution != self.resolution:
+                buffer = self._rebuild(covered_since, zip(times, values))
+                times, values = buffer.columns()
+                covered_since = buffer.covered_since
+            if not clean:
+                covered_since = max(covered_since, now)
+            self._restored[entity_id] = (covered_since, times, values)
+        return len(self._restored)
+
+    async def async_load(self) -> int:
+        """Load the snapshot from .storage.
+
+        Returns:
+            Number of restored entities
+        """
+        path = Path(self._hass.config.path(".storage", SNAPSHOT_FILE))
+        try:
+            snapshot = await self._hass.async_add_executor_job(read_snapshot, path)
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Ignoring recent values snapshot %s: %s", path, err)
+            return 0
+        if snapshot is None:
+            return 0
+        return self.restore(*snapshot)
+
+    async def async_save(self, clean: bool = False) -> None:
+        """Write a snapshot to .storage.
+
+        Args:
+            clean: Whether no changes are recorded after it (shutdown)
+        """
+        path = Path(self._hass.config.path(".storage", SNAPSHOT_FILE))
+        entries = self.snapshot()
+        resolution = self.resolution
+        data = await self._hass.async_add_executor_job(
+            encode_snapshot, resolution, time.time(), entries, clean
+        )
+        try:
+            await self._hass.async_add_executor_job(write_snapshot, path, data)
+        except OSError as err:
+            self.dirty = True
+            _LOGGER.warning("Failed to save recent values snapshot: %s", err)
+
+    def get_report(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "window_hours": self.window / 3600,
+            "resolution_s": self.resolution,
+            "capacity_per_entity": self.capacity,
+            "max_bytes_per_entity": self.capacity * POINT_SIZE,
+            "entities": len(self._buffers),
+            "points": sum(buffer.count for buffer in self._buffers.values()),
+            "bytes": sum(buffer.nbytes for buffer in self._buffers.values()),
+        }
+
+    def _rebuild(
+        self, covered_since: float, points: Iterable[tuple[float, float]]
+    ) -> RingBuffer:
+        """Create a buffer at the current capacity from existing points."""
+        buffer = RingBuffer(self.capacity, covered_since)
+        for timestamp, value in points:
+            buffer.append(timestamp, value, self.resolution)
+        return buffer
+
+    @callback
+    def _async_seed(self, entity_id: str) -> None:
+        """Create a buffer for an entity from its snapshot and current state."""
+        state = self._hass.states.get(entity_id)
+        restored = self._restored.pop(entity_id, None)
+        if restored is not None:
+            self._buffers[entity_id] = RingBuffer.from_columns(
+                self.capacity, *restored
+            )
+        elif state is None:
+            self._buffers[entity_id] = RingBuffer(self.capacity, time.time())
+            return
+        else:
+            # The current state has been valid since it was last updated
+            self._buffers[entity_id] = RingBuffer(
+                self.capacity, state.last_updated.timestamp()
+            )
+        if state is not None:
+            self.record(entity_id, state.state, state.last_updated.timestamp())
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Record a state_changed event."""
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        self.record(
+            event.data["entity_id"],
+            new_state.state,
+            new_state.last_updated.timestamp(),
+        )
+
@@ -0,0 +1,277 @@
+"""Dashview - Incrementally maintained per-room aggregates.
+
+Backs the dashview/subscribe_rooms command. The panel used to derive room
+card data (lights on, motion, temperature, ...) by filtering the whole
+entity registry and hass.states for every room on every render, in every
+open browser. Here the displayed entities (category label, enabled maps,
+enabledRooms) are mapped to their room once, when settings or registries
+change. A state_changed event then only touches the affected room: the
+entity is added to or removed from the room's set of active entities and
+the room's snapshot is compared field by field, so subscribers receive
+small per-room deltas:
+
+    {"rooms": {area_id: snapshot, ...}}               (first event)
+    {"changed": {area_id: {field: value} | None}}     (later events)
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import area_registry as ar, device_registry as dr
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .entities import enabled_entries, entry_area_id
+from .recent_values import parse_numeric
+
+_LOGGER = logging.getLogger(__name__)
+
+# Category -> states counted as active (e.g. light on, cover open)
+ACTIVE_STATES = {
+    "light": ("on",),
+    "motion": ("on",),
+    "cover": ("open", "opening", "closing"),
+    "smoke": ("on",),
+    "waterLeak": ("on",),
+}
+
+# Categories whose first sensor (by name, as in the panel) is the reading
+READING_CATEGORIES = ("temperature", "humidity")
+
+CATEGORIES = (*ACTIVE_STATES, *READING_CATEGORIES)
+
+RoomsListener = Callable[[dict[str, dict[str, Any] | None]], None]
+
+
+@dataclass
+class RoomAggregate:
+    """Counters of one room.
+
+    Attributes:
+        floor_id: Floor of the area, if any
+        totals: Number of displayed entities per counted category
+        active: Active entity IDs per counted category
+        readings: Entity ID providing each reading category
+        values: Current reading per reading category
+    """
+
+    floor_id: str | None
+    totals: dict[str, int] = field(default_factory=dict)
+    active: dict[str, set[str]] = field(default_factory=dict)
+    readings: dict[str, str] = field(default_factory=dict)
+    values: dict[str, float | None] = field(default_factory=dict)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the room card data sent to the panel."""
+        lights_on = len(self.active.get("light", ()))
+        motion = bool(self.active.get("motion"))
+        return {
+            "floor": self.floor_id,
+            "lights": self.totals.get("light", 0),
+            "lightsOn": lights_on,
+            "motion": motion,
+            "coversOpen": len(self.active.get("cover", ())),
+            "smoke": bool(self.active.get("smoke")),
+            "waterLeak": bool(self.active.get("waterLeak")),
+            "temperature": self.values.get("temperature"),
+            "humidity": self.values.get("humidity"),
+            "active": motion or lights_on > 0,
+        }
+
+
+def diff_snapshots(
+    old: dict[str, Any] | None, new: dict[str, Any] | None
+) -> dict[str, Any] | None:
+    """Return the fields of `new` that differ from `old`.
+
+    Returns:
+        The full snapshot for new rooms, None for removed rooms and an
+        empty dict if nothing changed
+    """
+    if new is None or old is None:
+        return new
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+class RoomAggregator:
+    """Per-room aggregates of the displayed entities, updated per event."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the aggregator.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._rooms: dict[str, RoomAggregate] = {}
+        self._snapshots: dict[str, dict[str, Any]] = {}
+        # entity_id -> [(area_id, category), ...]
+        self._index: dict[str, list[tuple[str, str]]] = {}
+        self._listeners: list[RoomsListener] = []
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @property
+    def rooms(self) -> dict[str, dict[str, Any]]:
+        """Current snapshot of every room by area ID."""
+        return dict(self._snapshots)
+
+    @callback
+    def async_rebuild(self, settings: dict) -> None:
+        """Map displayed entities to rooms and recompute all aggregates.
+
+        Called when settings or the entity, device or area registry change;
+        subscribers receive the difference to the previous aggregates.
+
+        Args:
+            settings: Dashview settings
+        """
+        hass = self._hass
+        device_registry = dr.async_get(hass)
+        area_registry = ar.async_get(hass)
+        enabled_rooms = settings.get("enabledRooms") or {}
+
+        rooms: dict[str, RoomAggregate] = {}
+        index: dict[str, list[tuple[str, str]]] = {}
+        candidates: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for category, entries in enabled_entries(hass, settings, CATEGORIES).items():
+            for entry in entries:
+                area_id = entry_area_id(entry, device_registry)
+                if area_id is None or enabled_rooms.get(area_id) is False:
+                    continue
+                room = rooms.get(area_id)
+                if room is None:
+                    area = area_registry.async_get_area(area_id)
+                    if area is None:
+                        continue
+                    room = rooms[area_id] = RoomAggregate(area.floor_id)
+                if category in READING_CATEGORIES:
+                    state = hass.states.get(entry.entity_id)
+                    name = (
+                        state.attributes.get("friendly_name") if state else None
+                    ) or entry.original_name or entry.entity_id
+                    candidates.setdefault((area_id, category), []).append(
+                        (name, entry.entity_id)
+                    )
+                    continue
+                room.totals[category] = room.totals.get(category, 0) + 1
+                room.active.setdefault(category, set())
+                index.setdefault(entry.entity_id, []).append((area_id, category))
+
+        for (area_id, category), names in candidates.items():
+            entity_id = min(names)[1]
+            rooms[area_id].readings[category] = entity_id
+            index.setdefault(entity_id, []).append((area_id, category))
+
+        self._rooms = rooms
+        self._index = index
+        for entity_id in index:
+            self._apply_state(entity_id, hass.states.get(entity_id))
+
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if index:
+            self._unsub = async_track_state_change_event(
+                hass, list(index), self._async_state_changed
+            )
+
+        snapshots = {area_id: room.snapshot() for area_id, room in rooms.items()}
+        changes: dict[str, dict[str, Any] | None] = {}
+        for area_id in self._snapshots.keys() | snapshots.keys():
+            delta = diff_snapshots(
+                self._snapshots.get(area_id), snapshots.get(area_id)
+            )
+            if delta != {}:
+                changes[area_id] = delta
+        self._snapshots = snapshots
+        _LOGGER.debug(
+            "Room aggregates rebuilt: %d rooms, %d entities", len(rooms), len(index)
+        )
+        if changes:
+            self._notify(changes)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for state changes."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._listeners.clear()
+
+    @callback
+    def async_add_listener(self, listener: RoomsListener) -> CALLBACK_TYPE:
+        """Register a callback receiving {area_id: delta or None} changes.
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def async_update_entity(self, entity_id: str, state: Any) -> None:
+        """Apply an entity's new state and notify about changed rooms."""
+        changed_rooms = self._apply_state(entity_id, state)
+        changes: dict[str, dict[str, Any] | None] = {}
+        for area_id in changed_rooms:
+            snapshot = self._rooms[area_id].snapshot()
+            delta = diff_snapshots(self._snapshots[area_id], snapshot)
+            if delta:
+                self._snapshots[area_id] = snapshot
+                changes[area_id] = delta
+        if changes:
+            self._notify(changes)
+
+    def get_report(self) -> dict[str, Any]:
+        """Return aggregator statistics for diagnostics."""
+        return {
+            "rooms": len(self._rooms),
+            "entities": len(self._index),
+            "subscribers": len(self._listeners),
+        }
+
+    def _apply_state(self, entity_id: str, state: Any) -> set[str]:
+        """Update the counters an entity contributes to.
+
+        Returns:
+            Area IDs whose counters changed
+        """
+        changed: set[str] = set()
+        value = state.state if state is not None else None
+        for area_id, category in self._index.get(entity_id, ()):
+            room = self._rooms[area_id]
+            if category in READING_CATEGORIES:
+                reading = parse_numeric(value)
+                if room.values.get(category) != reading:
+                    room.values[category] = reading
+                    changed.add(area_id)
+                continue
+            active = room.active[category]
+            is_active = value in ACTIVE_STATES[category]
+            if is_active != (entity_id in active):
+                if is_active:
+                    active.add(entity_id)
+                else:
+                    active.discard(entity_id)
+                changed.add(area_id)
+        return changed
+
+    def _notify(self, changes: dict[str, dict[str, Any] | None]) -> None:
+        """Send changes to all subscribers."""
+        for listener in list(self._listeners):
+            listener(changes)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Apply a state_changed event."""
+        self.async_update_entity(
+            event.data["entity_id"], event.data.get("new_state")
+        )
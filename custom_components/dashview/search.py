@@ -0,0 +1,400 @@
+"""Dashview - Entity search index.
+
+Backs the dashview/search_entities command. The entity picker filtered and
+sorted every key of hass.states on each keystroke, which lags on tablets
+with thousands of entities. SearchIndex keeps a document per entity
+(entity ID, friendly name, area and label names) with two inverted
+indexes:
+
+- a token index (words of every field) with a sorted token list, so one-
+  and two-character terms are answered by a prefix range scan;
+- a trigram index, so longer terms only verify the entities sharing all
+  of their trigrams.
+
+Documents are updated incrementally: state_changed events only re-index
+added and removed entities and friendly name changes, registry events
+re-index the affected entities (area and label changes, renames), and
+area or label renames re-index the entities using them.
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    label_registry as lr,
+)
+
+from .entities import entry_area_id
+
+_LOGGER = logging.getLogger(__name__)
+
+# Request limits
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+MAX_QUERY_LENGTH = 100
+MAX_FILTERS = 20
+
+_TOKEN_SPLIT = re.compile(r"[\W_]+")
+
+# Score of a term matching a field: (exact, word prefix, substring).
+# Fields in order of relevance; a term counts with its best match.
+_FIELD_SCORES = {
+    "name": (100, 60, 15),
+    "object_id": (90, 50, 12),
+    "area": (30, 20, 5),
+    "labels": (25, 15, 4),
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase a text and collapse separators to single spaces."""
+    return " ".join(_TOKEN_SPLIT.split(text.lower())).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the trigrams of every word of a normalized text."""
+    return {
+        word[i : i + 3]
+        for word in text.split()
+        for i in range(len(word) - 2)
+    }
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    """The searchable fields of one entity.
+
+    Attributes:
+        entity_id: Entity ID
+        name: Friendly name as shown by the panel
+        area_id: Area of the entity or its device, if any
+        labels: Label IDs
+        fields: Normalized text per field (see _FIELD_SCORES)
+    """
+
+    entity_id: str
+    name: str
+    area_id: str | None
+    labels: frozenset[str]
+    fields: dict[str, str]
+
+    @property
+    def domain(self) -> str:
+        """Domain of the entity."""
+        return self.entity_id.split(".", 1)[0]
+
+    @property
+    def tokens(self) -> set[str]:
+        """Words of every field."""
+        return {token for text in self.fields.values() for token in text.split()}
+
+    def score(self, terms: list[str]) -> int:
+        """Rank the document for query terms; 0 if a term does not match."""
+        total = 0
+        for term in terms:
+            best = 0
+            for field, (exact, prefix, substring) in _FIELD_SCORES.items():
+                text = self.fields[field]
+                if term not in text:
+                    continue
+                if text == term:
+                    best = max(best, exact)
+                elif text.startswith(term) or f" {term}" in text:
+                    best = max(best, prefix)
+                elif len(term) >= 3:
+                    best = max(best, substring)
+            if not best:
+                return 0
+            total += best
+        return total
+
+
+class SearchIndex:
+    """Token and trigram index over the entities in hass.states."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty index.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._documents: dict[str, SearchDocument] = {}
+        self._tokens: dict[str, set[str]] = {}
+        self._sorted_tokens: list[str] = []
+        self._trigrams: dict[str, set[str]] = {}
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self.queries = 0
+        self.updates = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Index every entity once and follow state and registry changes."""
+        hass = self._hass
+        for state in hass.states.async_all():
+            self._index(state.entity_id, state)
+        if self._unsubs:
+            return
+        listeners = (
+            (EVENT_STATE_CHANGED, self._async_state_changed),
+            (er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated),
+            (dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_registry_updated),
+            (ar.EVENT_AREA_REGISTRY_UPDATED, self._async_area_registry_updated),
+            (lr.EVENT_LABEL_REGISTRY_UPDATED, self._async_label_registry_updated),
+        )
+        self._unsubs = [
+            hass.bus.async_listen(event_type, listener)
+            for event_type, listener in listeners
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following changes."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+
+    @callback
+    def async_update_entity(self, entity_id: str) -> None:
+        """Re-index one entity from its current state and registry entry."""
+        self.updates += 1
+        self._index(entity_id, self._hass.states.get(entity_id))
+
+    def search(
+        self,
+        query: str,
+        *,
+        domains: Iterable[str] | None = None,
+        areas: Iterable[str] | None = None,
+        labels: Iterable[str] | None = None,
+        limit: int = DEFAULT_LIMIT,
+        offset: int = 0,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Return a page of ranked matches.
+
+        Every query term must match a field by word prefix or, from three
+        characters, as a substring. Results are ranked by score, then
+        shorter names, then entity ID. An empty query lists the entities
+        passing the filters by name.
+
+        Args:
+            query: Search text
+            domains: Only entities of these domains
+            areas: Only entities in these areas (IDs)
+            labels: Only entities with any of these labels (IDs)
+            limit: Page size
+            offset: Matches to skip
+
+        Returns:
+            ([{"entity_id", "name", "area_id", "score"}], total matches)
+        """
+        self.queries += 1
+        terms = normalize(query).split()
+        domain_set = set(domains or ())
+        area_set = set(areas or ())
+        label_set = set(labels or ())
+
+        if terms:
+            candidates: set[str] | None = None
+            # Most selective (longest) terms first
+            for term in sorted(terms, key=len, reverse=True):
+                matches = self._candidates(term)
+                candidates = matches if candidates is None else candidates & matches
+                if not candidates:
+                    return [], 0
+        else:
+            candidates = set(self._documents)
+
+        ranked: list[tuple[int, int, str, str, SearchDocument]] = []
+        for entity_id in candidates or ():
+            document = self._documents[entity_id]
+            if domain_set and document.domain not in domain_set:
+                continue
+            if area_set and document.area_id not in area_set:
+                continue
+            if label_set and not label_set & document.labels:
+                continue
+            score = document.score(terms) if terms else 0
+            if terms and not score:
+                continue
+            ranked.append((
+                -score,
+                len(document.name) if terms else 0,
+                document.fields["name"],
+                entity_id,
+                document,
+            ))
+
+        page = heapq.nsmallest(offset + limit, ranked)[offset:]
+        return [
+            {
+                "entity_id": document.entity_id,
+                "name": document.name,
+                "area_id": document.area_id,
+                "score": -negative_score,
+            }
+            for negative_score, _, _, _, document in page
+        ], len(ranked)
+
+    def get_report(self) -> dict[str, Any]:
+        """Return index sizes for diagnostics."""
+        return {
+            "entities": len(self._documents),
+            "tokens": len(self._tokens),
+            "trigrams": len(self._trigrams),
+            "queries": self.queries,
+            "updates": self.updates,
+        }
+
+    def _candidates(self, term: str) -> set[str]:
+        """Return entities possibly matching a term."""
+        if len(term) < 3:
+            # Word prefix: range of the sorted tokens starting with the term
+            result: set[str] = set()
+            start = bisect.bisect_left(self._sorted_tokens, term)
+            for token in self._sorted_tokens[start:]:
+                if not token.startswith(term):
+                    break
+                result |= self._tokens[token]
+            return result
+        result = None
+        for trigram in trigrams(term):
+            entity_ids = self._trigrams.get(trigram)
+            if not entity_ids:
+                return set()
+            result = set(entity_ids) if result is None else result & entity_ids
+        return result or set()
+
+    def _document(self, entity_id: str, state: Any) -> SearchDocument:
+        """Build the document of an entity."""
+        hass = self._hass
+        entry = er.async_get(hass).async_get(entity_id)
+        area_id: str | None = None
+        labels: frozenset[str] = frozenset()
+        if entry is not None:
+            area_id = entry_area_id(entry, dr.async_get(hass))
+            labels = frozenset(entry.labels)
+        area = ar.async_get(hass).async_get_area(area_id) if area_id else None
+        label_registry = lr.async_get(hass)
+        label_names = []
+        for label_id in sorted(labels):
+            label = label_registry.async_get_label(label_id)
+            label_names.append(label.name if label is not None else label_id)
+
+        object_id = entity_id.split(".", 1)[1]
+        name = state.attributes.get("friendly_name") or object_id
+        return SearchDocument(
+            entity_id=entity_id,
+            name=name,
+            area_id=area_id,
+            labels=labels,
+            fields={
+                "name": normalize(name),
+                "object_id": normalize(object_id),
+                "area": normalize(area.name) if area is not None else "",
+                "labels": normalize(" ".join(label_names)),
+            },
+        )
+
+    def _index(self, entity_id: str, state: Any) -> None:
+        """Replace an entity's document; removes it if the state is None."""
+        old = self._documents.pop(entity_id, None)
+        new = self._document(entity_id, state) if state is not None else None
+        old_tokens = old.tokens if old is not None else set()
+        new_tokens = new.tokens if new is not None else set()
+        old_trigrams = {t for token in old_tokens for t in trigrams(token)}
+        new_trigrams = {t for token in new_tokens for t in trigrams(token)}
+
+        for token in old_tokens - new_tokens:
+            entity_ids = self._tokens[token]
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del self._tokens[token]
+                del self._sorted_tokens[
+                    bisect.bisect_left(self._sorted_tokens, token)
+                ]
+        for token in new_tokens - old_tokens:
+            entity_ids = self._tokens.get(token)
+            if entity_ids is None:
+                entity_ids = self._tokens[token] = set()
+                bisect.insort(self._sorted_tokens, token)
+            entity_ids.add(entity_id)
+        for trigram in old_trigrams - new_trigrams:
+            entity_ids = self._trigrams[trigram]
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del self._trigrams[trigram]
+        for trigram in new_trigrams - old_trigrams:
+            self._trigrams.setdefault(trigram, set()).add(entity_id)
+
+        if new is not None:
+            self._documents[entity_id] = new
+
+    def _entities_where(
+        self, predicate: Callable[[SearchDocument], bool]
+    ) -> list[str]:
+        """Return the indexed entities whose document matches a predicate."""
+        return [
+            entity_id
+            for entity_id, document in self._documents.items()
+            if predicate(document)
+        ]
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Re-index added and removed entities and friendly name changes."""
+        data = event.data
+        old_state = data.get("old_state")
+        new_state = data.get("new_state")
+        if (
+            old_state is not None
+            and new_state is not None
+            and old_state.attributes.get("friendly_name")
+            == new_state.attributes.get("friendly_name")
+        ):
+            return
+        self.updates += 1
+        self._index(data["entity_id"], new_state)
+
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        """Re-index a created, renamed, moved or relabeled entity."""
+        data = event.data
+        if data.get("old_entity_id"):
+            self._index(data["old_entity_id"], None)
+        self.async_update_entity(data["entity_id"])
+
+    @callback
+    def _async_device_registry_updated(self, event: Event) -> None:
+        """Re-index the entities of a device that moved to another area."""
+        data = event.data
+        if data.get("action") != "update" or "area_id" not in data.get("changes", {}):
+            return
+        entity_registry = er.async_get(self._hass)
+        for entry in er.async_entries_for_device(entity_registry, data["device_id"]):
+            if entry.entity_id in self._documents:
+                self.async_update_entity(entry.entity_id)
+
+    @callback
+    def _async_area_registry_updated(self, event: Event) -> None:
+        """Re-index the entities of a renamed or removed area."""
+        area_id = event.data.get("area_id")
+        for entity_id in self._entities_where(lambda doc: doc.area_id == area_id):
+            self.async_update_entity(entity_id)
+
+    @callback
+    def _async_label_registry_updated(self, event: Event) -> None:
+        """Re-index the entities of a renamed or removed label."""
+        label_id = event.data.get("label_id")
+        for entity_id in self._entities_where(lambda doc: label_id in doc.labels):
+            self.async_update_entity(entity_id)
@@ -0,0 +1,253 @@
+"""Dashview - Server-side undo and redo of settings changes.
+
+Backs the dashview/undo and dashview/redo commands. Every applied
+save_settings or save_settings_delta is recorded as a pair of deltas in
+the save_settings_delta format: the changes redoing it and the inverse
+changes undoing it. Only the paths that changed are kept, so undoing a
+change costs the size of the change, not a full settings document. Maps
+keyed by entity ID (the enabled* maps), which dot paths cannot address,
+are diffed per entity into "entries":
+
+    {"changes": {path: value}, "entries": {map path: {entity_id: value}}}
+
+Toggling one light thus records that light, not the whole enabledLights
+map. None removes a path or entity, as in deltas.
+
+The undo history is a ring buffer of MAX_ENTRIES changes; recording a new
+change clears the redo history. With the persist_undo_history option the
+history is kept in its own Dashview store across restarts.
+
+There is one history, like there is one shared settings document: undo
+reverts the newest change of the shared settings, whichever admin made
+it. Per-user overlays (overlays.py) are not part of it.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+from collections import deque
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.settings_history"
+STORAGE_VERSION = 1
+STORAGE_FORMAT = 2
+SAVE_DELAY = 10
+
+MAX_ENTRIES = 50
+
+# Bookkeeping keys that are not part of a change
+IGNORED_KEYS = frozenset({"_version"})
+
+
+def settings_diff(
+    old: dict,
+    new: dict,
+    prefix: str = "",
+    entries: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Return the dot-path changes turning old into new.
+
+    Nested dicts are compared key by key and lists are replaced whole.
+    Maps with dotted keys (entity IDs) cannot be addressed by dot paths:
+    with `entries` they are diffed per key into it, otherwise they are
+    replaced whole. Removed keys map to None, as in deltas.
+
+    Args:
+        old: Settings before the change
+        new: Settings after the change
+        prefix: Path of old and new in the settings
+        entries: Receives map path -> {key: new value or None}
+
+    Returns:
+        Dict of dot-notation path -> new value or None
+    """
+    changes: dict[str, Any] = {}
+    for key in old.keys() | new.keys():
+        if not prefix and key in IGNORED_KEYS:
+            continue
+        path = f"{prefix}{key}"
+        if key not in new:
+            changes[path] = None
+            continue
+        old_value = old.get(key)
+        new_value = new[key]
+        if key in old and old_value == new_value:
+            continue
+        if not (isinstance(old_value, dict) and isinstance(new_value, dict)):
+            changes[path] = new_value
+        elif not any("." in k for k in old_value.keys() | new_value.keys()):
+            changes.update(settings_diff(old_value, new_value, f"{path}.", entries))
+        elif entries is not None:
+            entries[path] = {
+                k: new_value.get(k)
+                for k in old_value.keys() | new_value.keys()
+                if k not in old_value or k not in new_value
+                or old_value[k] != new_value[k]
+            }
+        else:
+            changes[path] = new_value
+    return changes
+
+
+def history_delta(old: dict, new: dict) -> dict[str, Any]:
+    """Return the changes and per-entity entries turning old into new."""
+    entries: dict[str, dict[str, Any]] = {}
+    changes = settings_diff(old, new, entries=entries)
+    return {"changes": changes, "entries": entries}
+
+
+def apply_entries(settings: dict, entries: dict[str, dict[str, Any]]) -> dict:
+    """Apply per-entity entries of a history delta to settings in place.
+
+    Args:
+        settings: Settings, already merged with the delta's changes
+        entries: Map path -> {entity_id: value or None}
+
+    Returns:
+        The settings
+    """
+    for path, values in entries.items():
+        current = settings
+        for part in path.split("."):
+            if not isinstance(current.get(part), dict):
+                current[part] = {}
+            current = current[part]
+        for key, value in values.items():
+            if value is None:
+                current.pop(key, None)
+            else:
+                current[key] = value
+    return settings
+
+
+def _upgrade_entry(entry: dict[str, dict]) -> dict[str, dict]:
+    """Convert a stored entry of format 1, which held only the changes."""
+    return {
+        direction: {"changes": entry[direction], "entries": {}}
+        for direction in ("undo", "redo")
+    }
+
+
+class SettingsHistory:
+    """Bounded undo and redo history of settings changes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty history.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._persist = False
+        # Entries are {"undo": changes, "redo": changes}, newest last
+        self._undo: deque[dict[str, dict]] = deque(maxlen=MAX_ENTRIES)
+        self._redo: deque[dict[str, dict]] = deque(maxlen=MAX_ENTRIES)
+        self.undone = 0
+        self.redone = 0
+
+    def configure(self, persist: bool) -> None:
+        """Set whether the history is kept across restarts."""
+        if self._persist and not persist:
+            self._hass.async_create_task(self._store.async_remove())
+        self._persist = persist
+        if self._undo or self._redo:
+            self._async_schedule_save()
+
+    async def async_load(self) -> None:
+        """Load the history saved before the last shutdown, if persisted."""
+        if not self._persist:
+            return
+        data = await self._store.async_load() or {}
+        undo = data.get("undo", [])
+        redo = data.get("redo", [])
+        if data.get("format", 1) < STORAGE_FORMAT:
+            undo = [_upgrade_entry(entry) for entry in undo]
+            redo = [_upgrade_entry(entry) for entry in redo]
+        self._undo.extend(undo)
+        self._redo.extend(redo)
+
+    def record(self, old: dict, new: dict) -> None:
+        """Record an applied change and clear the redo history.
+
+        Args:
+            old: Settings before the change
+            new: Settings after the change
+        """
+        redo = history_delta(old, new)
+        if not redo["changes"] and not redo["entries"]:
+            return
+        self._undo.append(
+            copy.deepcopy({"undo": history_delta(new, old), "redo": redo})
+        )
+        self._redo.clear()
+        self._async_schedule_save()
+
+    def peek_undo(self) -> dict[str, Any] | None:
+        """Return the delta undoing the newest change without moving it."""
+        return self._undo[-1]["undo"] if self._undo else None
+
+    def peek_redo(self) -> dict[str, Any] | None:
+        """Return the delta redoing the newest undone change, or None."""
+        return self._redo[-1]["redo"] if self._redo else None
+
+    def undo(self) -> dict[str, Any] | None:
+        """Return the delta undoing the newest change, or None if none.
+
+        The change moves to the redo history.
+        """
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        self.undone += 1
+        self._async_schedule_save()
+        return entry["undo"]
+
+    def redo(self) -> dict[str, Any] | None:
+        """Return the delta redoing the newest undone change, or None."""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        self.redone += 1
+        self._async_schedule_save()
+        return entry["redo"]
+
+    @property
+    def can_undo(self) -> bool:
+        """Whether there is a change to undo."""
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        """Whether there is an undone change to redo."""
+        return bool(self._redo)
+
+    def get_report(self) -> dict[str, Any]:
+        """Return history statistics for diagnostics."""
+        return {
+            "persist": self._persist,
+            "undo_entries": len(self._undo),
+            "redo_entries": len(self._redo),
+            "undone": self.undone,
+            "redone": self.redone,
+        }
+
+    def _async_schedule_save(self) -> None:
+        if self._persist:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "format": STORAGE_FORMAT,
+            "undo": list(self._undo),
+            "redo": list(self._redo),
+        }
@@ -0,0 +1,185 @@
+"""Dashview - Single-writer settings commit queue.
+
+All writes of the shared settings (save_settings, save_settings_delta,
+undo and redo) go through one SettingsWriter:
+
+- updates are applied to the in-memory settings synchronously, in
+  arrival order, each against the result of the previous one, so
+  concurrent admin sessions cannot interleave a read-modify-write;
+- each applied update gets the next version, a counter that only grows,
+  so two saves in the same millisecond or a clock jump cannot cause false
+  conflicts or lost updates (versions of older releases were millisecond
+  timestamps; the counter continues from the stored value);
+- one save is in flight at a time. Updates applied while it runs are
+  written together by the next save (group commit), and every writer
+  waits until a save containing its version completed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SIGNAL_SETTINGS_UPDATED
+
+_LOGGER = logging.getLogger(__name__)
+
+# Turns the current settings into new ones; must not change them in place
+SettingsUpdate = Callable[[dict], dict]
+
+
+class VersionConflict(Exception):
+    """The settings changed since the version the client based a delta on."""
+
+    def __init__(self, client_version: int, current_version: int) -> None:
+        super().__init__(
+            f"Settings version {client_version} is older than {current_version}"
+        )
+        self.client_version = client_version
+        self.current_version = current_version
+
+
+class SettingsWriter:
+    """Serializes settings updates and saves them in group commits."""
+
+    def __init__(self, hass: HomeAssistant, store: Store) -> None:
+        """Initialize the writer.
+
+        Args:
+            hass: Home Assistant instance
+            store: Settings store
+        """
+        self._hass = hass
+        self._store = store
+        self._version = 0
+        self._saved_version = 0
+        # Settings of the newest applied update, saved by the next commit
+        self._settings: dict | None = None
+        # (version, future) of writers waiting for their save
+        self._waiters: list[tuple[int, asyncio.Future]] = []
+        self._commit_task: asyncio.Task | None = None
+        self.writes = 0
+        self.commits = 0
+        self.failures = 0
+        self.max_group = 0
+
+    @property
+    def version(self) -> int:
+        """Version of the newest applied update."""
+        return self._version
+
+    @callback
+    def async_apply(self, update: SettingsUpdate, record_history: bool = True) -> int:
+        """Apply an update to the current settings and schedule its save.
+
+        Args:
+            update: Function returning the new settings from the current
+                ones; exceptions it raises propagate and nothing changes
+            record_history: Whether the change can be undone
+
+        Returns:
+            Version of the new settings
+        """
+        data = self._hass.data[DOMAIN]
+        current = data.get("settings", {})
+        current_version = current.get("_version", 0)
+        if current_version > self._version:
+            # First write after loading
+            self._version = self._saved_version = current_version
+
+        settings = {**update(current), "_version": self._version + 1}
+        self._version += 1
+        self.writes += 1
+
+        history = data.get("settings_history")
+        if record_history and history is not None:
+            history.record(current, settings)
+        data["settings"] = self._settings = settings
+        async_dispatcher_send(self._hass, SIGNAL_SETTINGS_UPDATED)
+
+        if self._commit_task is None:
+            self._commit_task = self._hass.async_create_task(self._async_commit())
+        return self._version
+
+    async def async_saved(self, version: int) -> None:
+        """Wait until the settings of a version or newer are saved.
+
+        Raises:
+            Exception: The error of the save that should have included it
+        """
+        if version <= self._saved_version:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((version, future))
+        await future
+
+    async def async_write(
+        self, update: SettingsUpdate, record_history: bool = True
+    ) -> int:
+        """Apply an update and wait until it is saved.
+
+        Returns:
+            Version of the new settings
+        """
+        version = self.async_apply(update, record_history)
+        await self.async_saved(version)
+        return version
+
+    async def async_flush(self) -> None:
+        """Wait until all applied updates are saved or failed to save.
+
+        Called on unload, so no update is lost when hass.data is dropped.
+        """
+        if self._commit_task is not None:
+            await self._commit_task
+
+    def get_report(self) -> dict[str, Any]:
+        """Return write statistics for diagnostics."""
+        return {
+            "version": self._version,
+            "saved_version": self._saved_version,
+            "writes": self.writes,
+            "commits": self.commits,
+            "failures": self.failures,
+            "max_group": self.max_group,
+        }
+
+    async def _async_commit(self) -> None:
+        """Save the newest settings until all applied versions are saved."""
+        try:
+            while self._saved_version < self._version:
+                version, settings = self._version, self._settings
+                group = version - self._saved_version
+                self.max_group = max(self.max_group, group)
+                try:
+                    await self._store.async_save(settings)
+                except Exception as err:  # noqa: BLE001
+                    self.failures += 1
+                    _LOGGER.error("Failed to save Dashview settings: %s", err)
+                    self._saved_version = version
+                    self._resolve(version, err)
+                    continue
+                self.commits += 1
+                self._saved_version = version
+                self._resolve(version, None)
+                if group > 1:
+                    _LOGGER.debug("Saved %d settings updates at once", group)
+        finally:
+            self._commit_task = None
+
+    def _resolve(self, version: int, err: Exception | None) -> None:
+        """Wake the writers waiting for versions up to version."""
+        waiting = []
+        for waiter_version, future in self._waiters:
+            if waiter_version > version:
+                waiting.append((waiter_version, future))
+            elif not future.done():
+                if err is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(err)
+        self._waiters = waiting
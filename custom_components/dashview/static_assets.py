@@ -0,0 +1,302 @@
+"""Dashview - Compressed static asset serving.
+
+Serves the frontend bundle (frontend/dist), the vendored libraries
+(frontend/vendor) and the locale files (frontend/locales) with
+Accept-Encoding negotiation. Pre-compressed .br/.gz siblings produced by
+the rollup build are used when present; otherwise the file is compressed
+lazily on first request and kept in memory until the source file changes.
+Nothing is written to the integration's install directory at runtime.
+Content-hashed files listed in asset-manifest.json are sent with immutable
+cache headers.
+
+For code-split builds (manifest with entry/shared/lazy chunks) a small
+bootstrap module is generated that emits modulepreload hints for the
+critical chunks and then imports the entry; lazy chunks (admin, popups)
+are only fetched when the panel imports them.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import mimetypes
+import re
+from pathlib import Path
+
+from aiohttp import hdrs, web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import URL_BASE
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, HA normally ships it
+    brotli = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# Folders below frontend/ served by the asset view
+COMPRESSED_FOLDERS = ("dist", "vendor", "locales")
+
+# Only text formats benefit from compression
+COMPRESSIBLE_EXTENSIONS = {".js", ".mjs", ".json", ".css", ".svg", ".map"}
+
+# Files smaller than this are served as-is
+MIN_COMPRESS_SIZE = 1024
+
+# Lazily compressed variants kept in memory
+MAX_CACHED_VARIANTS = 64
+
+# Encodings in server preference order with their sibling suffix
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# Hashed files never change; everything else must be revalidated
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+# Generated module served as the panel's module_url in code-split builds
+BOOTSTRAP_URL = f"{URL_BASE}/bootstrap.js"
+DIST_URL = f"{URL_BASE}/dist/"
+
+# SECURITY: plain file names only, no separators or traversal
+SAFE_ASSET_REGEX = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]{0,127}$")
+
+
+def is_safe_asset_name(filename: str) -> bool:
+    """Return whether a requested file name may be served.
+
+    Compressed siblings (.br/.gz) are only reachable through negotiation:
+    requested directly they would be sent without Content-Encoding.
+    """
+    return (
+        bool(SAFE_ASSET_REGEX.match(filename))
+        and ".." not in filename
+        and not filename.endswith(tuple(ENCODINGS.values()))
+    )
+
+
+def parse_accept_encoding(header: str) -> list[str]:
+    """Return supported encodings accepted by the client, best first.
+
+    Args:
+        header: Raw Accept-Encoding header value
+
+    Returns:
+        Encodings from ENCODINGS ordered by q-value, then server preference
+    """
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding == "*":
+            for name in ENCODINGS:
+                accepted.setdefault(name, quality)
+        elif coding in ENCODINGS:
+            accepted[coding] = quality
+
+    preference = list(ENCODINGS)
+    return sorted(
+        (name for name, quality in accepted.items() if quality > 0),
+        key=lambda name: (-accepted[name], preference.index(name)),
+    )
+
+
+def _compress(data: bytes, encoding: str) -> bytes | None:
+    """Compress data with the given encoding, None if unavailable."""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def resolve_variant(
+    file_path: Path,
+    encodings: list[str],
+    cache: dict[tuple[Path, str], tuple[float, bytes]],
+) -> tuple[Path, str | None, bytes | None]:
+    """Pick the variant to send for a request, compressing lazily if needed.
+
+    Shipped siblings are sent as files. Files without one are compressed
+    in memory and kept in `cache` while the source is unchanged, so the
+    install directory stays untouched.
+
+    Does blocking file I/O; must be run in the executor.
+
+    Args:
+        file_path: Uncompressed source file (must exist)
+        encodings: Acceptable encodings, best first
+        cache: (source path, encoding) -> (source mtime, compressed body)
+
+    Returns:
+        Tuple of (path to send, Content-Encoding or None, body); the body is
+        set for in-memory variants and None if the file at path is sent
+    """
+    source_stat = file_path.stat()
+    compressible = (
+        file_path.suffix in COMPRESSIBLE_EXTENSIONS
+        and source_stat.st_size >= MIN_COMPRESS_SIZE
+    )
+
+    for encoding in encodings:
+        sibling = file_path.with_name(file_path.name + ENCODINGS[encoding])
+        try:
+            if sibling.stat().st_mtime >= source_stat.st_mtime:
+                return sibling, encoding, None
+        except FileNotFoundError:
+            pass
+
+        if not compressible:
+            continue
+
+        cached = cache.get((file_path, encoding))
+        if cached is not None and cached[0] == source_stat.st_mtime:
+            return file_path, encoding, cached[1]
+
+        compressed = _compress(file_path.read_bytes(), encoding)
+        if compressed is None:
+            continue
+        if len(cache) >= MAX_CACHED_VARIANTS:
+            del cache[next(iter(cache))]
+        cache[(file_path, encoding)] = (source_stat.st_mtime, compressed)
+        _LOGGER.debug(
+            "Compressed %s with %s: %d -> %d bytes",
+            file_path.name, encoding, source_stat.st_size, len(compressed),
+        )
+        return file_path, encoding, compressed
+
+    return file_path, None, None
+
+
+def build_bootstrap_module(manifest: dict | None) -> str | None:
+    """Build the panel bootstrap module for a code-split manifest.
+
+    Args:
+        manifest: Parsed asset-manifest.json
+
+    Returns:
+        JavaScript source, or None if the build is not code-split
+    """
+    if not manifest or not isinstance(manifest.get("entry"), str):
+        return None
+    entry = manifest["entry"]
+    critical = [entry] + [
+        name for name in manifest.get("shared", []) if isinstance(name, str)
+    ]
+    return (
+        "// Dashview bootstrap (generated): preload critical chunks, then load the panel\n"
+        f"const base = {json.dumps(DIST_URL)};\n"
+        f"for (const file of {json.dumps(critical)}) {{\n"
+        "  const link = document.createElement(\"link\");\n"
+        "  link.rel = \"modulepreload\";\n"
+        "  link.href = base + file;\n"
+        "  document.head.appendChild(link);\n"
+        "}\n"
+        # Top-level await: the bootstrap module (and so Home Assistant's
+        # panel import) only resolves once the panel is defined, and load
+        # errors reject it instead of being unhandled
+        f"await import(base + {json.dumps(entry)});\n"
+    )
+
+
+class DashviewAssetView(HomeAssistantView):
+    """Serve frontend assets with pre-compressed variants."""
+
+    url = URL_BASE + "/{folder:(?:" + "|".join(COMPRESSED_FOLDERS) + ")}/{filename}"
+    name = "dashview:assets"
+    requires_auth = False
+
+    def __init__(
+        self, hass: HomeAssistant, frontend_path: Path, manifest: dict | None
+    ) -> None:
+        """Initialize the view.
+
+        Args:
+            hass: Home Assistant instance
+            frontend_path: Path of the frontend directory
+            manifest: Parsed asset-manifest.json, None in dev mode
+        """
+        self._hass = hass
+        self._frontend_path = frontend_path
+        # Lazily compressed variants (see resolve_variant)
+        self._compressed: dict[tuple[Path, str], tuple[float, bytes]] = {}
+        self.set_manifest(manifest)
+
+    def set_manifest(self, manifest: dict | None) -> None:
+        """Update the set of content-hashed files (e.g. after an update)."""
+        self.bootstrap = build_bootstrap_module(manifest)
+        self._hashed_files: set[str] = set()
+        for value in (manifest or {}).values():
+            if isinstance(value, str):
+                self._hashed_files.add(value)
+            elif isinstance(value, list):
+                self._hashed_files.update(v for v in value if isinstance(v, str))
+
+    async def get(
+        self, request: web.Request, folder: str, filename: str
+    ) -> web.StreamResponse:
+        """Serve an asset, negotiating Content-Encoding."""
+        if not is_safe_asset_name(filename):
+            raise web.HTTPNotFound
+
+        file_path = self._frontend_path / folder / filename
+        encodings = parse_accept_encoding(
+            request.headers.get(hdrs.ACCEPT_ENCODING, "")
+        )
+        try:
+            served_path, encoding, body = await self._hass.async_add_executor_job(
+                resolve_variant, file_path, encodings, self._compressed
+            )
+        except (FileNotFoundError, NotADirectoryError):
+            raise web.HTTPNotFound from None
+
+        content_type, _ = mimetypes.guess_type(filename)
+        headers = {
+            hdrs.CONTENT_TYPE: content_type or "application/octet-stream",
+            hdrs.VARY: hdrs.ACCEPT_ENCODING,
+            hdrs.CACHE_CONTROL: (
+                CACHE_IMMUTABLE
+                if folder == "dist" and filename in self._hashed_files
+                else CACHE_REVALIDATE
+            ),
+        }
+        if encoding:
+            headers[hdrs.CONTENT_ENCODING] = encoding
+        if body is not None:
+            return web.Response(body=body, headers=headers)
+        return web.FileResponse(served_path, headers=headers)
+
+
+class DashviewBootstrapView(HomeAssistantView):
+    """Serve the generated bootstrap module for code-split builds."""
+
+    url = BOOTSTRAP_URL
+    name = "dashview:bootstrap"
+    requires_auth = False
+
+    def __init__(self, asset_view: DashviewAssetView) -> None:
+        """Initialize the view.
+
+        Args:
+            asset_view: Asset view holding the current manifest
+        """
+        self._asset_view = asset_view
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Serve the bootstrap module."""
+        if self._asset_view.bootstrap is None:
+            raise web.HTTPNotFound
+        return web.Response(
+            text=self._asset_view.bootstrap,
+            content_type="text/javascript",
+            headers={hdrs.CACHE_CONTROL: CACHE_REVALIDATE},
+        )
@@ -0,0 +1,275 @@
+"""Dashview - Long-term statistics for week and month charts.
+
+Backs the dashview/statistics_summary command. Instead of raw state history
+it reads the recorder's pre-aggregated long-term statistics (5-minute,
+hourly or daily mean/min/max), so a 30-day chart reads at most 720 hourly
+rows per entity. Rows are merged into at most N chart points and returned
+in a columnar layout:
+
+    {"sensor.x": {"t": [...], "mean": [...], "min": [...], "max": [...]}}
+
+Results are cached per (entities, range, period, points). The range is
+aligned to the statistics period and entries expire when the recorder
+compiles the next period, so repeated requests between two compile runs
+never touch the database.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .history import DEFAULT_POINTS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Recorder statistics periods and their length in seconds
+PERIOD_5MINUTE = "5minute"
+PERIOD_HOUR = "hour"
+PERIOD_DAY = "day"
+PERIOD_SECONDS = {
+    PERIOD_5MINUTE: 300,
+    PERIOD_HOUR: 3600,
+    PERIOD_DAY: 86400,
+}
+PERIODS = tuple(PERIOD_SECONDS)
+
+# Longest range a request may cover
+MAX_RANGE_DAYS = 90
+
+# Automatic period selection: 5-minute data up to 2 days, hourly up to
+# 31 days (at most 744 rows per entity), daily beyond
+AUTO_5MINUTE_MAX = timedelta(days=2)
+AUTO_HOUR_MAX = timedelta(days=31)
+
+# The recorder compiles 5-minute and hourly statistics shortly after each
+# period ends; daily statistics are reduced from the hourly ones, so they
+# change every hour
+COMPILE_INTERVAL = {
+    PERIOD_5MINUTE: 300,
+    PERIOD_HOUR: 3600,
+    PERIOD_DAY: 3600,
+}
+COMPILE_DELAY = 15
+
+# Cached responses
+MAX_CACHE_ENTRIES = 64
+
+_STAT_TYPES = {"mean", "min", "max"}
+
+
+def select_period(start_time: datetime, end_time: datetime) -> str:
+    """Pick the coarsest period that still gives a detailed chart."""
+    span = end_time - start_time
+    if span <= AUTO_5MINUTE_MAX:
+        return PERIOD_5MINUTE
+    if span <= AUTO_HOUR_MAX:
+        return PERIOD_HOUR
+    return PERIOD_DAY
+
+
+def align_range(start_ts: float, end_ts: float, period: str) -> tuple[float, float]:
+    """Extend a range to whole statistics periods.
+
+    The end is rounded up so the currently open period (not compiled yet)
+    is included once it is, and requests made within one period share a
+    cache key. Days are local days, like the recorder's daily statistics
+    (23 or 25 hours long on DST changes).
+    """
+    if period == PERIOD_DAY:
+        start_day = dt_util.start_of_local_day(
+            dt_util.as_local(dt_util.utc_from_timestamp(start_ts))
+        )
+        end_day = dt_util.start_of_local_day(
+            dt_util.as_local(dt_util.utc_from_timestamp(end_ts))
+        )
+        end = end_day.timestamp()
+        if end < end_ts:
+            end = dt_util.start_of_local_day(
+                end_day.date() + timedelta(days=1)
+            ).timestamp()
+        return start_day.timestamp(), end
+
+    length = PERIOD_SECONDS[period]
+    start = start_ts - start_ts % length
+    end = end_ts - end_ts % length
+    if end < end_ts:
+        end += length
+    return start, end
+
+
+def _row_start(row: dict[str, Any]) -> float:
+    """Return a statistics row's start as epoch seconds."""
+    start = row["start"]
+    if isinstance(start, datetime):
+        return start.timestamp()
+    return float(start)
+
+
+def merge_rows(rows: list[dict[str, Any]], points: int) -> dict[str, list]:
+    """Merge consecutive statistics rows into at most `points` points.
+
+    Each output point starts at its first row; mean is the average of the
+    row means, min and max are the extremes of the group, so peaks are
+    never lost.
+
+    Args:
+        rows: Statistics rows for one entity, oldest first
+        points: Maximum number of output points
+
+    Returns:
+        Columnar dict with "t", "mean", "min" and "max" lists
+    """
+    rows = [row for row in rows if row.get("mean") is not None]
+    result: dict[str, list] = {"t": [], "mean": [], "min": [], "max": []}
+    if not rows:
+        return result
+
+    size = max(1, -(-len(rows) // points))  # ceil division
+    for index in range(0, len(rows), size):
+        group = rows[index:index + size]
+        means = [row["mean"] for row in group]
+        mins = [row["min"] for row in group if row.get("min") is not None]
+        maxs = [row["max"] for row in group if row.get("max") is not None]
+        result["t"].append(int(_row_start(group[0])))
+        result["mean"].append(round(sum(means) / len(means), 4))
+        result["min"].append(min(mins) if mins else None)
+        result["max"].append(max(maxs) if maxs else None)
+    return result
+
+
+def _fetch_statistics_summary(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    period: str,
+    points: int,
+) -> dict[str, dict[str, list]]:
+    """Query long-term statistics and merge rows. Runs in the recorder executor."""
+    # Imported lazily: recorder is an optional (after_) dependency
+    from homeassistant.components.recorder.statistics import (
+        statistics_during_period,
+    )
+
+    result = statistics_during_period(
+        hass,
+        start_time,
+        end_time,
+        set(entity_ids),
+        period,
+        None,
+        _STAT_TYPES,
+    )
+    return {
+        entity_id: merge_rows(result.get(entity_id, []), points)
+        for entity_id in entity_ids
+    }
+
+
+class StatisticsCache:
+    """LRU cache of statistics summaries that expire with the next compile."""
+
+    def __init__(self, max_entries: int = MAX_CACHE_ENTRIES) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, now: float | None = None) -> dict | None:
+        """Return a cached result if it has not expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, value = entry
+        if (now if now is not None else time.time()) >= expires:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: tuple, value: dict, expires: float) -> None:
+        """Store a result until `expires` (epoch seconds)."""
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_report(self) -> dict[str, Any]:
+        """Return cache statistics for diagnostics."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def next_compile_time(now: float, period: str) -> float:
+    """Return when the recorder next updates statistics of a period."""
+    interval = COMPILE_INTERVAL[period]
+    return now - now % interval + interval + COMPILE_DELAY
+
+
+async def async_get_statistics_summary(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime,
+    period: str,
+    points: int = DEFAULT_POINTS,
+    cache: StatisticsCache | None = None,
+) -> tuple[float, float, dict[str, dict[str, list]]]:
+    """Fetch merged long-term statistics for several entities at once.
+
+    The recorder must be loaded; handlers check hass.config.components
+    first.
+
+    Args:
+        hass: Home Assistant instance
+        entity_ids: Entities (statistic IDs) to fetch
+        start_time: Range start (timezone-aware)
+        end_time: Range end (timezone-aware)
+        period: Statistics period (5minute, hour or day)
+        points: Maximum points per series
+        cache: Response cache, if enabled
+
+    Returns:
+        Tuple of (aligned start, aligned end, series by entity_id)
+    """
+    start_ts, end_ts = align_range(
+        start_time.timestamp(), end_time.timestamp(), period
+    )
+    key = (tuple(sorted(entity_ids)), start_ts, end_ts, period, points)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return start_ts, end_ts, {eid: cached[eid] for eid in entity_ids}
+
+    from homeassistant.components.recorder import get_instance
+
+    tz = start_time.tzinfo
+    series = await get_instance(hass).async_add_executor_job(
+        _fetch_statistics_summary,
+        hass,
+        entity_ids,
+        datetime.fromtimestamp(start_ts, tz),
+        datetime.fromtimestamp(end_ts, tz),
+        period,
+        points,
+    )
+    if cache is not None:
+        cache.set(key, series, next_compile_time(time.time(), period))
+    return start_ts, end_ts, series
@@ -0,0 +1,323 @@
+"""Dashview - Event-driven info-text status summary.
+
+Backs the dashview/subscribe_status command. The info-text row (open
+windows, lights on, low batteries, ...) was derived in every panel by
+checking all enabled entities - and for batteries every state in
+hass.states - on each render. The engine keeps, per status group enabled
+in settings["infoTextConfig"], the set of displayed entities and the ones
+currently in the group's active state, updated per state_changed event.
+
+Subscribers receive a compact summary; the panel formats the texts from
+the few entities it names:
+
+    {"summary": {group: {"ids": [...], "total": n}, "battery": [...]}}
+    {"changed": {group: {...} | None}}
+
+"ids" are the active entities (longest active first) or, when none is,
+the most recently changed one, so "last motion ... ago" and "no leaks"
+can still be shown.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .entities import enabled_entries
+from .recent_values import parse_numeric
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _is_on(state: Any) -> bool:
+    return state.state == "on"
+
+
+def _is_open_door(state: Any) -> bool:
+    return state.state == "on" and state.attributes.get("device_class") == "door"
+
+
+def _is_open_cover(state: Any) -> bool:
+    # Anything but closed counts (opening, closing, stopped, ...)
+    return state.entity_id.startswith("cover.") and state.state != "closed"
+
+
+# infoTextConfig key -> (category, active predicate); mirrors
+# frontend/services/status-service.js
+STATUS_GROUPS: dict[str, tuple[str, Callable[[Any], bool]]] = {
+    "water": ("waterLeak", _is_on),
+    "smoke": ("smoke", _is_on),
+    "doors": ("door", _is_open_door),
+    "locks": ("lock", lambda state: state.state == "unlocked"),
+    "garage": ("garage", lambda state: state.state == "open"),
+    "windows": ("window", _is_on),
+    "roofWindows": ("roofWindow", _is_on),
+    "motion": ("motion", _is_on),
+    "lights": ("light", _is_on),
+    "covers": ("cover", _is_open_cover),
+    "tvs": ("tv", _is_on),
+}
+
+# Groups enabled when infoTextConfig does not mention them (DEFAULT_SETTINGS)
+DEFAULT_ENABLED = ("motion", "garage")
+
+BATTERY_GROUP = "batteryLow"
+DEFAULT_BATTERY_THRESHOLD = 20
+
+StatusListener = Callable[[dict[str, Any]], None]
+
+
+def group_enabled(info_text_config: dict, key: str) -> bool:
+    """Return whether a status group is shown in the info-text row."""
+    config = info_text_config.get(key)
+    if not isinstance(config, dict) or "enabled" not in config:
+        return key in DEFAULT_ENABLED
+    return bool(config["enabled"])
+
+
+def is_battery_sensor(entity_id: str, state: Any) -> bool:
+    """Return whether the panel treats an entity as a battery sensor."""
+    return (
+        "battery" in entity_id
+        or state.attributes.get("device_class") == "battery"
+    )
+
+
+@dataclass
+class StatusGroup:
+    """Members of one status group and the ones currently active.
+
+    Attributes:
+        members: Displayed entity IDs, sorted
+        active: Active entity ID -> last_changed timestamp
+        last_inactive: (last_changed, entity ID) of the most recently
+            changed inactive entity
+    """
+
+    members: list[str]
+    active: dict[str, float] = field(default_factory=dict)
+    last_inactive: tuple[float, str] | None = None
+
+    def summary(self) -> dict[str, Any]:
+        """Return the compact summary sent to the panel."""
+        if self.active:
+            ids = sorted(self.active, key=lambda entity_id: self.active[entity_id])
+        elif self.last_inactive is not None:
+            ids = [self.last_inactive[1]]
+        else:
+            ids = self.members[:1]
+        return {"ids": ids, "total": len(self.members)}
+
+
+class StatusEngine:
+    """Incrementally maintained info-text status summary."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the engine.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._groups: dict[str, StatusGroup] = {}
+        # entity_id -> (group key, predicate)
+        self._index: dict[str, list[tuple[str, Callable[[Any], bool]]]] = {}
+        self._battery_threshold: float | None = None
+        self._batteries: dict[str, float] = {}
+        self._summary: dict[str, Any] = {}
+        self._listeners: list[StatusListener] = []
+        self._unsub: CALLBACK_TYPE | None = None
+        self._unsub_battery: CALLBACK_TYPE | None = None
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        """Current summary of every enabled group."""
+        return dict(self._summary)
+
+    @callback
+    def async_rebuild(self, settings: dict) -> None:
+        """Apply infoTextConfig and the displayed entities from the settings.
+
+        Args:
+            settings: Dashview settings
+        """
+        hass = self._hass
+        config = settings.get("infoTextConfig") or {}
+        keys = [key for key in STATUS_GROUPS if group_enabled(config, key)]
+        entries = enabled_entries(
+            hass, settings, {STATUS_GROUPS[key][0] for key in keys}
+        )
+
+        self._groups = {}
+        self._index = {}
+        for key in keys:
+            category, predicate = STATUS_GROUPS[key]
+            members = [entry.entity_id for entry in entries[category]]
+            self._groups[key] = StatusGroup(members)
+            for entity_id in members:
+                self._index.setdefault(entity_id, []).append((key, predicate))
+        for entity_id in self._index:
+            self._apply_state(entity_id, hass.states.get(entity_id))
+
+        self._stop_tracking()
+        if self._index:
+            self._unsub = async_track_state_change_event(
+                hass, list(self._index), self._async_state_changed
+            )
+
+        self._batteries = {}
+        self._battery_threshold = None
+        if group_enabled(config, BATTERY_GROUP):
+            battery = config.get(BATTERY_GROUP) or {}
+            threshold = parse_numeric(battery.get("threshold"))
+            self._battery_threshold = (
+                DEFAULT_BATTERY_THRESHOLD if threshold is None else threshold
+            )
+            # Battery sensors are found by name or device class across all
+            # entities, so this scans once and then follows every event
+            for state in hass.states.async_all():
+                self._apply_battery(state.entity_id, state)
+            self._unsub_battery = hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_battery_changed
+            )
+
+        _LOGGER.debug(
+            "Status engine rebuilt: %d groups, %d entities",
+            len(self._groups),
+            len(self._index),
+        )
+        self._publish(set(self._summary) | set(self._groups) | {"battery"})
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for state changes."""
+        self._stop_tracking()
+        self._listeners.clear()
+
+    @callback
+    def async_add_listener(self, listener: StatusListener) -> CALLBACK_TYPE:
+        """Register a callback receiving {group: summary or None} changes.
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def async_update_entity(self, entity_id: str, state: Any) -> None:
+        """Apply an entity's new state and notify about changed groups."""
+        changed = self._apply_state(entity_id, state)
+        if self._battery_threshold is not None and self._apply_battery(
+            entity_id, state
+        ):
+            changed.add("battery")
+        if changed:
+            self._publish(changed)
+
+    def get_report(self) -> dict[str, Any]:
+        """Return engine statistics for diagnostics."""
+        return {
+            "groups": sorted(self._groups),
+            "entities": len(self._index),
+            "low_batteries": len(self._batteries),
+            "subscribers": len(self._listeners),
+        }
+
+    def _stop_tracking(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._unsub_battery is not None:
+            self._unsub_battery()
+            self._unsub_battery = None
+
+    def _apply_state(self, entity_id: str, state: Any) -> set[str]:
+        """Update the groups an entity belongs to.
+
+        Returns:
+            Keys of groups whose active set changed
+        """
+        changed: set[str] = set()
+        for key, predicate in self._index.get(entity_id, ()):
+            group = self._groups[key]
+            was_active = entity_id in group.active
+            if state is not None and predicate(state):
+                last_changed = state.last_changed.timestamp()
+                if group.active.get(entity_id) != last_changed:
+                    group.active[entity_id] = last_changed
+                    changed.add(key)
+            elif was_active:
+                del group.active[entity_id]
+                changed.add(key)
+            if state is not None and entity_id not in group.active:
+                # Most recently changed inactive entity ("last motion ...")
+                candidate = (state.last_changed.timestamp(), entity_id)
+                if group.last_inactive is None or candidate > group.last_inactive:
+                    group.last_inactive = candidate
+                    changed.add(key)
+        return changed
+
+    def _apply_battery(self, entity_id: str, state: Any) -> bool:
+        """Update the low battery set.
+
+        Returns:
+            Whether the set changed
+        """
+        value = None
+        if state is not None and is_battery_sensor(entity_id, state):
+            value = parse_numeric(state.state)
+        if value is not None and 0 <= value < self._battery_threshold:
+            changed = self._batteries.get(entity_id) != value
+            self._batteries[entity_id] = value
+            return changed
+        return self._batteries.pop(entity_id, None) is not None
+
+    def _publish(self, keys: set[str]) -> None:
+        """Recompute the summary of some groups and notify about changes."""
+        changes: dict[str, Any] = {}
+        for key in keys:
+            if key == "battery":
+                value = (
+                    sorted(self._batteries, key=self._batteries.__getitem__)
+                    if self._battery_threshold is not None
+                    else None
+                )
+            else:
+                group = self._groups.get(key)
+                value = group.summary() if group is not None else None
+            if value != self._summary.get(key):
+                changes[key] = value
+                if value is None:
+                    self._summary.pop(key, None)
+                else:
+                    self._summary[key] = value
+        if changes:
+            for listener in list(self._listeners):
+                listener(changes)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Apply a state_changed event of a displayed entity."""
+        entity_id = event.data["entity_id"]
+        changed = self._apply_state(entity_id, event.data.get("new_state"))
+        if changed:
+            self._publish(changed)
+
+    @callback
+    def _async_battery_changed(self, event: Event) -> None:
+        """Apply a state_changed event to the low battery set."""
+        if self._battery_threshold is not None and self._apply_battery(
+            event.data["entity_id"], event.data.get("new_state")
+        ):
+            self._publish({"battery"})
@@ -0,0 +1,233 @@
+"""Dashview - Settings storage and compact encoding.
+
+The enabled* settings maps ({entity_id: true/false}) repeat long entity IDs
+and dominated the stored document and the settings payloads. In compact
+form the entity IDs of all these maps are interned once in a sorted table
+and each map lists the indexes of its enabled and disabled entities:
+
+    {"_entityTable": ["light.a", "light.b", "sensor.c"],
+     "enabledLights": {"on": [0], "off": [1]},
+     "enabledTemperatureSensors": {"on": [2], "off": []}}
+
+Entities missing from a map stay missing (enabled by default). The store
+keeps settings in compact form since version 2; SettingsStore encodes and
+decodes transparently, so the rest of the integration keeps working with
+plain maps. Clients opt into the compact form on the wire (see
+websocket.py).
+
+Older files are migrated once on load by the steps in MIGRATIONS, in the
+executor, and saved right away; their durations are kept for diagnostics.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.settings"
+STORAGE_VERSION = 3
+
+ENTITY_TABLE_KEY = "_entityTable"
+_ENABLED_PREFIX = "enabled"
+
+# Written by Dashview versions that kept media presets outside the settings
+LEGACY_MEDIA_PRESETS_FILE = "www/dashview/config/media_presets.json"
+
+
+def is_enabled_map(key: str, value: Any) -> bool:
+    """Return whether a settings entry is a plain {id: bool} enabled* map."""
+    return (
+        key.startswith(_ENABLED_PREFIX)
+        and isinstance(value, dict)
+        and all(isinstance(enabled, bool) for enabled in value.values())
+    )
+
+
+def _is_encoded_map(key: str, value: Any) -> bool:
+    return (
+        key.startswith(_ENABLED_PREFIX)
+        and isinstance(value, dict)
+        and set(value) == {"on", "off"}
+        and all(isinstance(indexes, list) for indexes in value.values())
+    )
+
+
+def encode_settings(settings: dict) -> dict:
+    """Return settings with the enabled* maps in compact form.
+
+    Other entries (including maps with non-boolean values such as
+    enabledAppliances) are kept as they are. Always adds the entity table,
+    so encoded documents are recognizable even without enabled* maps.
+    """
+    maps = {
+        key: value for key, value in settings.items() if is_enabled_map(key, value)
+    }
+    table = sorted({entity_id for value in maps.values() for entity_id in value})
+    index = {entity_id: i for i, entity_id in enumerate(table)}
+    result = {key: value for key, value in settings.items() if key not in maps}
+    for key, value in maps.items():
+        result[key] = {
+            "on": sorted(index[entity_id] for entity_id, on in value.items() if on),
+            "off": sorted(
+                index[entity_id] for entity_id, on in value.items() if not on
+            ),
+        }
+    result[ENTITY_TABLE_KEY] = table
+    return result
+
+
+def decode_settings(data: dict) -> dict:
+    """Return settings with compact enabled* maps expanded.
+
+    Documents without an entity table are returned unchanged.
+
+    Raises:
+        ValueError: If a map references an index outside the table
+    """
+    table = data.get(ENTITY_TABLE_KEY)
+    if table is None:
+        return data
+    if not isinstance(table, list):
+        raise ValueError(f"Invalid {ENTITY_TABLE_KEY}")
+    result = {}
+    for key, value in data.items():
+        if key == ENTITY_TABLE_KEY:
+            continue
+        if not _is_encoded_map(key, value):
+            result[key] = value
+            continue
+        expanded: dict[str, bool] = {}
+        for state, enabled in (("on", True), ("off", False)):
+            for i in value[state]:
+                if not isinstance(i, int) or not 0 <= i < len(table):
+                    raise ValueError(f"Invalid entity index in {key}: {i}")
+                expanded[table[i]] = enabled
+        result[key] = expanded
+    return result
+
+
+def _import_legacy_media_presets(settings: dict, config_dir: Path) -> dict:
+    """Import media presets from the legacy JSON file, if none are set."""
+    if settings.get("mediaPresets"):
+        return settings
+    path = config_dir / LEGACY_MEDIA_PRESETS_FILE
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return settings
+    except (OSError, ValueError) as err:
+        _LOGGER.warning("Could not import legacy media presets from %s: %s", path, err)
+        return settings
+    presets = data.get("media_presets") if isinstance(data, dict) else None
+    if not isinstance(presets, list):
+        return settings
+    presets = [
+        preset for preset in presets
+        if isinstance(preset, dict)
+        and isinstance(preset.get("media_content_id"), str)
+    ]
+    if not presets:
+        return settings
+    _LOGGER.info("Imported %d media presets from %s", len(presets), path)
+    return {**settings, "mediaPresets": presets}
+
+
+# (version, name, step): steps of all versions newer than the stored one
+# run in order. Steps get plain settings and the Home Assistant config
+# directory and run in the executor, so they may read files. Version 2
+# only changed the stored format, which SettingsStore handles.
+MIGRATIONS: tuple[tuple[int, str, Callable[[dict, Path], dict]], ...] = (
+    (3, "legacy_media_presets", _import_legacy_media_presets),
+)
+
+
+def migrate_settings(
+    old_version: int, data: dict, config_dir: Path
+) -> tuple[dict, dict[str, float]]:
+    """Migrate stored settings to STORAGE_VERSION. Runs in the executor.
+
+    Args:
+        old_version: Major version of the stored data, 0 if there is none
+        data: Stored settings, plain or compact
+        config_dir: Home Assistant config directory
+
+    Returns:
+        Tuple of the plain migrated settings and the duration of each
+        step that ran, in ms
+    """
+    settings = decode_settings(data)
+    timings: dict[str, float] = {}
+    for version, name, migrate in MIGRATIONS:
+        if old_version >= version:
+            continue
+        start = time.perf_counter()
+        settings = migrate(settings, config_dir)
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return settings, timings
+
+
+class SettingsStore(Store):
+    """Settings store keeping the enabled* maps in compact form on disk."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the settings store.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        super().__init__(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._config_dir = Path(hass.config.config_dir)
+        # Step name -> duration in ms of the migrations run by the last load
+        self.migration_timings: dict[str, float] = {}
+
+    async def async_load(self) -> dict | None:
+        """Load the settings with plain enabled* maps.
+
+        Migrated settings are saved right away, so migrations run once.
+        Without stored settings the migration steps run from scratch to
+        pick up legacy files; their result is saved even if empty, so a
+        new installation does not look for legacy files on every start.
+        """
+        self.migration_timings = {}
+        data = await super().async_load()
+        if data is None:
+            data = await self._async_migrate_func(0, 0, {})
+            await self.async_save(data)
+        elif self.migration_timings:
+            await self.async_save(data)
+        return decode_settings(data) or None
+
+    async def async_save(self, data: dict) -> None:
+        """Save the settings with compact enabled* maps."""
+        await super().async_save(encode_settings(data))
+
+    def get_report(self) -> dict[str, Any]:
+        """Return the storage version and last migrations for diagnostics."""
+        return {
+            "version": STORAGE_VERSION,
+            "migration_timings": self.migration_timings,
+        }
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict
+    ) -> dict:
+        """Migrate data written by older versions in the executor."""
+        settings, self.migration_timings = await self.hass.async_add_executor_job(
+            migrate_settings, old_major_version, old_data, self._config_dir
+        )
+        if self.migration_timings:
+            _LOGGER.info(
+                "Migrated Dashview settings from version %d (ms): %s",
+                old_major_version, self.migration_timings,
+            )
+        return settings
@@ -0,0 +1,397 @@
+"""Dashview - Event-driven smart suggestions.
+
+Backs the dashview/subscribe_suggestions command. The panel evaluated
+every suggestion rule (frontend/services/suggestion-engine.js) against
+hass.states on each render, and kept cooldowns and dismissals in each
+browser's localStorage, so tablets disagreed and all of them did the work.
+
+Here each rule depends on a few condition sets (lights on, active
+climates, open windows, sun below the horizon). A condition set keeps its
+displayed members and the ones currently matching; a state_changed event
+updates only the sets the entity belongs to and re-evaluates only the
+rules depending on them. Cooldowns and dismissals are shared by all
+panels and persisted in their own Dashview store.
+
+Subscribers receive the active suggestions; texts, icons and actions are
+built by the panel:
+
+    {"suggestions": [{"rule": id, "entity_ids": [...], "priority": n,
+                      "level": "info" | "warning"}, ...]}
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Iterable
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+    async_track_time_change,
+)
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .entities import enabled_entries
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.suggestions"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# Suggestions shown at once (as in the panel)
+MAX_VISIBLE = 2
+
+SUN_ENTITY = "sun.sun"
+
+ACTIVE_CLIMATE_STATES = (
+    "cool", "heat", "heat_cool", "auto", "heating", "cooling", "dry",
+)
+
+# Condition set -> (category, matching predicate)
+CONDITIONS: dict[str, tuple[str, Callable[[Any], bool]]] = {
+    "lights_on": ("light", lambda state: state.state == "on"),
+    "climates_active": (
+        "climate", lambda state: state.state in ACTIVE_CLIMATE_STATES
+    ),
+    "windows_open": ("window", lambda state: state.state == "on"),
+}
+SUN_CONDITION = "sun_below"
+
+# Actions reported by the panel
+ACTION_DISMISS = "dismiss"
+ACTION_TAKEN = "taken"
+ACTIONS = (ACTION_DISMISS, ACTION_TAKEN)
+
+SuggestionsListener = Callable[[list[dict[str, Any]]], None]
+
+
+@dataclass
+class ConditionSet:
+    """Displayed members of a condition and the ones currently matching."""
+
+    members: set[str] = field(default_factory=set)
+    active: set[str] = field(default_factory=set)
+
+
+def _lights_left_on(sets: dict[str, ConditionSet], now: datetime) -> list[str] | None:
+    # Late night (after 23:00) with 2+ lights still on
+    if now.hour < 23 or len(sets["lights_on"].active) < 2:
+        return None
+    return sorted(sets["lights_on"].active)
+
+
+def _ac_windows_conflict(
+    sets: dict[str, ConditionSet], now: datetime
+) -> list[str] | None:
+    # Heating or cooling while a window is open
+    if not sets["climates_active"].active or not sets["windows_open"].active:
+        return None
+    return sorted(sets["windows_open"].active)
+
+
+def _sunset_lights(sets: dict[str, ConditionSet], now: datetime) -> list[str] | None:
+    # Sun below the horizon and no light on yet
+    lights = sets["lights_on"]
+    if not sets[SUN_CONDITION].active or not lights.members or lights.active:
+        return None
+    return []
+
+
+@dataclass(frozen=True)
+class SuggestionRule:
+    """A suggestion rule; mirrors RULES in suggestion-engine.js.
+
+    Attributes:
+        rule_id: Rule identifier shared with the panel
+        cooldown: Seconds the rule stays silent after dismiss or action
+        priority: Higher priorities are shown first
+        level: "info" or "warning"
+        conditions: Condition sets the rule depends on
+        evaluate: Returns the triggering entity IDs, or None if inactive
+        time_dependent: Whether the result depends on the time of day
+    """
+
+    rule_id: str
+    cooldown: int
+    priority: int
+    level: str
+    conditions: tuple[str, ...]
+    evaluate: Callable[[dict[str, ConditionSet], datetime], list[str] | None]
+    time_dependent: bool = False
+
+
+RULES = (
+    SuggestionRule(
+        "lights-left-on", 60 * 60, 50, "info",
+        ("lights_on",), _lights_left_on, time_dependent=True,
+    ),
+    SuggestionRule(
+        "ac-windows-conflict", 30 * 60, 80, "warning",
+        ("climates_active", "windows_open"), _ac_windows_conflict,
+    ),
+    SuggestionRule(
+        "sunset-lights", 120 * 60, 30, "info",
+        (SUN_CONDITION, "lights_on"), _sunset_lights,
+    ),
+)
+RULES_BY_ID = {rule.rule_id: rule for rule in RULES}
+
+
+class SuggestionEngine:
+    """Incrementally evaluated suggestion rules with shared cooldowns."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the engine.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._sets: dict[str, ConditionSet] = {}
+        # entity_id -> condition set names
+        self._index: dict[str, list[str]] = {}
+        # rule_id -> triggering entity IDs of active rules
+        self._results: dict[str, list[str]] = {}
+        # rule_id -> cooldown start (epoch seconds)
+        self._cooldowns: dict[str, float] = {}
+        # Dismissed rules stay hidden until their condition clears
+        self._dismissed: set[str] = set()
+        self._suggestions: list[dict[str, Any]] = []
+        self._listeners: list[SuggestionsListener] = []
+        self._unsub: CALLBACK_TYPE | None = None
+        self._unsub_hourly: CALLBACK_TYPE | None = None
+        self._unsub_cooldown: CALLBACK_TYPE | None = None
+        self.evaluations = 0
+
+    @property
+    def suggestions(self) -> list[dict[str, Any]]:
+        """Currently visible suggestions, highest priority first."""
+        return list(self._suggestions)
+
+    async def async_load(self) -> None:
+        """Load cooldowns and dismissals from the store."""
+        data = await self._store.async_load() or {}
+        self._cooldowns = {
+            rule_id: float(started)
+            for rule_id, started in (data.get("cooldowns") or {}).items()
+            if rule_id in RULES_BY_ID
+        }
+        self._dismissed = {
+            rule_id for rule_id in data.get("dismissed") or [] if rule_id in RULES_BY_ID
+        }
+
+    @callback
+    def async_rebuild(self, settings: dict) -> None:
+        """Resolve the condition members from the settings and re-evaluate.
+
+        Args:
+            settings: Dashview settings
+        """
+        hass = self._hass
+        categories = {category for category, _ in CONDITIONS.values()}
+        entries = enabled_entries(hass, settings, categories)
+
+        self._sets = {}
+        self._index = {}
+        for name, (category, _) in CONDITIONS.items():
+            members = {entry.entity_id for entry in entries[category]}
+            self._sets[name] = ConditionSet(members)
+            for entity_id in members:
+                self._index.setdefault(entity_id, []).append(name)
+        self._sets[SUN_CONDITION] = ConditionSet({SUN_ENTITY})
+        self._index.setdefault(SUN_ENTITY, []).append(SUN_CONDITION)
+        for entity_id in self._index:
+            self._apply_state(entity_id, hass.states.get(entity_id))
+
+        self._stop_tracking()
+        self._unsub = async_track_state_change_event(
+            hass, list(self._index), self._async_state_changed
+        )
+        # Time-dependent rules change on the hour
+        self._unsub_hourly = async_track_time_change(
+            hass, self._async_hourly, minute=0, second=0
+        )
+        self._evaluate(RULES)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for state and time changes."""
+        self._stop_tracking()
+        if self._unsub_cooldown is not None:
+            self._unsub_cooldown()
+            self._unsub_cooldown = None
+        self._listeners.clear()
+
+    @callback
+    def async_add_listener(self, listener: SuggestionsListener) -> CALLBACK_TYPE:
+        """Register a callback receiving the visible suggestions on change.
+
+        Returns:
+            Function removing the listener
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def async_update_entity(self, entity_id: str, state: Any) -> None:
+        """Apply an entity's new state and re-evaluate dependent rules."""
+        changed = self._apply_state(entity_id, state)
+        if changed:
+            self._evaluate(
+                [rule for rule in RULES if changed.intersection(rule.conditions)]
+            )
+
+    @callback
+    def async_record_action(
+        self, rule_id: str, action: str, now: float | None = None
+    ) -> None:
+        """Start a rule's cooldown after it was dismissed or acted upon.
+
+        Args:
+            rule_id: Rule identifier
+            action: ACTION_DISMISS or ACTION_TAKEN
+            now: Current time in epoch seconds
+
+        Raises:
+            KeyError: If the rule is unknown
+        """
+        rule = RULES_BY_ID[rule_id]
+        self._cooldowns[rule_id] = time.time() if now is None else now
+        if action == ACTION_DISMISS:
+            self._dismissed.add(rule_id)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        self._evaluate((rule,))
+
+    def get_report(self) -> dict[str, Any]:
+        """Return engine statistics for diagnostics."""
+        return {
+            "entities": len(self._index),
+            "active_rules": sorted(self._results),
+            "cooldowns": len(self._cooldowns),
+            "dismissed": sorted(self._dismissed),
+            "evaluations": self.evaluations,
+            "subscribers": len(self._listeners),
+        }
+
+    def _stop_tracking(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._unsub_hourly is not None:
+            self._unsub_hourly()
+            self._unsub_hourly = None
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "cooldowns": self._cooldowns,
+            "dismissed": sorted(self._dismissed),
+        }
+
+    def _apply_state(self, entity_id: str, state: Any) -> set[str]:
+        """Update the condition sets an entity belongs to.
+
+        Returns:
+            Names of condition sets whose active entities changed
+        """
+        changed: set[str] = set()
+        for name in self._index.get(entity_id, ()):
+            if name == SUN_CONDITION:
+                matches = state is not None and state.state == "below_horizon"
+            else:
+                matches = state is not None and CONDITIONS[name][1](state)
+            active = self._sets[name].active
+            if matches != (entity_id in active):
+                if matches:
+                    active.add(entity_id)
+                else:
+                    active.discard(entity_id)
+                changed.add(name)
+        return changed
+
+    def _local_now(self) -> datetime:
+        """Return the current time in Home Assistant's time zone."""
+        return dt_util.now()
+
+    def _evaluate(self, rules: Iterable[SuggestionRule]) -> None:
+        """Re-evaluate some rules and publish the visible suggestions."""
+        now = self._local_now()
+        for rule in rules:
+            self.evaluations += 1
+            result = rule.evaluate(self._sets, now)
+            if result is None:
+                self._results.pop(rule.rule_id, None)
+                if rule.rule_id in self._dismissed:
+                    # The condition cleared; the next occurrence is shown
+                    self._dismissed.discard(rule.rule_id)
+                    self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+            else:
+                self._results[rule.rule_id] = result
+        self._publish()
+
+    def _publish(self) -> None:
+        """Recompute the visible suggestions and notify on change."""
+        now = time.time()
+        visible: list[dict[str, Any]] = []
+        next_expiry: float | None = None
+        for rule_id, entity_ids in self._results.items():
+            rule = RULES_BY_ID[rule_id]
+            if rule_id in self._dismissed:
+                continue
+            started = self._cooldowns.get(rule_id)
+            if started is not None and now - started < rule.cooldown:
+                expiry = started + rule.cooldown
+                if next_expiry is None or expiry < next_expiry:
+                    next_expiry = expiry
+                continue
+            visible.append({
+                "rule": rule_id,
+                "entity_ids": entity_ids,
+                "priority": rule.priority,
+                "level": rule.level,
+            })
+        visible.sort(key=lambda suggestion: -suggestion["priority"])
+        visible = visible[:MAX_VISIBLE]
+
+        if self._unsub_cooldown is not None:
+            self._unsub_cooldown()
+            self._unsub_cooldown = None
+        if next_expiry is not None:
+            self._unsub_cooldown = async_call_later(
+                self._hass, max(next_expiry - now, 0), self._async_cooldown_expired
+            )
+
+        if visible != self._suggestions:
+            self._suggestions = visible
+            for listener in list(self._listeners):
+                listener(self.suggestions)
+
+    @callback
+    def _async_cooldown_expired(self, _now: Any) -> None:
+        """Show suggestions whose cooldown ended."""
+        self._unsub_cooldown = None
+        self._publish()
+
+    @callback
+    def _async_hourly(self, _now: Any) -> None:
+        """Re-evaluate time-dependent rules."""
+        self._evaluate([rule for rule in RULES if rule.time_dependent])
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Apply a state_changed event."""
+        self.async_update_entity(
+            event.data["entity_id"], event.data.get("new_state")
+        )
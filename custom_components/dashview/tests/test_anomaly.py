@@ -0,0 +1,220 @@
+"""Tests for server-side rate-of-change anomaly detection.
+
+Tests the sliding windows, threshold evaluation and subscriber
+notifications behind dashview/subscribe_anomalies.
+"""
+import sys
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+from custom_components.dashview import entities
+from custom_components.dashview.anomaly import (
+    KIND_HUMIDITY,
+    KIND_TEMPERATURE,
+    AnomalyDetector,
+    RateWindow,
+    evaluate,
+)
+from custom_components.dashview.recent_values import RecentValuesCache
+
+
+def _registry(*entries):
+    """Build an entity registry mock with (entity_id, labels) entries."""
+    registry = MagicMock()
+    registry.entities.values.return_value = [
+        MagicMock(entity_id=entity_id, labels=set(labels))
+        for entity_id, labels in entries
+    ]
+    return registry
+
+
+SETTINGS = {
+    "categoryLabels": {"temperature": "temp", "humidity": "hum"},
+    "tempRapidChangeThreshold": 3,
+    "tempRapidChangeWindowMinutes": 30,
+}
+
+
+def _detector(settings=SETTINGS, cache=None):
+    """Build a detector tracking sensor.t (temperature) and sensor.h (humidity)."""
+    detector = AnomalyDetector(MagicMock())
+    registry = _registry(("sensor.t", {"temp"}), ("sensor.h", {"hum"}))
+    with patch.object(entities.er, "async_get", return_value=registry):
+        detector.async_update_settings(settings, cache)
+    return detector
+
+
+class TestRateWindow:
+    """Test the sliding window."""
+
+    def test_expires_old_points(self):
+        """Points older than the window are dropped from the front."""
+        window = RateWindow(600)
+        for timestamp in (0, 300, 600, 900):
+            window.add(timestamp, float(timestamp))
+        assert [p[0] for p in window.points] == [300, 600, 900]
+
+    def test_coalesces_close_samples(self):
+        """Samples within a few seconds replace the newest point."""
+        window = RateWindow(600)
+        window.add(0, 1.0)
+        window.add(100, 2.0)
+        window.add(105, 3.0)
+        assert list(window.points) == [(0, 1.0), (105, 3.0)]
+
+    def test_keeps_anchor_point(self):
+        """The oldest point is never replaced by coalescing."""
+        window = RateWindow(600)
+        window.add(0, 1.0)
+        window.add(2, 5.0)
+        assert list(window.points) == [(0, 1.0), (2, 5.0)]
+
+    def test_rate_needs_a_minute(self):
+        """Changes over less than a minute are not rated."""
+        window = RateWindow(600)
+        window.add(0, 1.0)
+        window.add(30, 9.0)
+        assert window.rate(30) is None
+        window.add(90, 9.0)
+        assert window.rate(90) == (8.0, 90)
+
+
+class TestEvaluate:
+    """Test threshold evaluation."""
+
+    def test_falling_anomaly(self):
+        """Changes at or above the threshold are reported like the panel does."""
+        window = RateWindow(3600)
+        window.add(0, 22.0)
+        window.add(1800, 16.5)
+        assert evaluate(window, 5, 1800) == {
+            "change": 5.5,
+            "duration": 30,
+            "direction": "falling",
+        }
+
+    def test_within_threshold(self):
+        """Small changes are not anomalies."""
+        window = RateWindow(3600)
+        window.add(0, 22.0)
+        window.add(1800, 20.0)
+        assert evaluate(window, 5, 1800) is None
+
+
+class TestAnomalyDetector:
+    """Test the detector and its subscribers."""
+
+    def test_tracks_labelled_sensors_with_settings(self):
+        """Kinds and thresholds follow the settings."""
+        detector = _detector()
+        assert detector._kinds == {"sensor.t": KIND_TEMPERATURE, "sensor.h": KIND_HUMIDITY}
+        assert detector._thresholds[KIND_TEMPERATURE] == (3, 1800)
+        assert detector._thresholds[KIND_HUMIDITY] == (20, 1800)
+
+    def test_notifies_on_appear_and_clear(self):
+        """Listeners get the anomaly when it appears and None when it clears."""
+        detector = _detector()
+        received = []
+        detector.async_add_listener(received.append)
+        now = time.time()
+
+        detector.async_record("sensor.t", "21.0", now - 600)
+        detector.async_record("sensor.t", "17.5", now)
+        assert received == [{
+            "sensor.t": {
+                "change": 3.5,
+                "duration": 10,
+                "direction": "falling",
+                "kind": KIND_TEMPERATURE,
+            },
+        }]
+        assert "sensor.t" in detector.anomalies
+
+        # Unchanged anomaly -> no notification
+        detector.async_evaluate_all(now)
+        assert len(received) == 1
+
+        # Window moves past the first point -> cleared
+        detector.async_evaluate_all(now + 1500)
+        assert received[-1] == {"sensor.t": None}
+        assert detector.anomalies == {}
+
+    def test_ignores_untracked_and_non_numeric(self):
+        """Untracked sensors and non-numeric states are ignored."""
+        detector = _detector()
+        detector.async_record("sensor.other", "1", time.time())
+        detector.async_record("sensor.t", "unavailable", time.time())
+        assert detector.get_report()["points"] == 0
+
+    def test_removed_listener_not_called(self):
+        """The returned function removes the listener."""
+        detector = _detector()
+        received = []
+        remove = detector.async_add_listener(received.append)
+        remove()
+        now = time.time()
+        detector.async_record("sensor.h", "40", now - 600)
+        detector.async_record("sensor.h", "70", now)
+        assert received == []
+        assert detector.anomalies["sensor.h"]["direction"] == "rising"
+
+    def test_seeds_from_recent_values(self):
+        """Windows of new sensors start from the recent values cache."""
+        now = float(int(time.time()))
+        state = MagicMock()
+        state.state = "22"
+        state.last_updated = datetime.fromtimestamp(now - 900, timezone.utc)
+        hass = MagicMock()
+        hass.states.get = lambda entity_id: state
+        cache = RecentValuesCache(hass)
+        cache.async_set_tracked(["sensor.t"])
+        cache.record("sensor.t", "18", now - 60)
+
+        detector = _detector(cache=cache)
+        assert detector.anomalies["sensor.t"]["change"] == 4.0
+
+    def test_dropped_sensor_clears_anomaly(self):
+        """Sensors no longer displayed lose their anomaly."""
+        detector = _detector()
+        now = time.time()
+        detector.async_record("sensor.t", "21.0", now - 600)
+        detector.async_record("sensor.t", "10", now)
+        received = []
+        detector.async_add_listener(received.append)
+
+        with patch.object(entities.er, "async_get", return_value=_registry()):
+            detector.async_update_settings(SETTINGS)
+        assert received == [{"sensor.t": None}]
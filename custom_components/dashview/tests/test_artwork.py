@@ -0,0 +1,300 @@
+"""Tests for the media preset artwork cache.
+
+Runs against an in-process stand-in for the oEmbed endpoint and thumbnail
+host: batching, concurrency bound, local thumbnails, TTL, negative caching
+and the eviction budgets.
+"""
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.parse import urlparse
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import artwork
+from custom_components.dashview.artwork import (
+    ARTWORK_TTL,
+    MAX_CONCURRENT_FETCHES,
+    MAX_ENTRIES,
+    MAX_NEGATIVE_ENTRIES,
+    NEGATIVE_TTL,
+    ArtworkCache,
+)
+
+JPEG = b"\xff\xd8\xff\xe0" + b"x" * 100
+HOST = "http://stand-in"
+
+
+class ClientError(Exception):
+    """Stand-in for aiohttp.ClientError."""
+
+
+# The parts of aiohttp the cache uses
+FAKE_AIOHTTP = SimpleNamespace(
+    ClientError=ClientError,
+    ClientSession=MagicMock,
+    ClientTimeout=lambda total: total,
+)
+
+
+class Response:
+    """Response of the stand-in, used as an async context manager."""
+
+    def __init__(self, status, content_type, body):
+        self.status = status
+        self.content_type = content_type
+        self.content_length = len(body)
+        self._body = body
+        self.content = SimpleNamespace(iter_chunked=self._iter_chunked)
+
+    async def json(self, content_type=None):
+        return json.loads(self._body)
+
+    async def _iter_chunked(self, size):
+        for i in range(0, len(self._body), size):
+            yield self._body[i:i + size]
+
+
+class StandIn:
+    """oEmbed endpoint and thumbnail host.
+
+    Media IDs ending in ":missing" are unknown (404), ":broken" return a
+    body that is no JSON; every request waits `delay` seconds so
+    concurrent requests overlap.
+    """
+
+    def __init__(self):
+        self.requests: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self.delay = 0.0
+
+    def get(self, url, params=None, timeout=None):
+        return _Request(self, url, params or {})
+
+    async def respond(self, url, params):
+        self.requests.append(url)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            path = urlparse(url).path
+            if path == "/oembed":
+                media_id = params["url"]
+                if media_id.endswith(":missing"):
+                    return Response(404, "application/json", b"{}")
+                if media_id.endswith(":broken"):
+                    return Response(200, "text/html", b"<html>")
+                name = media_id.rsplit(":", 1)[1]
+                body = json.dumps({"thumbnail_url": f"{HOST}/thumb/{name}.jpg"})
+                return Response(200, "application/json", body.encode())
+            if path.startswith("/thumb/"):
+                return Response(200, "image/jpeg", JPEG)
+            return Response(404, "text/plain", b"")
+        finally:
+            self.active -= 1
+
+
+class _Request:
+    def __init__(self, stand_in, url, params):
+        self._response = stand_in.respond(url, params)
+
+    async def __aenter__(self):
+        return await self._response
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def session():
+    """Return the stand-in session."""
+    return StandIn()
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    """Return a factory building caches on the stand-in and a temp config dir."""
+    hass = MagicMock()
+    hass.config.path = lambda path: str(tmp_path / path)
+
+    async def executor_job(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = executor_job
+    with patch.object(artwork, "aiohttp", FAKE_AIOHTTP):
+        yield lambda session: ArtworkCache(hass, f"{HOST}/oembed", session)
+
+
+def _oembed_requests(session):
+    return [url for url in session.requests if url.endswith("/oembed")]
+
+
+class TestArtworkCache:
+    """Test resolving artwork against the stand-in server."""
+
+    @pytest.mark.asyncio
+    async def test_load_serves_directory(self, make_cache, session, tmp_path):
+        """Loading creates and registers the artwork directory once."""
+        cache = make_cache(session)
+        hass = cache._hass
+        hass.data = {}
+        hass.http.async_register_static_paths = AsyncMock()
+        cache._store.async_load = AsyncMock(return_value={"entries": {
+            "spotify:album:a": {
+                "url": "/local/dashview/artwork/a.jpg", "file": "a.jpg", "fetched": 1,
+            },
+        }})
+
+        await cache.async_load()
+        await cache.async_load()
+
+        assert (tmp_path / "www/dashview/artwork").is_dir()
+        hass.http.async_register_static_paths.assert_awaited_once()
+        assert cache._entries["spotify:album:a"]["url"] == "/dashview_artwork/a.jpg"
+
+    @pytest.mark.asyncio
+    async def test_batch_downloads_thumbnails(self, make_cache, session, tmp_path):
+        """Each media ID is resolved once and its thumbnail stored locally."""
+        result = await make_cache(session).async_resolve(
+            ["spotify:playlist:a", "spotify:playlist:b", "spotify:playlist:a"]
+        )
+
+        assert set(result) == {"spotify:playlist:a", "spotify:playlist:b"}
+        url = result["spotify:playlist:a"]
+        assert url.startswith("/dashview_artwork/")
+        stored = tmp_path / "www/dashview/artwork" / url.rsplit("/", 1)[1]
+        assert stored.read_bytes() == JPEG
+        assert len(_oembed_requests(session)) == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_within_ttl(self, make_cache, session):
+        """Repeated lookups are served from the cache until the TTL ends."""
+        cache = make_cache(session)
+        first = await cache.async_resolve(["spotify:album:x"])
+        assert await cache.async_resolve(["spotify:album:x"]) == first
+        assert len(_oembed_requests(session)) == 1
+
+        cache._entries["spotify:album:x"]["fetched"] -= ARTWORK_TTL
+        await cache.async_resolve(["spotify:album:x"])
+        assert len(_oembed_requests(session)) == 2
+
+    @pytest.mark.asyncio
+    async def test_negative_caching(self, make_cache, session):
+        """Unknown media is remembered for NEGATIVE_TTL, others skipped."""
+        cache = make_cache(session)
+        result = await cache.async_resolve(
+            ["spotify:track:missing", "http://radio.example/stream"]
+        )
+        assert result == {
+            "spotify:track:missing": None,
+            "http://radio.example/stream": None,
+        }
+        await cache.async_resolve(["spotify:track:missing"])
+        assert len(_oembed_requests(session)) == 1
+        assert cache.get_report()["negative"] == 1
+
+        cache._entries["spotify:track:missing"]["fetched"] -= NEGATIVE_TTL
+        await cache.async_resolve(["spotify:track:missing"])
+        assert len(_oembed_requests(session)) == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_artwork_kept_on_failure(self, make_cache, session):
+        """An unreachable source keeps serving the previous artwork."""
+        cache = make_cache(session)
+        result = await cache.async_resolve(["spotify:album:y"])
+        cache._entries["spotify:album:y"]["fetched"] -= ARTWORK_TTL
+        cache._oembed_url = f"{HOST}/gone"
+
+        assert await cache.async_resolve(["spotify:album:y"]) == result
+        assert cache.failures == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self, make_cache, session):
+        """At most MAX_CONCURRENT_FETCHES media IDs are fetched at once."""
+        session.delay = 0.05
+        media_ids = [
+            f"spotify:playlist:p{i}" for i in range(MAX_CONCURRENT_FETCHES * 2)
+        ]
+        result = await make_cache(session).async_resolve(media_ids)
+
+        assert all(result.values())
+        assert session.max_active <= MAX_CONCURRENT_FETCHES
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_fetch(self, make_cache, session):
+        """Overlapping requests for a media ID fetch it once."""
+        session.delay = 0.05
+        cache = make_cache(session)
+        first, second = await asyncio.gather(
+            cache.async_resolve(["spotify:album:z"]),
+            cache.async_resolve(["spotify:album:z"]),
+        )
+        assert first == second
+        assert len(_oembed_requests(session)) == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_json_is_negative(self, make_cache, session):
+        """An oEmbed body that is no JSON is cached as a failure."""
+        cache = make_cache(session)
+        result = await cache.async_resolve(["spotify:track:broken"])
+        assert result == {"spotify:track:broken": None}
+        assert cache.failures == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_evict_artwork(self, make_cache, session):
+        """Failures are evicted within their own budget."""
+        cache = make_cache(session)
+        now = artwork.time.time()
+        for i in range(MAX_ENTRIES):
+            cache._entries[f"spotify:album:a{i}"] = {
+                "url": f"/dashview_artwork/a{i}.jpg",
+                "file": f"a{i}.jpg",
+                "fetched": now - 60,
+            }
+        for i in range(MAX_NEGATIVE_ENTRIES):
+            cache._entries[f"spotify:album:n{i}:missing"] = {
+                "url": None, "file": None, "fetched": now - 30,
+            }
+
+        await cache.async_resolve(["spotify:track:new:missing"])
+
+        report = cache.get_report()
+        assert report["negative"] == MAX_NEGATIVE_ENTRIES
+        assert report["entries"] - report["negative"] == MAX_ENTRIES
+        assert "spotify:track:new:missing" in cache._entries
+        assert "spotify:album:n0:missing" not in cache._entries
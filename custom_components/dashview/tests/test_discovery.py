@@ -0,0 +1,184 @@
+"""Tests for the maintained discovery indexes.
+
+Tests attribute-based pollen and DWD warning detection, seeding the index
+and following state and registry changes.
+"""
+import sys
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import discovery
+from custom_components.dashview.discovery import (
+    DiscoveryIndex,
+    dwd_warning_info,
+    pollen_info,
+)
+
+
+def _state(value="1", **attributes):
+    """Build a State-like mock."""
+    return MagicMock(state=value, attributes=attributes)
+
+
+POLLEN = {"state_tomorrow": 1, "state_in_2_days": 0}
+WARNING = {"warning_count": 0, "region_name": "Berlin"}
+
+
+def _event(entity_id, old, new):
+    """Build a state_changed event."""
+    return MagicMock(data={"entity_id": entity_id, "old_state": old, "new_state": new})
+
+
+@pytest.fixture
+def registry():
+    """Patch the entity registry with one DWD warnings entity."""
+    entity_registry = MagicMock()
+    entry = MagicMock(entity_id="sensor.warn_level", platform="dwd_weather_warnings")
+    entity_registry.entities.values.return_value = [entry]
+    entity_registry.async_get = {"sensor.warn_level": entry}.get
+    with patch.object(discovery.er, "async_get", return_value=entity_registry):
+        yield entity_registry
+
+
+def _index(states):
+    """Build and start an index over the given states."""
+    hass = MagicMock()
+    hass.states.async_entity_ids = lambda domain: [
+        entity_id for entity_id in states if entity_id.startswith(f"{domain}.")
+    ]
+    hass.states.get = states.get
+    index = DiscoveryIndex(hass)
+    index.async_start()
+    return index
+
+
+class TestDetection:
+    """Test attribute-based detection (mirrors pollen-service.js)."""
+
+    def test_pollen_by_entity_id_pattern(self):
+        """Type and region come from sensor.pollenflug_[type]_[region]."""
+        assert pollen_info("sensor.pollenflug_birke_124", _state("2", **POLLEN), False) == {
+            "type": "birke", "region": "124",
+        }
+
+    def test_pollen_renamed_by_friendly_name(self):
+        """Renamed sensors are recognized by English or German names."""
+        state = _state("0.5", friendly_name="Birch pollen", **POLLEN)
+        assert pollen_info("sensor.my_pollen_7", state, False) == {
+            "type": "birke", "region": "7",
+        }
+
+    def test_pollen_requires_forecast_attributes_and_range(self):
+        """Other sensors and out-of-range values are not pollen sensors."""
+        assert pollen_info("sensor.pollenflug_birke_1", _state("2"), False) is None
+        assert pollen_info("sensor.pollenflug_birke_1", _state("7", **POLLEN), False) is None
+        assert pollen_info("sensor.x_1", _state("1", **POLLEN), False) is None
+
+    def test_dwd_warning_by_platform_or_attributes(self):
+        """DWD warning sensors match by platform or attributes."""
+        assert dwd_warning_info("sensor.a", _state("0", **WARNING), False) == {
+            "region": "Berlin",
+        }
+        assert dwd_warning_info("sensor.b", _state("0"), True) == {"region": None}
+        assert dwd_warning_info("sensor.c", _state("0"), False) is None
+
+
+class TestDiscoveryIndex:
+    """Test seeding and incremental updates."""
+
+    def test_seeded_payload(self, registry):
+        """All kinds are found once at start, sorted."""
+        index = _index({
+            "weather.b": _state("sunny"),
+            "weather.a": _state("rainy"),
+            "person.x": _state("home"),
+            "sensor.pollenflug_erle_5": _state("1", **POLLEN),
+            "sensor.warn_level": _state("0"),
+            "sensor.temperature": _state("21"),
+        })
+
+        assert index.payload == {
+            "weather": ["weather.a", "weather.b"],
+            "person": ["person.x"],
+            "pollen": {"sensor.pollenflug_erle_5": {"type": "erle", "region": "5"}},
+            "dwd_warning": {"sensor.warn_level": {"region": None}},
+        }
+        assert index.first("weather") == "weather.a"
+        assert index.contains("weather", "weather.b")
+        assert not index.contains("weather", "weather.c")
+
+    def test_follows_state_changes(self, registry):
+        """Added, removed and re-described entities notify their kind only."""
+        index = _index({"weather.a": _state()})
+        listener = MagicMock()
+        index.async_add_listener(listener)
+
+        index._async_state_changed(_event("weather.b", None, _state()))
+        listener.assert_called_once_with({"weather": ["weather.a", "weather.b"]})
+
+        listener.reset_mock()
+        index._async_state_changed(_event("weather.b", _state(), _state("rainy")))
+        index._async_state_changed(_event("sensor.other", _state(), _state("2")))
+        listener.assert_not_called()
+
+        pollen = "sensor.pollenflug_hasel_3"
+        index._async_state_changed(_event(pollen, None, _state("1")))
+        listener.assert_not_called()
+        index._async_state_changed(_event(pollen, _state("1"), _state("1", **POLLEN)))
+        listener.assert_called_once_with(
+            {"pollen": {pollen: {"type": "hasel", "region": "3"}}}
+        )
+
+        listener.reset_mock()
+        index._async_state_changed(_event("weather.a", _state(), None))
+        listener.assert_called_once_with({"weather": ["weather.b"]})
+
+    def test_follows_registry_platform(self, registry):
+        """Entities registered by the DWD warnings platform are indexed."""
+        states = {"sensor.renamed": _state("1")}
+        index = _index(states)
+        entry = MagicMock(entity_id="sensor.renamed", platform="dwd_weather_warnings")
+        registry.async_get = {"sensor.renamed": entry}.get
+
+        index._async_registry_updated(MagicMock(data={
+            "action": "create", "entity_id": "sensor.renamed",
+        }))
+        assert index.entity_ids("dwd_warning") == ["sensor.renamed"]
+
+        index._async_registry_updated(MagicMock(data={
+            "action": "remove", "entity_id": "sensor.renamed",
+        }))
+        assert index.entity_ids("dwd_warning") == []
@@ -0,0 +1,206 @@
+"""Tests for the filtered, throttled entity state stream.
+
+Tests resolving displayed entities, the update events and per-entity
+coalescing behind dashview/subscribe_entities.
+"""
+import sys
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import entities, entity_stream
+from custom_components.dashview.entity_stream import (
+    DisplayedEntities,
+    EntityStream,
+    settings_entity_refs,
+)
+
+
+def _state(entity_id, value, changed=0.0, updated=None, **attributes):
+    """Build a State-like mock."""
+    state = MagicMock()
+    state.entity_id = entity_id
+    state.state = value
+    state.attributes = attributes
+    state.last_changed = datetime.fromtimestamp(changed, timezone.utc)
+    state.last_updated = datetime.fromtimestamp(
+        changed if updated is None else updated, timezone.utc
+    )
+    return state
+
+
+class TestSettingsEntityRefs:
+    """Test entities referenced directly in settings."""
+
+    def test_collects_references(self):
+        """Entity settings, appliances, garbage and custom entities are found."""
+        settings = {
+            "weatherEntity": "weather.home",
+            "weatherCurrentTempEntity": "",
+            "infoTextConfig": {
+                "washer": {"enabled": True, "entity": "sensor.washer", "finishTimeEntity": ""},
+                "motion": {"enabled": True},
+            },
+            "enabledAppliances": {"dev1": {"stateEntity": "sensor.dryer"}},
+            "garbageSensors": ["sensor.bin"],
+            "enabledCustomEntities": {
+                "sensor.custom": {"enabled": True},
+                "sensor.hidden": {"enabled": False},
+            },
+        }
+        assert settings_entity_refs(settings) == {
+            "weather.home", "sensor.washer", "sensor.dryer", "sensor.bin", "sensor.custom",
+        }
+
+    def test_floor_cards_and_child_entities(self):
+        """Floor card slots and child entities of enabled custom entities are found."""
+        settings = {
+            "floorCardConfig": {
+                "ground": {
+                    "0": {"entity_id": "sensor.outside", "type": "entity"},
+                    "1": {"entity_id": "virtual:security-summary", "type": "security"},
+                },
+            },
+            "enabledCustomEntities": {
+                "switch.pump": {"enabled": True, "childEntities": ["sensor.pump_power"]},
+                "switch.off": {"enabled": False, "childEntities": ["sensor.off_power"]},
+            },
+        }
+        assert settings_entity_refs(settings) == {
+            "sensor.outside", "switch.pump", "sensor.pump_power",
+        }
+
+
+@pytest.fixture
+def displayed():
+    """Displayed entities resolved from a patched entity registry."""
+    registry = MagicMock()
+    registry.entities.values.return_value = [
+        MagicMock(entity_id="light.a", labels={"light"}),
+        MagicMock(entity_id="sensor.temp", labels={"temp"}),
+        MagicMock(entity_id="sensor.power", labels=set()),
+    ]
+    hass = MagicMock()
+    hass.states.async_entity_ids.return_value = ["person.anna"]
+    hass.states.get = lambda entity_id: _state(entity_id, "on")
+    discovery = MagicMock()
+    discovery.entity_ids.return_value = []
+    discovery.first.return_value = None
+    result = DisplayedEntities(hass, discovery)
+    with patch.object(entities.er, "async_get", return_value=registry):
+        result.async_rebuild({
+            "categoryLabels": {"light": "light", "temperature": "temp"},
+        })
+    return result
+
+
+class TestDisplayedEntities:
+    """Test entities found outside the category labels."""
+
+    def test_custom_labels_and_discovery(self, displayed):
+        """Custom label entities, enabled pollen sensors and the fallback weather are displayed."""
+        registry = MagicMock()
+        registry.entities.values.return_value = [
+            MagicMock(entity_id="switch.pump", labels={"garden"}),
+            MagicMock(entity_id="switch.other", labels={"shed"}),
+        ]
+        discovery = displayed._discovery
+        discovery.entity_ids.return_value = ["sensor.pollenflug_birke_124", "sensor.pollenflug_erle_124"]
+        discovery.first.return_value = "weather.home"
+        with patch.object(entities.er, "async_get", return_value=registry):
+            displayed.async_rebuild({
+                "customLabels": {"garden": {"enabled": True}, "shed": {"enabled": False}},
+                "pollenConfig": {"enabled": True, "enabledSensors": {"sensor.pollenflug_erle_124": False}},
+            })
+        assert displayed.entity_ids == {
+            "switch.pump", "sensor.pollenflug_birke_124", "weather.home", "person.anna",
+        }
+
+
+class TestEntityStream:
+    """Test filtering and coalescing."""
+
+    def _stream(self, displayed, rate=1.0):
+        messages = []
+        stream = EntityStream(displayed._hass, displayed, messages.append, rate)
+        stream.async_start()
+        return stream, messages
+
+    def test_sends_displayed_entities_only(self, displayed):
+        """The first event names the displayed entities; others are never tracked."""
+        assert displayed.entity_ids == {"light.a", "sensor.temp", "person.anna"}
+        _, messages = self._stream(displayed)
+        assert messages[0] == {"u": {"light.a": 0.0, "sensor.temp": 0.0, "person.anna": 0.0}}
+
+    def test_non_numeric_changes_sent_immediately(self, displayed):
+        """Updates of non-numeric entities are sent right away, without states."""
+        stream, messages = self._stream(displayed)
+        stream.async_update_entity("light.a", _state("light.a", "on", 0, 50, brightness=20))
+        assert messages[-1] == {"u": {"light.a": 50.0}}
+
+        # Same last_updated: the client already knows
+        sent = len(messages)
+        stream.async_update_entity("light.a", _state("light.a", "on", 0, 50))
+        assert len(messages) == sent
+
+    def test_numeric_sensors_coalesced(self, displayed):
+        """Numeric updates within the interval are coalesced, latest wins."""
+        stream, messages = self._stream(displayed, rate=1.0)
+        # Past the interval of the initial event
+        clock = [entity_stream.time.monotonic() + 10]
+        with patch.object(entity_stream.time, "monotonic", side_effect=lambda: clock[0]):
+            stream.async_update_entity("sensor.temp", _state("sensor.temp", "20", 1))
+            sent = len(messages)
+            clock[0] += 0.2
+            stream.async_update_entity("sensor.temp", _state("sensor.temp", "21", 2))
+            stream.async_update_entity("sensor.temp", _state("sensor.temp", "22", 3))
+            assert len(messages) == sent
+            assert stream.coalesced == 1
+            displayed._hass.loop.call_later.assert_called_once()
+
+            clock[0] += 1.0
+            stream._async_flush()
+        assert messages[-1] == {"u": {"sensor.temp": 3.0}}
+        assert len(messages) == sent + 1
+
+    def test_removed_entities(self, displayed):
+        """Entities that are no longer displayed are removed."""
+        stream, messages = self._stream(displayed)
+        displayed._listeners[0](set(), {"light.a"})
+        assert messages[-1] == {"r": ["light.a"]}
+
+        stream.async_stop()
+        assert displayed.get_report()["streams"] == 0
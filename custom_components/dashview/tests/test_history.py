@@ -0,0 +1,148 @@
+"""Tests for batched, downsampled numeric history.
+
+Tests series extraction from recorder rows and the LTTB / min-max
+downsampling used by the dashview/history_summary command.
+"""
+import sys
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+from custom_components.dashview.history import (
+    METHOD_LTTB,
+    METHOD_MINMAX,
+    extract_numeric_series,
+    lttb,
+    minmax_buckets,
+    summarize_history,
+)
+
+
+class TestExtractNumericSeries:
+    """Test conversion of recorder rows."""
+
+    def test_compressed_format(self):
+        """Compressed rows use "s" and "lu"."""
+        rows = [{"s": "21.5", "lu": 100.0}, {"s": "22", "lu": 200.0}]
+        assert extract_numeric_series(rows) == ([100.0, 200.0], [21.5, 22.0])
+
+    def test_skips_non_numeric_states(self):
+        """Unavailable, unknown and non-numeric states are dropped."""
+        rows = [
+            {"s": "unavailable", "lu": 1.0},
+            {"s": "unknown", "lu": 2.0},
+            {"s": "on", "lu": 3.0},
+            {"s": "nan", "lu": 4.0},
+            {"s": "5", "lu": 5.0},
+        ]
+        assert extract_numeric_series(rows) == ([5.0], [5.0])
+
+    def test_minimal_dict_format(self):
+        """Minimal rows carry an ISO last_changed string."""
+        rows = [{"state": "1.5", "last_changed": "2024-01-01T00:00:00+00:00"}]
+        times, values = extract_numeric_series(rows)
+        assert times == [datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()]
+        assert values == [1.5]
+
+    def test_state_objects(self):
+        """State objects are read via attributes."""
+        state = MagicMock()
+        state.state = "3"
+        state.last_updated = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        times, values = extract_numeric_series([state])
+        assert values == [3.0]
+        assert times == [state.last_updated.timestamp()]
+
+
+class TestLttb:
+    """Test Largest-Triangle-Three-Buckets downsampling."""
+
+    def test_short_series_unchanged(self):
+        """Series shorter than the threshold are returned as-is."""
+        times, values = [1.0, 2.0, 3.0], [1.0, 5.0, 2.0]
+        assert lttb(times, values, 10) == (times, values)
+
+    def test_reduces_to_threshold_keeping_endpoints(self):
+        """Output has threshold points and keeps first and last."""
+        times = [float(i) for i in range(1000)]
+        values = [float(i % 17) for i in range(1000)]
+        out_t, out_v = lttb(times, values, 50)
+        assert len(out_t) == len(out_v) == 50
+        assert out_t[0] == 0.0 and out_t[-1] == 999.0
+        assert out_t == sorted(out_t)
+
+    def test_keeps_spike(self):
+        """A single spike in a flat line survives downsampling."""
+        times = [float(i) for i in range(500)]
+        values = [0.0] * 500
+        values[250] = 100.0
+        _, out_v = lttb(times, values, 20)
+        assert 100.0 in out_v
+
+
+class TestMinMaxBuckets:
+    """Test min/max bucket downsampling."""
+
+    def test_preserves_extremes(self):
+        """Global minimum and maximum are always kept."""
+        times = [float(i) for i in range(1000)]
+        values = [float((i * 37) % 101) for i in range(1000)]
+        values[123] = -50.0
+        values[877] = 500.0
+        out_t, out_v = minmax_buckets(times, values, 40)
+        assert len(out_v) <= 40
+        assert min(out_v) == -50.0
+        assert max(out_v) == 500.0
+        assert out_t == sorted(out_t)
+
+
+class TestSummarizeHistory:
+    """Test the columnar payload."""
+
+    def test_columnar_layout_and_missing_entities(self):
+        """Every requested entity gets a series, times are integers."""
+        history = {"sensor.a": [{"s": str(i), "lu": i + 0.5} for i in range(300)]}
+        result = summarize_history(history, ["sensor.a", "sensor.b"], 100, METHOD_LTTB)
+
+        assert set(result) == {"sensor.a", "sensor.b"}
+        assert len(result["sensor.a"]["t"]) == 100
+        assert all(isinstance(t, int) for t in result["sensor.a"]["t"])
+        assert result["sensor.b"] == {"t": [], "v": []}
+
+    def test_minmax_method(self):
+        """The minmax method is selectable."""
+        history = {"sensor.a": [{"s": str(i % 10), "lu": i} for i in range(300)]}
+        result = summarize_history(history, ["sensor.a"], 20, METHOD_MINMAX)
+        assert len(result["sensor.a"]["v"]) <= 20
+        assert max(result["sensor.a"]["v"]) == 9.0
@@ -0,0 +1,223 @@
+"""Tests for sampled security/rate-limit logging.
+
+Tests that repeated rejections are aggregated into periodic summaries
+while full detail remains available through get_metrics().
+"""
+import logging
+import sys
+import time
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.log_sampler import (
+    LogSampler,
+    get_log_sampler,
+    reset_log_sampler,
+)
+from custom_components.dashview.rate_limiter import (
+    rate_limited,
+    reset_rate_limiters,
+)
+
+
+class TestLogSampler:
+    """Test LogSampler class."""
+
+    def test_first_event_is_logged(self):
+        """First event for a key should be logged in full."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        assert sampler.warning(logger, "upload_photo", "invalid_filename", 1, "msg %s", "a") is True
+        logger.log.assert_called_once_with(logging.WARNING, "msg %s", "a")
+
+    def test_repeats_are_suppressed_within_window(self):
+        """Repeated events inside the window should not be logged."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        sampler.warning(logger, "h", "r", 1, "msg")
+        for _ in range(100):
+            assert sampler.warning(logger, "h", "r", 1, "msg") is False
+
+        assert logger.log.call_count == 1
+
+    def test_would_emit_predicts_suppression(self):
+        """Callers can skip building arguments of suppressed events."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        assert sampler.would_emit("h", "r", 1) is True
+        sampler.warning(logger, "h", "r", 1, "msg")
+        assert sampler.would_emit("h", "r", 1) is False
+        assert sampler.would_emit("h", "r", 2) is True
+
+        sampler.interval = 0
+        assert sampler.would_emit("h", "r", 1) is True
+
+    def test_keys_are_independent(self):
+        """Different handler, reason or connection should each log once."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        sampler.warning(logger, "h", "r", 1, "msg")
+        sampler.warning(logger, "h", "r", 2, "msg")
+        sampler.warning(logger, "h", "other", 1, "msg")
+        sampler.warning(logger, "other", "r", 1, "msg")
+
+        assert logger.log.call_count == 4
+
+    def test_summary_after_window(self):
+        """The first event after the window should emit a summary and log."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        sampler.warning(logger, "h", "r", 1, "msg")
+        for _ in range(4812):
+            sampler.warning(logger, "h", "r", 1, "msg")
+
+        # Simulate the window elapsing
+        sampler._states[("h", "r", 1)].window_start -= 61
+        assert sampler.warning(logger, "h", "r", 1, "msg") is True
+
+        summary_args = logger.log.call_args_list[1][0]
+        assert "Suppressed" in summary_args[1]
+        assert summary_args[2] == "4,812"
+        assert logger.log.call_count == 3
+
+    def test_flush_emits_pending_summary(self):
+        """flush() should summarize elapsed windows without a new event."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        sampler.warning(logger, "h", "r", 1, "msg")
+        sampler.warning(logger, "h", "r", 1, "msg")
+        sampler._states[("h", "r", 1)].window_start -= 61
+
+        sampler.flush()
+
+        assert logger.log.call_count == 2
+        assert sampler._states[("h", "r", 1)].suppressed == 0
+
+    def test_flush_without_suppressed_events_is_silent(self):
+        """No summary should be logged if nothing was suppressed."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        sampler.warning(logger, "h", "r", 1, "msg")
+        sampler._states[("h", "r", 1)].window_start -= 61
+        sampler.flush()
+
+        assert logger.log.call_count == 1
+
+    def test_flush_drops_stale_keys(self):
+        """Keys idle longer than STALE_TIMEOUT should be removed."""
+        sampler = LogSampler(interval=60)
+        sampler.warning(MagicMock(), "h", "r", 1, "msg")
+        sampler._states[("h", "r", 1)].last_seen = time.monotonic() - sampler.STALE_TIMEOUT - 1
+
+        sampler.flush()
+
+        assert ("h", "r", 1) not in sampler._states
+
+    def test_max_keys_bounded(self):
+        """Tracked keys should never exceed max_keys."""
+        sampler = LogSampler(interval=60, max_keys=10)
+        logger = MagicMock()
+
+        for conn_id in range(50):
+            sampler.warning(logger, "h", "r", conn_id, "msg")
+
+        assert len(sampler._states) == 10
+        assert ("h", "r", 49) in sampler._states
+
+    def test_suppressed_events_are_not_formatted(self):
+        """Suppressed events should not format their message."""
+        sampler = LogSampler(interval=60)
+        arg = MagicMock()
+
+        sampler.warning(MagicMock(), "h", "r", 1, "msg %s", "first")
+        sampler.warning(MagicMock(), "h", "r", 1, "msg %s", arg)
+
+        arg.__str__.assert_not_called()
+
+    def test_metrics_keep_full_detail(self):
+        """get_metrics() should expose counters and the last full message."""
+        sampler = LogSampler(interval=60)
+        logger = MagicMock()
+
+        sampler.warning(logger, "upload_photo", "invalid_filename", 7, "bad %s", "a.jpg")
+        sampler.warning(logger, "upload_photo", "invalid_filename", 7, "bad %s", "b.jpg")
+
+        metrics = sampler.get_metrics()
+        assert len(metrics) == 1
+        entry = metrics[0]
+        assert entry["handler"] == "upload_photo"
+        assert entry["reason"] == "invalid_filename"
+        assert entry["connection"] == 7
+        assert entry["total"] == 2
+        assert entry["suppressed"] == 1
+        assert entry["last_message"] == "bad b.jpg"
+
+
+class TestRateLimitedSampling:
+    """Test that rate_limited warnings go through the sampler."""
+
+    def setup_method(self):
+        """Reset shared state before each test."""
+        reset_rate_limiters()
+        reset_log_sampler()
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_warning_logged_once(self, caplog):
+        """A flood of rejected requests should log a single warning."""
+        @rate_limited("upload_photo")
+        async def handler(hass, connection, msg):
+            return "success"
+
+        connection = MagicMock()
+        msg = {"id": 1}
+
+        with caplog.at_level(logging.WARNING):
+            for _ in range(50):
+                await handler(MagicMock(), connection, msg)
+
+        rate_limited_records = [r for r in caplog.records if "RATE_LIMITED" in r.getMessage()]
+        assert len(rate_limited_records) == 1
+
+        metrics = get_log_sampler().get_metrics()
+        assert metrics[0]["reason"] == "rate_limited"
+        assert metrics[0]["total"] == 48
@@ -0,0 +1,184 @@
+"""Tests for the event-loop blocking detector.
+
+Tests that synchronous slices of instrumented coroutines are timed
+individually and slow slices are reported with a stack summary.
+"""
+import asyncio
+import sys
+import time
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.loop_monitor import (
+    LoopMonitor,
+    get_loop_monitor,
+    loop_monitored,
+    reset_loop_monitor,
+)
+
+
+async def _blocking_step(duration):
+    """Yield once, then block the loop for duration seconds."""
+    await asyncio.sleep(0)
+    time.sleep(duration)
+    return "done"
+
+
+class TestLoopMonitor:
+    """Test LoopMonitor class."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_returns_coroutine_unchanged(self):
+        """Disabled monitor should not wrap the coroutine."""
+        monitor = LoopMonitor(enabled=False)
+        coro = _blocking_step(0)
+
+        assert monitor.run("x", coro) is coro
+        assert await coro == "done"
+        assert monitor.get_report()["handlers"] == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_slice_recorded(self):
+        """A slice longer than the threshold should be recorded."""
+        monitor = LoopMonitor(enabled=True, threshold_ms=20)
+
+        result = await monitor.run("handler", _blocking_step(0.05))
+
+        assert result == "done"
+        report = monitor.get_report()
+        stats = report["handlers"]["handler"]
+        assert stats["calls"] == 1
+        assert stats["slices"] == 2
+        assert stats["slow_slices"] == 1
+        assert stats["max_slice_ms"] >= 20
+
+        slow = report["slow_slices"][0]
+        assert slow["name"] == "handler"
+        assert any("_blocking_step" in frame for frame in slow["resumed_at"])
+
+    @pytest.mark.asyncio
+    async def test_fast_slices_not_recorded(self):
+        """Slices below the threshold should only update counters."""
+        monitor = LoopMonitor(enabled=True, threshold_ms=1000)
+
+        await monitor.run("handler", _blocking_step(0))
+
+        report = monitor.get_report()
+        assert report["slow_slices"] == []
+        assert report["handlers"]["handler"]["slow_slices"] == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates(self):
+        """Exceptions raised by the coroutine should reach the caller."""
+        monitor = LoopMonitor(enabled=True)
+
+        async def failing():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await monitor.run("failing", failing())
+        assert monitor.get_report()["handlers"]["failing"]["slices"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancellation_forwarded(self):
+        """Cancelling the outer task should cancel the wrapped coroutine."""
+        monitor = LoopMonitor(enabled=True)
+        cancelled = False
+
+        async def waiter():
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+
+        task = asyncio.ensure_future(monitor.run("waiter", waiter()))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert cancelled is True
+
+    def test_measure_sync_block(self):
+        """measure() should time a synchronous block as one slice."""
+        monitor = LoopMonitor(enabled=True, threshold_ms=5)
+
+        with monitor.measure("setup.asset_manifest"):
+            time.sleep(0.01)
+
+        report = monitor.get_report()
+        assert report["handlers"]["setup.asset_manifest"]["slow_slices"] == 1
+
+    def test_slow_slices_bounded(self):
+        """The slow slice list should be bounded."""
+        monitor = LoopMonitor(enabled=True, threshold_ms=0)
+
+        for _ in range(500):
+            monitor.record_slice("x", 0.0, 1.0, None, None)
+
+        assert len(monitor.get_report()["slow_slices"]) <= 50
+
+
+class TestLoopMonitoredDecorator:
+    """Test loop_monitored decorator."""
+
+    def setup_method(self):
+        """Reset the shared monitor before each test."""
+        reset_loop_monitor()
+
+    @pytest.mark.asyncio
+    async def test_handler_instrumented_when_enabled(self):
+        """Decorated handlers should be timed when enabled."""
+        @loop_monitored("get_settings")
+        async def handler(hass, connection, msg):
+            return "success"
+
+        get_loop_monitor().configure(True, 50)
+        assert await handler(None, None, {"id": 1}) == "success"
+
+        assert get_loop_monitor().get_report()["handlers"]["get_settings"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_handler_not_instrumented_when_disabled(self):
+        """Decorated handlers should not be timed by default."""
+        @loop_monitored("get_settings")
+        async def handler(hass, connection, msg):
+            return "success"
+
+        assert await handler(None, None, {"id": 1}) == "success"
+        assert get_loop_monitor().get_report()["handlers"] == {}
@@ -0,0 +1,181 @@
+"""Tests for per-user settings overlays.
+
+Tests layered resolution with structural sharing, cached views and overlay
+updates and limits.
+"""
+import sys
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.overlays import (
+    MAX_OVERLAY_PATHS,
+    SettingsOverlays,
+    apply_overlay,
+)
+from custom_components.dashview.websocket import deep_merge
+
+
+BASE = {
+    "weather": {"entity": "weather.home", "show": True},
+    "enabledLights": {"light.kitchen": True},
+    "floorOrder": ["ground", "first"],
+    "roomConfig": {"kitchen": {"icon": "mdi:knife"}, "office": {"icon": "mdi:desk"}},
+}
+
+
+class TestApplyOverlay:
+    """Test overlay resolution."""
+
+    @pytest.mark.parametrize("overlay", [
+        {"weather.entity": "weather.mine"},
+        {"floorOrder": ["first"], "weather": None},
+        {"roomConfig.kitchen.hidden": True, "roomConfig.office": None},
+        {"new.nested.path": 1},
+    ])
+    def test_same_result_as_deep_merge(self, overlay):
+        """Resolution matches merging the overlay as a delta."""
+        assert apply_overlay(BASE, overlay) == deep_merge(BASE, overlay)
+
+    def test_structural_sharing(self):
+        """Only the dicts on the overlay's paths are copied."""
+        view = apply_overlay(BASE, {"roomConfig.kitchen.hidden": True})
+        assert view["enabledLights"] is BASE["enabledLights"]
+        assert view["roomConfig"]["office"] is BASE["roomConfig"]["office"]
+        assert view["roomConfig"] is not BASE["roomConfig"]
+        assert "hidden" not in BASE["roomConfig"]["kitchen"]
+
+
+class TestSettingsOverlays:
+    """Test per-user overlays."""
+
+    def test_users_without_overlay_get_base(self):
+        """No copy is made for users without an overlay."""
+        overlays = SettingsOverlays(MagicMock())
+        assert overlays.resolve("user", BASE) is BASE
+
+    def test_views_cached_per_layer(self):
+        """Views are rebuilt when the base or the overlay changes."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("user", {"weather.entity": "weather.mine"}, [])
+        view = overlays.resolve("user", BASE)
+        assert view["weather"] == {"entity": "weather.mine", "show": True}
+        assert overlays.resolve("user", BASE) is view
+
+        new_base = {**BASE, "floorOrder": []}
+        assert overlays.resolve("user", new_base)["floorOrder"] == []
+
+        overlays.update("user", {"weather.show": False}, [])
+        assert overlays.resolve("user", new_base)["weather"] == {
+            "entity": "weather.mine", "show": False,
+        }
+        assert overlays.builds == 3
+        assert overlays.hits == 1
+
+    def test_invalidate(self):
+        """Invalidation drops all views."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("user", {"floorOrder": []}, [])
+        overlays.resolve("user", BASE)
+        overlays.invalidate()
+        assert overlays.get_report()["cached_views"] == 0
+
+    def test_later_paths_win(self):
+        """A path set again is applied after the paths it replaces."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("user", {"weather.entity": "weather.a"}, [])
+        overlays.update("user", {"weather": {"entity": "weather.b"}}, [])
+        overlays.update("user", {"weather.show": False}, [])
+        assert overlays.resolve("user", BASE)["weather"] == {
+            "entity": "weather.b", "show": False,
+        }
+
+    def test_reset(self):
+        """Reset paths fall back to the base; empty overlays are dropped."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("user", {"floorOrder": []}, [])
+        assert overlays.update("user", {}, ["floorOrder"]) == {}
+        assert overlays.resolve("user", BASE) is BASE
+        assert overlays.get_report()["users"] == 0
+
+    def test_users_isolated(self):
+        """Overlays only apply to their user."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("a", {"floorOrder": []}, [])
+        assert overlays.resolve("b", BASE) is BASE
+
+    @pytest.mark.parametrize("changes", [
+        {"_version": 1},
+        {f"path{i}": i for i in range(MAX_OVERLAY_PATHS + 1)},
+        {"big": "x" * 40000},
+    ])
+    def test_limits(self, changes):
+        """Internal paths and oversized overlays are rejected unchanged."""
+        overlays = SettingsOverlays(MagicMock())
+        with pytest.raises(ValueError):
+            overlays.update("user", changes, [])
+        assert overlays.get_overlay("user") == {}
+
+
+class TestProtect:
+    """Test writes of the shared settings by users with an overlay."""
+
+    def test_full_save_of_merged_view_keeps_base(self):
+        """An admin saving their merged view does not leak the overlay."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("admin", {
+            "weather.entity": "weather.mine",
+            "enabledLights": {"light.kitchen": False},
+            "floorOrder": None,
+        }, [])
+        view = overlays.resolve("admin", BASE)
+        saved = {**view, "newKey": 1}
+
+        new_base = overlays.protect("admin", BASE, saved)
+        assert new_base == {**BASE, "newKey": 1}
+
+    def test_delta_whole_map_keeps_base(self):
+        """Whole maps sent in deltas keep the base values."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("admin", {"enabledLights": {"light.kitchen": False}}, [])
+        merged = deep_merge(BASE, {"enabledLights": {"light.kitchen": False}})
+        assert overlays.protect("admin", BASE, merged) == BASE
+
+    def test_other_users_unaffected(self):
+        """Only the writing user's overlay paths are protected."""
+        overlays = SettingsOverlays(MagicMock())
+        overlays.update("other", {"floorOrder": []}, [])
+        saved = {**BASE, "floorOrder": ["first"]}
+        assert overlays.protect("admin", BASE, saved) is saved
@@ -29,15 +29,23 @@ mock_ha = MagicMock()
 mock_components = MagicMock()
 mock_components.websocket_api = mock_websocket_api
 
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
 sys.modules['homeassistant'] = mock_ha
 sys.modules['homeassistant.components'] = mock_components
 sys.modules['homeassistant.components.frontend'] = MagicMock()
 sys.modules['homeassistant.components.http'] = MagicMock()
 sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
 sys.modules['homeassistant.config_entries'] = MagicMock()
-sys.modules['homeassistant.core'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
 sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
 sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
 sys.modules['voluptuous'] = mock_vol
 
 import pytest
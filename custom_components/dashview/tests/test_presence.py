@@ -0,0 +1,238 @@
+"""Tests for the cached presence history.
+
+Tests collapsing recorder rows into zone transitions, dwell times and
+invalidating cached persons on zone changes.
+"""
+import sys
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import presence
+from custom_components.dashview.presence import (
+    MAX_CACHED_PERSONS,
+    PresenceCache,
+    extract_transitions,
+    is_presence_entity,
+    recent_transitions,
+)
+
+HOUR = 3600
+
+
+def _event(entity_id, old, new):
+    """Build a state_changed event with mock states."""
+    old_state = MagicMock(state=old) if old is not None else None
+    new_state = MagicMock(state=new) if new is not None else None
+    return MagicMock(data={
+        "entity_id": entity_id, "old_state": old_state, "new_state": new_state,
+    })
+
+
+class TestExtractTransitions:
+    """Test collapsing recorder rows."""
+
+    def test_collapses_repeats_and_skips_unavailable(self):
+        """Equal consecutive and unavailable states are dropped."""
+        rows = [
+            {"s": "home", "lu": 100.0},
+            {"s": "home", "lu": 150.0},
+            {"s": "unavailable", "lu": 200.0},
+            {"s": "work", "lu": 300.0},
+            {"s": "unknown", "lu": 350.0},
+            {"s": "work", "lu": 400.0},
+            {"s": "home", "lu": 500.0},
+        ]
+
+        assert extract_transitions(rows) == [
+            {"state": "home", "since": 100.0, "until": 300.0},
+            {"state": "work", "since": 300.0, "until": 500.0},
+            {"state": "home", "since": 500.0, "until": None},
+        ]
+
+    def test_minimal_response_rows(self):
+        """Rows with ISO last_changed are accepted."""
+        rows = [{"state": "home", "last_changed": "1970-01-01T00:01:40+00:00"}]
+
+        assert extract_transitions(rows) == [
+            {"state": "home", "since": 100.0, "until": None},
+        ]
+
+
+class TestRecentTransitions:
+    """Test range trimming, limits and dwell times."""
+
+    TRANSITIONS = [
+        {"state": "home", "since": 0.0, "until": 10 * HOUR},
+        {"state": "work", "since": 10 * HOUR, "until": 18 * HOUR},
+        {"state": "home", "since": 18 * HOUR, "until": None},
+    ]
+
+    def test_most_recent_first_with_dwell(self):
+        """The current state's dwell runs until now."""
+        result = recent_transitions(self.TRANSITIONS, 0, 20 * HOUR, 10)
+
+        assert [entry["state"] for entry in result] == ["home", "work", "home"]
+        assert [entry["dwell"] for entry in result] == [2 * HOUR, 8 * HOUR, 10 * HOUR]
+
+    def test_limit_and_range(self):
+        """Transitions that ended before the range start are dropped."""
+        assert len(recent_transitions(self.TRANSITIONS, 0, 20 * HOUR, 2)) == 2
+        result = recent_transitions(self.TRANSITIONS, 12 * HOUR, 20 * HOUR, 10)
+        assert [entry["since"] for entry in result] == [18 * HOUR, 10 * HOUR]
+
+
+class TestPresenceCache:
+    """Test caching and invalidation."""
+
+    @pytest.fixture
+    def recorder_module(self):
+        """Recorder whose executor runs jobs inline."""
+        async def run_in_executor(func, *args):
+            return func(*args)
+
+        recorder = MagicMock()
+        recorder.async_add_executor_job = run_in_executor
+        module = MagicMock()
+        module.get_instance.return_value = recorder
+        with patch.dict(sys.modules, {"homeassistant.components.recorder": module}):
+            yield module
+
+    @pytest.fixture
+    def fetch(self, recorder_module):
+        """Patched recorder query returning one transition per person."""
+        def transitions(hass, entity_ids, start_time):
+            return {
+                entity_id: [{"state": "home", "since": 0.0, "until": None}]
+                for entity_id in entity_ids
+            }
+
+        with patch.object(presence, "_fetch_transitions", side_effect=transitions) as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_second_request_served_from_cache(self, fetch):
+        """A person is queried once; shorter ranges reuse the cache."""
+        cache = PresenceCache(MagicMock())
+
+        first = await cache.async_get_history(["person.a"], 7, 10)
+        second = await cache.async_get_history(["person.a"], 3, 10)
+
+        assert fetch.call_count == 1
+        assert first["person.a"][0]["state"] == "home"
+        assert second["person.a"][0]["state"] == "home"
+        assert cache.get_report()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_longer_range_refetches(self, fetch):
+        """A range reaching before the cached start queries again."""
+        cache = PresenceCache(MagicMock())
+
+        await cache.async_get_history(["person.a"], 3, 10)
+        await cache.async_get_history(["person.a"], 7, 10)
+
+        assert fetch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_only_missing_persons_queried(self, fetch):
+        """Cached persons are not part of the recorder query."""
+        cache = PresenceCache(MagicMock())
+
+        await cache.async_get_history(["person.a"], 7, 10)
+        result = await cache.async_get_history(["person.a", "person.b"], 7, 10)
+
+        assert fetch.call_args[0][1] == ["person.b"]
+        assert list(result) == ["person.a", "person.b"]
+
+    @pytest.mark.asyncio
+    async def test_zone_change_invalidates(self, fetch):
+        """A zone change drops the person; position updates do not."""
+        cache = PresenceCache(MagicMock())
+        await cache.async_get_history(["person.a"], 7, 10)
+
+        cache._async_state_changed(_event("person.a", "home", "home"))
+        await cache.async_get_history(["person.a"], 7, 10)
+        assert fetch.call_count == 1
+
+        cache._async_state_changed(_event("person.a", "home", "not_home"))
+        await cache.async_get_history(["person.a"], 7, 10)
+        assert fetch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_tracks_requested_persons(self, fetch):
+        """State changes of every requested person are followed."""
+        cache = PresenceCache(MagicMock())
+
+        with patch.object(presence, "async_track_state_change_event") as track:
+            await cache.async_get_history(["person.a"], 7, 10)
+            await cache.async_get_history(["person.b"], 7, 10)
+            await cache.async_get_history(["person.a"], 7, 10)
+
+        assert track.call_count == 2
+        assert sorted(track.call_args[0][1]) == ["person.a", "person.b"]
+
+    @pytest.mark.asyncio
+    async def test_least_recently_requested_evicted(self, fetch):
+        """Beyond MAX_CACHED_PERSONS the oldest persons are dropped and unfollowed."""
+        cache = PresenceCache(MagicMock())
+
+        with patch.object(presence, "async_track_state_change_event") as track:
+            for i in range(MAX_CACHED_PERSONS):
+                await cache.async_get_history([f"person.p{i}"], 7, 10)
+            await cache.async_get_history(["person.p0"], 7, 10)
+            await cache.async_get_history(["person.new"], 7, 10)
+
+        assert cache.get_report()["persons"] == MAX_CACHED_PERSONS
+        assert "person.p1" not in track.call_args[0][1]
+        assert "person.p0" in track.call_args[0][1]
+        assert "person.new" in track.call_args[0][1]
+
+        await cache.async_get_history(["person.p0"], 7, 10)
+        assert fetch.call_count == MAX_CACHED_PERSONS + 1
+
+    def test_presence_entities(self):
+        """Only persons and device trackers have presence history."""
+        assert is_presence_entity("person.a")
+        assert is_presence_entity("device_tracker.phone")
+        assert not is_presence_entity("sensor.person_a")
+
+    @pytest.mark.asyncio
+    async def test_recorder_unavailable(self, recorder_module):
+        """KeyError from get_instance propagates to the handler."""
+        recorder_module.get_instance.side_effect = KeyError("recorder_instance")
+        cache = PresenceCache(MagicMock())
+
+        with pytest.raises(KeyError):
+            await cache.async_get_history(["person.a"], 7, 10)
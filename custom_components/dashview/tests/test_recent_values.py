@@ -0,0 +1,338 @@
+"""Tests for the in-memory recent values cache.
+
+Tests the bounded-resolution ring buffers, settings-driven tracking and
+serving dashview/history_summary from memory.
+"""
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+
+import pytest
+
+from custom_components.dashview import entities, history
+from custom_components.dashview.recent_values import (
+    MAX_POINTS_PER_ENTITY,
+    POINT_SIZE,
+    RecentValuesCache,
+    RingBuffer,
+    encode_snapshot,
+    read_snapshot,
+    tracked_entities,
+    write_snapshot,
+)
+
+
+def _state(value, timestamp):
+    """Build a State-like mock."""
+    state = MagicMock()
+    state.state = value
+    state.last_updated = datetime.fromtimestamp(timestamp, timezone.utc)
+    return state
+
+
+def _cache(states=None, **kwargs):
+    """Build a cache with a mock hass whose states are given."""
+    hass = MagicMock()
+    hass.states.get = lambda entity_id: (states or {}).get(entity_id)
+    return RecentValuesCache(hass, **kwargs)
+
+
+class TestRingBuffer:
+    """Test the fixed-capacity ring buffer."""
+
+    def test_same_bucket_keeps_latest(self):
+        """Samples within one resolution bucket replace each other."""
+        buffer = RingBuffer(10, 0)
+        buffer.append(60.0, 1.0, 60)
+        buffer.append(90.0, 2.0, 60)
+        buffer.append(120.0, 3.0, 60)
+        assert list(buffer.points()) == [(90.0, 2.0), (120.0, 3.0)]
+
+    def test_wraps_and_updates_coverage(self):
+        """A full buffer drops the oldest point and moves coverage."""
+        buffer = RingBuffer(3, 0)
+        for i in range(5):
+            buffer.append(i * 60.0, float(i), 60)
+        assert list(buffer.points()) == [(120.0, 2.0), (180.0, 3.0), (240.0, 4.0)]
+        assert buffer.covered_since == 120.0
+
+    def test_out_of_order_dropped(self):
+        """Points older than the newest one are ignored."""
+        buffer = RingBuffer(3, 0)
+        buffer.append(120.0, 1.0, 60)
+        assert buffer.append(60.0, 2.0, 60) is False
+        assert buffer.count == 1
+
+    def test_columns_in_order_after_wrap(self):
+        """columns() returns ordered copies of a wrapped buffer."""
+        buffer = RingBuffer(3, 0)
+        for i in range(4):
+            buffer.append(i * 60.0, float(i), 60)
+        times, values = buffer.columns()
+        assert list(times) == [60.0, 120.0, 180.0]
+        assert list(values) == [1.0, 2.0, 3.0]
+
+    def test_series_includes_start_state(self):
+        """The value before the range is reported at the range start."""
+        buffer = RingBuffer(10, 0)
+        for i in range(5):
+            buffer.append(i * 60.0, float(i), 60)
+        assert buffer.series(90.0, 180.0) == ([90.0, 120.0, 180.0], [1.0, 2.0, 3.0])
+
+
+class TestTrackedEntities:
+    """Test collecting displayed sensors from settings."""
+
+    def test_labelled_sensors_not_disabled(self):
+        """Labelled sensors are tracked unless switched off, like the panel."""
+        registry = MagicMock()
+        registry.entities.values.return_value = [
+            MagicMock(entity_id="sensor.t", labels={"temp"}),
+            MagicMock(entity_id="sensor.off", labels={"temp"}),
+            MagicMock(entity_id="sensor.h", labels={"hum", "other"}),
+            MagicMock(entity_id="sensor.unlabelled", labels=set()),
+            MagicMock(entity_id="climate.living", labels={"temp"}),
+        ]
+        settings = {
+            "categoryLabels": {"temperature": "temp", "humidity": "hum"},
+            "enabledTemperatureSensors": {"sensor.off": False},
+        }
+        with patch.object(entities.er, "async_get", return_value=registry):
+            assert tracked_entities(MagicMock(), settings) == ["sensor.h", "sensor.t"]
+
+    def test_no_labels_configured(self):
+        """Without category labels nothing is tracked."""
+        assert tracked_entities(MagicMock(), {"enabledTemperatureSensors": {"sensor.t": True}}) == []
+
+
+class TestRecentValuesCache:
+    """Test the cache."""
+
+    def test_capacity_bounded(self):
+        """Capacity follows window/resolution but is capped per entity."""
+        assert _cache(window_hours=24, resolution=60).capacity == 1441
+        assert _cache(window_hours=168, resolution=10).capacity == MAX_POINTS_PER_ENTITY
+
+    def test_seeds_current_state_and_records(self):
+        """Tracking seeds the current state; events are recorded."""
+        cache = _cache({"sensor.t": _state("20.5", 1000.0)})
+        cache.async_set_tracked(["sensor.t"])
+
+        assert cache.covers("sensor.t", 1000.0)
+        assert not cache.covers("sensor.t", 999.0)
+
+        event = MagicMock()
+        event.data = {"entity_id": "sensor.t", "new_state": _state("21", 1200.0)}
+        cache._async_state_changed(event)
+        event.data = {"entity_id": "sensor.t", "new_state": _state("unavailable", 1300.0)}
+        cache._async_state_changed(event)
+
+        assert cache.series("sensor.t", 1000.0, 2000.0) == ([1000.0, 1200.0], [20.5, 21.0])
+
+    def test_untracked_entities_dropped(self):
+        """Entities no longer tracked lose their buffer."""
+        cache = _cache({"sensor.a": _state("1", 0), "sensor.b": _state("2", 0)})
+        cache.async_set_tracked(["sensor.a", "sensor.b"])
+        cache.async_set_tracked(["sensor.b"])
+        assert not cache.covers("sensor.a", 0)
+        assert cache.covers("sensor.b", 0)
+
+    def test_max_entities(self):
+        """No more than max_entities buffers are kept."""
+        cache = _cache(max_entities=2)
+        cache.async_set_tracked(["sensor.a", "sensor.b", "sensor.c"])
+        assert cache.get_report()["entities"] == 2
+
+    def test_backfill_extends_coverage(self):
+        """Recorder history older than the cache is merged in front."""
+        cache = _cache({"sensor.t": _state("5", 1000.0)})
+        cache.async_set_tracked(["sensor.t"])
+
+        cache.backfill("sensor.t", [400.0, 700.0, 1000.0], [3.0, 4.0, 5.0], 400.0)
+
+        assert cache.covers("sensor.t", 400.0)
+        assert cache.series("sensor.t", 400.0, 1000.0) == ([400.0, 700.0, 1000.0], [3.0, 4.0, 5.0])
+
+    def test_configure_keeps_points(self):
+        """Changing resolution rebuilds buffers with existing points."""
+        cache = _cache({"sensor.t": _state("1", 0.0)}, resolution=10)
+        cache.async_set_tracked(["sensor.t"])
+        cache.record("sensor.t", "2", 30.0)
+        cache.record("sensor.t", "3", 70.0)
+
+        cache.configure(24, 60)
+
+        assert cache.series("sensor.t", 0.0, 100.0) == ([30.0, 70.0], [2.0, 3.0])
+
+    def test_report_memory(self):
+        """The report includes memory use per entity."""
+        cache = _cache({"sensor.t": _state("1", 0.0)})
+        cache.async_set_tracked(["sensor.t"])
+        report = cache.get_report()
+        assert report["entities"] == 1
+        assert report["points"] == 1
+        assert report["bytes"] == cache.capacity * POINT_SIZE
+
+
+class TestSnapshot:
+    """Test persisting the cache to a binary snapshot."""
+
+    def test_round_trip(self, tmp_path):
+        """Encoded entries are read back unchanged."""
+        path = tmp_path / "dashview.recent_values"
+        entries = [
+            ("sensor.t", 100.0, array("d", [100.0, 160.0]), array("d", [20.5, 21.0])),
+            ("sensor.empty", 50.0, array("d"), array("d")),
+        ]
+        write_snapshot(path, encode_snapshot(60, 1234.0, entries, clean=True))
+
+        resolution, saved_at, restored, clean = read_snapshot(path)
+
+        assert (resolution, saved_at, clean) == (60, 1234.0, True)
+        assert restored == entries
+        # Fixed-width records: header + entry headers + names + 16 bytes/point
+        assert path.stat().st_size == 28 + 2 * 14 + len("sensor.t") + len("sensor.empty") + 2 * 16
+
+    def test_missing_file(self, tmp_path):
+        """A missing snapshot yields None."""
+        assert read_snapshot(tmp_path / "missing") is None
+
+    def test_corrupt_file_rejected(self, tmp_path):
+        """Garbage and truncated files raise ValueError."""
+        path = tmp_path / "snapshot"
+        path.write_bytes(b"not a snapshot at all, really not")
+        with pytest.raises(ValueError):
+            read_snapshot(path)
+
+        data = encode_snapshot(60, 1.0, [("sensor.t", 0.0, array("d", [1.0]), array("d", [2.0]))])
+        path.write_bytes(data[:-4])
+        with pytest.raises(ValueError):
+            read_snapshot(path)
+
+    def test_restore_seeds_tracked_buffers(self):
+        """Restored entries warm buffers and the current state is appended."""
+        now = float(int(time.time()))
+        source = _cache({"sensor.t": _state("20", now - 600)})
+        source.async_set_tracked(["sensor.t"])
+        source.record("sensor.t", "21", now - 300)
+        assert source.dirty
+
+        entries = source.snapshot()
+        assert not source.dirty
+
+        cache = _cache({"sensor.t": _state("22", now)})
+        assert cache.restore(60, now - 10, entries, clean=True) == 1
+        cache.async_set_tracked(["sensor.t"])
+
+        assert cache.covers("sensor.t", now - 600)
+        _, values = cache.series("sensor.t", now - 600, now)
+        assert values == [20.0, 21.0, 22.0]
+
+    def test_unclean_snapshot_does_not_hide_gap(self):
+        """After a crash, restored buffers only cover the time since restart."""
+        now = float(int(time.time()))
+        entries = [(
+            "sensor.t", now - 600,
+            array("d", [now - 600, now - 300]), array("d", [20.0, 21.0]),
+        )]
+        cache = _cache({"sensor.t": _state("22", now)})
+        assert cache.restore(60, now - 200, entries) == 1
+        cache.async_set_tracked(["sensor.t"])
+
+        assert not cache.covers("sensor.t", now - 600)
+        assert not cache.covers("sensor.t", now - 200)
+
+    def test_stale_snapshot_ignored(self):
+        """Snapshots older than the window are not restored."""
+        cache = _cache(window_hours=1)
+        entries = [("sensor.t", 0.0, array("d", [0.0]), array("d", [1.0]))]
+        assert cache.restore(60, time.time() - 7200, entries) == 0
+
+    def test_restore_with_different_resolution(self):
+        """Entries are re-bucketed when the resolution changed."""
+        now = time.time()
+        base = now - now % 600
+        entries = [(
+            "sensor.t", base,
+            array("d", [base, base + 10, base + 20]),
+            array("d", [1.0, 2.0, 3.0]),
+        )]
+        cache = _cache(resolution=600)
+        cache.restore(10, now, entries)
+        cache.async_set_tracked(["sensor.t"])
+        assert cache.series("sensor.t", base, base + 30) == ([base + 20], [3.0])
+
+
+class TestHistorySummaryFromCache:
+    """Test that covered ranges skip the recorder."""
+
+    @pytest.mark.asyncio
+    async def test_covered_entities_served_from_memory(self):
+        """Only uncovered entities are fetched from the recorder."""
+        cache = _cache({"sensor.t": _state("20", 0.0)})
+        cache.async_set_tracked(["sensor.t"])
+        cache.record("sensor.t", "21", 600.0)
+
+        hass = MagicMock()
+
+        async def run_in_executor(func, *args):
+            return func(*args)
+
+        hass.async_add_executor_job = run_in_executor
+        recorder = MagicMock()
+        recorder.async_add_executor_job = run_in_executor
+        recorder_module = MagicMock()
+        recorder_module.get_instance.return_value = recorder
+
+        with patch.dict(sys.modules, {
+            "homeassistant.components.recorder": recorder_module,
+        }), patch.object(
+            history, "_fetch_history_summary",
+            return_value=({"sensor.x": ([], [])}, {"sensor.x": {"t": [], "v": []}}),
+        ) as fetch:
+            result = await history.async_get_history_summary(
+                hass,
+                ["sensor.x", "sensor.t"],
+                datetime.fromtimestamp(0, timezone.utc),
+                datetime.fromtimestamp(1200, timezone.utc),
+                cache=cache,
+            )
+
+        assert list(result) == ["sensor.x", "sensor.t"]
+        assert result["sensor.t"] == {"t": [0, 600], "v": [20.0, 21.0]}
+        assert fetch.call_args[0][1] == ["sensor.x"]
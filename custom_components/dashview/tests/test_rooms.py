@@ -0,0 +1,230 @@
+"""Tests for the per-room aggregates.
+
+Tests mapping displayed entities to rooms and the per-event deltas behind
+dashview/subscribe_rooms.
+"""
+import sys
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import entities, rooms
+from custom_components.dashview.rooms import RoomAggregator, diff_snapshots
+
+
+def _state(value, name=None):
+    """Build a State-like mock."""
+    state = MagicMock()
+    state.state = value
+    state.attributes = {"friendly_name": name} if name else {}
+    return state
+
+
+def _entry(entity_id, labels, area_id=None, device_id=None):
+    """Build an entity registry entry mock."""
+    return MagicMock(
+        entity_id=entity_id,
+        labels=set(labels),
+        area_id=area_id,
+        device_id=device_id,
+        original_name=None,
+    )
+
+
+SETTINGS = {
+    "categoryLabels": {
+        "light": "light",
+        "motion": "motion",
+        "temperature": "temp",
+        "humidity": "hum",
+    },
+}
+
+
+@pytest.fixture
+def registries():
+    """Patch the entity, device and area registries."""
+    entity_registry = MagicMock()
+    entity_registry.entities.values.return_value = [
+        _entry("light.a", {"light"}, area_id="living"),
+        _entry("light.b", {"light"}, device_id="dev1"),
+        _entry("light.off", {"light"}, area_id="living"),
+        _entry("binary_sensor.motion", {"motion"}, area_id="kitchen"),
+        _entry("sensor.temp_z", {"temp"}, area_id="living"),
+        _entry("sensor.temp_a", {"temp"}, area_id="living"),
+        _entry("sensor.hum", {"hum"}, area_id="kitchen"),
+        _entry("light.nowhere", {"light"}),
+    ]
+    device_registry = MagicMock()
+    device_registry.async_get.side_effect = lambda device_id: (
+        MagicMock(area_id="living") if device_id == "dev1" else None
+    )
+    area_registry = MagicMock()
+    area_registry.async_get_area.side_effect = lambda area_id: MagicMock(
+        floor_id="ground"
+    )
+    with patch.object(entities.er, "async_get", return_value=entity_registry), \
+            patch.object(rooms.dr, "async_get", return_value=device_registry), \
+            patch.object(rooms.ar, "async_get", return_value=area_registry):
+        yield
+
+
+def _aggregator(states):
+    """Build an aggregator over the given states and rebuild it."""
+    hass = MagicMock()
+    hass.states.get = lambda entity_id: states.get(entity_id)
+    aggregator = RoomAggregator(hass)
+    aggregator.async_rebuild({**SETTINGS, "enabledLights": {"light.off": False}})
+    return aggregator
+
+
+STATES = {
+    "light.a": _state("on"),
+    "light.b": _state("off"),
+    "binary_sensor.motion": _state("off"),
+    "sensor.temp_z": _state("19.5", "Alpha thermometer"),
+    "sensor.temp_a": _state("23.0", "Zeta thermometer"),
+    "sensor.hum": _state("unavailable"),
+}
+
+
+class TestDiffSnapshots:
+    """Test per-room deltas."""
+
+    def test_changed_fields_only(self):
+        """Only differing fields are sent."""
+        assert diff_snapshots({"a": 1, "b": 2}, {"a": 1, "b": 3}) == {"b": 3}
+
+    def test_new_and_removed_rooms(self):
+        """New rooms are sent in full, removed rooms as None."""
+        assert diff_snapshots(None, {"a": 1}) == {"a": 1}
+        assert diff_snapshots({"a": 1}, None) is None
+
+
+class TestRoomAggregator:
+    """Test building and updating room aggregates."""
+
+    def test_rebuild_maps_entities_to_rooms(self, registries):
+        """Entities map via their own or their device's area."""
+        living = _aggregator(STATES).rooms["living"]
+        assert living["floor"] == "ground"
+        assert living["lights"] == 2  # light.off is switched off
+        assert living["lightsOn"] == 1
+        assert living["active"] is True
+        # First temperature sensor by name, as in the panel
+        assert living["temperature"] == 19.5
+
+        kitchen = _aggregator(STATES).rooms["kitchen"]
+        assert kitchen["motion"] is False
+        assert kitchen["humidity"] is None
+        assert kitchen["active"] is False
+
+    def test_disabled_room_skipped(self, registries):
+        """Rooms switched off in enabledRooms are not aggregated."""
+        hass = MagicMock()
+        hass.states.get = STATES.get
+        aggregator = RoomAggregator(hass)
+        aggregator.async_rebuild({**SETTINGS, "enabledRooms": {"kitchen": False}})
+        assert set(aggregator.rooms) == {"living"}
+
+    def test_state_change_sends_room_delta(self, registries):
+        """A state change only reports the affected room's changed fields."""
+        aggregator = _aggregator(STATES)
+        received = []
+        aggregator.async_add_listener(received.append)
+
+        aggregator.async_update_entity("binary_sensor.motion", _state("on"))
+        assert received == [{"kitchen": {"motion": True, "active": True}}]
+
+        aggregator.async_update_entity("light.b", _state("on"))
+        assert received[-1] == {"living": {"lightsOn": 2}}
+
+        aggregator.async_update_entity("sensor.temp_z", _state("20.25"))
+        assert received[-1] == {"living": {"temperature": 20.25}}
+
+    def test_irrelevant_changes_not_sent(self, registries):
+        """Unchanged counters and untracked entities produce no events."""
+        aggregator = _aggregator(STATES)
+        received = []
+        aggregator.async_add_listener(received.append)
+
+        aggregator.async_update_entity("light.a", _state("on"))
+        aggregator.async_update_entity("sensor.temp_a", _state("30"))
+        aggregator.async_update_entity("light.unknown", _state("on"))
+        assert received == []
+
+    def test_rebuild_reports_removed_rooms(self, registries):
+        """Rooms that disappear on rebuild are sent as None."""
+        aggregator = _aggregator(STATES)
+        received = []
+        aggregator.async_add_listener(received.append)
+
+        aggregator.async_rebuild({
+            **SETTINGS,
+            "enabledLights": {"light.off": False},
+            "enabledRooms": {"kitchen": False},
+        })
+        assert received == [{"kitchen": None}]
+
+
+class TestEndSubscriptions:
+    """Test ending subscriptions when Dashview unloads."""
+
+    def test_unload_ends_subscriptions(self):
+        """Open subscriptions are removed and answered with an error."""
+        from custom_components.dashview.const import DOMAIN
+        from custom_components.dashview.websocket import (
+            _async_add_subscription,
+            async_end_subscriptions,
+        )
+
+        hass = MagicMock()
+        hass.data = {DOMAIN: {}}
+        connection = MagicMock()
+        connection.subscriptions = {}
+        open_unsub, closed_unsub = MagicMock(), MagicMock()
+        _async_add_subscription(hass, connection, 1, open_unsub)
+        _async_add_subscription(hass, connection, 2, closed_unsub)
+        # The client unsubscribed from 2 itself
+        connection.subscriptions.pop(2)()
+
+        async_end_subscriptions(hass)
+
+        assert connection.subscriptions == {}
+        open_unsub.assert_called_once()
+        closed_unsub.assert_called_once()
+        connection.send_error.assert_called_once_with(
+            1, "unloaded", "Dashview was unloaded"
+        )
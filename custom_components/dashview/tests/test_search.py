@@ -0,0 +1,244 @@
+"""Tests for the entity search index.
+
+Tests normalization, ranking, filters, pagination and incremental updates
+from state and registry changes.
+"""
+import sys
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import search
+from custom_components.dashview.search import SearchIndex, normalize, trigrams
+
+
+def _state(entity_id, name=None):
+    """Build a State-like mock."""
+    attributes = {"friendly_name": name} if name else {}
+    return MagicMock(entity_id=entity_id, state="on", attributes=attributes)
+
+
+def _event(entity_id, old, new):
+    """Build a state_changed event."""
+    return MagicMock(data={"entity_id": entity_id, "old_state": old, "new_state": new})
+
+
+@pytest.fixture
+def registries():
+    """Patch the registries: two areas, one label, entries by entity ID."""
+    entries = {}
+    areas = {"kitchen": MagicMock(), "office": MagicMock()}
+    areas["kitchen"].name = "Kitchen"
+    areas["office"].name = "Home Office"
+    label = MagicMock()
+    label.name = "Energy Meter"
+    entity_registry = MagicMock()
+    entity_registry.async_get = entries.get
+    area_registry = MagicMock()
+    area_registry.async_get_area = areas.get
+    label_registry = MagicMock()
+    label_registry.async_get_label = {"energy": label}.get
+    with patch.object(search.er, "async_get", return_value=entity_registry), \
+            patch.object(search.dr, "async_get", return_value=MagicMock()), \
+            patch.object(search.ar, "async_get", return_value=area_registry), \
+            patch.object(search.lr, "async_get", return_value=label_registry):
+        yield {"entries": entries, "areas": areas}
+
+
+def _entry(entity_id, area_id=None, labels=()):
+    """Build a registry entry without a device."""
+    return MagicMock(
+        entity_id=entity_id, area_id=area_id, device_id=None, labels=set(labels)
+    )
+
+
+def _index(states):
+    """Build and start an index over the given states."""
+    hass = MagicMock()
+    hass.states.async_all = lambda: list(states.values())
+    hass.states.get = states.get
+    index = SearchIndex(hass)
+    index.async_start()
+    return index
+
+
+def _ids(index, query, **kwargs):
+    """Return the matching entity IDs in rank order."""
+    return [result["entity_id"] for result in index.search(query, **kwargs)[0]]
+
+
+@pytest.fixture
+def index(registries):
+    """Index a few entities with areas and labels."""
+    registries["entries"].update({
+        "light.kitchen_ceiling": _entry("light.kitchen_ceiling", "kitchen"),
+        "sensor.kitchen_power": _entry("sensor.kitchen_power", "kitchen", ["energy"]),
+        "sensor.desk_power": _entry("sensor.desk_power", "office", ["energy"]),
+    })
+    states = {
+        entity_id: _state(entity_id, name)
+        for entity_id, name in (
+            ("light.kitchen_ceiling", "Kitchen Ceiling"),
+            ("sensor.kitchen_power", "Kitchen Power"),
+            ("sensor.desk_power", "Desk Power"),
+            ("weather.home", "Forecast Home"),
+            ("sun.sun", None),
+        )
+    }
+    built = _index(states)
+    built.states = states
+    return built
+
+
+class TestText:
+    """Test normalization and trigrams."""
+
+    def test_normalize(self):
+        """Separators collapse to single spaces, text is lowercased."""
+        assert normalize("Sensor.Kitchen_Power  (W)") == "sensor kitchen power w"
+
+    def test_trigrams_per_word(self):
+        """Trigrams do not span words; short words have none."""
+        assert trigrams("abcd ef") == {"abc", "bcd"}
+
+
+class TestSearch:
+    """Test matching, ranking, filters and pagination."""
+
+    def test_ranks_name_prefix_first(self, index):
+        """Name matches outrank area matches, then shorter names win."""
+        assert _ids(index, "kitchen") == [
+            "sensor.kitchen_power",
+            "light.kitchen_ceiling",
+        ]
+        assert _ids(index, "home")[0] == "weather.home"
+        assert "sensor.desk_power" in _ids(index, "home")
+
+    def test_every_term_must_match(self, index):
+        """Terms match any field, but all of them must match."""
+        assert _ids(index, "power kitchen") == ["sensor.kitchen_power"]
+        assert _ids(index, "power bedroom") == []
+
+    def test_short_terms_match_word_prefixes(self, index):
+        """One- and two-character terms use the token prefix index only."""
+        assert _ids(index, "de") == ["sensor.desk_power"]
+        # "en" is inside "kitchen" but starts no word except "energy"
+        assert _ids(index, "en") == ["sensor.desk_power", "sensor.kitchen_power"]
+
+    def test_substring_from_three_characters(self, index):
+        """Longer terms also match inside words."""
+        assert _ids(index, "itche") == [
+            "sensor.kitchen_power",
+            "light.kitchen_ceiling",
+        ]
+
+    def test_labels_and_object_id(self, index):
+        """Label names and the object ID are searchable."""
+        assert set(_ids(index, "energy")) == {
+            "sensor.desk_power",
+            "sensor.kitchen_power",
+        }
+        assert _ids(index, "sun") == ["sun.sun"]
+
+    def test_filters(self, index):
+        """Domain, area and label filters accept any of their values."""
+        assert _ids(index, "kitchen", domains=["light"]) == ["light.kitchen_ceiling"]
+        assert _ids(index, "power", areas=["office"]) == ["sensor.desk_power"]
+        assert _ids(index, "", labels=["energy"]) == [
+            "sensor.desk_power",
+            "sensor.kitchen_power",
+        ]
+
+    def test_pagination(self, index):
+        """Pages are slices of the ranking; total counts every match."""
+        results, total = index.search("", limit=2, offset=1)
+        assert total == 5
+        assert [result["entity_id"] for result in results] == [
+            "weather.home",
+            "light.kitchen_ceiling",
+        ]
+        assert results[0] == {
+            "entity_id": "weather.home",
+            "name": "Forecast Home",
+            "area_id": None,
+            "score": 0,
+        }
+
+
+class TestIncrementalUpdates:
+    """Test following state and registry changes."""
+
+    def test_added_renamed_removed(self, index):
+        """Friendly name changes re-index; other state changes do not."""
+        new = _state("fan.attic", "Attic Fan")
+        index.states["fan.attic"] = new
+        index._async_state_changed(_event("fan.attic", None, new))
+        assert _ids(index, "attic") == ["fan.attic"]
+
+        same_name = _state("fan.attic", "Attic Fan")
+        index._async_state_changed(_event("fan.attic", new, same_name))
+        assert index.updates == 1
+
+        renamed = _state("fan.attic", "Loft Fan")
+        index._async_state_changed(_event("fan.attic", new, renamed))
+        assert _ids(index, "loft") == ["fan.attic"]
+        assert index.search("loft")[0][0]["name"] == "Loft Fan"
+
+        index._async_state_changed(_event("fan.attic", renamed, None))
+        assert _ids(index, "loft") == []
+        assert "lof" not in index._trigrams
+        assert "loft" not in index._sorted_tokens
+
+    def test_registry_area_change(self, index, registries):
+        """Moving an entity re-indexes it with the new area."""
+        registries["entries"]["sensor.desk_power"] = _entry(
+            "sensor.desk_power", "kitchen"
+        )
+        index._async_entity_registry_updated(MagicMock(data={
+            "action": "update", "entity_id": "sensor.desk_power",
+        }))
+        assert _ids(index, "power", areas=["kitchen"]) == [
+            "sensor.desk_power",
+            "sensor.kitchen_power",
+        ]
+
+    def test_area_rename(self, index, registries):
+        """Renaming an area re-indexes its entities only."""
+        registries["areas"]["office"].name = "Study"
+        index._async_area_registry_updated(MagicMock(data={
+            "action": "update", "area_id": "office",
+        }))
+        assert _ids(index, "study") == ["sensor.desk_power"]
+        assert index.updates == 1
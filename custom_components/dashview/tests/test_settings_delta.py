@@ -0,0 +1,162 @@
+"""Tests for settings deltas.
+
+Tests dot-path merging and array operations (insert, remove, move,
+replace by index or stable ID).
+"""
+import sys
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.websocket import (
+    _commutes,
+    apply_array_ops,
+    deep_merge,
+)
+
+
+class TestDeepMerge:
+    """Test dot-path changes."""
+
+    def test_set_and_delete_nested(self):
+        """Paths create parents, None deletes; the base is not modified."""
+        base = {"weather": {"entity": "weather.a"}, "old": 1}
+        merged = deep_merge(base, {"weather.entity": "weather.b", "old": None})
+        assert merged == {"weather": {"entity": "weather.b"}}
+        assert base["weather"]["entity"] == "weather.a"
+
+    def test_dangerous_paths_rejected(self):
+        """Prototype-style keys are rejected in changes and ops."""
+        with pytest.raises(ValueError):
+            deep_merge({}, {"a.__proto__": 1})
+        with pytest.raises(ValueError):
+            deep_merge({}, {}, [{"op": "insert", "path": "__class__", "value": 1}])
+
+    def test_ops_apply_after_changes(self):
+        """Array ops see the result of the dot-path changes."""
+        merged = deep_merge(
+            {"floorOrder": ["a"]},
+            {"floorOrder": ["a", "b"]},
+            [{"op": "move", "path": "floorOrder", "id": "b", "to": 0}],
+        )
+        assert merged["floorOrder"] == ["b", "a"]
+
+
+class TestArrayOps:
+    """Test insert, remove, move and replace."""
+
+    def test_insert(self):
+        """Insert at an index, before an ID, or at the end."""
+        settings = {"floorOrder": ["a", "c"]}
+        apply_array_ops(settings, [
+            {"op": "insert", "path": "floorOrder", "value": "b", "before": "c"},
+            {"op": "insert", "path": "floorOrder", "value": "z"},
+            {"op": "insert", "path": "floorOrder", "value": "0", "to": 0},
+        ])
+        assert settings["floorOrder"] == ["0", "a", "b", "c", "z"]
+
+    def test_insert_creates_nested_list(self):
+        """Inserting into a missing list creates it."""
+        settings = {}
+        apply_array_ops(settings, [
+            {"op": "insert", "path": "roomOrder.ground", "value": "kitchen"},
+        ])
+        assert settings == {"roomOrder": {"ground": ["kitchen"]}}
+
+    def test_remove_and_replace_by_id_or_index(self):
+        """Objects are addressed by their "id", any item by index."""
+        settings = {"presets": [{"id": "x", "n": 1}, {"id": "y", "n": 2}, "z"]}
+        apply_array_ops(settings, [
+            {"op": "replace", "path": "presets", "id": "y", "value": {"id": "y", "n": 3}},
+            {"op": "remove", "path": "presets", "index": 0},
+            {"op": "remove", "path": "presets", "id": "z"},
+        ])
+        assert settings["presets"] == [{"id": "y", "n": 3}]
+
+    def test_move(self):
+        """Move to an index (after removal) or before another item."""
+        settings = {"order": ["a", "b", "c", "d"]}
+        apply_array_ops(settings, [
+            {"op": "move", "path": "order", "id": "a", "to": 3},
+            {"op": "move", "path": "order", "id": "d", "before": "b"},
+        ])
+        assert settings["order"] == ["d", "b", "c", "a"]
+
+    def test_id_ops_merge_concurrent_edits(self):
+        """Missing items and duplicate inserts are no-ops."""
+        settings = {"order": ["a", "b"]}
+        apply_array_ops(settings, [
+            {"op": "remove", "path": "order", "id": "gone"},
+            {"op": "move", "path": "order", "id": "gone", "before": "a"},
+            {"op": "insert", "path": "order", "value": "a"},
+            {"op": "move", "path": "order", "id": "b", "before": "gone"},
+        ])
+        assert settings["order"] == ["a", "b"]
+
+    def test_items_without_id(self):
+        """Objects without an id are never duplicates and need an index."""
+        settings = {"presets": [{"name": "a"}]}
+        apply_array_ops(settings, [
+            {"op": "insert", "path": "presets", "value": {"name": "b"}},
+        ])
+        assert settings["presets"] == [{"name": "a"}, {"name": "b"}]
+        with pytest.raises(ValueError):
+            apply_array_ops(settings, [
+                {"op": "remove", "path": "presets", "id": None},
+            ])
+        assert len(settings["presets"]) == 2
+
+    @pytest.mark.parametrize("op", [
+        {"op": "splice", "path": "order"},
+        {"op": "remove", "path": "order", "index": 5},
+        {"op": "remove", "path": "order", "index": False},
+        {"op": "move", "path": "order", "id": "a", "to": True},
+        {"op": "move", "path": "order", "id": "a", "to": 9},
+        {"op": "remove", "path": "order"},
+        {"op": "remove", "path": "name", "id": "a"},
+        {"op": "insert", "path": "order"},
+    ])
+    def test_invalid_ops(self, op):
+        """Malformed ops, bad indexes and non-list paths raise ValueError."""
+        with pytest.raises(ValueError):
+            apply_array_ops({"order": ["a"], "name": "x"}, [op])
+
+    def test_commutes(self):
+        """Only deltas of ID-addressed ops skip the version check."""
+        by_id = [{"op": "move", "path": "order", "id": "a", "before": "b"}]
+        assert _commutes({}, by_id)
+        assert not _commutes({"x": 1}, by_id)
+        assert not _commutes({}, [{"op": "remove", "path": "order", "index": 0}])
+        assert not _commutes({}, [])
@@ -0,0 +1,200 @@
+"""Tests for the settings undo and redo history.
+
+Tests path diffs, per-entity entries of entity ID maps, inverse deltas
+applied through deep_merge and the bounded history.
+"""
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.settings_history import (
+    MAX_ENTRIES,
+    SettingsHistory,
+    apply_entries,
+    settings_diff,
+)
+from custom_components.dashview.websocket import deep_merge
+
+
+OLD = {
+    "weather": {"entity": "weather.a", "show": True},
+    "enabledLights": {"light.kitchen": True},
+    "floorOrder": ["ground", "first"],
+    "_version": 1,
+}
+NEW = {
+    "weather": {"entity": "weather.b", "show": True},
+    "enabledLights": {"light.kitchen": False},
+    "floorOrder": ["first", "ground"],
+    "mediaPresets": [],
+    "_version": 2,
+}
+
+
+def without_version(settings):
+    return {key: value for key, value in settings.items() if key != "_version"}
+
+
+def apply_delta(settings, delta):
+    return apply_entries(deep_merge(settings, delta["changes"]), delta["entries"])
+
+
+class TestSettingsDiff:
+    """Test dot-path diffs."""
+
+    def test_only_changed_paths(self):
+        """Unchanged keys and the version are left out."""
+        assert settings_diff(OLD, NEW) == {
+            "weather.entity": "weather.b",
+            "enabledLights": {"light.kitchen": False},
+            "floorOrder": ["first", "ground"],
+            "mediaPresets": [],
+        }
+
+    def test_removed_keys(self):
+        """Removed keys map to None."""
+        assert settings_diff(NEW, OLD)["mediaPresets"] is None
+
+    @pytest.mark.parametrize("old,new", [(OLD, NEW), (NEW, OLD)])
+    def test_diff_applies_through_deep_merge(self, old, new):
+        """Merging the diff into old gives new."""
+        merged = deep_merge(old, settings_diff(old, new))
+        assert without_version(merged) == without_version(new)
+
+    def test_entity_maps_diffed_per_entity(self):
+        """With entries, maps keyed by entity ID record only changed entities."""
+        old = {"enabledLights": {"light.a": True, "light.b": False}}
+        new = {"enabledLights": {"light.a": False, "light.c": True}}
+        entries = {}
+        assert settings_diff(old, new, entries=entries) == {}
+        assert entries == {
+            "enabledLights": {"light.a": False, "light.b": None, "light.c": True},
+        }
+        assert apply_entries(deep_merge(old, {}), entries) == new
+
+
+class TestSettingsHistory:
+    """Test undo and redo."""
+
+    def test_undo_redo(self):
+        """Undo returns the inverse delta, redo the delta."""
+        history = SettingsHistory(MagicMock())
+        history.record(OLD, NEW)
+        assert history.can_undo and not history.can_redo
+
+        undo = history.undo()
+        assert without_version(apply_delta(NEW, undo)) == without_version(OLD)
+        assert history.can_redo and not history.can_undo
+        assert history.undo() is None
+
+        redo = history.redo()
+        assert without_version(apply_delta(OLD, redo)) == without_version(NEW)
+        assert history.redo() is None
+
+    def test_peek_keeps_entry(self):
+        """Peeking returns the next changes without moving them."""
+        history = SettingsHistory(MagicMock())
+        history.record(OLD, NEW)
+        assert history.peek_redo() is None
+        changes = history.peek_undo()
+        assert history.peek_undo() == changes
+        assert history.can_undo and not history.can_redo
+
+        assert history.undo() == changes
+        assert history.peek_undo() is None
+        assert history.peek_redo() is not None
+
+    def test_record_clears_redo(self):
+        """A new change drops the undone ones."""
+        history = SettingsHistory(MagicMock())
+        history.record(OLD, NEW)
+        history.undo()
+        history.record(OLD, {**OLD, "floorOrder": []})
+        assert not history.can_redo
+
+    def test_unchanged_settings_not_recorded(self):
+        """Saves that change nothing (or only the version) are skipped."""
+        history = SettingsHistory(MagicMock())
+        history.record(OLD, {**OLD, "_version": 5})
+        assert not history.can_undo
+
+    def test_bounded(self):
+        """Only the newest MAX_ENTRIES changes are kept."""
+        history = SettingsHistory(MagicMock())
+        for i in range(MAX_ENTRIES + 5):
+            history.record({"count": i}, {"count": i + 1})
+        undone = [history.undo() for _ in range(MAX_ENTRIES)]
+        assert undone[-1]["changes"] == {"count": 5}
+        assert history.undo() is None
+
+    def test_entries_copied(self):
+        """Later changes to the settings objects do not alter the history."""
+        history = SettingsHistory(MagicMock())
+        new = {"floorOrder": ["a"]}
+        history.record({}, new)
+        new["floorOrder"].append("b")
+        assert history.undo()["changes"] == {"floorOrder": None}
+        assert history.redo()["changes"] == {"floorOrder": ["a"]}
+
+    def test_one_entity_toggle_records_that_entity(self):
+        """Undoing a toggle costs one entity, not the whole enabled* map."""
+        history = SettingsHistory(MagicMock())
+        lights = {f"light.l{i}": True for i in range(100)}
+        history.record(
+            {"enabledLights": lights},
+            {"enabledLights": {**lights, "light.l7": False}},
+        )
+        assert history.peek_undo() == {
+            "changes": {},
+            "entries": {"enabledLights": {"light.l7": True}},
+        }
+        history.undo()
+        assert history.peek_redo() == {
+            "changes": {},
+            "entries": {"enabledLights": {"light.l7": False}},
+        }
+
+    @pytest.mark.asyncio
+    async def test_format_1_entries_loaded(self):
+        """Persisted entries holding only the changes are converted."""
+        history = SettingsHistory(MagicMock())
+        history.configure(True)
+        history._store.async_load = AsyncMock(return_value={
+            "undo": [{"undo": {"a": 1}, "redo": {"a": 2}}],
+            "redo": [],
+        })
+        await history.async_load()
+        assert history.peek_undo() == {"changes": {"a": 1}, "entries": {}}
@@ -0,0 +1,171 @@
+"""Tests for the settings writer.
+
+Tests monotonic versions, arrival-order application, group commits and
+error propagation.
+"""
+import asyncio
+import sys
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.const import DOMAIN
+from custom_components.dashview.settings_writer import SettingsWriter
+from custom_components.dashview.websocket import deep_merge
+
+
+class FakeStore:
+    """Store whose saves can be held in flight."""
+
+    def __init__(self):
+        self.saved = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.error = None
+
+    async def async_save(self, data):
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        self.saved.append(data)
+
+
+def make_writer(settings=None):
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"settings": settings if settings is not None else {}}}
+    hass.async_create_task = lambda coro: asyncio.get_running_loop().create_task(coro)
+    store = FakeStore()
+    return hass, store, SettingsWriter(hass, store)
+
+
+def set_key(key, value):
+    return lambda current: {**current, key: value}
+
+
+@pytest.mark.asyncio
+async def test_versions_monotonic_from_stored():
+    """Versions continue from the stored (timestamp) version, one per write."""
+    hass, store, writer = make_writer({"_version": 1700000000000})
+    first = await writer.async_write(set_key("a", 1))
+    second = await writer.async_write(set_key("a", 2))
+    assert (first, second) == (1700000000001, 1700000000002)
+    assert hass.data[DOMAIN]["settings"] == {"a": 2, "_version": second}
+    assert store.saved[-1]["_version"] == second
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_group_commit():
+    """Writes arriving during a save are applied in order and saved once."""
+    hass, store, writer = make_writer({"floorOrder": []})
+    store.release.clear()
+
+    def append(item):
+        return lambda current: deep_merge(
+            current, {}, [{"op": "insert", "path": "floorOrder", "value": item}]
+        )
+
+    tasks = [asyncio.ensure_future(writer.async_write(append("a")))]
+    for _ in range(3):
+        await asyncio.sleep(0)
+    tasks += [
+        asyncio.ensure_future(writer.async_write(append(item)))
+        for item in ("b", "c")
+    ]
+    await asyncio.sleep(0)
+    store.release.set()
+    versions = await asyncio.gather(*tasks)
+
+    assert versions == [1, 2, 3]
+    assert hass.data[DOMAIN]["settings"]["floorOrder"] == ["a", "b", "c"]
+    # The first save was in flight when b and c arrived
+    assert [saved["_version"] for saved in store.saved] == [1, 3]
+    assert writer.get_report()["max_group"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_update_changes_nothing():
+    """Errors of an update propagate without using a version."""
+    hass, store, writer = make_writer({"a": 1, "_version": 5})
+
+    def fail(current):
+        raise ValueError("bad delta")
+
+    with pytest.raises(ValueError):
+        writer.async_apply(fail)
+    assert hass.data[DOMAIN]["settings"] == {"a": 1, "_version": 5}
+    assert await writer.async_write(set_key("a", 2)) == 6
+
+
+@pytest.mark.asyncio
+async def test_save_error_reaches_waiting_writers():
+    """Writers waiting for a failed save get its error."""
+    hass, store, writer = make_writer()
+    store.error = OSError("disk full")
+    with pytest.raises(OSError):
+        await writer.async_write(set_key("a", 1))
+    assert writer.get_report()["failures"] == 1
+
+    store.error = None
+    assert await writer.async_write(set_key("a", 2)) == 2
+    assert store.saved[-1]["a"] == 2
+
+
+@pytest.mark.asyncio
+async def test_history_recorded_on_request():
+    """Writes are recorded for undo unless they are undo or redo."""
+    hass, store, writer = make_writer({"a": 1})
+    history = MagicMock()
+    hass.data[DOMAIN]["settings_history"] = history
+    await writer.async_write(set_key("a", 2))
+    await writer.async_write(set_key("a", 1), record_history=False)
+    history.record.assert_called_once_with({"a": 1}, {"a": 2, "_version": 1})
+
+
+@pytest.mark.asyncio
+async def test_flush_saves_after_data_dropped():
+    """Unload waits for the applied settings, even without hass.data."""
+    hass, store, writer = make_writer()
+    store.release.clear()
+    writer.async_apply(set_key("a", 1))
+    hass.data.pop(DOMAIN)
+
+    flush = asyncio.ensure_future(writer.async_flush())
+    await asyncio.sleep(0)
+    assert not flush.done()
+    store.release.set()
+    await flush
+
+    assert store.saved == [{"a": 1, "_version": 1}]
+    assert writer.get_report()["saved_version"] == 1
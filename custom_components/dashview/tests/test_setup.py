@@ -0,0 +1,213 @@
+"""Tests for integration startup.
+
+Tests that frontend setup does its file I/O in the executor and reports
+a per-phase timing breakdown, and that commands wait for the stores.
+"""
+import asyncio
+import json
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+
+class TestGetAssetManifest:
+    """Test the executor-side manifest read."""
+
+    def test_dev_mode_without_dist(self, tmp_path):
+        """Missing dist directory should report no manifest."""
+        from custom_components.dashview import _get_asset_manifest
+        assert _get_asset_manifest(tmp_path) is None
+
+    def test_reads_manifest_from_dist(self, tmp_path):
+        """Manifest in dist should be returned."""
+        from custom_components.dashview import _get_asset_manifest
+        dist = tmp_path / "dist"
+        dist.mkdir()
+        (dist / "asset-manifest.json").write_text(
+            json.dumps({"dashview-panel.js": "dashview-panel.abc123.js"})
+        )
+        assert _get_asset_manifest(tmp_path) == {
+            "dashview-panel.js": "dashview-panel.abc123.js"
+        }
+
+    def test_invalid_manifest_ignored(self, tmp_path):
+        """Corrupt manifest should fall back to dev mode."""
+        from custom_components.dashview import _get_asset_manifest
+        dist = tmp_path / "dist"
+        dist.mkdir()
+        (dist / "asset-manifest.json").write_text("{not json")
+        assert _get_asset_manifest(tmp_path) is None
+
+
+class TestAsyncSetupFrontend:
+    """Test async_setup_frontend."""
+
+    @pytest.fixture
+    def mock_hass(self):
+        """Create mock Home Assistant instance."""
+        hass = MagicMock()
+        hass.data = {}
+        hass.async_add_executor_job = AsyncMock(side_effect=lambda f, *a: f(*a))
+        hass.http.async_register_static_paths = AsyncMock()
+        return hass
+
+    @pytest.fixture(autouse=True)
+    def mock_asset_views(self):
+        """Replace the asset views (their HA base class is mocked)."""
+        import custom_components.dashview as dashview
+        with patch.object(dashview, "DashviewAssetView"), \
+                patch.object(dashview, "DashviewBootstrapView"):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_file_io_runs_in_executor(self, mock_hass):
+        """Manifest read should be dispatched to the executor."""
+        import custom_components.dashview as dashview
+
+        await dashview.async_setup_frontend(mock_hass)
+
+        mock_hass.async_add_executor_job.assert_called_once()
+        assert mock_hass.async_add_executor_job.call_args[0][0] is dashview._get_asset_manifest
+
+    @pytest.mark.asyncio
+    async def test_reports_phase_timings(self, mock_hass):
+        """Every frontend phase should be recorded in the timings dict."""
+        import custom_components.dashview as dashview
+
+        timings = {}
+        await dashview.async_setup_frontend(mock_hass, timings)
+
+        assert set(timings) == {"manifest", "static_paths", "panel_registration"}
+        assert all(value >= 0 for value in timings.values())
+
+    @pytest.mark.asyncio
+    async def test_uses_hashed_bundle_from_manifest(self, mock_hass):
+        """The panel should load the hashed bundle when a manifest exists."""
+        import custom_components.dashview as dashview
+
+        with patch.object(
+            dashview,
+            "_get_asset_manifest",
+            return_value={"dashview-panel.js": "dashview-panel.abc123.js"},
+        ), patch.object(dashview, "async_register_built_in_panel") as register:
+            await dashview.async_setup_frontend(mock_hass)
+
+        config = register.call_args.kwargs["config"]["_panel_custom"]
+        assert config["js_url"] == "/dashview_assets/dist/dashview-panel.abc123.js"
+
+    @pytest.mark.asyncio
+    async def test_asset_view_registered_once(self, mock_hass):
+        """Reloading should update the existing asset view, not add a route."""
+        import custom_components.dashview as dashview
+
+        await dashview.async_setup_frontend(mock_hass)
+        calls = mock_hass.http.register_view.call_count
+        await dashview.async_setup_frontend(mock_hass)
+
+        assert mock_hass.http.register_view.call_count == calls
+
+    @pytest.mark.asyncio
+    async def test_code_split_build_uses_bootstrap_module(self, mock_hass):
+        """A code-split manifest should register the bootstrap as module_url."""
+        import custom_components.dashview as dashview
+
+        manifest = {
+            "dashview-panel.js": "dashview-panel.abc123.js",
+            "entry": "dashview-panel.abc123.js",
+            "shared": ["index.def456.js"],
+            "lazy": ["index.789abc.js"],
+        }
+        with patch.object(
+            dashview, "_get_asset_manifest", return_value=manifest
+        ), patch.object(dashview, "async_register_built_in_panel") as register:
+            await dashview.async_setup_frontend(mock_hass)
+
+        config = register.call_args.kwargs["config"]["_panel_custom"]
+        assert config["module_url"] == "/dashview_assets/bootstrap.js?v=dashview-panel.abc123.js"
+        assert "js_url" not in config
+
+
+class TestLoading:
+    """Test commands waiting for the stores."""
+
+    @pytest.mark.asyncio
+    async def test_broken_cache_starts_empty(self):
+        """A failing cache load is logged instead of failing setup."""
+        import custom_components.dashview as dashview
+
+        async def fail():
+            raise ValueError("corrupt store")
+
+        await dashview._async_load_optional("artwork_load", fail())
+
+    @pytest.mark.asyncio
+    async def test_after_load_waits_for_settings(self):
+        """Handlers run once the settings are loaded."""
+        from custom_components.dashview.websocket import DATA_LOADED, after_load
+
+        handler = AsyncMock()
+        loaded = asyncio.Event()
+        hass = MagicMock()
+        hass.data = {"dashview": {DATA_LOADED: loaded}}
+        connection = MagicMock()
+
+        task = asyncio.ensure_future(after_load(handler)(hass, connection, {"id": 1}))
+        await asyncio.sleep(0)
+        handler.assert_not_called()
+
+        hass.data["dashview"]["settings"] = {}
+        loaded.set()
+        await task
+        handler.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_after_load_fails_without_settings(self):
+        """If setup failed, handlers answer with an error instead of waiting."""
+        from custom_components.dashview.websocket import DATA_LOADED, after_load
+
+        handler = AsyncMock()
+        loaded = asyncio.Event()
+        loaded.set()
+        hass = MagicMock()
+        hass.data = {"dashview": {DATA_LOADED: loaded}}
+        connection = MagicMock()
+
+        await after_load(handler)(hass, connection, {"id": 1})
+
+        handler.assert_not_called()
+        connection.send_error.assert_called_once_with(
+            1, "not_loaded", "Dashview settings are not loaded"
+        )
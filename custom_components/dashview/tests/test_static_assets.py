@@ -0,0 +1,215 @@
+"""Tests for compressed static asset serving.
+
+Tests Accept-Encoding negotiation and lazy creation of .gz siblings.
+"""
+import gzip
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.static_assets import (
+    MAX_CACHED_VARIANTS,
+    MIN_COMPRESS_SIZE,
+    build_bootstrap_module,
+    is_safe_asset_name,
+    parse_accept_encoding,
+    resolve_variant,
+)
+
+JS_SOURCE = b"export const x = 1;\n" * 200
+
+
+class TestParseAcceptEncoding:
+    """Test parse_accept_encoding function."""
+
+    def test_empty_header(self):
+        """No header should mean no compression."""
+        assert parse_accept_encoding("") == []
+
+    def test_prefers_brotli(self):
+        """Brotli should win over gzip at equal quality."""
+        assert parse_accept_encoding("gzip, deflate, br") == ["br", "gzip"]
+
+    def test_quality_values_respected(self):
+        """Higher q-value should win over server preference."""
+        assert parse_accept_encoding("br;q=0.5, gzip;q=1.0") == ["gzip", "br"]
+
+    def test_zero_quality_excluded(self):
+        """q=0 explicitly refuses an encoding."""
+        assert parse_accept_encoding("gzip, br;q=0") == ["gzip"]
+
+    def test_wildcard(self):
+        """Wildcard should accept all supported encodings."""
+        assert parse_accept_encoding("*") == ["br", "gzip"]
+
+    def test_unsupported_encodings_ignored(self):
+        """Unknown encodings should be ignored."""
+        assert parse_accept_encoding("deflate, zstd") == []
+
+
+class TestIsSafeAssetName:
+    """Test is_safe_asset_name function."""
+
+    def test_plain_names_allowed(self):
+        """Hashed bundles and locale files can be requested."""
+        assert is_safe_asset_name("dashview-panel.abc123.js")
+        assert is_safe_asset_name("de.json")
+
+    def test_traversal_rejected(self):
+        """Separators and parent references are rejected."""
+        assert not is_safe_asset_name("../secrets.yaml")
+        assert not is_safe_asset_name("a..js")
+
+    def test_compressed_siblings_rejected(self):
+        """Siblings are only served through Accept-Encoding negotiation."""
+        assert not is_safe_asset_name("x.js.br")
+        assert not is_safe_asset_name("x.js.gz")
+
+
+class TestResolveVariant:
+    """Test resolve_variant function."""
+
+    def test_uses_prebuilt_sibling(self, tmp_path):
+        """A fresh pre-compressed sibling should be served."""
+        source = tmp_path / "bundle.abc.js"
+        source.write_bytes(JS_SOURCE)
+        sibling = tmp_path / "bundle.abc.js.br"
+        sibling.write_bytes(b"prebuilt")
+
+        assert resolve_variant(source, ["br", "gzip"], {}) == (sibling, "br", None)
+
+    def test_lazily_compresses_in_memory(self, tmp_path):
+        """Files without a sibling are compressed once and kept in memory."""
+        source = tmp_path / "lit.esm.js"
+        source.write_bytes(JS_SOURCE)
+        cache = {}
+
+        path, encoding, body = resolve_variant(source, ["gzip"], cache)
+
+        assert (path, encoding) == (source, "gzip")
+        assert gzip.decompress(body) == JS_SOURCE
+        assert not (tmp_path / "lit.esm.js.gz").exists()
+        assert resolve_variant(source, ["gzip"], cache)[2] is body
+
+    def test_changed_source_recompressed(self, tmp_path):
+        """A cached variant older than its source is rebuilt."""
+        source = tmp_path / "en.json"
+        source.write_bytes(JS_SOURCE)
+        cache = {}
+        resolve_variant(source, ["gzip"], cache)
+        source.write_bytes(JS_SOURCE * 2)
+        os.utime(source, (1, 1))
+
+        _, _, body = resolve_variant(source, ["gzip"], cache)
+
+        assert gzip.decompress(body) == JS_SOURCE * 2
+
+    def test_stale_sibling_ignored(self, tmp_path):
+        """A sibling older than its source is not served."""
+        source = tmp_path / "en.json"
+        source.write_bytes(JS_SOURCE)
+        sibling = tmp_path / "en.json.gz"
+        sibling.write_bytes(b"stale")
+        os.utime(sibling, (0, 0))
+
+        path, encoding, body = resolve_variant(source, ["gzip"], {})
+
+        assert (path, encoding) == (source, "gzip")
+        assert gzip.decompress(body) == JS_SOURCE
+        assert sibling.read_bytes() == b"stale"
+
+    def test_cache_bounded(self, tmp_path):
+        """At most MAX_CACHED_VARIANTS variants are kept."""
+        cache = {}
+        for i in range(MAX_CACHED_VARIANTS + 1):
+            source = tmp_path / f"chunk{i}.js"
+            source.write_bytes(JS_SOURCE)
+            resolve_variant(source, ["gzip"], cache)
+
+        assert len(cache) == MAX_CACHED_VARIANTS
+        assert (tmp_path / "chunk0.js", "gzip") not in cache
+
+    def test_no_accepted_encoding(self, tmp_path):
+        """Clients without compression support get the plain file."""
+        source = tmp_path / "bundle.js"
+        source.write_bytes(JS_SOURCE)
+
+        assert resolve_variant(source, [], {}) == (source, None, None)
+
+    def test_small_files_not_compressed(self, tmp_path):
+        """Files below MIN_COMPRESS_SIZE should be served as-is."""
+        source = tmp_path / "tiny.js"
+        source.write_bytes(b"x" * (MIN_COMPRESS_SIZE - 1))
+
+        assert resolve_variant(source, ["gzip"], {}) == (source, None, None)
+
+    def test_binary_files_not_compressed(self, tmp_path):
+        """Non-text formats should not be compressed."""
+        source = tmp_path / "image.png"
+        source.write_bytes(JS_SOURCE)
+
+        assert resolve_variant(source, ["gzip"], {}) == (source, None, None)
+
+    def test_missing_file_raises(self, tmp_path):
+        """Missing source should raise FileNotFoundError (mapped to 404)."""
+        with pytest.raises(FileNotFoundError):
+            resolve_variant(tmp_path / "missing.js", ["gzip"], {})
+
+
+class TestBuildBootstrapModule:
+    """Test build_bootstrap_module function."""
+
+    def test_not_code_split(self):
+        """Single-bundle and dev builds need no bootstrap."""
+        assert build_bootstrap_module(None) is None
+        assert build_bootstrap_module({"dashview-panel.js": "dashview-panel.abc.js"}) is None
+
+    def test_preloads_only_critical_chunks(self):
+        """Entry and shared chunks are preloaded, lazy chunks are not."""
+        source = build_bootstrap_module({
+            "dashview-panel.js": "dashview-panel.abc.js",
+            "entry": "dashview-panel.abc.js",
+            "shared": ["index.core1.js", "i18n.core2.js"],
+            "lazy": ["index.admin1.js"],
+        })
+
+        assert "modulepreload" in source
+        assert '"index.core1.js"' in source
+        assert '"i18n.core2.js"' in source
+        assert "index.admin1.js" not in source
+        assert 'await import(base + "dashview-panel.abc.js")' in source
+        assert '"/dashview_assets/dist/"' in source
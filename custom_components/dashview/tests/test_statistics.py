@@ -0,0 +1,204 @@
+"""Tests for the long-term statistics summary.
+
+Tests period selection, range alignment, row merging and the
+per-period response cache behind dashview/statistics_summary.
+"""
+import sys
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from zoneinfo import ZoneInfo
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import statistics
+from custom_components.dashview.statistics import (
+    PERIOD_5MINUTE,
+    PERIOD_DAY,
+    PERIOD_HOUR,
+    StatisticsCache,
+    align_range,
+    merge_rows,
+    next_compile_time,
+    select_period,
+)
+
+DAY = timedelta(days=1)
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+def _start_of_local_day(value):
+    """homeassistant.util.dt.start_of_local_day for BERLIN."""
+    day = value.date() if isinstance(value, datetime) else value
+    return datetime.combine(day, time(), tzinfo=BERLIN)
+
+
+# The parts of homeassistant.util.dt used, in Europe/Berlin
+LOCAL_DT = SimpleNamespace(
+    as_local=lambda value: value.astimezone(BERLIN),
+    start_of_local_day=_start_of_local_day,
+    utc_from_timestamp=lambda ts: datetime.fromtimestamp(ts, timezone.utc),
+)
+
+
+class TestSelectPeriod:
+    """Test automatic period selection."""
+
+    def test_periods_by_span(self):
+        """Day views use 5-minute data, weeks and months hourly."""
+        assert select_period(START, START + DAY) == PERIOD_5MINUTE
+        assert select_period(START, START + 7 * DAY) == PERIOD_HOUR
+        assert select_period(START, START + 30 * DAY) == PERIOD_HOUR
+        assert select_period(START, START + 60 * DAY) == PERIOD_DAY
+
+
+class TestAlignRange:
+    """Test range alignment to whole periods."""
+
+    def test_rounds_start_down_and_end_up(self):
+        """Requests within one period share the aligned range."""
+        assert align_range(3700, 7300, PERIOD_HOUR) == (3600, 10800)
+        assert align_range(3600, 7200, PERIOD_HOUR) == (3600, 7200)
+        assert align_range(3601, 7299, PERIOD_HOUR) == align_range(3700, 7250, PERIOD_HOUR)
+
+    def test_days_are_local_days(self):
+        """Day ranges start and end at local midnight, also across DST."""
+        # 2024-03-31 has 23 hours in Berlin
+        start = datetime(2024, 3, 30, 12, tzinfo=BERLIN).timestamp()
+        end = datetime(2024, 3, 31, 12, tzinfo=BERLIN).timestamp()
+        with patch.object(statistics, "dt_util", LOCAL_DT):
+            aligned = align_range(start, end, PERIOD_DAY)
+            assert align_range(*aligned, PERIOD_DAY) == aligned
+
+        assert aligned == (
+            datetime(2024, 3, 30, tzinfo=BERLIN).timestamp(),
+            datetime(2024, 4, 1, tzinfo=BERLIN).timestamp(),
+        )
+        assert aligned[1] - aligned[0] == 47 * 3600
+
+
+class TestMergeRows:
+    """Test merging statistics rows into chart points."""
+
+    def test_short_input_unchanged(self):
+        """Fewer rows than points are returned one-to-one."""
+        rows = [
+            {"start": 0.0, "mean": 1.0, "min": 0.5, "max": 1.5},
+            {"start": START, "mean": 2.0, "min": 1.0, "max": 3.0},
+        ]
+        result = merge_rows(rows, 10)
+        assert result == {
+            "t": [0, int(START.timestamp())],
+            "mean": [1.0, 2.0],
+            "min": [0.5, 1.0],
+            "max": [1.5, 3.0],
+        }
+
+    def test_groups_keep_extremes(self):
+        """Merged groups average means and keep min/max."""
+        rows = [
+            {"start": i * 3600.0, "mean": float(i), "min": i - 1.0, "max": i + 1.0}
+            for i in range(720)
+        ]
+        rows[100]["max"] = 999.0
+        result = merge_rows(rows, 200)
+        assert len(result["t"]) <= 200
+        assert max(result["max"]) == 999.0
+        assert min(result["min"]) == -1.0
+        assert result["mean"][0] == pytest.approx(1.5)  # mean of rows 0-3
+
+    def test_rows_without_mean_skipped(self):
+        """Rows of entities without mean statistics are ignored."""
+        result = merge_rows([{"start": 0.0, "mean": None, "sum": 5.0}], 10)
+        assert result["t"] == []
+
+
+class TestStatisticsCache:
+    """Test the response cache."""
+
+    def test_expiry_and_lru(self):
+        """Entries expire at their time and the oldest are evicted."""
+        cache = StatisticsCache(max_entries=2)
+        cache.set("a", {"x": 1}, expires=100)
+        assert cache.get("a", now=99) == {"x": 1}
+        assert cache.get("a", now=100) is None
+
+        cache.set("a", {}, expires=100)
+        cache.set("b", {}, expires=100)
+        cache.set("c", {}, expires=100)
+        assert cache.get("a", now=0) is None
+        assert cache.get_report()["entries"] == 2
+
+    def test_next_compile_time(self):
+        """Expiry is aligned to the recorder's compile schedule."""
+        assert next_compile_time(3700, PERIOD_HOUR) == 7200 + statistics.COMPILE_DELAY
+        assert next_compile_time(3700, PERIOD_5MINUTE) == 3900 + statistics.COMPILE_DELAY
+        assert next_compile_time(3700, PERIOD_DAY) == 7200 + statistics.COMPILE_DELAY
+
+
+class TestAsyncGetStatisticsSummary:
+    """Test fetching and caching summaries."""
+
+    @pytest.mark.asyncio
+    async def test_second_request_served_from_cache(self):
+        """Identical aligned requests query the recorder once."""
+        async def run_in_executor(func, *args):
+            return func(*args)
+
+        recorder = MagicMock()
+        recorder.async_add_executor_job = run_in_executor
+        recorder_module = MagicMock()
+        recorder_module.get_instance.return_value = recorder
+        series = {"sensor.t": {"t": [], "mean": [], "min": [], "max": []}}
+        cache = StatisticsCache()
+
+        with patch.dict(sys.modules, {
+            "homeassistant.components.recorder": recorder_module,
+        }), patch.object(
+            statistics, "_fetch_statistics_summary", return_value=series
+        ) as fetch:
+            first = await statistics.async_get_statistics_summary(
+                MagicMock(), ["sensor.t"], START, START + 7 * DAY - timedelta(minutes=10),
+                PERIOD_HOUR, cache=cache,
+            )
+            second = await statistics.async_get_statistics_summary(
+                MagicMock(), ["sensor.t"], START + timedelta(minutes=5),
+                START + 7 * DAY - timedelta(minutes=5), PERIOD_HOUR, cache=cache,
+            )
+
+        assert fetch.call_count == 1
+        assert first == second
+        assert first[0] == START.timestamp()
@@ -0,0 +1,195 @@
+"""Tests for the info-text status summary.
+
+Tests group configuration from infoTextConfig and the incremental updates
+behind dashview/subscribe_status.
+"""
+import sys
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import entities
+from custom_components.dashview.status import StatusEngine, group_enabled
+
+
+def _state(entity_id, value, changed=0, **attributes):
+    """Build a State-like mock."""
+    state = MagicMock()
+    state.entity_id = entity_id
+    state.state = value
+    state.attributes = attributes
+    state.last_changed = datetime.fromtimestamp(changed, timezone.utc)
+    return state
+
+
+SETTINGS = {
+    "categoryLabels": {"window": "window", "motion": "motion", "waterLeak": "water"},
+    "infoTextConfig": {
+        "windows": {"enabled": True},
+        "water": {"enabled": True},
+    },
+}
+
+
+@pytest.fixture
+def registry():
+    """Patch the entity registry with labelled entities."""
+    entity_registry = MagicMock()
+    entity_registry.entities.values.return_value = [
+        MagicMock(entity_id=entity_id, labels={label})
+        for entity_id, label in (
+            ("binary_sensor.window_a", "window"),
+            ("binary_sensor.window_b", "window"),
+            ("binary_sensor.motion_a", "motion"),
+            ("binary_sensor.motion_b", "motion"),
+            ("binary_sensor.leak", "water"),
+        )
+    ]
+    with patch.object(entities.er, "async_get", return_value=entity_registry):
+        yield
+
+
+def _engine(states, settings=SETTINGS):
+    """Build an engine over the given states and rebuild it."""
+    by_id = {state.entity_id: state for state in states}
+    hass = MagicMock()
+    hass.states.get = by_id.get
+    hass.states.async_all.return_value = list(by_id.values())
+    engine = StatusEngine(hass)
+    engine.async_rebuild(settings)
+    return engine
+
+
+STATES = [
+    _state("binary_sensor.window_a", "on", 200),
+    _state("binary_sensor.window_b", "on", 100),
+    _state("binary_sensor.motion_a", "off", 300),
+    _state("binary_sensor.motion_b", "off", 500),
+    _state("binary_sensor.leak", "off", 50),
+    _state("sensor.phone_battery", "12"),
+    _state("sensor.remote", "35", device_class="battery"),
+]
+
+
+class TestGroupEnabled:
+    """Test infoTextConfig defaults."""
+
+    def test_defaults_match_panel(self):
+        """Motion and garage are on unless configured otherwise."""
+        assert group_enabled({}, "motion")
+        assert group_enabled({}, "garage")
+        assert not group_enabled({}, "windows")
+        assert not group_enabled({"motion": {"enabled": False}}, "motion")
+
+
+class TestStatusEngine:
+    """Test the summary and its updates."""
+
+    def test_summary_of_enabled_groups(self, registry):
+        """Only enabled groups are summarized, longest active first."""
+        summary = _engine(STATES).summary
+        assert summary["windows"] == {
+            "ids": ["binary_sensor.window_b", "binary_sensor.window_a"],
+            "total": 2,
+        }
+        # No leak: the sensor is still named so "no leaks" can be shown
+        assert summary["water"] == {"ids": ["binary_sensor.leak"], "total": 1}
+        # Motion is on by default; no motion -> most recently stopped sensor
+        assert summary["motion"] == {"ids": ["binary_sensor.motion_b"], "total": 2}
+        assert "battery" not in summary
+
+    def test_state_change_updates_group(self, registry):
+        """A state change only reports the affected group."""
+        engine = _engine(STATES)
+        received = []
+        engine.async_add_listener(received.append)
+
+        engine.async_update_entity(
+            "binary_sensor.window_a", _state("binary_sensor.window_a", "off", 600)
+        )
+        assert received == [
+            {"windows": {"ids": ["binary_sensor.window_b"], "total": 2}},
+        ]
+
+        engine.async_update_entity(
+            "binary_sensor.motion_a", _state("binary_sensor.motion_a", "on", 700)
+        )
+        assert received[-1] == {
+            "motion": {"ids": ["binary_sensor.motion_a"], "total": 2},
+        }
+
+    def test_unrelated_change_not_sent(self, registry):
+        """Changes that keep the summary are not sent."""
+        engine = _engine(STATES)
+        received = []
+        engine.async_add_listener(received.append)
+        engine.async_update_entity("light.kitchen", _state("light.kitchen", "on"))
+        assert received == []
+
+    def test_low_batteries(self, registry):
+        """Battery sensors below the threshold are found by name or class."""
+        settings = {
+            **SETTINGS,
+            "infoTextConfig": {"batteryLow": {"enabled": True, "threshold": 40}},
+        }
+        engine = _engine(STATES, settings)
+        assert engine.summary["battery"] == ["sensor.phone_battery", "sensor.remote"]
+
+        received = []
+        engine.async_add_listener(received.append)
+        engine.async_update_entity("sensor.remote", _state("sensor.remote", "80"))
+        assert received == [{"battery": ["sensor.phone_battery"]}]
+
+    def test_zero_battery_threshold_kept(self, registry):
+        """A threshold of 0 reports no battery instead of the default."""
+        settings = {
+            **SETTINGS,
+            "infoTextConfig": {"batteryLow": {"enabled": True, "threshold": 0}},
+        }
+        engine = _engine(STATES, settings)
+        assert engine.summary["battery"] == []
+
+    def test_disabled_group_sent_as_none(self, registry):
+        """Switching a group off removes it from the summary."""
+        engine = _engine(STATES)
+        received = []
+        engine.async_add_listener(received.append)
+
+        engine.async_rebuild({
+            **SETTINGS,
+            "infoTextConfig": {"water": {"enabled": True}},
+        })
+        assert received == [{"windows": None}]
@@ -0,0 +1,158 @@
+"""Tests for the settings storage encoding.
+
+Tests the compact enabled* map form and the store migrations, including
+the legacy media presets import.
+"""
+import json
+import sys
+from unittest.mock import MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.storage import (
+    ENTITY_TABLE_KEY,
+    LEGACY_MEDIA_PRESETS_FILE,
+    decode_settings,
+    encode_settings,
+    is_enabled_map,
+    migrate_settings,
+)
+
+
+SETTINGS = {
+    "enabledLights": {"light.kitchen": True, "light.desk": False},
+    "enabledMotionSensors": {"binary_sensor.hall": True, "light.kitchen": True},
+    "enabledRooms": {},
+    "floorOrder": ["ground", "first"],
+    "weatherEntity": "weather.home",
+}
+
+
+class TestEncoding:
+    """Test the compact form."""
+
+    def test_encode_interns_entity_ids(self):
+        """Entity IDs are stored once; maps list indexes per state."""
+        encoded = encode_settings(SETTINGS)
+        assert encoded[ENTITY_TABLE_KEY] == [
+            "binary_sensor.hall", "light.desk", "light.kitchen",
+        ]
+        assert encoded["enabledLights"] == {"on": [2], "off": [1]}
+        assert encoded["enabledMotionSensors"] == {"on": [0, 2], "off": []}
+        assert encoded["enabledRooms"] == {"on": [], "off": []}
+        assert encoded["floorOrder"] == ["ground", "first"]
+
+    def test_round_trip(self):
+        """Decoding restores the plain maps."""
+        assert decode_settings(encode_settings(SETTINGS)) == SETTINGS
+
+    def test_non_boolean_maps_untouched(self):
+        """enabled* maps with non-boolean values are kept as they are."""
+        appliances = {"sensor.washer": {"enabled": True}}
+        assert not is_enabled_map("enabledAppliances", appliances)
+        encoded = encode_settings({"enabledAppliances": appliances})
+        assert encoded["enabledAppliances"] is appliances
+        assert decode_settings(encoded) == {"enabledAppliances": appliances}
+
+    def test_plain_settings_unchanged(self):
+        """Documents without an entity table are returned as they are."""
+        assert decode_settings(SETTINGS) is SETTINGS
+
+    @pytest.mark.parametrize("index", [3, -1, "0", 1.0])
+    def test_invalid_index(self, index):
+        """Indexes outside the table are rejected."""
+        data = {
+            ENTITY_TABLE_KEY: ["a", "b", "c"],
+            "enabledLights": {"on": [index], "off": []},
+        }
+        with pytest.raises(ValueError):
+            decode_settings(data)
+
+    def test_invalid_table(self):
+        """The entity table must be a list."""
+        with pytest.raises(ValueError):
+            decode_settings({ENTITY_TABLE_KEY: {"a": 0}})
+
+
+PRESETS = [{"name": "Jazz", "media_content_id": "spotify:playlist:1"}]
+
+
+def write_legacy_presets(config_dir, content):
+    path = config_dir / LEGACY_MEDIA_PRESETS_FILE
+    path.parent.mkdir(parents=True)
+    path.write_text(content)
+
+
+class TestMigration:
+    """Test the store migrations."""
+
+    def test_version_1_without_legacy_file(self, tmp_path):
+        """Plain settings come back unchanged, with step timings."""
+        settings, timings = migrate_settings(1, dict(SETTINGS), tmp_path)
+        assert settings == SETTINGS
+        assert set(timings) == {"legacy_media_presets"}
+
+    def test_version_2_is_decoded(self, tmp_path):
+        """Compact version 2 data is returned with plain maps."""
+        settings, _ = migrate_settings(2, encode_settings(SETTINGS), tmp_path)
+        assert settings == SETTINGS
+
+    def test_legacy_media_presets_imported(self, tmp_path):
+        """Presets from the legacy file are imported, invalid ones dropped."""
+        write_legacy_presets(tmp_path, json.dumps(
+            {"media_presets": PRESETS + [{"name": "broken"}, "spotify:x"]}
+        ))
+        settings, _ = migrate_settings(0, {}, tmp_path)
+        assert settings == {"mediaPresets": PRESETS}
+
+    def test_configured_media_presets_kept(self, tmp_path):
+        """The legacy file does not replace presets set in the settings."""
+        write_legacy_presets(tmp_path, json.dumps({"media_presets": PRESETS}))
+        current = [{"name": "Rock", "media_content_id": "spotify:playlist:2"}]
+        settings, _ = migrate_settings(1, {"mediaPresets": current}, tmp_path)
+        assert settings["mediaPresets"] == current
+
+    def test_invalid_legacy_file_ignored(self, tmp_path):
+        """An unreadable legacy file does not fail the migration."""
+        write_legacy_presets(tmp_path, "{not json")
+        settings, _ = migrate_settings(1, dict(SETTINGS), tmp_path)
+        assert settings == SETTINGS
+
+    def test_current_version_skips_steps(self, tmp_path):
+        """No steps run for data of the current version."""
+        write_legacy_presets(tmp_path, json.dumps({"media_presets": PRESETS}))
+        settings, timings = migrate_settings(3, {}, tmp_path)
+        assert settings == {}
+        assert timings == {}
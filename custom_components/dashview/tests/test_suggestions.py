@@ -0,0 +1,210 @@
+"""Tests for the server-side suggestion engine.
+
+Tests incremental rule evaluation, shared cooldowns and dismissals.
+"""
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview import entities, suggestions
+from custom_components.dashview.suggestions import SuggestionEngine
+
+EVENING = datetime(2026, 1, 1, 20, 0)
+NIGHT = datetime(2026, 1, 1, 23, 30)
+
+SETTINGS = {
+    "categoryLabels": {"light": "light", "climate": "climate", "window": "window"},
+}
+
+
+def _state(entity_id, value):
+    """Build a State-like mock."""
+    state = MagicMock()
+    state.entity_id = entity_id
+    state.state = value
+    return state
+
+
+@pytest.fixture
+def registry():
+    """Patch the entity registry with labelled entities."""
+    entity_registry = MagicMock()
+    entity_registry.entities.values.return_value = [
+        MagicMock(entity_id=entity_id, labels={label})
+        for entity_id, label in (
+            ("light.a", "light"),
+            ("light.b", "light"),
+            ("climate.living", "climate"),
+            ("binary_sensor.window", "window"),
+        )
+    ]
+    with patch.object(entities.er, "async_get", return_value=entity_registry):
+        yield
+
+
+def _engine(states, now=EVENING):
+    """Build an engine over the given states at a fixed local time."""
+    by_id = {state.entity_id: state for state in states}
+    hass = MagicMock()
+    hass.states.get = by_id.get
+    engine = SuggestionEngine(hass)
+    engine._local_now = lambda: now
+    engine.async_rebuild(SETTINGS)
+    return engine
+
+
+def _rules(engine):
+    return [suggestion["rule"] for suggestion in engine.suggestions]
+
+
+STATES = [
+    _state("light.a", "off"),
+    _state("light.b", "off"),
+    _state("climate.living", "heat"),
+    _state("binary_sensor.window", "off"),
+    _state("sun.sun", "above_horizon"),
+]
+
+
+class TestSuggestionEngine:
+    """Test rule evaluation and its updates."""
+
+    def test_no_suggestions_initially(self, registry):
+        """Nothing is suggested while no rule condition holds."""
+        assert _engine(STATES).suggestions == []
+
+    def test_window_opened_while_heating(self, registry):
+        """Opening a window while heating raises the conflict warning."""
+        engine = _engine(STATES)
+        listener = MagicMock()
+        engine.async_add_listener(listener)
+
+        engine.async_update_entity("binary_sensor.window", _state("binary_sensor.window", "on"))
+
+        assert engine.suggestions == [{
+            "rule": "ac-windows-conflict",
+            "entity_ids": ["binary_sensor.window"],
+            "priority": 80,
+            "level": "warning",
+        }]
+        listener.assert_called_once_with(engine.suggestions)
+
+    def test_only_dependent_rules_evaluated(self, registry):
+        """A window change does not re-evaluate the light rules."""
+        engine = _engine(STATES)
+        before = engine.evaluations
+
+        engine.async_update_entity("binary_sensor.window", _state("binary_sensor.window", "on"))
+
+        assert engine.evaluations == before + 1
+
+    def test_unchanged_condition_skips_evaluation(self, registry):
+        """Attribute-only updates do not evaluate any rule."""
+        engine = _engine(STATES)
+        before = engine.evaluations
+
+        engine.async_update_entity("light.a", _state("light.a", "off"))
+        engine.async_update_entity("sensor.unrelated", _state("sensor.unrelated", "1"))
+
+        assert engine.evaluations == before
+
+    def test_sunset_and_late_night_rules(self, registry):
+        """Sunset asks for lights; late at night 2+ lights on are flagged."""
+        engine = _engine(STATES)
+        engine.async_update_entity("sun.sun", _state("sun.sun", "below_horizon"))
+        assert _rules(engine) == ["sunset-lights"]
+
+        engine._local_now = lambda: NIGHT
+        engine.async_update_entity("light.a", _state("light.a", "on"))
+        engine.async_update_entity("light.b", _state("light.b", "on"))
+        assert _rules(engine) == ["lights-left-on"]
+        assert engine.suggestions[0]["entity_ids"] == ["light.a", "light.b"]
+
+    def test_hourly_reevaluation(self, registry):
+        """Time-dependent rules are re-evaluated on the hour."""
+        engine = _engine(STATES[:1] + [_state("light.b", "on")] + STATES[2:])
+        engine.async_update_entity("light.a", _state("light.a", "on"))
+        assert engine.suggestions == []
+
+        engine._local_now = lambda: NIGHT
+        engine._async_hourly(NIGHT)
+
+        assert _rules(engine) == ["lights-left-on"]
+
+    def test_action_starts_cooldown(self, registry):
+        """An action hides the rule for its cooldown, for every panel."""
+        engine = _engine(STATES)
+        engine.async_update_entity("binary_sensor.window", _state("binary_sensor.window", "on"))
+
+        with patch.object(suggestions.time, "time", return_value=1000.0):
+            engine.async_record_action("ac-windows-conflict", "taken", now=1000.0)
+            assert engine.suggestions == []
+        with patch.object(suggestions.time, "time", return_value=1000.0 + 30 * 60):
+            engine._async_cooldown_expired(None)
+            assert _rules(engine) == ["ac-windows-conflict"]
+
+    def test_dismissal_lasts_until_condition_clears(self, registry):
+        """A dismissed rule reappears only on its next occurrence."""
+        engine = _engine(STATES)
+        window = "binary_sensor.window"
+        engine.async_update_entity(window, _state(window, "on"))
+        engine.async_record_action("ac-windows-conflict", "dismiss", now=0.0)
+        assert engine.suggestions == []
+
+        engine.async_update_entity(window, _state(window, "off"))
+        engine.async_update_entity(window, _state(window, "on"))
+
+        assert _rules(engine) == ["ac-windows-conflict"]
+
+    def test_unknown_rule_rejected(self, registry):
+        """Actions for unknown rules raise KeyError."""
+        with pytest.raises(KeyError):
+            _engine(STATES).async_record_action("nope", "dismiss")
+
+    @pytest.mark.asyncio
+    async def test_load_ignores_unknown_rules(self):
+        """Stored cooldowns of removed rules are dropped."""
+        engine = SuggestionEngine(MagicMock())
+        engine._store.async_load = AsyncMock(return_value={
+            "cooldowns": {"sunset-lights": 5, "removed-rule": 6},
+            "dismissed": ["lights-left-on", "removed-rule"],
+        })
+
+        await engine.async_load()
+
+        assert engine._cooldowns == {"sunset-lights": 5.0}
+        assert engine._dismissed == {"lights-left-on"}
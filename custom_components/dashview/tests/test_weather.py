@@ -0,0 +1,137 @@
+"""Tests for the shared weather forecast subscriptions.
+
+Tests one upstream subscription per entity and forecast type, fan-out and
+the memory and disk cache.
+"""
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+# Mock homeassistant before importing our module - must be at top
+mock_websocket_api = MagicMock()
+mock_websocket_api.websocket_command = lambda schema: lambda f: f
+mock_websocket_api.async_response = lambda f: f
+mock_websocket_api.ActiveConnection = MagicMock
+
+mock_vol = MagicMock()
+mock_vol.Required = lambda x: x
+
+mock_ha = MagicMock()
+mock_components = MagicMock()
+mock_components.websocket_api = mock_websocket_api
+
+mock_core = MagicMock()
+mock_core.callback = lambda f: f
+
+sys.modules['aiohttp'] = MagicMock()
+sys.modules['homeassistant'] = mock_ha
+sys.modules['homeassistant.components'] = mock_components
+sys.modules['homeassistant.components.frontend'] = MagicMock()
+sys.modules['homeassistant.components.http'] = MagicMock()
+sys.modules['homeassistant.components.websocket_api'] = mock_websocket_api
+sys.modules['homeassistant.config_entries'] = MagicMock()
+sys.modules['homeassistant.const'] = MagicMock()
+sys.modules['homeassistant.core'] = mock_core
+sys.modules['homeassistant.helpers'] = MagicMock()
+sys.modules['homeassistant.helpers.dispatcher'] = MagicMock()
+sys.modules['homeassistant.helpers.event'] = MagicMock()
+sys.modules['homeassistant.helpers.storage'] = MagicMock()
+sys.modules['homeassistant.util'] = MagicMock()
+sys.modules['voluptuous'] = mock_vol
+
+import pytest
+
+from custom_components.dashview.weather import ForecastNotSupported, WeatherForecasts
+
+FORECAST = [{"datetime": "2026-01-01T00:00:00+00:00", "temperature": 3}]
+
+
+def _setup(supported_features=1 | 4):
+    """Build a multiplexer with one weather entity."""
+    entity = MagicMock()
+    entity.supported_features = supported_features
+    entity.async_update_listeners = MagicMock()
+    component = MagicMock()
+    component.get_entity = {"weather.home": entity}.get
+    hass = MagicMock()
+    hass.data = {"weather": component}
+    return WeatherForecasts(hass), entity
+
+
+def _upstream(entity):
+    """Return the listener the multiplexer registered on the entity."""
+    return entity.async_subscribe_forecast.call_args[0][1]
+
+
+class TestWeatherForecasts:
+    """Test multiplexing and caching."""
+
+    def test_one_upstream_subscription_per_feed(self):
+        """Several panels share one subscription per forecast type."""
+        forecasts, entity = _setup()
+        first, second, hourly = MagicMock(), MagicMock(), MagicMock()
+
+        forecasts.async_subscribe("weather.home", "daily", first)
+        forecasts.async_subscribe("weather.home", "daily", second)
+        forecasts.async_subscribe("weather.home", "hourly", hourly)
+
+        assert entity.async_subscribe_forecast.call_count == 2
+        daily_listener = entity.async_subscribe_forecast.call_args_list[0][0][1]
+        daily_listener(FORECAST)
+        first.assert_called_once_with(FORECAST)
+        second.assert_called_once_with(FORECAST)
+        hourly.assert_not_called()
+
+    def test_new_subscriber_gets_cached_forecast(self):
+        """The latest forecast is sent to new subscribers right away."""
+        forecasts, entity = _setup()
+        forecasts.async_subscribe("weather.home", "daily", MagicMock())
+        _upstream(entity)(FORECAST)
+
+        late = MagicMock()
+        forecasts.async_subscribe("weather.home", "daily", late)
+
+        late.assert_called_once_with(FORECAST)
+        forecasts._store.async_delay_save.assert_called()
+
+    def test_last_subscriber_stops_upstream(self):
+        """Upstream is unsubscribed once no panel listens; cache is kept."""
+        forecasts, entity = _setup()
+        remove_first = forecasts.async_subscribe("weather.home", "daily", MagicMock())
+        remove_second = forecasts.async_subscribe("weather.home", "daily", MagicMock())
+        _upstream(entity)(FORECAST)
+        upstream_unsub = entity.async_subscribe_forecast.return_value
+
+        remove_first()
+        upstream_unsub.assert_not_called()
+        remove_second()
+        upstream_unsub.assert_called_once()
+
+        again = MagicMock()
+        forecasts.async_subscribe("weather.home", "daily", again)
+        assert entity.async_subscribe_forecast.call_count == 2
+        again.assert_called_once_with(FORECAST)
+
+    def test_unsupported_forecast_type(self):
+        """Missing entities and forecast types are rejected."""
+        forecasts, _ = _setup(supported_features=1)
+
+        assert forecasts.supported_types("weather.home", ["daily", "hourly"]) == ["daily"]
+        assert forecasts.supported_types("weather.other", ["daily"]) == []
+        with pytest.raises(ForecastNotSupported):
+            forecasts.async_subscribe("weather.home", "hourly", MagicMock())
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_served_after_restart(self):
+        """Forecasts loaded from the store are sent before upstream answers."""
+        forecasts, _ = _setup()
+        forecasts._store.async_load = AsyncMock(return_value={
+            "weather.home|daily": {"forecast": FORECAST, "updated": 100.0},
+            "weather.home|bogus": {"forecast": FORECAST, "updated": 100.0},
+        })
+        await forecasts.async_load()
+
+        listener = MagicMock()
+        forecasts.async_subscribe("weather.home", "daily", listener)
+
+        listener.assert_called_once_with(FORECAST)
+        assert forecasts.get_report()["feeds"] == 1
@@ -0,0 +1,202 @@
+"""Dashview - Shared weather forecast subscriptions.
+
+Backs the dashview/subscribe_weather command. Every open panel subscribed
+to weather/subscribe_forecast twice (daily and hourly) for the same
+entity, so N tablets kept 2N forecast pipelines. The multiplexer keeps one
+forecast subscription per (entity, forecast type) for as long as any panel
+listens, fans updates out to all of them and caches the latest forecast in
+memory and in a Dashview store, so new subscribers - also right after a
+restart - get it immediately.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.weather_forecasts"
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+WEATHER_DOMAIN = "weather"
+
+# Forecast type -> WeatherEntityFeature flag
+FORECAST_FEATURES = {
+    "daily": 1,
+    "twice_daily": 2,
+    "hourly": 4,
+}
+FORECAST_TYPES = tuple(FORECAST_FEATURES)
+
+ForecastListener = Callable[[list[dict[str, Any]] | None], None]
+
+
+class ForecastNotSupported(Exception):
+    """The weather entity does not exist or lacks the forecast type."""
+
+
+@dataclass
+class ForecastFeed:
+    """One upstream forecast subscription and its subscribers.
+
+    Attributes:
+        listeners: Panels receiving updates
+        unsub: Removes the upstream subscription while active
+        forecast: Latest forecast, if any
+        updated: When the forecast was received (epoch seconds)
+    """
+
+    listeners: list[ForecastListener] = field(default_factory=list)
+    unsub: CALLBACK_TYPE | None = None
+    forecast: list[dict[str, Any]] | None = None
+    updated: float | None = None
+
+
+class WeatherForecasts:
+    """Multiplexes weather forecast subscriptions across panels."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without feeds.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._hass = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._feeds: dict[tuple[str, str], ForecastFeed] = {}
+        self.upstream_updates = 0
+
+    async def async_load(self) -> None:
+        """Load the forecasts cached before the last shutdown."""
+        data = await self._store.async_load() or {}
+        for key, cached in data.items():
+            entity_id, _, forecast_type = key.partition("|")
+            if forecast_type not in FORECAST_FEATURES:
+                continue
+            self._feeds[(entity_id, forecast_type)] = ForecastFeed(
+                forecast=cached.get("forecast"), updated=cached.get("updated")
+            )
+
+    @callback
+    def async_subscribe(
+        self, entity_id: str, forecast_type: str, listener: ForecastListener
+    ) -> CALLBACK_TYPE:
+        """Subscribe a panel to an entity's forecast.
+
+        The cached forecast, if any, is sent right away. The first
+        subscriber of a feed starts the upstream subscription, the last one
+        to leave stops it.
+
+        Args:
+            entity_id: Weather entity ID
+            forecast_type: One of FORECAST_TYPES
+            listener: Called with each forecast
+
+        Returns:
+            Function removing the subscription
+
+        Raises:
+            ForecastNotSupported: If the entity is not loaded or does not
+                provide the forecast type
+        """
+        key = (entity_id, forecast_type)
+        feed = self._feeds.get(key)
+        if feed is None or feed.unsub is None:
+            entity = self._get_entity(entity_id, forecast_type)
+            feed = self._feeds.setdefault(key, ForecastFeed())
+            feed.unsub = entity.async_subscribe_forecast(
+                forecast_type,
+                lambda forecast: self._async_forecast_updated(key, forecast),
+            )
+            # Ask the entity for a current forecast (as weather/subscribe_forecast)
+            self._hass.async_create_task(
+                entity.async_update_listeners({forecast_type})
+            )
+        feed.listeners.append(listener)
+        if feed.forecast is not None:
+            listener(feed.forecast)
+
+        @callback
+        def remove() -> None:
+            if listener in feed.listeners:
+                feed.listeners.remove(listener)
+            if not feed.listeners and feed.unsub is not None:
+                feed.unsub()
+                feed.unsub = None
+
+        return remove
+
+    def supported_types(self, entity_id: str, forecast_types: list[str]) -> list[str]:
+        """Return the forecast types an entity provides, in request order."""
+        supported = []
+        for forecast_type in forecast_types:
+            try:
+                self._get_entity(entity_id, forecast_type)
+            except ForecastNotSupported:
+                continue
+            supported.append(forecast_type)
+        return supported
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop all upstream subscriptions."""
+        for feed in self._feeds.values():
+            feed.listeners.clear()
+            if feed.unsub is not None:
+                feed.unsub()
+                feed.unsub = None
+
+    def get_report(self) -> dict[str, Any]:
+        """Return multiplexer statistics for diagnostics."""
+        return {
+            "feeds": len(self._feeds),
+            "active_feeds": sum(
+                1 for feed in self._feeds.values() if feed.unsub is not None
+            ),
+            "subscribers": sum(len(feed.listeners) for feed in self._feeds.values()),
+            "upstream_updates": self.upstream_updates,
+        }
+
+    def _get_entity(self, entity_id: str, forecast_type: str) -> Any:
+        """Return the weather entity object providing a forecast type."""
+        component = self._hass.data.get(WEATHER_DOMAIN)
+        entity = component.get_entity(entity_id) if component is not None else None
+        if entity is None:
+            raise ForecastNotSupported(f"Weather entity {entity_id} not found")
+        if not (entity.supported_features or 0) & FORECAST_FEATURES[forecast_type]:
+            raise ForecastNotSupported(
+                f"{entity_id} does not support {forecast_type} forecasts"
+            )
+        return entity
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            f"{entity_id}|{forecast_type}": {
+                "forecast": feed.forecast,
+                "updated": feed.updated,
+            }
+            for (entity_id, forecast_type), feed in self._feeds.items()
+            if feed.forecast is not None
+        }
+
+    @callback
+    def _async_forecast_updated(
+        self, key: tuple[str, str], forecast: list[dict[str, Any]] | None
+    ) -> None:
+        """Cache an upstream forecast and fan it out."""
+        feed = self._feeds[key]
+        self.upstream_updates += 1
+        if forecast is not None:
+            feed.forecast = forecast
+            feed.updated = time.time()
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        for listener in list(feed.listeners):
+            listener(forecast)
@@ -1,30 +1,92 @@
 """Dashview - WebSocket command handlers."""
 from __future__ import annotations
 
+import asyncio
 import base64
 import copy
+import functools
 import hashlib
 import logging
 import os
 import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Awaitable, Callable
 
 from homeassistant.components import websocket_api
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.storage import Store
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 import voluptuous as vol
 
+from .artwork import MAX_MEDIA_IDS
 from .const import DOMAIN
+from .entity_stream import (
+    DEFAULT_NUMERIC_RATE,
+    MAX_NUMERIC_RATE,
+    MIN_NUMERIC_RATE,
+    EntityStream,
+)
+from .history import (
+    DEFAULT_POINTS,
+    MAX_ENTITIES,
+    MAX_POINTS,
+    MAX_RANGE_HOURS,
+    METHOD_LTTB,
+    METHODS,
+    async_get_history_summary,
+)
+from .log_sampler import get_log_sampler
+from .loop_monitor import loop_monitored
+from .overlays import MAX_OVERLAY_PATHS, SettingsOverlays
+from .presence import (
+    DEFAULT_DAYS,
+    DEFAULT_LIMIT,
+    MAX_DAYS,
+    MAX_LIMIT,
+    MAX_PERSONS,
+    is_presence_entity,
+)
 from .rate_limiter import rate_limited
+from .search import (
+    DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT,
+    MAX_FILTERS,
+    MAX_LIMIT as SEARCH_MAX_LIMIT,
+    MAX_QUERY_LENGTH,
+)
 from .security import (
     ALLOWED_EXTENSIONS,
     detect_file_type,
     validate_and_sanitize_filename,
     validate_magic_bytes,
 )
+from .settings_history import SettingsHistory, apply_entries
+from .settings_writer import SettingsWriter, VersionConflict
+from .statistics import (
+    MAX_RANGE_DAYS,
+    PERIODS,
+    async_get_statistics_summary,
+    select_period,
+)
+from .storage import decode_settings, encode_settings
+from .suggestions import ACTIONS, RULES_BY_ID
+from .weather import FORECAST_TYPES, WEATHER_DOMAIN, ForecastNotSupported
 
 _LOGGER = logging.getLogger(__name__)
 
+# get_settings layers: shared settings with the user's overlay, shared
+# settings only (for editing them) or the user's overlay only
+LAYER_MERGED = "merged"
+LAYER_BASE = "base"
+LAYER_USER = "user"
+LAYERS = (LAYER_MERGED, LAYER_BASE, LAYER_USER)
+
+# hass.data[DOMAIN] key of the open subscriptions
+DATA_SUBSCRIPTIONS = "subscriptions"
+
+# hass.data[DOMAIN] key of the event set once the stores are loaded
+DATA_LOADED = "loaded"
+# Seconds a command waits for the stores to load
+LOAD_TIMEOUT = 60
+
 # Photo upload configuration
 PHOTO_UPLOAD_DIR = "www/dashview/user_photos"
 PHOTO_URL_PREFIX = "/local/dashview/user_photos"
@@ -34,11 +96,44 @@ MAX_PHOTO_SIZE = 5 * 1024 * 1024  # 5MB
 MAX_BASE64_SIZE = int(MAX_PHOTO_SIZE * 4 / 3) + 1000  # ~6.67MB + buffer for data URL prefix
 
 
+def after_load(func: Callable[..., Awaitable[None]]) -> Callable:
+    """Decorator making a handler wait until the stores are loaded.
+
+    Commands are registered before async_setup_entry loads the settings,
+    history, overlays, forecasts and artwork, so a panel that opens early
+    finds them; handlers using that data wait for the load, at most
+    LOAD_TIMEOUT seconds. If setup failed or is not done by then, the
+    command is answered with a not_loaded error.
+    """
+    @functools.wraps(func)
+    async def wrapper(
+        hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+    ) -> None:
+        data = hass.data.get(DOMAIN, {})
+        loaded: asyncio.Event | None = data.get(DATA_LOADED)
+        if loaded is not None and not loaded.is_set():
+            try:
+                await asyncio.wait_for(loaded.wait(), LOAD_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+        if loaded is None or not loaded.is_set() or "settings" not in data:
+            connection.send_error(
+                msg["id"], "not_loaded", "Dashview settings are not loaded"
+            )
+            return
+        await func(hass, connection, msg)
+    return wrapper
+
+
 @websocket_api.websocket_command({
     vol.Required("type"): f"{DOMAIN}/get_settings",
+    vol.Optional("compact", default=False): bool,
+    vol.Optional("layer", default=LAYER_MERGED): vol.In(LAYERS),
 })
 @websocket_api.async_response
+@loop_monitored("get_settings")
 @rate_limited("get_settings")
+@after_load
 async def websocket_get_settings(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
@@ -47,11 +142,24 @@ async def websocket_get_settings(
     """Handle get settings request.
 
     Rate limit: 20 req/sec, burst 10 (Story 7.9 AC2)
+
+    Clients sending compact=True receive the enabled* maps in compact form
+    (see storage.encode_settings); older clients get plain maps. By default
+    the shared settings are returned with the user's overlay applied.
     """
     settings = hass.data[DOMAIN].get("settings", {
         "enabledRooms": {},
         "enabledLights": {},
     })
+    overlays: SettingsOverlays | None = hass.data[DOMAIN].get("overlays")
+    if overlays is not None and msg["layer"] != LAYER_BASE:
+        user_id = connection.user.id
+        if msg["layer"] == LAYER_USER:
+            settings = overlays.get_overlay(user_id)
+        else:
+            settings = overlays.resolve(user_id, settings)
+    if msg["compact"]:
+        settings = encode_settings(settings)
     connection.send_result(msg["id"], settings)
 
 
@@ -61,7 +169,9 @@ async def websocket_get_settings(
 })
 @websocket_api.require_admin
 @websocket_api.async_response
+@loop_monitored("save_settings")
 @rate_limited("save_settings")
+@after_load
 async def websocket_save_settings(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
@@ -70,44 +180,62 @@ async def websocket_save_settings(
     """Handle save settings request.
 
     Rate limit: 5 req/sec, burst 3 (Story 7.9 AC2)
-    """
-    settings = msg["settings"]
 
-    # Update in memory
-    hass.data[DOMAIN]["settings"] = settings
+    Accepts plain or compact (with an entity table) settings. Values at
+    the user's overlay paths keep their shared values (see overlays.py).
+    """
+    try:
+        settings = decode_settings(msg["settings"])
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_format", str(err))
+        return
 
-    # Persist to storage
-    store: Store = hass.data[DOMAIN]["store"]
-    await store.async_save(settings)
+    overlays: SettingsOverlays = hass.data[DOMAIN]["overlays"]
+    user_id = connection.user.id
+    writer: SettingsWriter = hass.data[DOMAIN]["settings_writer"]
+    version = await writer.async_write(
+        lambda current: overlays.protect(user_id, current, settings)
+    )
 
     _LOGGER.debug("Dashview settings saved: %s", settings)
-    connection.send_result(msg["id"], {"success": True})
+    connection.send_result(msg["id"], {"success": True, "version": version})
+
+
+# Reject dangerous keys that could cause issues
+_DANGEROUS_KEYS = {"__class__", "__init__", "__proto__", "constructor", "__dict__"}
+
+# Array operations in settings deltas
+ARRAY_OPS = ("insert", "remove", "move", "replace")
+MAX_ARRAY_OPS = 200
+
 
+def _split_path(path: str) -> list[str]:
+    """Split a dot-notation path, rejecting dangerous keys."""
+    parts = path.split(".")
+    if any(part in _DANGEROUS_KEYS for part in parts):
+        raise ValueError(f"Invalid path: {path}")
+    return parts
 
-def deep_merge(base: dict, changes: dict) -> dict:
+
+def deep_merge(base: dict, changes: dict, ops: list[dict] | None = None) -> dict:
     """Deep merge changes into base dict using dot-notation paths.
 
     Args:
         base: Base settings dictionary
         changes: Dict with dot-notation paths as keys (e.g., "weather.entity": "value")
+        ops: Array operations applied after the changes (see apply_array_ops)
 
     Returns:
         Merged dictionary (new object, base is not modified)
 
     Raises:
-        ValueError: If a path contains dangerous keys
+        ValueError: If a path contains dangerous keys or an array operation
+            is invalid
     """
-    # Reject dangerous keys that could cause issues
-    dangerous_keys = {"__class__", "__init__", "__proto__", "constructor", "__dict__"}
-
     result = copy.deepcopy(base)
 
     for path, value in changes.items():
-        parts = path.split(".")
-
-        # Validate path parts don't contain dangerous keys
-        if any(part in dangerous_keys for part in parts):
-            raise ValueError(f"Invalid path: {path}")
+        parts = _split_path(path)
 
         if len(parts) == 1:
             # Top-level key
@@ -130,17 +258,145 @@ def deep_merge(base: dict, changes: dict) -> dict:
             else:
                 current[final_key] = value
 
+    if ops:
+        apply_array_ops(result, ops)
     return result
 
 
+def _item_id(item):
+    """Return the stable ID of an array item: the item itself or its "id".
+
+    Objects without an "id" (and None) have no stable ID: None.
+    """
+    return item.get("id") if isinstance(item, dict) else item
+
+
+def _is_index(value) -> bool:
+    """Whether value is an int index (bool is no index)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _find_item(items: list, op: dict) -> int | None:
+    """Return the index addressed by an op's "index" or "id", if present."""
+    if "index" in op:
+        index = op["index"]
+        if not _is_index(index) or not 0 <= index < len(items):
+            raise ValueError(f"Index out of range: {index}")
+        return index
+    if op.get("id") is None:
+        raise ValueError(f"{op['op']} needs an index or id")
+    return next(
+        (i for i, item in enumerate(items) if _item_id(item) == op["id"]), None
+    )
+
+
+def _destination(items: list, op: dict) -> int:
+    """Return where an op inserts: "to" index, before the "before" ID, or the end."""
+    if "to" in op:
+        to = op["to"]
+        if not _is_index(to) or not 0 <= to <= len(items):
+            raise ValueError(f"Index out of range: {to}")
+        return to
+    if op.get("before") is not None:
+        for i, item in enumerate(items):
+            if _item_id(item) == op["before"]:
+                return i
+    return len(items)
+
+
+def apply_array_ops(settings: dict, ops: list[dict]) -> None:
+    """Apply array operations to settings in place.
+
+    Each op addresses the list at a dot-notation "path":
+
+    - {"op": "insert", "value": v, "to"|"before"}: inserts v at index "to",
+      before the item with ID "before", or at the end
+    - {"op": "remove", "index"|"id"}: removes an item
+    - {"op": "move", "index"|"id", "to"|"before"}: moves an item; "to" is
+      the index after removal
+    - {"op": "replace", "index"|"id", "value": v}: replaces an item
+
+    Items are addressed by index or by stable ID: scalar items are their
+    own ID, objects use their "id" key; objects without one can only be
+    addressed by index. ID-addressed ops merge cleanly with concurrent
+    edits: removing, moving or replacing a missing item is a no-op, an
+    unknown "before" ID means the end, and inserting an item whose ID is
+    already present without a "to" index is a no-op.
+
+    Raises:
+        ValueError: If an op is malformed, its path is no list, or an index
+            is out of range
+    """
+    for op in ops:
+        kind = op.get("op")
+        if kind not in ARRAY_OPS:
+            raise ValueError(f"Unknown array operation: {kind}")
+        path = op.get("path")
+        if not isinstance(path, str) or not path:
+            raise ValueError("Array operation needs a path")
+
+        parts = _split_path(path)
+        current = settings
+        for part in parts[:-1]:
+            if not isinstance(current.get(part), dict):
+                current[part] = {}
+            current = current[part]
+        items = current.get(parts[-1])
+        if items is None and kind == "insert":
+            items = current[parts[-1]] = []
+        if not isinstance(items, list):
+            raise ValueError(f"Not a list: {path}")
+
+        if kind == "insert":
+            if "value" not in op:
+                raise ValueError("insert needs a value")
+            value = op["value"]
+            value_id = _item_id(value)
+            if "to" not in op and value_id is not None and any(
+                _item_id(item) == value_id for item in items
+            ):
+                continue
+            items.insert(_destination(items, op), value)
+            continue
+
+        index = _find_item(items, op)
+        if index is None:
+            continue
+        if kind == "remove":
+            del items[index]
+        elif kind == "move":
+            item = items.pop(index)
+            items.insert(_destination(items, op), item)
+        else:
+            if "value" not in op:
+                raise ValueError("replace needs a value")
+            items[index] = op["value"]
+
+
+def _commutes(changes: dict, ops: list[dict]) -> bool:
+    """Whether a delta only holds ID-addressed array ops.
+
+    Such deltas do not depend on the exact state the client saw, so they
+    are applied even if another session saved in between.
+    """
+    return bool(ops) and not changes and all(
+        "index" not in op and "to" not in op for op in ops
+    )
+
+
 @websocket_api.websocket_command({
     vol.Required("type"): f"{DOMAIN}/save_settings_delta",
-    vol.Required("changes"): dict,
+    vol.Optional("changes", default={}): dict,
+    vol.Optional("ops", default=[]): vol.All(
+        [dict], vol.Length(max=MAX_ARRAY_OPS)
+    ),
     vol.Optional("version"): int,  # Timestamp for conflict detection
 })
 @websocket_api.require_admin
 @websocket_api.async_response
+@loop_monitored("save_settings_delta")
 @rate_limited("save_settings")
+@after_load
 async def websocket_save_settings_delta(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
@@ -151,20 +407,47 @@ async def websocket_save_settings_delta(
     Rate limit: 5 req/sec, burst 3 (same as full save)
 
     This endpoint applies incremental changes to existing settings using
-    dot-notation paths (e.g., "weather.entity": "new_value").
+    dot-notation paths (e.g., "weather.entity": "new_value"), then the
+    array operations in "ops" (see apply_array_ops). Deltas with only
+    ID-addressed array operations skip the version check; the result then
+    has "rebased": true, as the client did not see the other sessions'
+    changes and must keep its version (or reload) for its next deltas.
+    Top-level enabled* maps in "changes" may be compact if it has an
+    entity table.
     """
-    changes = msg["changes"]
+    try:
+        changes = decode_settings(msg["changes"])
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_format", str(err))
+        return
+    ops = msg["ops"]
     client_version = msg.get("version", 0)
 
-    # Get current settings
-    existing = hass.data[DOMAIN].get("settings", {})
-    current_version = existing.get("_version", 0)
+    overlays: SettingsOverlays = hass.data[DOMAIN]["overlays"]
+    user_id = connection.user.id
+    rebased = False
+
+    def _apply(existing: dict) -> dict:
+        nonlocal rebased
+        # Version conflict detection (Story 10.1 AC5)
+        current_version = existing.get("_version", 0)
+        if 0 < client_version < current_version:
+            if not _commutes(changes, ops):
+                raise VersionConflict(client_version, current_version)
+            rebased = True
+        return overlays.protect(
+            user_id, existing, deep_merge(existing, changes, ops)
+        )
 
-    # Version conflict detection (Story 10.1 AC5)
-    if client_version > 0 and client_version < current_version:
+    # Applied in arrival order against the newest settings, saved with the
+    # writes arriving meanwhile
+    writer: SettingsWriter = hass.data[DOMAIN]["settings_writer"]
+    try:
+        version = writer.async_apply(_apply)
+    except VersionConflict as err:
         _LOGGER.warning(
             "Settings version conflict: client=%d, server=%d",
-            client_version, current_version
+            err.client_version, err.current_version
         )
         connection.send_error(
             msg["id"],
@@ -172,28 +455,156 @@ async def websocket_save_settings_delta(
             "Settings were modified by another session. Please reload."
         )
         return
-
-    # Apply delta changes
-    try:
-        merged = deep_merge(existing, changes)
     except Exception as err:
         _LOGGER.error("Failed to merge settings delta: %s", err)
         connection.send_error(msg["id"], "merge_error", f"Failed to apply changes: {err}")
         return
+    await writer.async_saved(version)
+
+    _LOGGER.debug(
+        "Dashview delta settings saved: %d changes, %d array ops",
+        len(changes), len(ops)
+    )
+    result = {"success": True, "version": version}
+    if rebased:
+        result["rebased"] = True
+    connection.send_result(msg["id"], result)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/save_user_settings",
+    vol.Optional("changes", default={}): vol.All(
+        dict, vol.Length(max=MAX_OVERLAY_PATHS)
+    ),
+    vol.Optional("reset", default=[]): vol.All(
+        [str], vol.Length(max=MAX_OVERLAY_PATHS)
+    ),
+})
+@websocket_api.async_response
+@loop_monitored("save_user_settings")
+@rate_limited("save_user_settings")
+@after_load
+async def websocket_save_user_settings(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle a change of the user's own settings overlay.
+
+    Rate limit: 2 req/sec, burst 4
+
+    Not admin-only: every user may change their own overlay. "changes"
+    uses the save_settings_delta format; "reset" lists overlay paths to
+    drop so the shared settings apply again.
+    """
+    overlays: SettingsOverlays = hass.data[DOMAIN]["overlays"]
+    try:
+        changes = decode_settings(msg["changes"])
+        for path in (*changes, *msg["reset"]):
+            _split_path(path)
+        overlay = overlays.update(connection.user.id, changes, msg["reset"])
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_format", str(err))
+        return
+
+    _LOGGER.debug(
+        "Dashview user settings saved: %d changes, %d reset, %d paths",
+        len(changes), len(msg["reset"]), len(overlay),
+    )
+    connection.send_result(msg["id"], {"success": True, "paths": len(overlay)})
+
+
+async def _async_apply_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+    undo: bool,
+) -> None:
+    """Apply the newest undo or redo changes as a settings delta.
+
+    The entry moves to the other history only once the changes are
+    applied, without awaiting in between, so concurrent requests never
+    apply it twice and a failed merge keeps it.
+    """
+    history: SettingsHistory = hass.data[DOMAIN]["settings_history"]
+    delta = history.peek_undo() if undo else history.peek_redo()
+    if delta is None:
+        connection.send_error(
+            msg["id"], "not_found", f"Nothing to {'undo' if undo else 'redo'}"
+        )
+        return
+
+    writer: SettingsWriter = hass.data[DOMAIN]["settings_writer"]
+    version = writer.async_apply(
+        lambda current: apply_entries(
+            deep_merge(current, delta["changes"]), delta["entries"]
+        ),
+        record_history=False,
+    )
+    if undo:
+        history.undo()
+    else:
+        history.redo()
+    await writer.async_saved(version)
+
+    _LOGGER.debug(
+        "Dashview settings %s: %d changes, %d maps", "undone" if undo else "redone",
+        len(delta["changes"]), len(delta["entries"]),
+    )
+    connection.send_result(msg["id"], {
+        "changes": delta["changes"],
+        "entries": delta["entries"],
+        "version": version,
+        "can_undo": history.can_undo,
+        "can_redo": history.can_redo,
+    })
 
-    # Update version timestamp
-    new_version = int(time.time() * 1000)
-    merged["_version"] = new_version
 
-    # Update in memory
-    hass.data[DOMAIN]["settings"] = merged
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/undo",
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+@loop_monitored("undo")
+@rate_limited("undo")
+@after_load
+async def websocket_undo(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle undo of the newest settings change.
 
-    # Persist to storage
-    store: Store = hass.data[DOMAIN]["store"]
-    await store.async_save(merged)
+    Rate limit: 5 req/sec, burst 3
 
-    _LOGGER.debug("Dashview delta settings saved: %d changes", len(changes))
-    connection.send_result(msg["id"], {"success": True, "version": new_version})
+    Responds with the applied changes in the save_settings_delta format
+    and the per-entity "entries" of entity ID maps (see
+    settings_history.py), so clients update their copy without reloading
+    the settings. The
+    history is shared by all admins: this reverts the newest change of the
+    shared settings, also if another admin made it.
+    """
+    await _async_apply_history(hass, connection, msg, undo=True)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/redo",
+})
+@websocket_api.require_admin
+@websocket_api.async_response
+@loop_monitored("redo")
+@rate_limited("redo")
+@after_load
+async def websocket_redo(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle redo of the newest undone settings change.
+
+    Rate limit: 5 req/sec, burst 3
+    """
+    await _async_apply_history(hass, connection, msg, undo=False)
 
 
 @websocket_api.websocket_command({
@@ -203,6 +614,7 @@ async def websocket_save_settings_delta(
 })
 @websocket_api.require_admin
 @websocket_api.async_response
+@loop_monitored("upload_photo")
 @rate_limited("upload_photo")
 async def websocket_upload_photo(
     hass: HomeAssistant,
@@ -219,7 +631,8 @@ async def websocket_upload_photo(
     # SECURITY: Check payload size BEFORE any processing to prevent DoS (Story 7.3, GitHub #4)
     # This prevents memory exhaustion from oversized base64 payloads
     if len(data) > MAX_BASE64_SIZE:
-        _LOGGER.warning(
+        get_log_sampler().warning(
+            _LOGGER, "upload_photo", "file_too_large", id(connection),
             "SECURITY: Oversized upload rejected | size=%d | max=%d | filename=%s",
             len(data), MAX_BASE64_SIZE, filename
         )
@@ -245,9 +658,10 @@ async def websocket_upload_photo(
     try:
         safe_filename, _ = validate_and_sanitize_filename(filename, upload_dir)
     except ValueError as err:
-        _LOGGER.warning(
+        get_log_sampler().warning(
+            _LOGGER, "upload_photo", "invalid_filename", id(connection),
             "SECURITY: Path traversal attempt rejected | filename=%s | error=%s",
-            filename, str(err)
+            filename, err
         )
         connection.send_error(msg["id"], "invalid_filename", str(err))
         return
@@ -259,15 +673,24 @@ async def websocket_upload_photo(
             data = data.split(",", 1)[1]
         image_data = base64.b64decode(data)
     except Exception as err:
-        _LOGGER.error("Failed to decode image data: %s", err)
+        get_log_sampler().error(
+            _LOGGER, "upload_photo", "decode_error", id(connection),
+            "Failed to decode image data: %s", err
+        )
         connection.send_error(msg["id"], "decode_error", "Failed to decode image data")
         return
 
     # Validate magic bytes match expected format for extension
     if not validate_magic_bytes(image_data, ext):
-        file_hash = hashlib.sha256(image_data).hexdigest()[:16]
-        detected_type = detect_file_type(image_data)
-        _LOGGER.warning(
+        sampler = get_log_sampler()
+        if sampler.would_emit("upload_photo", "invalid_file_content", id(connection)):
+            file_hash = hashlib.sha256(image_data).hexdigest()[:16]
+            detected_type = detect_file_type(image_data)
+        else:
+            # Suppressed repeats are only counted; skip hashing the upload
+            file_hash = detected_type = "-"
+        sampler.warning(
+            _LOGGER, "upload_photo", "invalid_file_content", id(connection),
             "SECURITY: Photo upload rejected - magic bytes mismatch | "
             "claimed=%s | detected=%s | hash=%s | filename=%s | size=%d",
             ext, detected_type, file_hash, filename, len(image_data)
@@ -322,6 +745,7 @@ async def websocket_upload_photo(
 })
 @websocket_api.require_admin
 @websocket_api.async_response
+@loop_monitored("delete_photo")
 @rate_limited("delete_photo")
 async def websocket_delete_photo(
     hass: HomeAssistant,
@@ -350,9 +774,10 @@ async def websocket_delete_photo(
     try:
         safe_filename, file_path = validate_and_sanitize_filename(filename, upload_dir)
     except ValueError as err:
-        _LOGGER.warning(
+        get_log_sampler().warning(
+            _LOGGER, "delete_photo", "invalid_path", id(connection),
             "SECURITY: Delete path traversal attempt rejected | filename=%s | error=%s",
-            filename, str(err)
+            filename, err
         )
         connection.send_error(msg["id"], "invalid_path", str(err))
         return
@@ -366,3 +791,637 @@ async def websocket_delete_photo(
     except OSError as err:
         _LOGGER.error("Failed to delete photo: %s", err)
         connection.send_error(msg["id"], "delete_error", "Failed to delete photo")
+
+
+def _parse_time(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp; naive values are treated as UTC.
+
+    Raises:
+        ValueError: If value is not a valid timestamp
+    """
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/history_summary",
+    vol.Required("entity_ids"): vol.All(
+        [str], vol.Length(min=1, max=MAX_ENTITIES)
+    ),
+    vol.Required("start_time"): str,
+    vol.Optional("end_time"): str,
+    vol.Optional("points", default=DEFAULT_POINTS): vol.All(
+        int, vol.Range(min=3, max=MAX_POINTS)
+    ),
+    vol.Optional("method", default=METHOD_LTTB): vol.In(METHODS),
+})
+@websocket_api.async_response
+@loop_monitored("history_summary")
+@rate_limited("history_summary")
+async def websocket_history_summary(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle batched, downsampled numeric history request.
+
+    Rate limit: 5 req/sec, burst 10
+
+    Returns one columnar series per entity, reduced server-side to at most
+    `points` samples: {"series": {"sensor.x": {"t": [...], "v": [...]}}}
+    with t in epoch seconds. Ranges covered by the recent values cache are
+    served from memory.
+    """
+    try:
+        start_time = _parse_time(msg["start_time"])
+        end_time = (
+            _parse_time(msg["end_time"]) if msg.get("end_time")
+            else datetime.now(timezone.utc)
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_time", str(err))
+        return
+
+    if end_time <= start_time or end_time - start_time > timedelta(hours=MAX_RANGE_HOURS):
+        connection.send_error(
+            msg["id"],
+            "invalid_range",
+            f"Time range must be positive and at most {MAX_RANGE_HOURS} hours"
+        )
+        return
+
+    entity_ids = list(dict.fromkeys(msg["entity_ids"]))
+    if "recorder" not in hass.config.components:
+        connection.send_error(
+            msg["id"], "recorder_unavailable", "Recorder is not available"
+        )
+        return
+    series = await async_get_history_summary(
+        hass,
+        entity_ids,
+        start_time,
+        end_time,
+        msg.get("points", DEFAULT_POINTS),
+        msg.get("method", METHOD_LTTB),
+        hass.data[DOMAIN].get("recent_values"),
+    )
+
+    connection.send_result(msg["id"], {
+        "start": int(start_time.timestamp()),
+        "end": int(end_time.timestamp()),
+        "series": _with_units(hass, series),
+    })
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/presence_history",
+    vol.Required("entity_ids"): vol.All(
+        [str], vol.Length(min=1, max=MAX_PERSONS)
+    ),
+    vol.Optional("days", default=DEFAULT_DAYS): vol.All(
+        int, vol.Range(min=1, max=MAX_DAYS)
+    ),
+    vol.Optional("limit", default=DEFAULT_LIMIT): vol.All(
+        int, vol.Range(min=1, max=MAX_LIMIT)
+    ),
+})
+@websocket_api.async_response
+@loop_monitored("presence_history")
+@rate_limited("presence_history")
+async def websocket_presence_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle presence history request for one or more persons.
+
+    Rate limit: 5 req/sec, burst 10
+
+    Returns the latest zone transitions per person, most recent first:
+    {"persons": {"person.x": [{"state", "since", "until", "dwell"}]}} with
+    epoch seconds and dwell in seconds; "until" is null for the current
+    state. Served from a cache that is invalidated on zone changes. Only
+    person and device_tracker entities are accepted.
+    """
+    entity_ids = list(dict.fromkeys(msg["entity_ids"]))
+    invalid = [
+        entity_id for entity_id in entity_ids if not is_presence_entity(entity_id)
+    ]
+    if invalid:
+        connection.send_error(
+            msg["id"],
+            "invalid_format",
+            f"Not a person or device tracker: {', '.join(invalid)}",
+        )
+        return
+    if "recorder" not in hass.config.components:
+        connection.send_error(
+            msg["id"], "recorder_unavailable", "Recorder is not available"
+        )
+        return
+    persons = await hass.data[DOMAIN]["presence_cache"].async_get_history(
+        entity_ids, msg["days"], msg["limit"]
+    )
+
+    connection.send_result(msg["id"], {"persons": persons})
+
+
+def _with_units(hass: HomeAssistant, series: dict[str, dict]) -> dict[str, dict]:
+    """Add each entity's current unit_of_measurement to its series."""
+    result = {}
+    for entity_id, data in series.items():
+        state = hass.states.get(entity_id)
+        result[entity_id] = {
+            **data,
+            "unit": state.attributes.get("unit_of_measurement") if state else None,
+        }
+    return result
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/statistics_summary",
+    vol.Required("entity_ids"): vol.All(
+        [str], vol.Length(min=1, max=MAX_ENTITIES)
+    ),
+    vol.Required("start_time"): str,
+    vol.Optional("end_time"): str,
+    vol.Optional("period"): vol.In(PERIODS),
+    vol.Optional("points", default=DEFAULT_POINTS): vol.All(
+        int, vol.Range(min=3, max=MAX_POINTS)
+    ),
+})
+@websocket_api.async_response
+@loop_monitored("statistics_summary")
+@rate_limited("statistics_summary")
+async def websocket_statistics_summary(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle long-term statistics request for week/month charts.
+
+    Rate limit: 5 req/sec, burst 10
+
+    Reads the recorder's 5-minute/hourly/daily statistics (the period is
+    picked from the range unless given) and returns at most `points`
+    samples per entity: {"series": {"sensor.x": {"t", "mean", "min",
+    "max"}}}. The range is aligned to whole periods.
+    """
+    try:
+        start_time = _parse_time(msg["start_time"])
+        end_time = (
+            _parse_time(msg["end_time"]) if msg.get("end_time")
+            else datetime.now(timezone.utc)
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_time", str(err))
+        return
+
+    if end_time <= start_time or end_time - start_time > timedelta(days=MAX_RANGE_DAYS):
+        connection.send_error(
+            msg["id"],
+            "invalid_range",
+            f"Time range must be positive and at most {MAX_RANGE_DAYS} days"
+        )
+        return
+
+    entity_ids = list(dict.fromkeys(msg["entity_ids"]))
+    period = msg.get("period") or select_period(start_time, end_time)
+    if "recorder" not in hass.config.components:
+        connection.send_error(
+            msg["id"], "recorder_unavailable", "Recorder is not available"
+        )
+        return
+    start_ts, end_ts, series = await async_get_statistics_summary(
+        hass,
+        entity_ids,
+        start_time,
+        end_time,
+        period,
+        msg.get("points", DEFAULT_POINTS),
+        hass.data[DOMAIN].get("statistics_cache"),
+    )
+
+    connection.send_result(msg["id"], {
+        "start": int(start_ts),
+        "end": int(end_ts),
+        "period": period,
+        "series": _with_units(hass, series),
+    })
+
+
+@callback
+def _async_add_subscription(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg_id: int,
+    unsub: CALLBACK_TYPE,
+) -> None:
+    """Register a subscription that async_end_subscriptions can end."""
+    subscriptions = hass.data[DOMAIN].setdefault(DATA_SUBSCRIPTIONS, {})
+    key = (connection, msg_id)
+
+    @callback
+    def remove() -> None:
+        subscriptions.pop(key, None)
+        unsub()
+
+    subscriptions[key] = unsub
+    connection.subscriptions[msg_id] = remove
+
+
+@callback
+def async_end_subscriptions(hass: HomeAssistant) -> None:
+    """End all open subscriptions before the engines stop.
+
+    Each client gets an error for its subscription, so panels know that
+    no more events follow and can subscribe again after a reload.
+    """
+    subscriptions = hass.data[DOMAIN].pop(DATA_SUBSCRIPTIONS, {})
+    for (connection, msg_id), unsub in subscriptions.items():
+        connection.subscriptions.pop(msg_id, None)
+        unsub()
+        connection.send_error(msg_id, "unloaded", "Dashview was unloaded")
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_anomalies",
+})
+@websocket_api.async_response
+@loop_monitored("subscribe_anomalies")
+@rate_limited("subscribe")
+async def websocket_subscribe_anomalies(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Subscribe to server-side rate-of-change anomalies.
+
+    Rate limit: 5 req/sec, burst 10 (shared by all subscriptions)
+
+    The first event carries all active anomalies ({"anomalies": {...}}),
+    later events only the sensors whose anomaly changed ({"changed":
+    {entity_id: anomaly or null}}).
+    """
+    detector = hass.data[DOMAIN]["anomaly_detector"]
+
+    @callback
+    def forward(changes: dict) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"changed": changes})
+        )
+
+    _async_add_subscription(
+        hass, connection, msg["id"], detector.async_add_listener(forward)
+    )
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(msg["id"], {"anomalies": detector.anomalies})
+    )
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_rooms",
+})
+@websocket_api.async_response
+@loop_monitored("subscribe_rooms")
+@rate_limited("subscribe")
+async def websocket_subscribe_rooms(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Subscribe to per-room aggregates for room and floor cards.
+
+    Rate limit: 5 req/sec, burst 10 (shared by all subscriptions)
+
+    The first event carries every room ({"rooms": {area_id: {...}}}),
+    later events only changed fields ({"changed": {area_id: {...}}}); a
+    room that is no longer shown is sent as null.
+    """
+    aggregator = hass.data[DOMAIN]["room_aggregator"]
+
+    @callback
+    def forward(changes: dict) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"changed": changes})
+        )
+
+    _async_add_subscription(
+        hass, connection, msg["id"], aggregator.async_add_listener(forward)
+    )
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(msg["id"], {"rooms": aggregator.rooms})
+    )
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_status",
+})
+@websocket_api.async_response
+@loop_monitored("subscribe_status")
+@rate_limited("subscribe")
+async def websocket_subscribe_status(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Subscribe to the info-text status summary.
+
+    Rate limit: 5 req/sec, burst 10 (shared by all subscriptions)
+
+    The first event carries the summary of every enabled status group
+    ({"summary": {...}}), later events only changed groups ({"changed":
+    {...}}); a group that was switched off is sent as null.
+    """
+    engine = hass.data[DOMAIN]["status_engine"]
+
+    @callback
+    def forward(changes: dict) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"changed": changes})
+        )
+
+    _async_add_subscription(
+        hass, connection, msg["id"], engine.async_add_listener(forward)
+    )
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(msg["id"], {"summary": engine.summary})
+    )
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_entities",
+    vol.Optional("numeric_rate", default=DEFAULT_NUMERIC_RATE): vol.All(
+        vol.Coerce(float), vol.Range(min=MIN_NUMERIC_RATE, max=MAX_NUMERIC_RATE)
+    ),
+})
+@websocket_api.async_response
+@loop_monitored("subscribe_entities")
+@rate_limited("subscribe")
+async def websocket_subscribe_entities(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Subscribe to state changes of the entities Dashview displays.
+
+    Rate limit: 5 req/sec, burst 10 (shared by all subscriptions)
+
+    Only displayed entities are reported, numeric sensors at most
+    numeric_rate times per second each. Events carry no states, only the
+    "u" (entity ID -> last_updated) and "r" (removed) entities described in
+    entity_stream.py; states are read from hass.states.
+    """
+
+    @callback
+    def send(payload: dict) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], payload))
+
+    stream = EntityStream(
+        hass, hass.data[DOMAIN]["displayed_entities"], send, msg["numeric_rate"]
+    )
+    _async_add_subscription(hass, connection, msg["id"], stream.async_stop)
+    connection.send_result(msg["id"])
+    stream.async_start()
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_suggestions",
+})
+@websocket_api.async_response
+@loop_monitored("subscribe_suggestions")
+@rate_limited("subscribe")
+@after_load
+async def websocket_subscribe_suggestions(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Subscribe to the visible smart suggestions.
+
+    Rate limit: 5 req/sec, burst 10 (shared by all subscriptions)
+
+    Every event carries the complete list ({"suggestions": [...]}, at most
+    two, highest priority first); it is sent whenever it changes.
+    """
+    engine = hass.data[DOMAIN]["suggestion_engine"]
+
+    @callback
+    def forward(suggestions: list) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"suggestions": suggestions})
+        )
+
+    _async_add_subscription(
+        hass, connection, msg["id"], engine.async_add_listener(forward)
+    )
+    connection.send_result(msg["id"])
+    forward(engine.suggestions)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/suggestion_action",
+    vol.Required("rule"): vol.In(list(RULES_BY_ID)),
+    vol.Required("action"): vol.In(ACTIONS),
+})
+@websocket_api.async_response
+@loop_monitored("suggestion_action")
+@rate_limited("suggestion_action")
+@after_load
+async def websocket_suggestion_action(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Record that a suggestion was dismissed or acted upon.
+
+    Rate limit: 5 req/sec, burst 3
+
+    Starts the rule's cooldown for every panel; a dismissed rule also stays
+    hidden until its condition clears.
+    """
+    hass.data[DOMAIN]["suggestion_engine"].async_record_action(
+        msg["rule"], msg["action"]
+    )
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_weather",
+    vol.Optional("entity_id"): str,
+    vol.Optional("forecast_types", default=["daily", "hourly"]): vol.All(
+        [vol.In(FORECAST_TYPES)], vol.Length(min=1)
+    ),
+})
+@websocket_api.async_response
+@loop_monitored("subscribe_weather")
+@rate_limited("subscribe")
+@after_load
+async def websocket_subscribe_weather(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Subscribe to weather forecasts shared by all panels.
+
+    Rate limit: 5 req/sec, burst 10 (shared by all subscriptions)
+
+    Falls back to the first weather entity if entity_id is missing or does
+    not exist. The first event names the entity and the forecast types it
+    provides ({"entity_id": ..., "forecast_types": [...]}); every later
+    event carries one forecast ({"type": "daily", "forecast": [...]}),
+    cached forecasts right away.
+    """
+    index = hass.data[DOMAIN]["discovery_index"]
+    entity_id = msg.get("entity_id")
+    if entity_id is None or not index.contains(WEATHER_DOMAIN, entity_id):
+        entity_id = index.first(WEATHER_DOMAIN)
+    if entity_id is None:
+        connection.send_error(msg["id"], "not_found", "No weather entity found")
+        return
+
+    forecasts = hass.data[DOMAIN]["weather_forecasts"]
+    forecast_types = forecasts.supported_types(
+        entity_id, list(dict.fromkeys(msg["forecast_types"]))
+    )
+    if not forecast_types:
+        connection.send_error(
+            msg["id"], "not_supported", f"{entity_id} provides no requested forecast"
+        )
+        return
+
+    unsubs = []
+
+    @callback
+    def unsubscribe() -> None:
+        for unsub in unsubs:
+            unsub()
+
+    _async_add_subscription(hass, connection, msg["id"], unsubscribe)
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(
+        msg["id"], {"entity_id": entity_id, "forecast_types": forecast_types}
+    ))
+    for forecast_type in forecast_types:
+
+        @callback
+        def forward(forecast: list | None, forecast_type: str = forecast_type) -> None:
+            connection.send_message(websocket_api.event_message(
+                msg["id"], {"type": forecast_type, "forecast": forecast}
+            ))
+
+        try:
+            unsubs.append(forecasts.async_subscribe(entity_id, forecast_type, forward))
+        except ForecastNotSupported as err:
+            _LOGGER.debug("Weather forecast unavailable: %s", err)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_discovery",
+})
+@websocket_api.async_response
+@loop_monitored("subscribe_discovery")
+@rate_limited("subscribe")
+async def websocket_subscribe_discovery(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Subscribe to the discovered weather, person, pollen and DWD entities.
+
+    Rate limit: 5 req/sec, burst 10 (shared by all subscriptions)
+
+    The first event carries every kind ({"discovery": {...}}), later events
+    the complete new value of changed kinds ({"changed": {kind: ...}}); see
+    discovery.py for the format.
+    """
+    index = hass.data[DOMAIN]["discovery_index"]
+
+    @callback
+    def forward(changes: dict) -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"changed": changes})
+        )
+
+    _async_add_subscription(
+        hass, connection, msg["id"], index.async_add_listener(forward)
+    )
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(msg["id"], {"discovery": index.payload})
+    )
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/search_entities",
+    vol.Optional("query", default=""): vol.All(str, vol.Length(max=MAX_QUERY_LENGTH)),
+    vol.Optional("domains"): vol.All([str], vol.Length(max=MAX_FILTERS)),
+    vol.Optional("areas"): vol.All([str], vol.Length(max=MAX_FILTERS)),
+    vol.Optional("labels"): vol.All([str], vol.Length(max=MAX_FILTERS)),
+    vol.Optional("limit", default=SEARCH_DEFAULT_LIMIT): vol.All(
+        int, vol.Range(min=1, max=SEARCH_MAX_LIMIT)
+    ),
+    vol.Optional("offset", default=0): vol.All(int, vol.Range(min=0)),
+})
+@websocket_api.async_response
+@loop_monitored("search_entities")
+@rate_limited("search_entities")
+async def websocket_search_entities(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle entity search for the entity picker.
+
+    Rate limit: 10 req/sec, burst 20
+
+    Returns a ranked page of matches from the search index:
+    {"results": [{"entity_id", "name", "area_id", "score"}], "total",
+    "offset", "limit"}. Domain, area and label filters each accept any of
+    their values; see search.py for matching and ranking.
+    """
+    results, total = hass.data[DOMAIN]["search_index"].search(
+        msg["query"],
+        domains=msg.get("domains"),
+        areas=msg.get("areas"),
+        labels=msg.get("labels"),
+        limit=msg["limit"],
+        offset=msg["offset"],
+    )
+    connection.send_result(msg["id"], {
+        "results": results,
+        "total": total,
+        "offset": msg["offset"],
+        "limit": msg["limit"],
+    })
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/media_artwork",
+    vol.Required("media_ids"): vol.All([str], vol.Length(min=1, max=MAX_MEDIA_IDS)),
+})
+@websocket_api.async_response
+@loop_monitored("media_artwork")
+@rate_limited("media_artwork")
+@after_load
+async def websocket_media_artwork(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict,
+) -> None:
+    """Handle artwork lookup for media presets.
+
+    Rate limit: 2 req/sec, burst 4
+
+    Returns {"artwork": {media_id: url or null}} with URLs of locally
+    cached thumbnails; see artwork.py for fetching and caching.
+    """
+    artwork = await hass.data[DOMAIN]["artwork_cache"].async_resolve(
+        msg["media_ids"]
+    )
+    connection.send_result(msg["id"], {"artwork": artwork})
@@ -4,27 +4,77 @@ import terser from '@rollup/plugin-terser';
 import { createHash } from 'crypto';
 import { writeFileSync, mkdirSync } from 'fs';
 import { dirname, join } from 'path';
+import { gzipSync, brotliCompressSync, constants as zlibConstants } from 'zlib';
 
 const outputDir = 'custom_components/dashview/frontend/dist';
 
+// Dynamic imports matching these are fetched on demand (admin UI, popups)
+// and are never preloaded by the bootstrap module
+const LAZY_MODULES = [/\/features\/admin\//, /\/features\/popups\//];
+
+/**
+ * Custom plugin to resolve versioned dynamic imports.
+ * The panel imports its modules as `./x.js?v=${DASHVIEW_VERSION}` for cache
+ * busting in dev mode. Rollup cannot resolve template literals, so the query
+ * is stripped here; content hashes take over cache busting in the build and
+ * each import becomes its own chunk.
+ */
+function stripVersionQuery() {
+  const versioned = /import\(`(\.{1,2}\/[^`?$]+\.js)\?v=\$\{DASHVIEW_VERSION\}`\)/g;
+  return {
+    name: 'strip-version-query',
+    transform(code) {
+      if (!code.includes('?v=${DASHVIEW_VERSION}')) return null;
+      return { code: code.replace(versioned, "import('$1')"), map: null };
+    }
+  };
+}
+
 /**
- * Custom plugin to generate asset-manifest.json with content hash mapping
+ * Custom plugin to generate asset-manifest.json with content hash mapping.
+ *
+ * Besides the legacy `dashview-panel.js` key, the manifest lists the
+ * code-split build: `entry` (the panel chunk), `shared` (chunks needed for
+ * the first render, preloaded by the backend bootstrap module) and `lazy`
+ * (admin and popup chunks, fetched on demand).
  */
 function assetManifest() {
   return {
     name: 'asset-manifest',
     generateBundle(options, bundle) {
       const manifest = {};
+      const chunks = Object.values(bundle).filter((chunk) => chunk.type === 'chunk');
+      const byFile = new Map(chunks.map((chunk) => [chunk.fileName, chunk]));
+      const isLazy = (chunk) =>
+        chunk.facadeModuleId && LAZY_MODULES.some((re) => re.test(chunk.facadeModuleId));
 
-      for (const [fileName, chunk] of Object.entries(bundle)) {
-        if (chunk.type === 'chunk' && chunk.isEntry) {
+      // Walk static imports plus eager dynamic imports from the entry
+      const critical = new Set();
+      const visit = (fileName) => {
+        const chunk = byFile.get(fileName);
+        if (!chunk || critical.has(fileName)) return;
+        critical.add(fileName);
+        chunk.imports.forEach(visit);
+        chunk.dynamicImports
+          .filter((dynamic) => !isLazy(byFile.get(dynamic) || {}))
+          .forEach(visit);
+      };
+
+      for (const chunk of chunks) {
+        if (chunk.isEntry) {
           // Use the chunk name (without hash) as the key
           // Map to the actual hashed output filename
-          const originalName = `${chunk.name}.js`;
-          manifest[originalName] = fileName;
+          manifest[`${chunk.name}.js`] = chunk.fileName;
+          manifest.entry = chunk.fileName;
+          visit(chunk.fileName);
         }
       }
 
+      manifest.shared = [...critical].filter((fileName) => fileName !== manifest.entry);
+      manifest.lazy = chunks
+        .map((chunk) => chunk.fileName)
+        .filter((fileName) => !critical.has(fileName));
+
       // Emit the manifest as an asset
       this.emitFile({
         type: 'asset',
@@ -35,6 +85,31 @@ function assetManifest() {
   };
 }
 
+/**
+ * Custom plugin to write pre-compressed .br/.gz siblings for every emitted
+ * JS/JSON file. The integration serves them via Accept-Encoding
+ * negotiation (see static_assets.py), so tablets download the small
+ * variant without relying on a reverse proxy.
+ */
+function precompress() {
+  const compressible = /\.(js|json|css|map)$/;
+  return {
+    name: 'precompress',
+    writeBundle(options, bundle) {
+      for (const [fileName, output] of Object.entries(bundle)) {
+        if (!compressible.test(fileName)) continue;
+        const source = output.type === 'chunk' ? output.code : output.source;
+        const filePath = join(options.dir, fileName);
+        mkdirSync(dirname(filePath), { recursive: true });
+        writeFileSync(`${filePath}.gz`, gzipSync(source, { level: 9 }));
+        writeFileSync(`${filePath}.br`, brotliCompressSync(source, {
+          params: { [zlibConstants.BROTLI_PARAM_QUALITY]: 11 }
+        }));
+      }
+    }
+  };
+}
+
 export default {
   input: 'custom_components/dashview/frontend/dashview-panel.js',
 
@@ -43,12 +118,15 @@ export default {
     format: 'es',
     // Content hash in filename for cache busting
     entryFileNames: '[name].[hash].js',
-    chunkFileNames: '[name].[hash].js',
-    // Inline dynamic imports into single bundle for simpler cache invalidation
-    inlineDynamicImports: true
+    chunkFileNames: '[name].[hash].js'
+    // Code-split: every dynamic import becomes its own chunk; the backend
+    // bootstrap module preloads only the critical ones (see asset-manifest)
   },
 
   plugins: [
+    // Make versioned dynamic imports resolvable for code splitting
+    stripVersionQuery(),
+
     // Resolve node_modules imports
     nodeResolve({
       browser: true
@@ -65,7 +143,10 @@ export default {
     }),
 
     // Generate asset manifest
-    assetManifest()
+    assetManifest(),
+
+    // Write .br/.gz siblings for served assets
+    precompress()
   ],
 
   // External dependencies provided by Home Assistant